@@ -81,17 +81,25 @@ cdef class FastPrimitivesCoderImpl(StreamCoderImpl):
   cdef CoderImpl iterable_coder_impl
   cdef object requires_deterministic_step_label
   cdef bint warn_deterministic_fallback
+  cdef bint encode_user_types
+  cdef object type_encodings
+  cdef Py_ssize_t max_cached_type_encodings
+  cdef libc.stdint.int64_t num_special_encoded
+  cdef libc.stdint.int64_t num_fallback_encoded
 
   @cython.locals(dict_value=dict, int_value=libc.stdint.int64_t,
                  unicode_value=unicode)
   cpdef encode_to_stream(self, value, OutputStream stream, bint nested)
   @cython.locals(t=int)
   cpdef decode_from_stream(self, InputStream stream, bint nested)
+  @cython.locals(tag=int)
+  cdef encode_special(self, value, OutputStream stream, bint nested)
   cdef encode_special_deterministic(self, value, OutputStream stream)
   cdef encode_type(self, t, OutputStream stream)
   cdef decode_type(self, InputStream stream)
 
 cdef dict _unpickled_types
+cdef dict _slot_names_by_type
 
 
 cdef class MapCoderImpl(StreamCoderImpl):
@@ -265,6 +273,7 @@ cdef class ParamWindowedValueCoderImpl(WindowedValueCoderImpl):
 
 cdef class LengthPrefixCoderImpl(StreamCoderImpl):
   cdef CoderImpl _value_coder
+  cdef bint _decode_from_substream
 
 
 cdef class RowColumnEncoder:
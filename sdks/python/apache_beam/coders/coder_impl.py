@@ -30,6 +30,7 @@ For internal use only; no backwards-compatibility guarantees.
 """
 # pytype: skip-file
 
+import collections
 import decimal
 import enum
 import itertools
@@ -346,6 +347,15 @@ DATACLASS_TYPE = 101
 NAMED_TUPLE_TYPE = 102
 ENUM_TYPE = 103
 NESTED_STATE_TYPE = 104
+SLOTS_TYPE = 105
+
+# The maximum number of distinct classes for which a FastPrimitivesCoderImpl
+# remembers how to encode their instances.
+_MAX_CACHED_TYPE_ENCODINGS = 1000
+
+# Methods through which a class may customize how it is pickled.
+_PICKLE_CUSTOMIZATION_METHODS = (
+    '__reduce__', '__reduce_ex__', '__getstate__', '__setstate__')
 
 # Types that can be encoded as iterables, but are not literally
 # lists, etc. due to being lazy.  The actual type is not preserved
@@ -357,11 +367,28 @@ _ITERABLE_LIKE_TYPES = set()  # type: Set[Type]
 class FastPrimitivesCoderImpl(StreamCoderImpl):
   """For internal use only; no backwards-compatibility guarantees."""
   def __init__(
-      self, fallback_coder_impl, requires_deterministic_step_label=None):
+      self,
+      fallback_coder_impl,
+      requires_deterministic_step_label=None,
+      max_cached_type_encodings=_MAX_CACHED_TYPE_ENCODINGS,
+      encode_user_types=False):
     self.fallback_coder_impl = fallback_coder_impl
     self.iterable_coder_impl = IterableCoderImpl(self)
     self.requires_deterministic_step_label = requires_deterministic_step_label
     self.warn_deterministic_fallback = True
+    # Whether enums, NamedTuples, frozen dataclasses and classes with
+    # __slots__ are encoded field by field rather than with the fallback coder
+    # when determinism is not required. This changes the encoding, so it must
+    # be opted into.
+    self.encode_user_types = encode_user_types
+    # Maps the classes most recently seen by encode_special to a (tag, encoded
+    # type, field names) tuple describing how their instances are encoded, or
+    # to None if they take the general (fallback or special deterministic)
+    # path.
+    self.type_encodings = collections.OrderedDict()
+    self.max_cached_type_encodings = max_cached_type_encodings
+    self.num_special_encoded = 0
+    self.num_fallback_encoded = 0
 
   @staticmethod
   def register_iterable_like_type(t):
@@ -397,6 +424,7 @@ class FastPrimitivesCoderImpl(StreamCoderImpl):
         stream.write_byte(INT_TYPE)
         stream.write_var_int64(int_value)
       except OverflowError:
+        self.num_fallback_encoded += 1
         stream.write_byte(UNKNOWN_TYPE)
         self.fallback_coder_impl.encode_to_stream(value, stream, nested)
     elif t is float:
@@ -451,14 +479,123 @@ class FastPrimitivesCoderImpl(StreamCoderImpl):
               self.requires_deterministic_step_label) from exn
       for e in value:
         self.encode_to_stream(e, stream, True)
+    else:
+      self.encode_special(value, stream, nested)
+
+  def encode_special(self, value, stream, nested):
+    t = type(value)
+    try:
+      type_encoding = self.type_encodings[t]
+      self.type_encodings.move_to_end(t)
+    except KeyError:
+      # Also reached if another thread evicted t in the meantime.
+      type_encoding = self.get_type_encoding(t)
+      self.type_encodings[t] = type_encoding
+      if len(self.type_encodings) > self.max_cached_type_encodings:
+        try:
+          # Evict the least recently used entry.
+          self.type_encodings.popitem(last=False)
+        except KeyError:
+          # Another thread emptied the cache.
+          pass
+
+    if type_encoding is not None:
+      tag, encoded_type, field_names = type_encoding
+      if tag == ENUM_TYPE:
+        values = value.value
+      elif tag == NAMED_TUPLE_TYPE:
+        values = value
+      else:
+        try:
+          values = [getattr(value, name) for name in field_names]
+        except AttributeError:
+          # E.g. an unset slot, which needs the general path.
+          type_encoding = None
+    if type_encoding is not None:
+      self.num_special_encoded += 1
+      stream.write_byte(tag)
+      stream.write(encoded_type, True)
+      try:
+        if tag == ENUM_TYPE:
+          self.encode_to_stream(values, stream, True)
+        else:
+          self.iterable_coder_impl.encode_to_stream(values, stream, True)
+      except Exception as e:
+        if self.requires_deterministic_step_label is None:
+          raise
+        raise TypeError(self._deterministic_encoding_error_msg(value)) from e
     # All possibly deterministic encodings should be above this clause,
     # all non-deterministic ones below.
     elif self.requires_deterministic_step_label is not None:
       self.encode_special_deterministic(value, stream)
     else:
+      self.num_fallback_encoded += 1
       stream.write_byte(UNKNOWN_TYPE)
       self.fallback_coder_impl.encode_to_stream(value, stream, nested)
 
+  def get_type_encoding(self, t):
+    """Returns how to encode instances of t field by field, if possible.
+
+    The result is a (tag, encoded type, field names) tuple, or None if instances
+    of t must take the general path. If determinism is required, this is the
+    encoding encode_special_deterministic would use. Otherwise, unless
+    encode_user_types is set, or if t customizes its pickling, instances are
+    left to the fallback coder.
+    """
+    deterministic = self.requires_deterministic_step_label is not None
+    if not deterministic and not self.encode_user_types:
+      return None
+    if issubclass(t, enum.Enum):
+      tag = ENUM_TYPE
+      field_names = None
+    elif not deterministic and any(name in base.__dict__ for base in t.__mro__
+                                   if base not in (object, tuple)
+                                   for name in _PICKLE_CUSTOMIZATION_METHODS):
+      return None
+    elif dataclasses and dataclasses.is_dataclass(t):
+      fields = dataclasses.fields(t)
+      # Instances are decoded by calling the constructor, which would run
+      # __post_init__ again and drop attributes that are not fields. Only
+      # frozen dataclasses reliably avoid this, so others are pickled unless
+      # their deterministic encoding is required (which rejects them).
+      if (not t.__dataclass_params__.frozen or
+          (not deterministic and hasattr(t, '__post_init__')) or
+          any(not field.init or getattr(field, 'kw_only', False)
+              for field in fields)):
+        return None
+      tag = DATACLASS_TYPE
+      field_names = tuple(field.name for field in fields)
+    elif issubclass(t, tuple) and hasattr(t, '_fields'):
+      tag = NAMED_TUPLE_TYPE
+      field_names = None
+    # Equality of classes with __slots__ need not cover all their slots, so
+    # encoding them field by field isn't deterministic.
+    elif (not deterministic and not issubclass(t, proto_utils.message_types) and
+          not any(name in base.__dict__
+                  for base in t.__mro__ if base is not object
+                  for name in _PICKLE_CUSTOMIZATION_METHODS)):
+      tag = SLOTS_TYPE
+      field_names = _slot_names(t)
+      if field_names is None:
+        return None
+    else:
+      return None
+    try:
+      encoded_type = dill.dumps(t)
+    except Exception:
+      if deterministic:
+        raise
+      return None
+    return tag, encoded_type, field_names
+
+  def get_type_encoding_stats(self):
+    """Returns counters describing how user types have been encoded."""
+    return {
+        'cached_types': len(self.type_encodings),
+        'special_encoded': self.num_special_encoded,
+        'fallback_encoded': self.num_fallback_encoded,
+    }
+
   def encode_special_deterministic(self, value, stream):
     if self.warn_deterministic_fallback:
       _LOGGER.warning(
@@ -580,6 +717,13 @@ class FastPrimitivesCoderImpl(StreamCoderImpl):
       value = cls.__new__(cls)
       value.__setstate__(state)
       return value
+    elif t == SLOTS_TYPE:
+      cls = self.decode_type(stream)
+      values = self.iterable_coder_impl.decode_from_stream(stream, True)
+      value = cls.__new__(cls)
+      for name, field_value in zip(_slot_names(cls), values):
+        object.__setattr__(value, name, field_value)
+      return value
     elif t == UNKNOWN_TYPE:
       return self.fallback_coder_impl.decode_from_stream(stream, nested)
     else:
@@ -606,6 +750,44 @@ def _unpickle_named_tuple(bs, items):
   return _unpickle_type(bs)(*items)
 
 
+_slot_names_by_type = {}  # type: Dict[type, Optional[Tuple[str, ...]]]
+
+
+def _slot_names(t):
+  """Returns the (mangled) names of all slots of t.
+
+  Returns None unless t and all its bases (other than object) define
+  __slots__, i.e. if instances of t may have a __dict__.
+  """
+  try:
+    return _slot_names_by_type[t]
+  except KeyError:
+    pass
+  names = []
+  for base in reversed(t.__mro__):
+    if base is object:
+      continue
+    slots = base.__dict__.get('__slots__')
+    if slots is None:
+      names = None
+      break
+    if isinstance(slots, str):
+      slots = (slots, )
+    for name in slots:
+      if name == '__dict__':
+        names = None
+        break
+      elif name == '__weakref__':
+        continue
+      elif name.startswith('__') and not name.endswith('__'):
+        name = '_%s%s' % (base.__name__.lstrip('_'), name)
+      names.append(name)
+    if names is None:
+      break
+  result = _slot_names_by_type[t] = None if names is None else tuple(names)
+  return result
+
+
 class BytesCoderImpl(CoderImpl):
   """For internal use only; no backwards-compatibility guarantees.
 
@@ -1628,6 +1810,11 @@ class LengthPrefixCoderImpl(StreamCoderImpl):
   def __init__(self, value_coder):
     # type: (CoderImpl) -> None
     self._value_coder = value_coder
+    # Value coders that decode from a stream can read the value in place
+    # rather than from a copy of its bytes.
+    self._decode_from_substream = (
+        isinstance(value_coder, StreamCoderImpl) and getattr(
+            type(value_coder), 'decode') is getattr(StreamCoderImpl, 'decode'))
 
   def encode_to_stream(self, value, out, nested):
     # type: (Any, create_OutputStream, bool) -> None
@@ -1638,6 +1825,9 @@ class LengthPrefixCoderImpl(StreamCoderImpl):
   def decode_from_stream(self, in_stream, nested):
     # type: (create_InputStream, bool) -> Any
     value_length = in_stream.read_var_int64()
+    if self._decode_from_substream:
+      return self._value_coder.decode_from_stream(
+          in_stream.read_substream(value_length), False)
     return self._value_coder.decode(in_stream.read(value_length))
 
   def estimate_size(self, value, nested=False):
@@ -1891,7 +2081,8 @@ class RowCoderImpl(StreamCoderImpl):
         RowColumnEncoder.create(
             self.schema.fields[i].type.atomic_type,
             self.components[i],
-            columns[name]) for i, name in enumerate(self.field_names)
+            np.ma.getdata(columns[name]))
+        for i, name in enumerate(self.field_names)
     ]
 
   def encode_batch_to_stream(self, columns: Dict[str, np.ndarray], out):
@@ -1903,7 +2094,15 @@ class RowCoderImpl(StreamCoderImpl):
       null_bits_py = np.zeros((n, null_bits_len), dtype=np.uint8)
       for i, attr in enumerate(attrs):
         attr_null_flags = attr.null_flags()
+        # Masked arrays carry their nulls in a separate mask.
+        column_mask = np.ma.getmask(columns[self.field_names[i]])
+        if column_mask is not np.ma.nomask:
+          if attr_null_flags is None:
+            attr_null_flags = column_mask
+          else:
+            attr_null_flags = attr_null_flags | column_mask
         if attr_null_flags is not None and attr_null_flags.any():
+          attr_null_flags = attr_null_flags.astype(np.uint8)
           null_flags_py[:, i] = attr_null_flags
           null_bits_py[:, i // 8] |= attr_null_flags << np.uint8(i % 8)
       has_null_bits = (null_bits_py.sum(axis=1) != 0).astype(np.uint8)
@@ -1967,6 +2166,11 @@ class RowCoderImpl(StreamCoderImpl):
   def decode_batch_from_stream(self, dest: Dict[str, np.ndarray], in_stream):
     attrs = self._row_column_encoders(dest)
     n = len(next(iter(dest.values())))
+    # Nulls are recorded in the mask of masked destination arrays. The masks
+    # of other arrays are allocated too, but discarded.
+    null_masks: List[np.ndarray] = [
+        np.zeros((n, ), dtype=np.bool_) for _ in self.field_names
+    ]
     for k in range(n):
       if in_stream.size() == 0:
         break
@@ -1981,16 +2185,25 @@ class RowCoderImpl(StreamCoderImpl):
           i = self.encoding_positions_argsort[i]
         if (null_mask_len and i >> 3 < null_mask_len and
             null_mask_c[i >> 3] & (0x01 << (i & 0x07))):
-          continue
+          null_masks[i][k] = True
         else:
           cython.cast(RowColumnEncoder,
                       attrs[i]).decode_from_stream(k, in_stream)
+
+      # Fields missing from the encoded value are null.
+      for i in range(nvals, self.num_fields):
+        if not self.encoding_positions_are_trivial:
+          i = self.encoding_positions_argsort[i]
+        null_masks[i][k] = True
     else:
       # Loop variable will be n-1 on normal exit.
       k = n
 
     for attr in attrs:
       attr.finalize_write()
+    for name, column_null_mask in zip(self.field_names, null_masks):
+      if np.ma.isMaskedArray(dest[name]):
+        dest[name].mask = column_null_mask
     return k
 
 
@@ -97,6 +97,7 @@ __all__ = [
     'CloudpickleCoder',
     'DillCoder',
     'FastPrimitivesCoder',
+    'FieldwiseFastPrimitivesCoder',
     'FloatCoder',
     'IterableCoder',
     'ListCoder',
@@ -995,6 +996,21 @@ class FakeDeterministicFastPrimitivesCoder(FastPrimitivesCoder):
     return True
 
 
+class FieldwiseFastPrimitivesCoder(FastPrimitivesCoder):
+  """A FastPrimitivesCoder that encodes enums, NamedTuples, frozen dataclasses
+  and classes with __slots__ field by field, rather than with its fallback
+  coder.
+
+  Its encoding of such types differs from that of FastPrimitivesCoder, so it
+  can't replace FastPrimitivesCoder in a pipeline that is being updated. It can
+  be registered as a fallback coder, or as the coder of specific types, to opt
+  into this encoding.
+  """
+  def _create_impl(self):
+    return coder_impl.FastPrimitivesCoderImpl(
+        self._fallback_coder.get_impl(), encode_user_types=True)
+
+
 class Base64PickleCoder(Coder):
   """Coder of objects by Python pickle, then base64 encoding."""
 
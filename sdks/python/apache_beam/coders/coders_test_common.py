@@ -88,6 +88,30 @@ class DefinesGetAndSetState(DefinesGetState):
     self.value = value
 
 
+class DefinesSlots:
+  __slots__ = ('a', '__b')
+
+  def __init__(self, a, b):
+    self.a = a
+    self.__b = b
+
+  def __eq__(self, other):
+    return (
+        type(other) is type(self) and other.a == self.a and
+        other.__b == self.__b)
+
+
+class ExtendsSlots(DefinesSlots):
+  __slots__ = ('c', )
+
+  def __init__(self, a, b, c):
+    super().__init__(a, b)
+    self.c = c
+
+  def __eq__(self, other):
+    return super().__eq__(other) and other.c == self.c
+
+
 # Defined out of line for picklability.
 class CustomCoder(coders.Coder):
   def encode(self, x):
@@ -109,6 +133,13 @@ if dataclasses is not None:
     x: int
     y: int
 
+  @dataclasses.dataclass
+  class PostInitDataClass:
+    x: int
+
+    def __post_init__(self):
+      self.x *= 2
+
 
 # These tests need to all be run in the same process due to the asserts
 # in tearDownClass.
@@ -278,6 +309,8 @@ class CodersTest(unittest.TestCase):
         deterministic_coder,
         [DefinesGetAndSetState(1), DefinesGetAndSetState((1, 2, 3))])
 
+    with self.assertRaises(TypeError):
+      self.check_coder(deterministic_coder, DefinesSlots(1, 'b'))
     with self.assertRaises(TypeError):
       self.check_coder(deterministic_coder, DefinesGetState(1))
     with self.assertRaises(TypeError):
@@ -299,6 +332,85 @@ class CodersTest(unittest.TestCase):
     for v in self.test_values:
       self.check_coder(coders.TupleCoder((coder, )), (v, ))
 
+  def test_fieldwise_fast_primitives_coder(self):
+    coder = coders.FieldwiseFastPrimitivesCoder()
+    values = [
+        MyTypedNamedTuple(1, 'a'),
+        MyEnum.E3,
+        MyIntEnum.I2,
+        DefinesSlots(1, 'b'),
+        ExtendsSlots(1, 'b', MyTypedNamedTuple(3, 'd')),
+    ]
+    if dataclasses is not None:
+      values.append(FrozenDataClass(1, 2))
+    self.check_coder(coder, *values)
+    impl = coder.get_impl()
+    unknown_type = 0xFF
+    for v in values:
+      # Encoded field-wise, rather than pickled.
+      self.assertNotEqual(impl.encode(v)[0], unknown_type, type(v).__name__)
+      # FastPrimitivesCoder keeps pickling them.
+      self.assertEqual(
+          coders.FastPrimitivesCoder().get_impl().encode(v)[0],
+          unknown_type,
+          type(v).__name__)
+    self.check_coder(coder, DefinesGetAndSetState(1))
+    self.assertEqual(impl.encode(DefinesGetAndSetState(1))[0], unknown_type)
+
+  @unittest.skipIf(dataclasses is None, 'dataclasses library not available')
+  def test_fieldwise_fast_primitives_coder_mutable_dataclasses(self):
+    coder = coders.FieldwiseFastPrimitivesCoder()
+    impl = coder.get_impl()
+    # Mutable dataclasses are pickled, so that neither __post_init__ runs
+    # again nor attributes besides the fields are lost.
+    value = PostInitDataClass(1)
+    self.assertEqual(value.x, 2)
+    self.assertEqual(impl.decode(impl.encode(value)).x, 2)
+    value = UnFrozenDataClass(3, 4)
+    value.extra = 'x'
+    decoded = impl.decode(impl.encode(value))
+    self.assertEqual(decoded, value)
+    self.assertEqual(decoded.extra, 'x')
+
+  def test_fast_primitives_coder_type_encoding_stats(self):
+    impl = coders.coder_impl.FastPrimitivesCoderImpl(
+        coders.PickleCoder().get_impl(),
+        max_cached_type_encodings=2,
+        encode_user_types=True)
+    for v in [MyTypedNamedTuple(1, 'a'),
+              MyTypedNamedTuple(2, 'b'),
+              DefinesGetState(1)]:
+      impl.encode(v)
+    self.assertEqual(
+        impl.get_type_encoding_stats(), {
+            'cached_types': 2, 'special_encoded': 2, 'fallback_encoded': 1
+        })
+    impl.encode(MyEnum.E1)
+    impl.encode(10**100)
+    self.assertEqual(
+        impl.get_type_encoding_stats(), {
+            'cached_types': 2, 'special_encoded': 3, 'fallback_encoded': 2
+        })
+
+  def test_fast_primitives_coder_evicts_least_recently_used_type(self):
+    looked_up_types = []
+
+    class RecordingImpl(coders.coder_impl.FastPrimitivesCoderImpl):
+      def get_type_encoding(self, t):
+        looked_up_types.append(t)
+        return super().get_type_encoding(t)
+
+    impl = RecordingImpl(
+        coders.PickleCoder().get_impl(),
+        max_cached_type_encodings=2,
+        encode_user_types=True)
+    for v in [MyEnum.E1, MyIntEnum.I1, MyEnum.E2, MyFlag.F1, MyEnum.E3]:
+      impl.encode(v)
+    # MyEnum was used more recently than MyIntEnum, so MyIntEnum was evicted.
+    self.assertEqual([MyEnum, MyIntEnum, MyFlag], looked_up_types)
+    impl.encode(MyIntEnum.I2)
+    self.assertEqual([MyEnum, MyIntEnum, MyFlag, MyIntEnum], looked_up_types)
+
   def test_fast_primitives_coder_large_int(self):
     coder = coders.FastPrimitivesCoder()
     self.check_coder(coder, 10**100)
@@ -795,6 +907,16 @@ class CodersTest(unittest.TestCase):
     self.check_coder(
         coders.TupleCoder((coder, coder)), (b'', b'a'), (b'bc', b'def'))
 
+  def test_length_prefix_coder_stream_value_coder(self):
+    # The value is decoded in place from the enclosing stream.
+    coder = coders.LengthPrefixCoder(coders.VarIntCoder())
+    self.assertEqual(b'\x02\xac\x02', coder.encode(300))
+    self.check_coder(coder, 0, 1, 300, -1)
+    self.check_coder(coders.TupleCoder((coder, coder)), (1, 300))
+    self.check_coder(
+        coders.LengthPrefixCoder(coders.FastPrimitivesCoder()),
+        'abc', [1, 2, 3], {'a': ('b', 1.5)})
+
   def test_nested_observables(self):
     class FakeObservableIterator(observable.ObservableMixin):
       def __iter__(self):
@@ -17,9 +17,15 @@
 
 # pytype: skip-file
 
+from typing import Dict
+
+import numpy as np
+
 from apache_beam.coders import typecoders
 from apache_beam.coders.coder_impl import LogicalTypeCoderImpl
 from apache_beam.coders.coder_impl import RowCoderImpl
+from apache_beam.coders.coder_impl import create_InputStream
+from apache_beam.coders.coder_impl import create_OutputStream
 from apache_beam.coders.coders import BigEndianShortCoder
 from apache_beam.coders.coders import BooleanCoder
 from apache_beam.coders.coders import BytesCoder
@@ -44,6 +50,11 @@ from apache_beam.typehints.schemas import named_tuple_from_schema
 from apache_beam.typehints.schemas import schema_from_element_type
 from apache_beam.utils import proto_utils
 
+try:
+  import pyarrow as pa
+except ImportError:
+  pa = None
+
 __all__ = ["RowCoder"]
 
 
@@ -121,6 +132,93 @@ class RowCoder(FastCoder):
   def from_payload(payload: bytes) -> 'RowCoder':
     return RowCoder(proto_utils.parse_Bytes(payload, schema_pb2.Schema))
 
+  def encode_batch(self, batch) -> bytes:
+    """Encodes a batch of rows given in columnar form.
+
+    The result is the concatenation of the (unnested) encodings of each row,
+    exactly as if the rows were encoded one at a time, but fixed-width fields
+    are encoded straight from their column without creating a Python object
+    per value.
+
+    Args:
+      batch: Either a dict mapping each field name to a one dimensional numpy
+        array (a ``numpy.ma.MaskedArray`` may be used to mark null values), or
+        a ``pyarrow.RecordBatch`` or ``pyarrow.Table`` with a column for each
+        field.
+    """
+    if pa is not None and isinstance(batch, (pa.RecordBatch, pa.Table)):
+      columns = {
+          field.name: _numpy_from_arrow(batch.column(field.name))
+          for field in self.schema.fields
+      }
+    else:
+      columns = dict(batch)
+    out = create_OutputStream()
+    self.get_impl().encode_batch_to_stream(columns, out)
+    return out.get()
+
+  def decode_batch(self,
+                   encoded: bytes,
+                   batch_size: int = 1024) -> Dict[str, np.ndarray]:
+    """Decodes the concatenated encodings of rows into columns.
+
+    This is the inverse of :meth:`encode_batch`. Fixed-width fields are
+    decoded into arrays of the corresponding numpy dtype, all other fields into
+    arrays of objects. Nullable fields are returned as ``numpy.ma.MaskedArray``
+    whose mask marks the null values.
+
+    Args:
+      encoded: the encoded rows.
+      batch_size: the number of rows to decode into each intermediate set of
+        columns.
+    """
+    impl = self.get_impl()
+    in_stream = create_InputStream(encoded)
+    chunks = []
+    while True:
+      columns = self._allocate_columns(batch_size)
+      num_rows = impl.decode_batch_from_stream(columns, in_stream)
+      chunks.append({
+          name: column[:num_rows]
+          for name, column in columns.items()
+      })
+      if num_rows < batch_size or not in_stream.size():
+        break
+    if len(chunks) == 1:
+      return chunks[0]
+    return {
+        field.name: (
+            np.ma.concatenate if field.type.nullable else np.concatenate)(
+                [chunk[field.name] for chunk in chunks])
+        for field in self.schema.fields
+    }
+
+  def decode_record_batch(self, encoded: bytes) -> 'pa.RecordBatch':
+    """Like :meth:`decode_batch`, but returns a ``pyarrow.RecordBatch``."""
+    from apache_beam.typehints.arrow_type_compatibility import arrow_schema_from_beam_schema
+    arrow_schema = arrow_schema_from_beam_schema(self.schema)
+    columns = self.decode_batch(encoded)
+    arrays = [
+        pa.array(
+            np.ma.getdata(columns[field.name]),
+            mask=np.ma.getmaskarray(columns[field.name]),
+            type=field.type) for field in arrow_schema
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=arrow_schema)
+
+  def _allocate_columns(self, size):
+    columns = {}
+    for field in self.schema.fields:
+      if field.type.WhichOneof('type_info') == 'atomic_type':
+        dtype = _NUMPY_DTYPES.get(field.type.atomic_type, np.object_)
+      else:
+        dtype = np.object_
+      column = np.empty((size, ), dtype=dtype)
+      if field.type.nullable:
+        column = np.ma.MaskedArray(column, mask=False)
+      columns[field.name] = column
+    return columns
+
   def __reduce__(self):
     # when pickling, use bytes representation of the schema. schema_pb2.Schema
     # objects cannot be pickled.
@@ -131,6 +229,43 @@ typecoders.registry.register_coder(row_type.RowTypeConstraint, RowCoder)
 typecoders.registry.register_coder(
     row_type.GeneratedClassRowTypeConstraint, RowCoder)
 
+# The numpy dtypes that atomic fields are decoded into by decode_batch. These
+# all have a specialized RowColumnEncoder.
+_NUMPY_DTYPES = {
+    schema_pb2.INT32: np.int32,
+    schema_pb2.INT64: np.int64,
+    schema_pb2.FLOAT: np.float32,
+    schema_pb2.DOUBLE: np.float64,
+    schema_pb2.BOOLEAN: np.bool_,
+}
+
+
+def _numpy_from_arrow(column):
+  """Converts an Arrow array into a (possibly masked) numpy array."""
+  if isinstance(column, pa.ChunkedArray):
+    column = column.combine_chunks()
+  arrow_type = column.type
+  if (pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or
+      pa.types.is_boolean(arrow_type)):
+    # The column encoders need writable buffers, which costs a (cheap) copy of
+    # the Arrow buffers.
+    if not column.null_count:
+      return column.to_numpy(zero_copy_only=False, writable=True)
+    values = column.fill_null(pa.scalar(0).cast(arrow_type))
+    return np.ma.MaskedArray(
+        values.to_numpy(zero_copy_only=False, writable=True),
+        mask=column.is_null().to_numpy(zero_copy_only=False))
+  elif (pa.types.is_string(arrow_type) or
+        pa.types.is_large_string(arrow_type) or
+        pa.types.is_binary(arrow_type) or pa.types.is_large_binary(arrow_type)):
+    # These are converted into arrays of objects, with None for nulls.
+    return column.to_numpy(zero_copy_only=False)
+  else:
+    values = np.empty((len(column), ), dtype=np.object_)
+    for i, value in enumerate(column.to_pylist()):
+      values[i] = value
+    return values
+
 
 def _coder_from_type(field_type):
   coder = _nonnull_coder_from_type(field_type)
@@ -37,6 +37,11 @@ from apache_beam.typehints.schemas import named_tuple_from_schema
 from apache_beam.typehints.schemas import typing_to_runner_api
 from apache_beam.utils.timestamp import Timestamp
 
+try:
+  import pyarrow as pa
+except ImportError:
+  pa = None
+
 Person = typing.NamedTuple(
     "Person",
     [
@@ -60,6 +65,13 @@ NullablePerson = typing.NamedTuple(
      ("one_more_field", typing.Optional[str])])
 
 
+class Measurement(typing.NamedTuple):
+  sensor: str
+  reading: typing.Optional[np.float64]
+  count: typing.Optional[np.int64]
+  valid: bool
+
+
 class People(typing.NamedTuple):
   primary: Person
   partner: typing.Optional[Person]
@@ -456,6 +468,59 @@ class RowCoderTest(unittest.TestCase):
       for field, a in columnar.items():
         assert_array_equal(a[:n], dest[field][:n])
 
+  def test_encode_decode_batch_with_nulls(self):
+    coder = RowCoder(typing_to_runner_api(Measurement).row_type.schema)
+    rows = [
+        Measurement('a', 1.5, 10, True),
+        Measurement('b', None, 20, False),
+        Measurement('c', 3.5, None, True),
+    ]
+    columns = {
+        'sensor': np.array(['a', 'b', 'c'], dtype=object),
+        'reading': np.ma.MaskedArray([1.5, 0, 3.5], mask=[False, True, False]),
+        'count': np.ma.MaskedArray([10, 20, 0], mask=[False, False, True]),
+        'valid': np.array([True, False, True]),
+    }
+    encoded = coder.encode_batch(columns)
+    self.assertEqual(b''.join(coder.encode(row) for row in rows), encoded)
+
+    for batch_size in [1, 2, 1024]:
+      decoded = coder.decode_batch(encoded, batch_size=batch_size)
+      self.assertEqual(decoded['reading'].dtype, np.float64)
+      self.assertEqual(decoded['count'].dtype, np.int64)
+      assert_array_equal(decoded['sensor'], columns['sensor'])
+      assert_array_equal(decoded['valid'], columns['valid'])
+      for name in ('reading', 'count'):
+        assert_array_equal(
+            np.ma.getmaskarray(decoded[name]),
+            np.ma.getmaskarray(columns[name]))
+        self.assertEqual(decoded[name].tolist(), columns[name].tolist())
+
+    empty = coder.decode_batch(b'')
+    self.assertEqual([len(column) for column in empty.values()], [0] * 4)
+
+  @unittest.skipIf(pa is None, 'pyarrow is not installed')
+  def test_encode_decode_record_batch(self):
+    coder = RowCoder(typing_to_runner_api(Measurement).row_type.schema)
+    rows = [
+        Measurement('a', 1.5, 10, True),
+        Measurement('b', None, 20, False),
+        Measurement('c', 3.5, None, True),
+    ]
+    batch = pa.RecordBatch.from_pydict({
+        'sensor': ['a', 'b', 'c'],
+        'reading': [1.5, None, 3.5],
+        'count': [10, 20, None],
+        'valid': [True, False, True],
+    })
+    encoded = coder.encode_batch(batch)
+    self.assertEqual(b''.join(coder.encode(row) for row in rows), encoded)
+    self.assertEqual(
+        coder.encode_batch(pa.Table.from_batches([batch, batch])),
+        encoded + encoded)
+    self.assertEqual(
+        coder.decode_record_batch(encoded).to_pydict(), batch.to_pydict())
+
 
 if __name__ == "__main__":
   logging.getLogger().setLevel(logging.INFO)
@@ -23,6 +23,7 @@ For internal use only; no backwards-compatibility guarantees.
 
 import struct
 from typing import List
+from typing import Union
 
 
 class OutputStream(object):
@@ -122,7 +123,7 @@ class InputStream(object):
   """For internal use only; no backwards-compatibility guarantees.
 
   A pure Python implementation of stream.InputStream."""
-  def __init__(self, data: bytes) -> None:
+  def __init__(self, data: Union[bytes, bytearray, memoryview]) -> None:
     self.data = data
     self.pos = 0
 
@@ -131,7 +132,13 @@ class InputStream(object):
 
   def read(self, size: int) -> bytes:
     self.pos += size
-    return self.data[self.pos - size:self.pos]
+    if type(self.data) is bytes:
+      return self.data[self.pos - size:self.pos]
+    return bytes(self.data[self.pos - size:self.pos])
+
+  def read_substream(self, size: int) -> 'InputStream':
+    self.pos += size
+    return InputStream(memoryview(self.data)[self.pos - size:self.pos])
 
   def read_all(self, nested: bool) -> bytes:
     return self.read(self.read_var_int64() if nested else self.size())
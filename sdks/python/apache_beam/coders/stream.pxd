@@ -57,11 +57,15 @@ cdef class ByteCountingOutputStream(OutputStream):
 
 cdef class InputStream(object):
   cdef size_t pos
-  cdef bytes all
+  cdef size_t end
+  cdef object all
   cdef char* allc
+  cdef Py_buffer buffer
+  cdef bint has_buffer
 
   cpdef ssize_t size(self) except? -1
   cpdef bytes read(self, size_t len)
+  cpdef InputStream read_substream(self, size_t len)
   cpdef long read_byte(self) except? -1
   cpdef libc.stdint.int64_t read_var_int64(self) except? -1
   cpdef libc.stdint.int32_t read_var_int32(self) except? -1
@@ -22,6 +22,9 @@ For internal use only; no backwards-compatibility guarantees.
 
 cimport libc.stdlib
 cimport libc.string
+from cpython.buffer cimport PyBUF_SIMPLE
+from cpython.buffer cimport PyBuffer_Release
+from cpython.buffer cimport PyObject_GetBuffer
 
 
 cdef class OutputStream(object):
@@ -189,15 +192,41 @@ cdef class ByteCountingOutputStream(OutputStream):
 
 
 cdef class InputStream(object):
-  """An input string stream implementation supporting read() and size()."""
+  """An input string stream implementation supporting read() and size().
+
+  The stream reads directly from the memory of the given bytes or other
+  contiguous buffer (e.g. a memoryview or bytearray) without copying it.
+  """
 
   def __init__(self, all):
-    self.allc = self.all = all
+    if type(all) is bytes:
+      self.allc = all
+      self.end = len(all)
+    else:
+      PyObject_GetBuffer(all, &self.buffer, PyBUF_SIMPLE)
+      self.has_buffer = True
+      self.allc = <char*>self.buffer.buf
+      self.end = self.buffer.len
+    self.all = all
+
+  def __dealloc__(self):
+    if self.has_buffer:
+      PyBuffer_Release(&self.buffer)
 
   cpdef bytes read(self, size_t size):
     self.pos += size
     return self.allc[self.pos - size : self.pos]
 
+  cpdef InputStream read_substream(self, size_t size):
+    """Returns a stream over the next size bytes without copying them."""
+    cdef InputStream substream = InputStream.__new__(InputStream)
+    # Keep this stream, which owns the underlying memory, alive.
+    substream.all = self
+    substream.allc = self.allc + self.pos
+    substream.end = size
+    self.pos += size
+    return substream
+
   cpdef long read_byte(self) except? -1:
     self.pos += 1
     # Note: Some C++ compilers treats the char array below as a signed char.
@@ -206,7 +235,7 @@ cdef class InputStream(object):
     return <long>(<unsigned char> self.allc[self.pos - 1])
 
   cpdef ssize_t size(self) except? -1:
-    return len(self.all) - self.pos
+    return <ssize_t>(self.end - self.pos)
 
   cpdef bytes read_all(self, bint nested=False):
     return self.read(<ssize_t>self.read_var_int64() if nested else self.size())
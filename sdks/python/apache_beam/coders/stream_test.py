@@ -52,6 +52,30 @@ class StreamTest(unittest.TestCase):
     in_s = self.InputStream(out_s.get())
     self.assertEqual(b'abc', in_s.read_all(False))
 
+  def test_read_buffers(self):
+    out_s = self.OutputStream()
+    out_s.write(b'abc')
+    out_s.write_var_int64(300)
+    for buffer_type in (bytearray, memoryview):
+      in_s = self.InputStream(buffer_type(out_s.get()))
+      self.assertEqual(5, in_s.size())
+      self.assertEqual(b'abc', in_s.read(3))
+      self.assertEqual(300, in_s.read_var_int64())
+      self.assertEqual(0, in_s.size())
+
+  def test_read_substream(self):
+    out_s = self.OutputStream()
+    out_s.write(b'abc', True)
+    out_s.write_var_int64(300)
+    in_s = self.InputStream(out_s.get())
+    sub_s = in_s.read_substream(in_s.read_var_int64())
+    self.assertEqual(300, in_s.read_var_int64())
+    self.assertEqual(0, in_s.size())
+    self.assertEqual(3, sub_s.size())
+    self.assertEqual(b'ab', sub_s.read(2))
+    self.assertEqual(b'c', sub_s.read_all(False))
+    self.assertEqual(0, sub_s.size())
+
   def test_read_write_byte(self):
     out_s = self.OutputStream()
     out_s.write_byte(1)
@@ -197,7 +197,11 @@ class S3FileSystem(FileSystem):
       message = 'Unable to copy unequal number of sources and destinations'
       raise BeamIOError(message)
     src_dest_pairs = list(zip(source_file_names, destination_file_names))
-    return s3io.S3IO(options=self._options).copy_paths(src_dest_pairs)
+    # S3 has no batch copy API, so copies are issued concurrently.
+    return self._run_in_chunks(
+        s3io.S3IO(options=self._options).copy_paths,
+        src_dest_pairs,
+        chunk_size=1)
 
   def rename(self, source_file_names, destination_file_names):
     """Rename the files at the source list to the destination list.
@@ -214,7 +218,8 @@ class S3FileSystem(FileSystem):
       message = 'Unable to rename unequal number of sources and destinations'
       raise BeamIOError(message)
     src_dest_pairs = list(zip(source_file_names, destination_file_names))
-    results = s3io.S3IO(options=self._options).rename_files(src_dest_pairs)
+    results = self._run_in_chunks(
+        s3io.S3IO(options=self._options).rename_files, src_dest_pairs)
     exceptions = {(src, dest): error
                   for (src, dest, error) in results if error is not None}
     if exceptions:
@@ -308,11 +313,10 @@ class S3FileSystem(FileSystem):
     Args:
       paths: list of paths that give the file objects to be deleted
     """
-    results = s3io.S3IO(options=self._options).delete_paths(paths)
-    exceptions = {
-        path: error
-        for (path, error) in results.items() if error is not None
-    }
+    s3 = s3io.S3IO(options=self._options)
+    results = self._run_in_chunks(
+        lambda chunk: list(s3.delete_paths(chunk).items()), paths)
+    exceptions = {path: error for (path, error) in results if error is not None}
     if exceptions:
       raise BeamIOError("Delete operation failed", exceptions)
 
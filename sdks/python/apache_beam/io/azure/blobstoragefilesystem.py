@@ -193,7 +193,10 @@ class BlobStorageFileSystem(FileSystem):
       message = 'Unable to copy unequal number of sources and destinations.'
       raise BeamIOError(message)
     src_dest_pairs = list(zip(source_file_names, destination_file_names))
-    return self._blobstorageIO().copy_paths(src_dest_pairs)
+    # Azure Blob Storage has no batch copy API, so copies are issued
+    # concurrently.
+    return self._run_in_chunks(
+        self._blobstorageIO().copy_paths, src_dest_pairs, chunk_size=1)
 
   def rename(self, source_file_names, destination_file_names):
     """Rename the files at the source list to the destination list.
@@ -210,7 +213,8 @@ class BlobStorageFileSystem(FileSystem):
       message = 'Unable to rename unequal number of sources and destinations.'
       raise BeamIOError(message)
     src_dest_pairs = list(zip(source_file_names, destination_file_names))
-    results = self._blobstorageIO().rename_files(src_dest_pairs)
+    results = self._run_in_chunks(
+        self._blobstorageIO().rename_files, src_dest_pairs)
     # Retrieve exceptions.
     exceptions = {(src, dest): error
                   for (src, dest, error) in results if error is not None}
@@ -308,12 +312,11 @@ class BlobStorageFileSystem(FileSystem):
     Raises:
       ``BeamIOError``: if any of the delete operations fail
     """
-    results = self._blobstorageIO().delete_paths(paths)
+    blobstorage_io = self._blobstorageIO()
+    results = self._run_in_chunks(
+        lambda chunk: list(blobstorage_io.delete_paths(chunk).items()), paths)
     # Retrieve exceptions.
-    exceptions = {
-        path: error
-        for (path, error) in results.items() if error is not None
-    }
+    exceptions = {path: error for (path, error) in results if error is not None}
 
     if exceptions:
       raise BeamIOError("Delete operation failed", exceptions)
@@ -228,8 +228,11 @@ class BlobStorageFileSystemTest(unittest.TestCase):
     # Issue file copy.
     self.fs.copy(sources, destinations)
 
+    # Azure has no batch copy API, so each copy is issued separately.
     src_dest_pairs = list(zip(sources, destinations))
-    blobstorageio_mock.copy_paths.assert_called_once_with(src_dest_pairs)
+    blobstorageio_mock.copy_paths.assert_has_calls(
+        [mock.call([pair]) for pair in src_dest_pairs], any_order=True)
+    self.assertEqual(blobstorageio_mock.copy_paths.call_count, 2)
 
   @mock.patch('apache_beam.io.azure.blobstoragefilesystem.blobstorageio')
   def test_copy_file_error(self, unused_mock_blobstorageio):
@@ -24,13 +24,17 @@ from typing import Tuple
 
 import apache_beam as beam
 from apache_beam import typehints
+from apache_beam.io import fileio
+from apache_beam.io.filesystem import CompressionTypes
 from apache_beam.io.filesystems import FileSystems
 from apache_beam.io.iobase import Read
 from apache_beam.io.textio import ReadFromText
 from apache_beam.io.textio import WriteToText
+from apache_beam.metrics import Metrics
 from apache_beam.testing.load_tests.load_test import LoadTest
 from apache_beam.testing.load_tests.load_test import LoadTestOptions
 from apache_beam.testing.load_tests.load_test_metrics_utils import CountMessages
+from apache_beam.testing.load_tests.load_test_metrics_utils import MeasureBytes
 from apache_beam.testing.load_tests.load_test_metrics_utils import MeasureTime
 from apache_beam.testing.synthetic_pipeline import SyntheticSource
 from apache_beam.testing.test_pipeline import TestPipeline
@@ -66,6 +70,11 @@ class FileBasedIOTestOptions(LoadTestOptions):
         '--dataset_size',
         type=int,
         help='Size of data saved on the target filesystem (bytes).')
+    parser.add_argument(
+        '--read_size',
+        type=int,
+        default=1024 * 1024,
+        help='Number of bytes requested per read call by FileReadPerfTest.')
 
 
 @typehints.with_output_types(bytes)
@@ -96,6 +105,22 @@ class CreateFolderFn(beam.DoFn):
       filesystem.mkdirs(self.folder)
 
 
+class ReadFileFn(beam.DoFn):
+  """Reads a whole file in blocks of read_size bytes, counting the bytes."""
+  def __init__(self, namespace, read_size):
+    self.read_size = read_size
+    self.counter = Metrics.counter(namespace, MeasureBytes.LABEL)
+
+  def process(self, metadata):
+    with FileSystems.open(metadata.path,
+                          compression_type=CompressionTypes.UNCOMPRESSED) as f:
+      block = f.read(self.read_size)
+      while block:
+        self.counter.inc(len(block))
+        block = f.read(self.read_size)
+    yield metadata.path
+
+
 class TextIOPerfTest:
   def run(self):
     write_test = _TextIOWritePerfTest(need_cleanup=False)
@@ -172,6 +197,39 @@ class _TextIOReadPerfTest(LoadTest):
           'Unable to delete file %s during cleanup.', self.input_folder)
 
 
+class FileReadPerfTest:
+  """Measures the throughput of reading whole files as raw bytes.
+
+  Each file is read by a single thread, so this is suited to comparing single
+  file read throughput, e.g. of GCS reads with and without
+  --gcs_read_ahead_depth. Use --number_of_shards to control the file size.
+  """
+  def run(self):
+    write_test = _TextIOWritePerfTest(need_cleanup=False)
+    read_test = _FileReadPerfTest(input_folder=write_test.output_folder)
+    write_test.run()
+    read_test.run()
+
+
+class _FileReadPerfTest(LoadTest):
+  def __init__(self, input_folder):
+    super().__init__(READ_NAMESPACE)
+    self.test_options = self.pipeline.get_pipeline_options().view_as(
+        FileBasedIOTestOptions)
+    self.input_folder = input_folder
+
+  def test(self):
+    _ = (
+        self.pipeline
+        | 'Match files' >> fileio.MatchFiles(
+            FileSystems.join(self.input_folder, '*'))
+        | 'Avoid Fusion' >> Reshuffle()
+        | 'Measure time' >> beam.ParDo(MeasureTime(self.metrics_namespace))
+        | 'Read files' >> beam.ParDo(
+            ReadFileFn(self.metrics_namespace, self.test_options.read_size))
+        | 'Count files' >> beam.ParDo(CountMessages(self.metrics_namespace)))
+
+
 if __name__ == '__main__':
   logging.basicConfig(level=logging.INFO)
 
@@ -25,9 +25,10 @@ import re
 import time
 import uuid
 
-from apache_beam.internal import util
 from apache_beam.io import iobase
 from apache_beam.io.filesystem import BeamIOError
+from apache_beam.io.filesystem import CompressedFile
+from apache_beam.io.filesystem import CompressedFileIndex
 from apache_beam.io.filesystem import CompressionTypes
 from apache_beam.io.filesystems import FileSystems
 from apache_beam.options.value_provider import StaticValueProvider
@@ -58,8 +59,6 @@ class FileBasedSink(iobase.Sink):
   all written shards.
   """
 
-  # Max number of threads to be used for renaming.
-  _MAX_RENAME_THREADS = 64
   __hash__ = None  # type: ignore[assignment]
 
   def __init__(
@@ -76,8 +75,16 @@ class FileBasedSink(iobase.Sink):
       max_bytes_per_shard=None,
       skip_if_empty=False,
       convert_fn=None,
-      triggering_frequency=None):
+      triggering_frequency=None,
+      compressed_member_size=None):
     """
+     Args:
+      compressed_member_size: If set, compressed files are written as a series
+        of independently compressed members of about this many uncompressed
+        bytes, with a :class:`~apache_beam.io.filesystem.CompressedFileIndex`
+        of the members next to each file, so that the files can be split when
+        they are read.
+
      Raises:
       TypeError: if file path parameters are not a :class:`str` or
         :class:`~apache_beam.options.value_provider.ValueProvider`, or if
@@ -124,6 +131,7 @@ class FileBasedSink(iobase.Sink):
     self.skip_if_empty = skip_if_empty
     self.convert_fn = convert_fn
     self.triggering_frequency = triggering_frequency
+    self.compressed_member_size = compressed_member_size
 
   def display_data(self):
     return {
@@ -145,14 +153,31 @@ class FileBasedSink(iobase.Sink):
     The returned file handle is passed to ``write_[encoded_]record`` and
     ``close``.
     """
-    writer = FileSystems.create(
-        temp_path, self.mime_type, self.compression_type)
+    if self._writes_compression_index(temp_path):
+      writer = _CompressedMemberWriter(
+          temp_path,
+          self.mime_type,
+          self._compression_type_of(temp_path),
+          self.compressed_member_size)
+    else:
+      writer = FileSystems.create(
+          temp_path, self.mime_type, self.compression_type)
     if self.max_bytes_per_shard:
       self.byte_counter = _ByteCountingWriter(writer)
       return self.byte_counter
     else:
       return writer
 
+  def _compression_type_of(self, path):
+    if self.compression_type == CompressionTypes.AUTO:
+      return CompressionTypes.detect_compression_type(path)
+    return self.compression_type
+
+  def _writes_compression_index(self, path):
+    return bool(
+        self.compressed_member_size and
+        self._compression_type_of(path) != CompressionTypes.UNCOMPRESSED)
+
   def write_record(self, file_handle, value):
     """Writes a single record go the file handle returned by ``open()``.
 
@@ -362,75 +387,38 @@ class FileBasedSink(iobase.Sink):
     num_skipped += len(delete_files)
     FileSystems.delete(delete_files)
     num_shards_to_finalize = len(src_files)
-    min_threads = min(num_shards_to_finalize, FileBasedSink._MAX_RENAME_THREADS)
-    num_threads = max(1, min_threads)
-
-    chunk_size = FileSystems.get_chunk_size(self.file_path_prefix.get())
-    source_file_batch = [
-        src_files[i:i + chunk_size]
-        for i in range(0, len(src_files), chunk_size)
-    ]
-    destination_file_batch = [
-        dst_files[i:i + chunk_size]
-        for i in range(0, len(dst_files), chunk_size)
-    ]
 
     if num_shards_to_finalize:
       start_time = time.time()
 
-      def _rename_batch(batch):
-        """_rename_batch executes batch rename operations."""
-        source_files, destination_files = batch
-        exceptions = []
-        try:
-          FileSystems.rename(source_files, destination_files)
-          return exceptions
-        except BeamIOError as exp:
-          if exp.exception_details is None:
-            raise
-          for (src, dst), exception in exp.exception_details.items():
-            if exception:
-              _LOGGER.error(
-                  ('Exception in _rename_batch. src: %s, '
-                   'dst: %s, err: %s'),
-                  src,
-                  dst,
-                  exception)
-              exceptions.append(exception)
-            else:
-              _LOGGER.debug('Rename successful: %s -> %s', src, dst)
-          return exceptions
-
-      if w is None or isinstance(w, window.GlobalWindow):
-        # bounded input was handled by finalize_write legacy method
-        # the implementation here should be called by finalize_write
-        # Use a thread pool for renaming operations.
-        exception_batches = util.run_using_threadpool(
-            _rename_batch,
-            list(zip(source_file_batch, destination_file_batch)),
-            num_threads)
-
-        all_exceptions = [
-            e for exception_batch in exception_batches for e in exception_batch
-        ]
-        if all_exceptions:
-          raise Exception(
-              'Encountered exceptions in finalize_write: %s' % all_exceptions)
-
-        yield from dst_files
-      else:
-        # unbounded input
-        batch = list([src_files, dst_files])
-        exception_batches = _rename_batch(batch)
-
-        all_exceptions = [
-            e for exception_batch in exception_batches for e in exception_batch
-        ]
-        if all_exceptions:
-          raise Exception(
-              'Encountered exceptions in finalize_write: %s' % all_exceptions)
-
-        yield from dst_files
+      # Indexes of compressed files are moved along with the files.
+      rename_src_files = list(src_files)
+      rename_dst_files = list(dst_files)
+      for src, dst in zip(src_files, dst_files):
+        if self._writes_compression_index(src):
+          rename_src_files.append(CompressedFileIndex.index_path(src))
+          rename_dst_files.append(CompressedFileIndex.index_path(dst))
+
+      # FileSystems.rename issues the renames in concurrent batches.
+      exceptions = []
+      try:
+        FileSystems.rename(rename_src_files, rename_dst_files)
+      except BeamIOError as exp:
+        if exp.exception_details is None:
+          raise
+        for (src, dst), exception in exp.exception_details.items():
+          if exception:
+            _LOGGER.error(
+                'Exception in finalize_write rename. src: %s, dst: %s, err: %s',
+                src,
+                dst,
+                exception)
+            exceptions.append(exception)
+      if exceptions:
+        raise Exception(
+            'Encountered exceptions in finalize_write: %s' % exceptions)
+
+      yield from dst_files
 
       _LOGGER.info(
           'Renamed %d shards in %.2f seconds.',
@@ -560,3 +548,27 @@ class _ByteCountingWriter:
 
   def close(self):
     self.writer.close()
+
+
+class _CompressedMemberWriter:
+  """Writes a file as a series of compressed members, and an index of the
+  members next to the file when it is closed."""
+  def __init__(self, path, mime_type, compression_type, member_size):
+    self.path = path
+    self.writer = CompressedFile(
+        FileSystems.create(path, mime_type, CompressionTypes.UNCOMPRESSED),
+        compression_type=compression_type,
+        member_size=member_size)
+
+  def write(self, bs):
+    self.writer.write(bs)
+
+  def flush(self):
+    self.writer.flush()
+
+  def close(self):
+    self.writer.close()
+    with FileSystems.create(CompressedFileIndex.index_path(self.path),
+                            'application/json',
+                            CompressionTypes.UNCOMPRESSED) as f:
+      f.write(self.writer.compression_index().encode())
@@ -28,6 +28,10 @@ For an example implementation of :class:`FileBasedSource` see
 
 # pytype: skip-file
 
+import logging
+import threading
+import time
+import uuid
 from typing import Callable
 from typing import Iterable
 from typing import Tuple
@@ -37,6 +41,8 @@ from apache_beam.internal import pickler
 from apache_beam.io import concat_source
 from apache_beam.io import iobase
 from apache_beam.io import range_trackers
+from apache_beam.io.filesystem import CompressedFile
+from apache_beam.io.filesystem import CompressedFileIndex
 from apache_beam.io.filesystem import CompressionTypes
 from apache_beam.io.filesystem import FileMetadata
 from apache_beam.io.filesystems import FileSystems
@@ -52,8 +58,51 @@ from apache_beam.transforms.util import Reshuffle
 
 MAX_NUM_THREADS_FOR_SIZE_ESTIMATION = 25
 
+# Number of seconds for which the copies of a FileBasedSource in a process
+# reuse the files matched by its file pattern.
+MATCH_CACHE_TTL_SECS = 300
+
 __all__ = ['FileBasedSource']
 
+_LOGGER = logging.getLogger(__name__)
+
+
+class _ExpiringCache(object):
+  """A thread-safe cache whose entries expire after a given number of
+  seconds."""
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._entries = {}
+    self._next_eviction = 0
+
+  def get(self, key):
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is None:
+        return None
+      expiry, value = entry
+      if expiry <= time.time():
+        del self._entries[key]
+        return None
+      return value
+
+  def put(self, key, value, ttl_secs):
+    now = time.time()
+    with self._lock:
+      # Expired entries are dropped at most once per ttl, rather than on
+      # every put, so that filling the cache takes linear time.
+      if now >= self._next_eviction:
+        self._entries = {
+            k: entry
+            for k, entry in self._entries.items() if entry[0] > now
+        }
+        self._next_eviction = now + ttl_secs
+      self._entries[key] = (now + ttl_secs, value)
+
+
+# Files matched by the patterns of the sources in this process.
+_match_cache = _ExpiringCache()
+
 
 class FileBasedSource(iobase.BoundedSource):
   """A :class:`~apache_beam.io.iobase.BoundedSource` for reading a file glob of
@@ -68,7 +117,8 @@ class FileBasedSource(iobase.BoundedSource):
       min_bundle_size=0,
       compression_type=CompressionTypes.AUTO,
       splittable=True,
-      validate=True):
+      validate=True,
+      use_compression_indexes=False):
     """Initializes :class:`FileBasedSource`.
 
     Args:
@@ -94,6 +144,10 @@ class FileBasedSource(iobase.BoundedSource):
         whole file.
       validate (bool): Boolean flag to verify that the files exist during the
         pipeline creation time.
+      use_compression_indexes (bool): If :data:`True`, compressed files that
+        have a :class:`~apache_beam.io.filesystem.CompressedFileIndex` next to
+        them are split at the compressed members listed by the index. This
+        looks up the index of every compressed file when splitting.
 
     Raises:
       TypeError: when **compression_type** is not valid or if
@@ -123,6 +177,11 @@ class FileBasedSource(iobase.BoundedSource):
           'was %s' % type(compression_type))
     self._compression_type = compression_type
     self._splittable = splittable
+    self._use_compression_indexes = use_compression_indexes
+    # Indexes of the compressed files being read by split sources, by name.
+    self._compression_indexes = {}
+    # Identifies this source and its copies in process-wide caches.
+    self._cache_id = uuid.uuid4().hex
     if validate and file_pattern.is_accessible():
       self._validate()
 
@@ -140,8 +199,10 @@ class FileBasedSource(iobase.BoundedSource):
       pattern = self._pattern.get()
 
       single_file_sources = []
-      match_result = FileSystems.match([pattern])[0]
+      match_result = self._match(pattern)
       files_metadata = match_result.metadata_list
+      if self._use_compression_indexes:
+        files_metadata = _without_compression_indexes(files_metadata)
 
       # We create a reference for FileBasedSource that will be serialized along
       # with each _SingleFileSource. To prevent this FileBasedSource from having
@@ -175,6 +236,15 @@ class FileBasedSource(iobase.BoundedSource):
     return self._concat_source
 
   def open_file(self, file_name):
+    index = self._compression_indexes.get(file_name)
+    if index is not None:
+      return CompressedFile(
+          FileSystems.open(
+              file_name,
+              'application/octet-stream',
+              compression_type=CompressionTypes.UNCOMPRESSED),
+          compression_type=index.compression_type,
+          index=index)
     return FileSystems.open(
         file_name,
         'application/octet-stream',
@@ -187,10 +257,23 @@ class FileBasedSource(iobase.BoundedSource):
     pattern = self._pattern.get()
 
     # Limit the responses as we only want to check if something exists
-    match_result = FileSystems.match([pattern], limits=[1])[0]
+    match_result = self._match(pattern, limit=1)
     if len(match_result.metadata_list) <= 0:
       raise IOError('No files found based on the file pattern %s' % pattern)
 
+  def _match(self, pattern, limit=None):
+    # Copies of this source, such as those made for size estimation and
+    # splitting, share the files matched by its pattern for a while rather
+    # than listing them again.
+    key = (self._cache_id, pattern)
+    match_result = _match_cache.get(key)
+    if match_result is None:
+      if limit is not None:
+        return FileSystems.match([pattern], limits=[limit])[0]
+      match_result = FileSystems.match([pattern])[0]
+      _match_cache.put(key, match_result, MATCH_CACHE_TTL_SECS)
+    return match_result
+
   def split(
       self, desired_bundle_size=None, start_position=None, stop_position=None):
     return self._get_concat_source().split(
@@ -227,6 +310,16 @@ class FileBasedSource(iobase.BoundedSource):
     """
     raise NotImplementedError
 
+  def _block_offsets(self, file_name):
+    """Returns the sorted offsets at which the blocks of records of file
+    'file_name' start, or None if they are not known without reading the file.
+
+    Sources whose ``read_records`` claims each block of records at its start
+    offset may return these offsets so that their files are split between
+    blocks rather than at arbitrary offsets.
+    """
+    return None
+
   @property
   def splittable(self):
     return self._splittable
@@ -239,6 +332,40 @@ def _determine_splittability_from_compression_type(file_path, compression_type):
   return compression_type == CompressionTypes.UNCOMPRESSED
 
 
+def _read_compression_index(file_name, compression_type, compressed_size):
+  """Returns the index of the compressed file 'file_name', or None if the file
+  has no index or its index does not describe it."""
+  if compression_type == CompressionTypes.AUTO:
+    compression_type = CompressionTypes.detect_compression_type(file_name)
+  if compression_type == CompressionTypes.UNCOMPRESSED:
+    return None
+
+  index_path = CompressedFileIndex.index_path(file_name)
+  if not FileSystems.exists(index_path):
+    return None
+  with FileSystems.open(index_path,
+                        compression_type=CompressionTypes.UNCOMPRESSED) as f:
+    index = CompressedFileIndex.decode(f.read())
+  if (index.compression_type != compression_type or
+      index.compressed_size != compressed_size or index.uncompressed_size == 0):
+    _LOGGER.warning(
+        'Ignoring index %s which does not match %s.', index_path, file_name)
+    return None
+  return index
+
+
+def _without_compression_indexes(metadata_list):
+  """Drops the indexes of compressed files that are matched together with the
+  files they index."""
+  paths = set(metadata.path for metadata in metadata_list)
+  suffix = CompressedFileIndex.SUFFIX
+  return [
+      metadata for metadata in metadata_list if not (
+          metadata.path.endswith(suffix) and
+          metadata.path[:-len(suffix)] in paths)
+  ]
+
+
 class _SingleFileSource(iobase.BoundedSource):
   """Denotes a source for a specific file type."""
   def __init__(
@@ -248,7 +375,8 @@ class _SingleFileSource(iobase.BoundedSource):
       start_offset,
       stop_offset,
       min_bundle_size=0,
-      splittable=True):
+      splittable=True,
+      compression_index=None):
     if not isinstance(start_offset, int):
       raise TypeError(
           'start_offset must be a number. Received: %r' % start_offset)
@@ -269,6 +397,9 @@ class _SingleFileSource(iobase.BoundedSource):
     self._min_bundle_size = min_bundle_size
     self._file_based_source = file_based_source
     self._splittable = splittable
+    # If set, this source reads a compressed file through its index and its
+    # offsets are positions in the uncompressed data.
+    self._compression_index = compression_index
 
   def split(self, desired_bundle_size, start_offset=None, stop_offset=None):
     if start_offset is None:
@@ -276,6 +407,27 @@ class _SingleFileSource(iobase.BoundedSource):
     if stop_offset is None:
       stop_offset = self._stop_offset
 
+    if (not self._splittable and self._file_based_source.splittable and
+        self._file_based_source._use_compression_indexes and
+        start_offset == 0 and
+        stop_offset != range_trackers.OffsetRangeTracker.OFFSET_INFINITY):
+      # This file is only unsplittable because it is compressed.
+      index = _read_compression_index(
+          self._file_name,
+          self._file_based_source._compression_type,
+          stop_offset)
+      if index is not None:
+        yield from self._split_at_members(index, desired_bundle_size)
+        return
+
+    if (self._splittable and
+        stop_offset != range_trackers.OffsetRangeTracker.OFFSET_INFINITY):
+      block_offsets = self._file_based_source._block_offsets(self._file_name)
+      if block_offsets is not None:
+        yield from self._split_at_blocks(
+            block_offsets, start_offset, stop_offset, desired_bundle_size)
+        return
+
     if self._splittable:
       splits = OffsetRange(start_offset, stop_offset).split(
           desired_bundle_size, self._min_bundle_size)
@@ -289,7 +441,8 @@ class _SingleFileSource(iobase.BoundedSource):
                 split.start,
                 split.stop,
                 min_bundle_size=self._min_bundle_size,
-                splittable=self._splittable),
+                splittable=self._splittable,
+                compression_index=self._compression_index),
             split.start,
             split.stop)
     else:
@@ -309,7 +462,65 @@ class _SingleFileSource(iobase.BoundedSource):
           start_offset,
           range_trackers.OffsetRangeTracker.OFFSET_INFINITY)
 
+  def _split_at_members(self, index, desired_bundle_size):
+    # Groups consecutive members of the compressed file into bundles of at
+    # least the desired size in compressed bytes. The bundles are splittable
+    # sources over ranges of the uncompressed data.
+    bundle_size = max(desired_bundle_size, self._min_bundle_size)
+    ends = index.members[1:] + [
+        (index.compressed_size, index.uncompressed_size)
+    ]
+    compressed_start, uncompressed_start = 0, 0
+    for compressed_end, uncompressed_end in ends:
+      if (compressed_end - compressed_start < bundle_size and
+          uncompressed_end < index.uncompressed_size):
+        continue
+      yield iobase.SourceBundle(
+          compressed_end - compressed_start,
+          _SingleFileSource(
+              pickler.loads(pickler.dumps(self._file_based_source)),
+              self._file_name,
+              uncompressed_start,
+              uncompressed_end,
+              min_bundle_size=self._min_bundle_size,
+              splittable=True,
+              compression_index=index),
+          uncompressed_start,
+          uncompressed_end)
+      compressed_start, uncompressed_start = compressed_end, uncompressed_end
+
+  def _split_at_blocks(
+      self, block_offsets, start_offset, stop_offset, desired_bundle_size):
+    # Groups consecutive blocks into bundles of at least the desired size, so
+    # that no block is divided between bundles and each bundle starts a block.
+    bundle_size = max(desired_bundle_size, self._min_bundle_size)
+    offsets = [
+        offset for offset in block_offsets
+        if start_offset <= offset < stop_offset
+    ]
+    ends = offsets[1:] + [stop_offset]
+    bundle_start = start_offset
+    for bundle_end in ends:
+      if bundle_end - bundle_start < bundle_size and bundle_end < stop_offset:
+        continue
+      yield iobase.SourceBundle(
+          bundle_end - bundle_start,
+          _SingleFileSource(
+              pickler.loads(pickler.dumps(self._file_based_source)),
+              self._file_name,
+              bundle_start,
+              bundle_end,
+              min_bundle_size=self._min_bundle_size,
+              splittable=self._splittable),
+          bundle_start,
+          bundle_end)
+      bundle_start = bundle_end
+
   def estimate_size(self):
+    if self._compression_index is not None:
+      return (
+          self._compression_index.compressed_offset(self._stop_offset) -
+          self._compression_index.compressed_offset(self._start_offset))
     return self._stop_offset - self._start_offset
 
   def get_range_tracker(self, start_position, stop_position):
@@ -332,6 +543,9 @@ class _SingleFileSource(iobase.BoundedSource):
     return range_tracker
 
   def read(self, range_tracker):
+    if self._compression_index is not None:
+      self._file_based_source._compression_indexes[self._file_name] = (
+          self._compression_index)
     return self._file_based_source.read_records(self._file_name, range_tracker)
 
   def default_output_coder(self):
@@ -340,11 +554,17 @@ class _SingleFileSource(iobase.BoundedSource):
 
 class _ExpandIntoRanges(DoFn):
   def __init__(
-      self, splittable, compression_type, desired_bundle_size, min_bundle_size):
+      self,
+      splittable,
+      compression_type,
+      desired_bundle_size,
+      min_bundle_size,
+      use_compression_indexes=False):
     self._desired_bundle_size = desired_bundle_size
     self._min_bundle_size = min_bundle_size
     self._splittable = splittable
     self._compression_type = compression_type
+    self._use_compression_indexes = use_compression_indexes
     self._size_track = None
 
   def process(self, element: Union[str, FileMetadata], *args,
@@ -354,6 +574,8 @@ class _ExpandIntoRanges(DoFn):
     else:
       match_results = FileSystems.match([element])
       metadata_list = match_results[0].metadata_list
+      if self._use_compression_indexes:
+        metadata_list = _without_compression_indexes(metadata_list)
     for metadata in metadata_list:
       FileSystems.report_source_lineage(metadata.path)
 
@@ -361,10 +583,20 @@ class _ExpandIntoRanges(DoFn):
           self._splittable and _determine_splittability_from_compression_type(
               metadata.path, self._compression_type))
 
+      index = None
+      if self._use_compression_indexes and self._splittable and not splittable:
+        index = _read_compression_index(
+            metadata.path, self._compression_type, metadata.size_in_bytes)
+
       if splittable:
         for split in OffsetRange(0, metadata.size_in_bytes).split(
             self._desired_bundle_size, self._min_bundle_size):
           yield (metadata, split)
+      elif index is not None:
+        # Ranges of the uncompressed data, read through the index.
+        for split in OffsetRange(0, index.uncompressed_size).split(
+            self._desired_bundle_size, self._min_bundle_size):
+          yield (metadata, split)
       else:
         yield (
             metadata,
@@ -413,7 +645,8 @@ class ReadAllFiles(PTransform):
       desired_bundle_size: int,
       min_bundle_size: int,
       source_from_file: Callable[[str], iobase.BoundedSource],
-      with_filename: bool = False):
+      with_filename: bool = False,
+      use_compression_indexes: bool = False):
     """
     Args:
       splittable: If False, files won't be split into sub-ranges. If True,
@@ -436,6 +669,9 @@ class ReadAllFiles(PTransform):
       with_filename: If True, returns a Key Value with the key being the file
         name and the value being the actual data. If False, it only returns
         the data.
+      use_compression_indexes: If True, compressed files that have an index
+        next to them are split into data ranges. The sources produced by
+        ``source_from_file`` must use the indexes as well.
     """
     self._splittable = splittable
     self._compression_type = compression_type
@@ -443,6 +679,7 @@ class ReadAllFiles(PTransform):
     self._min_bundle_size = min_bundle_size
     self._source_from_file = source_from_file
     self._with_filename = with_filename
+    self._use_compression_indexes = use_compression_indexes
     # TODO(BEAM-14497) always reshuffle once gbk always trigger works.
     self._is_reshuffle = True
 
@@ -464,7 +701,8 @@ class ReadAllFiles(PTransform):
                 self._splittable,
                 self._compression_type,
                 self._desired_bundle_size,
-                self._min_bundle_size)))
+                self._min_bundle_size,
+                self._use_compression_indexes)))
     if self._is_reshuffle:
       pvalue = pvalue | 'Reshard' >> Reshuffle()
     return (
@@ -27,15 +27,20 @@ import tempfile
 import unittest
 
 import hamcrest as hc
+import mock
 
 import apache_beam as beam
+from apache_beam.internal import pickler
 from apache_beam.io import filebasedsource
 from apache_beam.io import iobase
 from apache_beam.io import range_trackers
+from apache_beam.io import source_test_utils
 # importing following private classes for testing
 from apache_beam.io.concat_source import ConcatSource
 from apache_beam.io.filebasedsource import _SingleFileSource as SingleFileSource
 from apache_beam.io.filebasedsource import FileBasedSource
+from apache_beam.io.filesystem import CompressedFile
+from apache_beam.io.filesystem import CompressedFileIndex
 from apache_beam.io.filesystem import CompressionTypes
 from apache_beam.options.value_provider import RuntimeValueProvider
 from apache_beam.options.value_provider import StaticValueProvider
@@ -300,6 +305,54 @@ class TestFileBasedSource(unittest.TestCase):
   def test_validation_file_missing_verification_disabled(self):
     LineSource('dummy_pattern', validate=False)
 
+  def test_match_reused_by_copies(self):
+    pattern, expected_data = write_pattern([5, 3, 12])
+    with mock.patch.object(filebasedsource.FileSystems,
+                           'match',
+                           wraps=filebasedsource.FileSystems.match) as match:
+      fbs = LineSource(pattern)
+      copy = pickler.loads(pickler.dumps(fbs))
+      self.assertEqual(fbs.estimate_size(), copy.estimate_size())
+      read_data = []
+      for split in copy.split(desired_bundle_size=10):
+        read_data.extend(source_test_utils.read_from_source(split.source))
+      self.assertCountEqual(expected_data, read_data)
+      # Only the existence check and a single full listing were needed.
+      self.assertEqual(2, match.call_count)
+
+      LineSource(pattern).estimate_size()
+      self.assertEqual(4, match.call_count)
+
+  def test_match_cache_expires(self):
+    pattern, _ = write_pattern([5, 3])
+    with mock.patch.object(filebasedsource, 'MATCH_CACHE_TTL_SECS', -1):
+      with mock.patch.object(filebasedsource.FileSystems,
+                             'match',
+                             wraps=filebasedsource.FileSystems.match) as match:
+        fbs = LineSource(pattern, validate=False)
+        pickler.loads(pickler.dumps(fbs)).estimate_size()
+        pickler.loads(pickler.dumps(fbs)).estimate_size()
+        self.assertEqual(2, match.call_count)
+
+  def test_expiring_cache_evicts_lazily(self):
+    cache = filebasedsource._ExpiringCache()
+    with mock.patch.object(filebasedsource.time, 'time') as time:
+      time.return_value = 0
+      cache.put('a', 1, 10)
+      time.return_value = 5
+      cache.put('b', 2, 10)
+      time.return_value = 11
+      self.assertIsNone(cache.get('a'))
+      self.assertEqual(2, cache.get('b'))
+      cache.put('c', 3, 10)
+      time.return_value = 16
+      cache.put('d', 4, 10)
+      # 'b' expired, but is only evicted by the next put after time 21.
+      self.assertEqual({'b', 'c', 'd'}, set(cache._entries))
+      time.return_value = 21
+      cache.put('e', 5, 10)
+      self.assertEqual({'d', 'e'}, set(cache._entries))
+
   def test_fully_read_single_file(self):
     file_name, expected_data = write_data(10)
     assert len(expected_data) == 10
@@ -334,6 +387,32 @@ class TestFileBasedSource(unittest.TestCase):
     read_data = [record for record in fbs.read(range_tracker)]
     self.assertCountEqual(expected_data, read_data)
 
+  def test_split_at_block_offsets(self):
+    file_name, expected_data = write_data(100)
+    with open(file_name, 'rb') as f:
+      line_offsets = [0]
+      for line in f:
+        line_offsets.append(line_offsets[-1] + len(line))
+    # Blocks of ten lines each.
+    block_offsets = line_offsets[:-1:10]
+
+    class BlockLineSource(LineSource):
+      def _block_offsets(self, file_name):
+        return block_offsets
+
+    fbs = BlockLineSource(file_name)
+    splits = list(fbs.split(desired_bundle_size=1))
+    self.assertEqual(block_offsets, [split.start_position for split in splits])
+    self.assertEqual(
+        block_offsets[1:] + [line_offsets[-1]],
+        [split.stop_position for split in splits])
+    self.assertEqual(
+        1, len(list(fbs.split(desired_bundle_size=line_offsets[-1]))))
+    read_data = []
+    for split in splits:
+      read_data.extend(source_test_utils.read_from_source(split.source))
+    self.assertCountEqual(expected_data, read_data)
+
   def test_estimate_size_of_file(self):
     file_name, expected_data = write_data(10)
     assert len(expected_data) == 10
@@ -546,6 +625,79 @@ class TestFileBasedSource(unittest.TestCase):
           LineSource(filename, compression_type=CompressionTypes.AUTO))
       assert_that(pcoll, equal_to(lines))
 
+  def _write_indexed_gzip(self, lines, member_size):
+    filename = tempfile.NamedTemporaryFile(
+        delete=False, prefix=tempfile.template, suffix='.gz').name
+    with open(filename, 'wb') as f:
+      writeable = CompressedFile(f, member_size=member_size)
+      for line in lines:
+        writeable.write(line + b'\n')
+      writeable.close()
+    index = writeable.compression_index()
+    with open(CompressedFileIndex.index_path(filename), 'wb') as f:
+      f.write(index.encode())
+    return filename, index
+
+  def test_split_compressed_file_with_index(self):
+    _, lines = write_data(200)
+    filename, index = self._write_indexed_gzip(lines, member_size=100)
+    fbs = LineSource(filename, use_compression_indexes=True)
+    splits = list(fbs.split(desired_bundle_size=1))
+    self.assertEqual(len(splits), len(index.members))
+    self.assertEqual(
+        sum(split.weight for split in splits), index.compressed_size)
+    self.assertEqual(splits[-1].stop_position, index.uncompressed_size)
+    source_test_utils.assert_sources_equal_reference_source(
+        (fbs, None, None),
+        [(split.source, split.start_position, split.stop_position)
+         for split in splits])
+    source_test_utils.assert_split_at_fraction_exhaustive(
+        splits[1].source, perform_multi_threaded_test=False)
+
+    # Bundles group members up to the desired size.
+    splits = list(fbs.split(desired_bundle_size=index.compressed_size // 2))
+    self.assertEqual(len(splits), 2)
+
+    with TestPipeline() as pipeline:
+      pcoll = pipeline | 'Read' >> beam.io.Read(
+          LineSource(filename + '*', use_compression_indexes=True))
+      assert_that(pcoll, equal_to(lines))
+
+  def test_compressed_file_index_is_opt_in(self):
+    _, lines = write_data(200)
+    filename, _ = self._write_indexed_gzip(lines, member_size=100)
+    splits = list(LineSource(filename).split(desired_bundle_size=1))
+    self.assertEqual(len(splits), 1)
+    self.assertEqual(
+        splits[0].stop_position,
+        range_trackers.OffsetRangeTracker.OFFSET_INFINITY)
+
+  def test_index_files_are_read_without_compression_indexes(self):
+    dir_path = tempfile.mkdtemp()
+    filename = os.path.join(dir_path, 'data')
+    with open(filename, 'wb') as f:
+      f.write(b'line1\nline2\n')
+    with open(CompressedFileIndex.index_path(filename), 'wb') as f:
+      f.write(b'line3\n')
+    with TestPipeline() as pipeline:
+      pcoll = pipeline | 'Read' >> beam.io.Read(
+          LineSource(os.path.join(dir_path, '*')))
+      assert_that(pcoll, equal_to([b'line1', b'line2', b'line3']))
+
+  def test_compressed_file_index_must_match_file(self):
+    _, lines = write_data(200)
+    filename, index = self._write_indexed_gzip(lines, member_size=100)
+    index.compressed_size += 1
+    with open(CompressedFileIndex.index_path(filename), 'wb') as f:
+      f.write(index.encode())
+    splits = list(
+        LineSource(filename,
+                   use_compression_indexes=True).split(desired_bundle_size=1))
+    self.assertEqual(len(splits), 1)
+    self.assertEqual(
+        splits[0].stop_position,
+        range_trackers.OffsetRangeTracker.OFFSET_INFINITY)
+
   def test_read_auto_pattern(self):
     _, lines = write_data(200)
     splits = [0, 34, 100, 140, 164, 188, 200]
@@ -25,23 +25,28 @@ Note to implementors:
 # pytype: skip-file
 
 import abc
+import bisect
 import bz2
 import io
+import json
 import logging
 import lzma
 import os
 import posixpath
 import re
+import string
 import time
 import zlib
 from typing import BinaryIO  # pylint: disable=unused-import
 from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Sequence
 from typing import Tuple
 
 import zstandard
 
+from apache_beam.internal import util
 from apache_beam.utils.plugin import BeamPlugin
 
 logger = logging.getLogger(__name__)
@@ -135,6 +140,101 @@ class CompressionTypes(object):
     return cls.UNCOMPRESSED
 
 
+class CompressedFileIndex(object):
+  """Index of the independently compressed members of a compressed file.
+
+  gzip, bzip2, zstd, lzma and deflate data may consist of several compressed
+  members (gzip members, bzip2 streams, zstd frames) that are concatenated and
+  are each decompressible on their own. An index listing where each member
+  starts in both the compressed and the uncompressed data lets a reader start
+  decompressing at any member, which makes such files splittable. Indexes are
+  stored next to the file they describe, at :meth:`index_path`.
+  """
+
+  SUFFIX = '.idx'
+
+  def __init__(
+      self,
+      compression_type: str,
+      members: Sequence[Tuple[int, int]],
+      compressed_size: int,
+      uncompressed_size: int):
+    """Initializes a CompressedFileIndex.
+
+    Args:
+      compression_type: The compression type of the file.
+      members: A list of (compressed offset, uncompressed offset) pairs giving
+        the start of each member, in increasing order and starting with
+        ``(0, 0)``.
+      compressed_size: The size of the compressed file.
+      uncompressed_size: The size of the uncompressed data.
+    """
+    if not members or tuple(members[0]) != (0, 0):
+      raise ValueError('The first member must start at offset 0.')
+    self.compression_type = compression_type
+    self.members = [(int(c), int(u)) for c, u in members]
+    self.compressed_size = compressed_size
+    self.uncompressed_size = uncompressed_size
+    self._uncompressed_offsets = [member[1] for member in self.members]
+
+  @staticmethod
+  def index_path(path: str) -> str:
+    """Returns the path of the index of the file at ``path``."""
+    return path + CompressedFileIndex.SUFFIX
+
+  def member_at(self, uncompressed_offset: int) -> Tuple[int, int]:
+    """Returns the (compressed offset, uncompressed offset) of the member
+    containing the given uncompressed offset."""
+    i = bisect.bisect_right(self._uncompressed_offsets, uncompressed_offset)
+    return self.members[max(i - 1, 0)]
+
+  def compressed_offset(self, uncompressed_offset: int) -> int:
+    """Returns the approximate compressed offset of an uncompressed offset,
+    interpolating within its member."""
+    if uncompressed_offset >= self.uncompressed_size:
+      return self.compressed_size
+    i = max(
+        bisect.bisect_right(self._uncompressed_offsets, uncompressed_offset) -
+        1,
+        0)
+    compressed_start, uncompressed_start = self.members[i]
+    if i + 1 < len(self.members):
+      compressed_stop, uncompressed_stop = self.members[i + 1]
+    else:
+      compressed_stop, uncompressed_stop = (
+          self.compressed_size, self.uncompressed_size)
+    fraction = ((uncompressed_offset - uncompressed_start) /
+                (uncompressed_stop - uncompressed_start))
+    return compressed_start + int(
+        fraction * (compressed_stop - compressed_start))
+
+  def encode(self) -> bytes:
+    return json.dumps({
+        'compression_type': self.compression_type,
+        'compressed_size': self.compressed_size,
+        'uncompressed_size': self.uncompressed_size,
+        'members': self.members,
+    }).encode('utf-8')
+
+  @classmethod
+  def decode(cls, data: bytes) -> 'CompressedFileIndex':
+    index = json.loads(data.decode('utf-8'))
+    return cls(
+        index['compression_type'],
+        index['members'],
+        index['compressed_size'],
+        index['uncompressed_size'])
+
+  def __eq__(self, other):
+    return (
+        isinstance(other, CompressedFileIndex) and
+        self.encode() == other.encode())
+
+  def __repr__(self):
+    return 'CompressedFileIndex(%s, %d members, %d bytes)' % (
+        self.compression_type, len(self.members), self.compressed_size)
+
+
 class CompressedFile(object):
   """File wrapper for easier handling of compressed files."""
   # XXX: This class is not thread safe in the read path.
@@ -147,7 +247,21 @@ class CompressedFile(object):
       self,
       fileobj: BinaryIO,
       compression_type=CompressionTypes.GZIP,
-      read_size=DEFAULT_READ_BUFFER_SIZE):
+      read_size=DEFAULT_READ_BUFFER_SIZE,
+      index: Optional[CompressedFileIndex] = None,
+      member_size: Optional[int] = None):
+    """Initializes a CompressedFile.
+
+    Args:
+      fileobj: The underlying file object, at position 0.
+      compression_type: The compression type of the data.
+      read_size: The number of bytes to read from ``fileobj`` at a time.
+      index: An optional :class:`CompressedFileIndex` of the file, used to seek
+        to a position by decompressing only from the member containing it.
+      member_size: If set, written data is compressed into separate members of
+        at least this many uncompressed bytes, which are listed by
+        :meth:`compression_index`.
+    """
     if not fileobj:
       raise ValueError('File object must not be None')
 
@@ -168,6 +282,12 @@ class CompressedFile(object):
           'File object must be at position 0 but was %d' % self._file.tell())
     self._uncompressed_position = 0
     self._uncompressed_size: Optional[int] = None
+    self._index = index
+    if index is not None:
+      self._uncompressed_size = index.uncompressed_size
+    self._member_size = member_size
+    self._compressed_position = 0
+    self._members = [(0, 0)]
 
     if self.readable():
       self._read_size = read_size
@@ -229,10 +349,35 @@ class CompressedFile(object):
     """Write data to file."""
     if not self._compressor:
       raise ValueError('compressor not initialized')
+    if (self._member_size is not None and
+        self._uncompressed_position - self._members[-1][1]
+        >= self._member_size):
+      self._start_member()
     self._uncompressed_position += len(data)
     compressed = self._compressor.compress(data)
     if compressed:
-      self._file.write(compressed)
+      self._write_compressed(compressed)
+
+  def _write_compressed(self, compressed: bytes) -> None:
+    self._compressed_position += len(compressed)
+    self._file.write(compressed)
+
+  def _start_member(self) -> None:
+    """Ends the current compressed member and starts a new one."""
+    assert self._compressor
+    self._write_compressed(self._compressor.flush())
+    self._initialize_compressor()
+    self._members.append(
+        (self._compressed_position, self._uncompressed_position))
+
+  def compression_index(self) -> CompressedFileIndex:
+    """Returns an index of the members written so far, which describes the
+    complete file once it is closed."""
+    return CompressedFileIndex(
+        self._compression_type,
+        self._members,
+        self._compressed_position,
+        self._uncompressed_position)
 
   def _fetch_to_internal_buffer(self, num_bytes: int) -> None:
     """Fetch up to num_bytes into the internal buffer."""
@@ -328,14 +473,14 @@ class CompressedFile(object):
 
     if self.writeable():
       assert self._compressor
-      self._file.write(self._compressor.flush())
+      self._write_compressed(self._compressor.flush())
 
     self._file.close()
 
   def flush(self) -> None:
     if self.writeable():
       assert self._compressor
-      self._file.write(self._compressor.flush())
+      self._write_compressed(self._compressor.flush())
     self._file.flush()
 
   @property
@@ -366,6 +511,14 @@ class CompressedFile(object):
     # Re-initialize decompressor to clear any data buffered prior to rewind
     self._initialize_decompressor()
 
+  def _seek_to_member(self, compressed_offset, uncompressed_offset) -> None:
+    """Positions the file at the start of the member at the given offsets."""
+    self._clear_read_buffer()
+    self._file.seek(compressed_offset, os.SEEK_SET)
+    self._read_eof = False
+    self._uncompressed_position = uncompressed_offset
+    self._initialize_decompressor()
+
   def seek(self, offset: int, whence: int = os.SEEK_SET) -> None:
     """Set the file's current offset.
 
@@ -377,6 +530,8 @@ class CompressedFile(object):
         overhead
       * seeking backwards from the current position rewinds the file to ``0``
         and decompresses the chunks to the requested offset
+      * if the file has an index, seeking starts decompressing at the member
+        containing the requested offset instead
       * seeking is only supported in files opened for reading
       * if the new offset is out of bound, it is adjusted to either ``0`` or
         ``EOF``.
@@ -419,7 +574,13 @@ class CompressedFile(object):
 
     # Determine how many bytes needs to be read before we reach
     # the requested offset. Rewind if we already passed the position.
-    if absolute_offset < self._uncompressed_position:
+    if self._index is not None:
+      compressed_start, uncompressed_start = self._index.member_at(
+          absolute_offset)
+      if (absolute_offset < self._uncompressed_position or
+          uncompressed_start > self._uncompressed_position):
+        self._seek_to_member(compressed_start, uncompressed_start)
+    elif absolute_offset < self._uncompressed_position:
       self._rewind()
     bytes_to_skip = absolute_offset - self._uncompressed_position
 
@@ -517,6 +678,27 @@ class FileSystem(BeamPlugin, metaclass=abc.ABCMeta):
   """
   CHUNK_SIZE = 1  # Chuck size in the batch operations
 
+  # Maximum number of chunks of a bulk copy, rename or delete operation that
+  # are processed concurrently.
+  MAX_BULK_OPERATION_THREADS = 16
+
+  # Number of listed files after which the listing of a pattern match
+  # continues as concurrent listings of ranges of names, on filesystems that
+  # implement ``_list_range``.
+  LIST_SHARDING_THRESHOLD = 5000
+
+  # Maximum number of patterns or ranges of names that a match lists
+  # concurrently.
+  MAX_LIST_THREADS = 16
+
+  # Characters following the listed prefix at which the remaining names are
+  # split into ranges for concurrent listings.
+  _LIST_SHARD_CHARACTERS = (
+      string.digits + string.ascii_uppercase + string.ascii_lowercase)
+
+  # Number of listings issued by the last call to match.
+  _num_list_calls = 0
+
   def __init__(self, pipeline_options):
     """
     Args:
@@ -524,6 +706,31 @@ class FileSystem(BeamPlugin, metaclass=abc.ABCMeta):
         values (like ``RuntimeValueProvider.runtime_options``).
     """
 
+  def _run_in_chunks(self, fn, items, chunk_size=None):
+    """Applies fn to chunks of items, processing chunks concurrently.
+
+    Filesystems use this to implement bulk operations, with chunks of
+    ``CHUNK_SIZE`` items for operations with a native batch API and of a
+    single item otherwise.
+
+    Args:
+      fn: function taking a list of items and returning a list of results. It
+        is called from multiple threads, and must not raise for failures of
+        individual items.
+      items: list of items to process.
+      chunk_size: number of items per chunk, ``CHUNK_SIZE`` by default.
+
+    Returns: list of the results of all the calls to fn, in order.
+    """
+    chunk_size = chunk_size or self.CHUNK_SIZE
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    if len(chunks) <= 1:
+      chunk_results = [fn(chunk) for chunk in chunks]
+    else:
+      chunk_results = util.run_using_threadpool(
+          fn, chunks, self.MAX_BULK_OPERATION_THREADS)
+    return [result for results in chunk_results for result in results]
+
   @staticmethod
   def _get_compression_type(path, compression_type):
     if compression_type == CompressionTypes.AUTO:
@@ -604,6 +811,69 @@ class FileSystem(BeamPlugin, metaclass=abc.ABCMeta):
     """
     raise NotImplementedError
 
+  def _list_range(self, dir_or_prefix, start_path, end_path):
+    """List files in a location whose paths are within a range.
+
+    Filesystems whose listings are ordered by path and can start at a given
+    path may implement this to let :meth:`match` list large locations
+    concurrently.
+
+    Args:
+      dir_or_prefix: (string) A directory or location prefix (for filesystems
+        that don't have directories).
+      start_path: (string) If set, only paths equal to or after it are listed.
+      end_path: (string) If set, only paths before it are listed.
+
+    Returns:
+      Generator of ``FileMetadata`` objects, ordered by path.
+
+    Raises:
+      ``BeamIOError``: if listing fails, but not if no files were found.
+    """
+    raise NotImplementedError
+
+  def _list_for_match(self, dir_or_prefix, num_list_calls):
+    """Lists the files in a location for a pattern match.
+
+    Listings of more than ``LIST_SHARDING_THRESHOLD`` files continue as
+    concurrent listings of ranges of the remaining names, if the filesystem
+    implements ``_list_range``. Each listing issued is counted in
+    ``num_list_calls[0]``.
+    """
+    num_list_calls[0] += 1
+    if type(self)._list_range is FileSystem._list_range:
+      yield from self._list(dir_or_prefix)
+      return
+
+    last_path = None
+    listing = self._list(dir_or_prefix)
+    for num_listed, file_metadata in enumerate(listing, 1):
+      yield file_metadata
+      last_path = file_metadata.path
+      if num_listed >= self.LIST_SHARDING_THRESHOLD:
+        listing.close()
+        break
+    else:
+      return
+
+    boundaries = sorted(
+        dir_or_prefix + c for c in self._LIST_SHARD_CHARACTERS
+        if dir_or_prefix + c > last_path)
+    ranges = list(zip([last_path] + boundaries, boundaries + [None]))
+    num_list_calls[0] += len(ranges)
+    logger.debug(
+        "Listing the rest of %r in %d concurrent ranges",
+        dir_or_prefix,
+        len(ranges))
+    results = util.run_using_threadpool(
+        lambda start_end: list(self._list_range(dir_or_prefix, *start_end)),
+        ranges,
+        self.MAX_LIST_THREADS)
+    for file_metadata in (m for result in results for m in result):
+      # The first range starts with the last file listed above.
+      if file_metadata.path != last_path:
+        yield file_metadata
+
   @staticmethod
   def _split_scheme(url_or_path):
     match = re.match(r'(^[a-z]+)://(.*)', url_or_path)
@@ -718,6 +988,9 @@ class FileSystem(BeamPlugin, metaclass=abc.ABCMeta):
 
     Patterns ending with '/' or '\\' will be appended with '*'.
 
+    Patterns are matched concurrently, and large listings of object stores
+    are split into concurrent listings of ranges of names.
+
     Args:
       patterns: list of string for the file path pattern to match against
       limits: list of maximum number of responses that need to be fetched
@@ -733,7 +1006,7 @@ class FileSystem(BeamPlugin, metaclass=abc.ABCMeta):
       err_msg = "Patterns and limits should be equal in length"
       assert len(patterns) == len(limits), err_msg
 
-    def _match(pattern, limit):
+    def _match(pattern, limit, num_list_calls):
       """Find all matching paths to the pattern provided."""
       if pattern.endswith('/') or pattern.endswith('\\'):
         pattern += '*'
@@ -757,7 +1030,7 @@ class FileSystem(BeamPlugin, metaclass=abc.ABCMeta):
             prefix_or_dir = prefix_dirname
 
         logger.debug("Listing files in %r", prefix_or_dir)
-        file_metadatas = self._list(prefix_or_dir)
+        file_metadatas = self._list_for_match(prefix_or_dir, num_list_calls)
 
       metadata_list = []
       for file_metadata in self.match_files(file_metadatas, pattern):
@@ -767,13 +1040,32 @@ class FileSystem(BeamPlugin, metaclass=abc.ABCMeta):
 
       return MatchResult(pattern, metadata_list)
 
-    exceptions = {}
-    result = []
-    for pattern, limit in zip(patterns, limits):
+    def _try_match(pattern_and_limit):
+      pattern, limit = pattern_and_limit
+      num_list_calls = [0]
       try:
-        result.append(_match(pattern, limit))
+        match_result = _match(pattern, limit, num_list_calls)
       except Exception as e:  # pylint: disable=broad-except
-        exceptions[pattern] = e
+        return None, e, num_list_calls[0]
+      return match_result, None, num_list_calls[0]
+
+    inputs = list(zip(patterns, limits))
+    if len(inputs) > 1:
+      outputs = util.run_using_threadpool(
+          _try_match, inputs, self.MAX_LIST_THREADS)
+    else:
+      outputs = [_try_match(pattern_and_limit) for pattern_and_limit in inputs]
+
+    exceptions = {}
+    result = []
+    self._num_list_calls = 0
+    for pattern, (match_result, exception, num_list_calls) in zip(patterns,
+                                                                  outputs):
+      self._num_list_calls += num_list_calls
+      if exception is not None:
+        exceptions[pattern] = exception
+      else:
+        result.append(match_result)
 
     if exceptions:
       raise BeamIOError("Match operation failed", exceptions)
@@ -36,6 +36,7 @@ from parameterized import param
 from parameterized import parameterized
 
 from apache_beam.io.filesystem import CompressedFile
+from apache_beam.io.filesystem import CompressedFileIndex
 from apache_beam.io.filesystem import CompressionTypes
 from apache_beam.io.filesystem import FileMetadata
 from apache_beam.io.filesystem import FileSystem
@@ -121,6 +122,26 @@ class TestFileSystem(unittest.TestCase):
         for file_metadata in match_result.metadata_list
     ]
 
+  def test_run_in_chunks(self):
+    chunks = []
+
+    def double(chunk):
+      chunks.append(chunk)
+      return [2 * i for i in chunk]
+
+    self.assertEqual(
+        self.fs._run_in_chunks(double, list(range(50))),
+        [2 * i for i in range(50)])
+    self.assertEqual(len(chunks), 50)
+
+    del chunks[:]
+    self.assertEqual(
+        self.fs._run_in_chunks(double, list(range(5)), chunk_size=2),
+        [0, 2, 4, 6, 8])
+    self.assertEqual(sorted(chunks), [[0, 1], [2, 3], [4]])
+
+    self.assertEqual(self.fs._run_in_chunks(double, []), [])
+
   @parameterized.expand([
       ('gs://gcsio-test/**', all),
       # Does not match root-level files
@@ -505,6 +526,58 @@ atomized in instants hammered around the
         if not line:
           break
 
+  @parameterized.expand([
+      param(compression_type=CompressionTypes.BZIP2),
+      param(compression_type=CompressionTypes.GZIP),
+      param(compression_type=CompressionTypes.ZSTD),
+  ])
+  def test_write_members_and_seek_with_index(self, compression_type):
+    lines = [b'line%d\n' % i for i in range(100)]
+    content = b''.join(lines)
+    file_name = self._create_temp_file()
+    with open(file_name, 'wb') as f:
+      writeable = CompressedFile(f, compression_type, member_size=100)
+      for line in lines:
+        writeable.write(line)
+      writeable.close()
+    index = CompressedFileIndex.decode(writeable.compression_index().encode())
+    self.assertEqual(index.compression_type, compression_type)
+    self.assertEqual(index.compressed_size, os.path.getsize(file_name))
+    self.assertEqual(index.uncompressed_size, len(content))
+    starts = [u for _, u in index.members]
+    self.assertGreater(len(starts), 1)
+    self.assertTrue(all(b - a >= 100 for a, b in zip(starts, starts[1:])))
+
+    # The members form an ordinary concatenated compressed file.
+    with open(file_name, 'rb') as f:
+      self.assertEqual(
+          CompressedFile(f, compression_type).read(len(content) + 1), content)
+
+    with open(file_name, 'rb') as f:
+      readable = CompressedFile(f, compression_type, index=index)
+      for offset in [500, 5, 99, 100, len(content) - 1, 250]:
+        readable.seek(offset)
+        self.assertEqual(readable.tell(), offset)
+        self.assertEqual(readable.read(20), content[offset:offset + 20])
+      readable.seek(-10, os.SEEK_END)
+      self.assertEqual(readable.read(20), content[-10:])
+
+  def test_compressed_file_index_offsets(self):
+    index = CompressedFileIndex(
+        CompressionTypes.GZIP, [(0, 0), (10, 100), (30, 200)], 40, 250)
+    self.assertEqual(index.member_at(0), (0, 0))
+    self.assertEqual(index.member_at(99), (0, 0))
+    self.assertEqual(index.member_at(100), (10, 100))
+    self.assertEqual(index.member_at(1000), (30, 200))
+    self.assertEqual(index.compressed_offset(50), 5)
+    self.assertEqual(index.compressed_offset(150), 20)
+    self.assertEqual(index.compressed_offset(225), 35)
+    self.assertEqual(index.compressed_offset(250), 40)
+    self.assertEqual(
+        CompressedFileIndex.index_path('/tmp/a.gz'), '/tmp/a.gz.idx')
+    with self.assertRaises(ValueError):
+      CompressedFileIndex(CompressionTypes.GZIP, [(10, 100)], 40, 250)
+
   def test_concatenated_compressed_file(self):
     # The test apache_beam.io.textio_test.test_read_gzip_concat
     # does not encounter the problem in the Beam 2.13 and earlier
@@ -19,14 +19,17 @@
 
 # pytype: skip-file
 
+import contextlib
 import logging
 import re
+import time
 from typing import BinaryIO  # pylint: disable=unused-import
 
 from apache_beam.io.filesystem import BeamIOError
 from apache_beam.io.filesystem import CompressionTypes
 from apache_beam.io.filesystem import FileSystem
 from apache_beam.metrics.metric import Lineage
+from apache_beam.metrics.metric import Metrics
 from apache_beam.options.value_provider import RuntimeValueProvider
 
 _LOGGER = logging.getLogger(__name__)
@@ -213,6 +216,9 @@ class FileSystems(object):
       - If the file listing is not recursive, a pattern like
         ``scheme://path/*/foo`` will not be able to mach any files.
 
+    The number of listings issued is reported in the ``match_list_calls``
+    counter.
+
     See Also:
       :meth:`.filesystem.FileSystem.match`
 
@@ -237,7 +243,12 @@ class FileSystems(object):
     if len(patterns) == 0:
       return []
     filesystem = FileSystems.get_filesystem(patterns[0])
-    return filesystem.match(patterns, limits)
+    with _measure_bulk_operation('match', len(patterns)):
+      try:
+        return filesystem.match(patterns, limits)
+      finally:
+        Metrics.counter(FileSystems,
+                        'match_list_calls').inc(filesystem._num_list_calls)
 
   @staticmethod
   def create(
@@ -283,6 +294,9 @@ class FileSystems(object):
   def copy(source_file_names, destination_file_names):
     """Recursively copy the file list from the source to the destination
 
+    The copies are issued in bulk, using the native batch API of the
+    filesystem where there is one, and may run concurrently and in any order.
+
     Args:
       source_file_names: list of source file objects that needs to be copied
       destination_file_names: list of destination of the new object
@@ -293,13 +307,17 @@ class FileSystems(object):
     if len(source_file_names) == 0:
       return
     filesystem = FileSystems.get_filesystem(source_file_names[0])
-    return filesystem.copy(source_file_names, destination_file_names)
+    with _measure_bulk_operation('copy', len(source_file_names)):
+      return filesystem.copy(source_file_names, destination_file_names)
 
   @staticmethod
   def rename(source_file_names, destination_file_names):
     """Rename the files at the source list to the destination list.
     Source and destination lists should be of the same size.
 
+    The renames are issued in bulk, using the native batch API of the
+    filesystem where there is one, and may run concurrently and in any order.
+
     Args:
       source_file_names: List of file paths that need to be moved
       destination_file_names: List of destination_file_names for the files
@@ -310,7 +328,8 @@ class FileSystems(object):
     if len(source_file_names) == 0:
       return
     filesystem = FileSystems.get_filesystem(source_file_names[0])
-    return filesystem.rename(source_file_names, destination_file_names)
+    with _measure_bulk_operation('rename', len(source_file_names)):
+      return filesystem.rename(source_file_names, destination_file_names)
 
   @staticmethod
   def exists(path):
@@ -364,6 +383,9 @@ class FileSystems(object):
     """Deletes files or directories at the provided paths.
     Directories will be deleted recursively.
 
+    The deletes are issued in bulk, using the native batch API of the
+    filesystem where there is one, and may run concurrently.
+
     Args:
       paths: list of paths that give the file objects to be deleted
 
@@ -376,7 +398,8 @@ class FileSystems(object):
     if len(paths) == 0:
       return
     filesystem = FileSystems.get_filesystem(paths[0])
-    return filesystem.delete(paths)
+    with _measure_bulk_operation('delete', len(paths)):
+      return filesystem.delete(paths)
 
   @staticmethod
   def get_chunk_size(path):
@@ -409,3 +432,15 @@ class FileSystems(object):
       path: string path to be reported.
     """
     FileSystems.get_filesystem(path).report_lineage(path, Lineage.sinks())
+
+
+@contextlib.contextmanager
+def _measure_bulk_operation(operation, num_paths):
+  """Records the latency and number of paths of a bulk operation."""
+  start = time.time()
+  try:
+    yield
+  finally:
+    Metrics.distribution(FileSystems, '%s_latency_msecs' % operation).update(
+        int((time.time() - start) * 1000))
+    Metrics.counter(FileSystems, '%s_paths' % operation).inc(num_paths)
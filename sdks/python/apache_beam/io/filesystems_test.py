@@ -199,6 +199,56 @@ class FileSystemsTest(unittest.TestCase):
     self.assertEqual(
         list(error.exception.exception_details.keys()), [(path1, path2)])
 
+  def test_rename_many(self):
+    sources = [os.path.join(self.tmpdir, 'f%d' % i) for i in range(50)]
+    destinations = [os.path.join(self.tmpdir, 'g%d' % i) for i in range(50)]
+    for path in sources[:45]:
+      with open(path, 'a') as f:
+        f.write('Hello')
+
+    with self.assertRaisesRegex(BeamIOError,
+                                r'^Rename operation failed') as error:
+      FileSystems.rename(sources, destinations)
+    self.assertEqual(
+        sorted(error.exception.exception_details.keys()),
+        sorted(zip(sources[45:], destinations[45:])))
+    for source, destination in zip(sources[:45], destinations[:45]):
+      self.assertFalse(FileSystems.exists(source))
+      self.assertTrue(FileSystems.exists(destination))
+
+  @mock.patch('apache_beam.io.filesystems.Metrics')
+  def test_bulk_operation_metrics(self, mock_metrics):
+    sources = [os.path.join(self.tmpdir, 'f%d' % i) for i in range(3)]
+    destinations = [os.path.join(self.tmpdir, 'g%d' % i) for i in range(3)]
+    for path in sources:
+      with open(path, 'a') as f:
+        f.write('Hello')
+
+    FileSystems.rename(sources, destinations)
+    mock_metrics.distribution.assert_called_once_with(
+        FileSystems, 'rename_latency_msecs')
+    mock_metrics.distribution.return_value.update.assert_called_once()
+    mock_metrics.counter.assert_called_once_with(FileSystems, 'rename_paths')
+    mock_metrics.counter.return_value.inc.assert_called_once_with(3)
+
+  @mock.patch('apache_beam.io.filesystems.Metrics')
+  def test_match_metrics(self, mock_metrics):
+    for name in ['f1', 'f2']:
+      with open(os.path.join(self.tmpdir, name), 'a') as f:
+        f.write('Hello')
+
+    result = FileSystems.match(
+        [os.path.join(self.tmpdir, 'f1'), os.path.join(self.tmpdir, '*')])
+    self.assertEqual([len(r.metadata_list) for r in result], [1, 2])
+    mock_metrics.distribution.assert_called_once_with(
+        FileSystems, 'match_latency_msecs')
+    mock_metrics.counter.assert_has_calls([
+        mock.call(FileSystems, 'match_list_calls'),
+        mock.call().inc(1),
+        mock.call(FileSystems, 'match_paths'),
+        mock.call().inc(2),
+    ])
+
   def test_rename_directory(self):
     path_t1 = os.path.join(self.tmpdir, 't1')
     path_t2 = os.path.join(self.tmpdir, 't2')
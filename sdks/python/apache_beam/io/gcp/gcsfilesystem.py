@@ -128,12 +128,31 @@ class GCSFileSystem(FileSystem):
     Returns:
       Generator of ``FileMetadata`` objects.
 
+    Raises:
+      ``BeamIOError``: if listing fails, but not if no files were found.
+    """
+    return self._list_range(dir_or_prefix, None, None)
+
+  def _list_range(self, dir_or_prefix, start_path, end_path):
+    """List files in a location whose paths are within a range.
+
+    Args:
+      dir_or_prefix: (string) A location prefix.
+      start_path: (string) If set, only paths equal to or after it are listed.
+      end_path: (string) If set, only paths before it are listed.
+
+    Returns:
+      Generator of ``FileMetadata`` objects, ordered by path.
+
     Raises:
       ``BeamIOError``: if listing fails, but not if no files were found.
     """
     try:
-      for path, (size, updated) in self._gcsIO().list_files(dir_or_prefix,
-                                                            with_metadata=True):
+      for path, (size,
+                 updated) in self._gcsIO().list_files(dir_or_prefix,
+                                                      with_metadata=True,
+                                                      start_path=start_path,
+                                                      end_path=end_path):
         yield FileMetadata(path, size, updated)
     except Exception as e:  # pylint: disable=broad-except
       raise BeamIOError("List operation failed", {dir_or_prefix: e})
@@ -203,6 +222,8 @@ class GCSFileSystem(FileSystem):
         "be equal in length")
     assert len(source_file_names) == len(destination_file_names), err_msg
 
+    gcs_io = self._gcsIO()
+
     def _copy_path(source, destination):
       """Recursively copy the file tree from the source to the destination
       """
@@ -210,16 +231,26 @@ class GCSFileSystem(FileSystem):
         raise ValueError('Destination %r must be GCS path.' % destination)
       # Use copy_tree if the path ends with / as it is a directory
       if source.endswith('/'):
-        self._gcsIO().copytree(source, destination)
+        gcs_io.copytree(source, destination)
       else:
-        self._gcsIO().copy(source, destination)
-
-    exceptions = {}
-    for source, destination in zip(source_file_names, destination_file_names):
-      try:
-        _copy_path(source, destination)
-      except Exception as e:  # pylint: disable=broad-except
-        exceptions[(source, destination)] = e
+        gcs_io.copy(source, destination)
+
+    def _copy_paths(pairs):
+      exceptions = []
+      for source, destination in pairs:
+        try:
+          _copy_path(source, destination)
+        except Exception as e:  # pylint: disable=broad-except
+          exceptions.append(((source, destination), e))
+      return exceptions
+
+    # Copies preserve source generations, which batch requests do not, so
+    # they are issued concurrently instead.
+    exceptions = dict(
+        self._run_in_chunks(
+            _copy_paths,
+            list(zip(source_file_names, destination_file_names)),
+            chunk_size=1))
 
     if exceptions:
       raise BeamIOError("Copy operation failed", exceptions)
@@ -240,33 +271,31 @@ class GCSFileSystem(FileSystem):
         "be equal in length")
     assert len(source_file_names) == len(destination_file_names), err_msg
 
-    gcs_batches = []
-    gcs_current_batch = []
-    for src, dest in zip(source_file_names, destination_file_names):
-      gcs_current_batch.append((src, dest))
-      if len(gcs_current_batch) == self.CHUNK_SIZE:
-        gcs_batches.append(gcs_current_batch)
-        gcs_current_batch = []
-    if gcs_current_batch:
-      gcs_batches.append(gcs_current_batch)
-
-    # Execute GCS renames if any and return exceptions.
-    exceptions = {}
-    for batch in gcs_batches:
-      copy_statuses = self._gcsIO().copy_batch(batch)
+    gcs_io = self._gcsIO()
+
+    def _rename_batch(batch):
+      exceptions = []
+      copy_statuses = gcs_io.copy_batch(batch)
       copy_succeeded = {}
       delete_targets = []
       for src, dest, exception in copy_statuses:
         if exception:
-          exceptions[(src, dest)] = exception
+          exceptions.append(((src, dest), exception))
         else:
           copy_succeeded[src] = dest
           delete_targets.append(src)
-      delete_statuses = self._gcsIO().delete_batch(delete_targets)
+      delete_statuses = gcs_io.delete_batch(delete_targets)
       for src, exception in delete_statuses:
         if exception:
           dest = copy_succeeded[src]
-          exceptions[(src, dest)] = exception
+          exceptions.append(((src, dest), exception))
+      return exceptions
+
+    # Execute GCS renames in concurrent batches and return exceptions.
+    exceptions = dict(
+        self._run_in_chunks(
+            _rename_batch, list(zip(source_file_names,
+                                    destination_file_names))))
 
     if exceptions:
       raise BeamIOError("Rename operation failed", exceptions)
@@ -350,20 +379,24 @@ class GCSFileSystem(FileSystem):
       paths: list of paths that give the file objects to be deleted
     """
 
-    exceptions = {}
-
+    gcs_io = self._gcsIO()
+    patterns = []
     for path in paths:
       if path.endswith('/'):
-        self._gcsIO().delete(path, recursive=True)
-        continue
+        gcs_io.delete(path, recursive=True)
       else:
-        path_to_use = path
-      match_result = self.match([path_to_use])[0]
-      statuses = self._gcsIO().delete_batch(
-          [m.path for m in match_result.metadata_list])
-      for target, exception in statuses:
-        if exception:
-          exceptions[target] = exception
+        patterns.append(path)
+
+    # Delete the matching objects in concurrent batches.
+    targets = [
+        m.path for match_result in self.match(patterns)
+        for m in match_result.metadata_list
+    ]
+    exceptions = {
+        target: exception
+        for target, exception in self._run_in_chunks(
+            gcs_io.delete_batch, targets) if exception
+    }
 
     if exceptions:
       raise BeamIOError("Delete operation failed", exceptions)
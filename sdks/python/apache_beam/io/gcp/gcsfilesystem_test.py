@@ -93,7 +93,7 @@ class GCSFileSystemTest(unittest.TestCase):
     match_result = self.fs.match(['gs://bucket/'])[0]
     self.assertEqual(set(match_result.metadata_list), expected_results)
     gcsio_mock.list_files.assert_called_once_with(
-        'gs://bucket/', with_metadata=True)
+        'gs://bucket/', with_metadata=True, start_path=None, end_path=None)
 
   @mock.patch('apache_beam.io.gcp.gcsfilesystem.gcsio')
   def test_match_multiples_limit(self, mock_gcsio):
@@ -109,7 +109,7 @@ class GCSFileSystemTest(unittest.TestCase):
     self.assertEqual(set(match_result.metadata_list), expected_results)
     self.assertEqual(len(match_result.metadata_list), limit)
     gcsio_mock.list_files.assert_called_once_with(
-        'gs://bucket/', with_metadata=True)
+        'gs://bucket/', with_metadata=True, start_path=None, end_path=None)
 
   @mock.patch('apache_beam.io.gcp.gcsfilesystem.gcsio')
   def test_match_multiples_error(self, mock_gcsio):
@@ -125,22 +125,53 @@ class GCSFileSystemTest(unittest.TestCase):
     self.assertRegex(
         str(error.exception.exception_details), r'gs://bucket/.*%s' % exception)
     gcsio_mock.list_files.assert_called_once_with(
-        'gs://bucket/', with_metadata=True)
+        'gs://bucket/', with_metadata=True, start_path=None, end_path=None)
 
   @mock.patch('apache_beam.io.gcp.gcsfilesystem.gcsio')
   def test_match_multiple_patterns(self, mock_gcsio):
     # Prepare mocks.
     gcsio_mock = mock.MagicMock()
     gcsfilesystem.gcsio.GcsIO = lambda pipeline_options=None: gcsio_mock
-    gcsio_mock.list_files.side_effect = [
-        iter([('gs://bucket/file1', (1, 99999.0))]),
-        iter([('gs://bucket/file2', (2, 88888.0))]),
-    ]
+    # The patterns are matched concurrently.
+    gcsio_mock.list_files.side_effect = lambda path, **kwargs: iter({
+        'gs://bucket/file1': [('gs://bucket/file1', (1, 99999.0))],
+        'gs://bucket/file2': [('gs://bucket/file2', (2, 88888.0))], }[path])
     expected_results = [[FileMetadata('gs://bucket/file1', 1, 99999.0)],
                         [FileMetadata('gs://bucket/file2', 2, 88888.0)]]
     result = self.fs.match(['gs://bucket/file1*', 'gs://bucket/file2*'])
     self.assertEqual([mr.metadata_list for mr in result], expected_results)
 
+  @mock.patch('apache_beam.io.gcp.gcsfilesystem.gcsio')
+  def test_match_sharded_listing(self, mock_gcsio):
+    # Prepare mocks.
+    gcsio_mock = mock.MagicMock()
+    gcsfilesystem.gcsio.GcsIO = lambda pipeline_options=None: gcsio_mock
+    paths = sorted(
+        'gs://bucket/dir/%s%d' % (c, i) for c in 'aB7z_' for i in range(3))
+
+    def list_files(path, with_metadata, start_path, end_path):
+      for p in paths:
+        if (p.startswith(path) and (start_path is None or p >= start_path) and
+            (end_path is None or p < end_path)):
+          yield p, (1, 99999.0)
+
+    gcsio_mock.list_files.side_effect = list_files
+    self.fs.LIST_SHARDING_THRESHOLD = 4
+    match_result = self.fs.match(['gs://bucket/dir/*'])[0]
+    self.assertEqual([m.path for m in match_result.metadata_list], paths)
+    # One listing up to the threshold, then one per range of the rest.
+    ranges = [
+        call[1]['start_path']
+        for call in gcsio_mock.list_files.call_args_list[1:]
+    ]
+    self.assertEqual(ranges[0], paths[3])
+    self.assertEqual(self.fs._num_list_calls, len(ranges) + 1)
+    self.assertEqual(
+        len(ranges),
+        1 + sum(
+            'gs://bucket/dir/' + c > paths[3]
+            for c in self.fs._LIST_SHARD_CHARACTERS))
+
   @mock.patch('apache_beam.io.gcp.gcsfilesystem.gcsio')
   def test_create(self, mock_gcsio):
     # Prepare mocks.
@@ -335,6 +366,29 @@ class GCSFileSystemTest(unittest.TestCase):
         'gs://bucket/from3',
     ])
 
+  @mock.patch('apache_beam.io.gcp.gcsfilesystem.gcsio')
+  def test_rename_concurrent_batches(self, mock_gcsio):
+    # Prepare mocks.
+    gcsio_mock = mock.MagicMock()
+    gcsfilesystem.gcsio.GcsIO = lambda pipeline_options=None: gcsio_mock
+    sources = ['gs://bucket/from%d' % i for i in range(250)]
+    destinations = ['gs://bucket/to%d' % i for i in range(250)]
+    gcsio_mock.copy_batch.side_effect = lambda batch: [(src, dest, None)
+                                                       for src, dest in batch]
+    gcsio_mock.delete_batch.side_effect = lambda paths: [(path, None)
+                                                         for path in paths]
+
+    self.fs.rename(sources, destinations)
+    self.assertEqual(
+        sorted(
+            len(call.args[0]) for call in gcsio_mock.copy_batch.call_args_list),
+        [50, 100, 100])
+    self.assertEqual(
+        sorted(
+            path for call in gcsio_mock.delete_batch.call_args_list
+            for path in call.args[0]),
+        sorted(sources))
+
   @mock.patch('apache_beam.io.gcp.gcsfilesystem.gcsio')
   def test_delete(self, mock_gcsio):
     # Prepare mocks.
@@ -363,15 +417,15 @@ class GCSFileSystemTest(unittest.TestCase):
         'gs://bucket/from2',
         'gs://bucket/from3',
     ]
-    gcsio_mock.delete_batch.side_effect = [
-        [('gs://bucket/from1', None)],
-        [('gs://bucket/from2', Exception("BadThings"))],
-        [('gs://bucket/from3', None)],
-    ]
+    gcsio_mock.delete_batch.side_effect = [[
+        ('gs://bucket/from1', None),
+        ('gs://bucket/from2', Exception("BadThings")),
+        ('gs://bucket/from3', None),
+    ]]
     # Issue batch delete.
     with self.assertRaisesRegex(BeamIOError, r'^Delete operation failed'):
       self.fs.delete(files)
-    gcsio_mock.delete_batch.assert_called()
+    gcsio_mock.delete_batch.assert_called_once_with(files)
 
   def test_lineage(self):
     self._verify_lineage("gs://bucket/", ("bucket", ))
@@ -29,12 +29,17 @@ https://github.com/apache/beam/blob/master/sdks/python/OWNERS
 
 # pytype: skip-file
 
+import collections
 import logging
 import re
 import time
+import uuid
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 from typing import Union
 
+from google.api_core.exceptions import RequestRangeNotSatisfiable
 from google.api_core.exceptions import RetryError
 from google.cloud import storage
 from google.cloud.exceptions import NotFound
@@ -57,6 +62,19 @@ _LOGGER = logging.getLogger(__name__)
 
 DEFAULT_READ_BUFFER_SIZE = 16 * 1024 * 1024
 
+# Default size of the ranged requests issued ahead of the read cursor when
+# read-ahead is enabled.
+DEFAULT_READ_AHEAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Defaults for parallel composite uploads. An object is uploaded in parts of
+# DEFAULT_COMPOSITE_UPLOAD_PART_SIZE bytes once more than the configured
+# threshold has been written to it.
+DEFAULT_COMPOSITE_UPLOAD_PART_SIZE = 32 * 1024 * 1024
+DEFAULT_COMPOSITE_UPLOAD_MAX_CONCURRENCY = 8
+
+# Maximum number of source objects of a single GCS compose request.
+MAX_COMPOSE_SOURCES = 32
+
 # Maximum number of operations permitted in GcsIO.copy_batch() and
 # GcsIO.delete_batch().
 MAX_BATCH_OPERATION_SIZE = 100
@@ -169,6 +187,16 @@ class GcsIO(object):
     self._storage_client_retry = gcsio_retry.get_retry(pipeline_options)
     self._use_blob_generation = getattr(
         google_cloud_options, 'enable_gcsio_blob_generation', False)
+    self._read_ahead_depth = getattr(
+        google_cloud_options, 'gcs_read_ahead_depth', 0) or 0
+    self._read_ahead_chunk_size = getattr(
+        google_cloud_options, 'gcs_read_ahead_chunk_size', None)
+    self._composite_upload_threshold = getattr(
+        google_cloud_options, 'gcs_composite_upload_threshold', None)
+    self._composite_upload_part_size = getattr(
+        google_cloud_options, 'gcs_composite_upload_part_size', None)
+    self._composite_upload_max_concurrency = getattr(
+        google_cloud_options, 'gcs_composite_upload_max_concurrency', None)
 
   def get_project_number(self, bucket):
     if bucket not in self.bucket_to_project_number:
@@ -216,7 +244,12 @@ class GcsIO(object):
       filename,
       mode='r',
       read_buffer_size=DEFAULT_READ_BUFFER_SIZE,
-      mime_type='application/octet-stream'):
+      mime_type='application/octet-stream',
+      read_ahead_depth=None,
+      read_ahead_chunk_size=None,
+      composite_upload_threshold=None,
+      composite_upload_part_size=None,
+      composite_upload_max_concurrency=None):
     """Open a GCS file path for reading or writing.
 
     Args:
@@ -224,6 +257,23 @@ class GcsIO(object):
       mode (str): ``'r'`` for reading or ``'w'`` for writing.
       read_buffer_size (int): Buffer size to use during read operations.
       mime_type (str): Mime type to set for write operations.
+      read_ahead_depth (int): Number of ranged requests to keep in flight
+        ahead of the read cursor. Defaults to the ``gcs_read_ahead_depth``
+        pipeline option; 0 reads sequentially.
+      read_ahead_chunk_size (int): Size in bytes of each ranged request when
+        read-ahead is enabled. Defaults to the ``gcs_read_ahead_chunk_size``
+        pipeline option, or ``DEFAULT_READ_AHEAD_CHUNK_SIZE``.
+      composite_upload_threshold (int): Size in bytes above which a written
+        object is uploaded as parallel parts that are composed at close.
+        Defaults to the ``gcs_composite_upload_threshold`` pipeline option;
+        if unset, objects are uploaded as a single stream.
+      composite_upload_part_size (int): Size in bytes of each part of a
+        composite upload. Defaults to the ``gcs_composite_upload_part_size``
+        pipeline option, or ``DEFAULT_COMPOSITE_UPLOAD_PART_SIZE``.
+      composite_upload_max_concurrency (int): Maximum number of parts of a
+        composite upload in flight at once. Defaults to the
+        ``gcs_composite_upload_max_concurrency`` pipeline option, or
+        ``DEFAULT_COMPOSITE_UPLOAD_MAX_CONCURRENCY``.
 
     Returns:
       GCS file object.
@@ -236,18 +286,38 @@ class GcsIO(object):
 
     if mode == 'r' or mode == 'rb':
       blob = bucket.blob(blob_name)
+      if read_ahead_depth is None:
+        read_ahead_depth = self._read_ahead_depth
+      if read_ahead_chunk_size is None:
+        read_ahead_chunk_size = (
+            self._read_ahead_chunk_size or DEFAULT_READ_AHEAD_CHUNK_SIZE)
       return BeamBlobReader(
           blob,
           chunk_size=read_buffer_size,
           enable_read_bucket_metric=self.enable_read_bucket_metric,
-          retry=self._storage_client_retry)
+          retry=self._storage_client_retry,
+          read_ahead_depth=read_ahead_depth,
+          read_ahead_chunk_size=read_ahead_chunk_size)
     elif mode == 'w' or mode == 'wb':
       blob = bucket.blob(blob_name)
+      if composite_upload_threshold is None:
+        composite_upload_threshold = self._composite_upload_threshold
+      if composite_upload_part_size is None:
+        composite_upload_part_size = (
+            self._composite_upload_part_size or
+            DEFAULT_COMPOSITE_UPLOAD_PART_SIZE)
+      if composite_upload_max_concurrency is None:
+        composite_upload_max_concurrency = (
+            self._composite_upload_max_concurrency or
+            DEFAULT_COMPOSITE_UPLOAD_MAX_CONCURRENCY)
       return BeamBlobWriter(
           blob,
           mime_type,
           enable_write_bucket_metric=self.enable_write_bucket_metric,
-          retry=self._storage_client_retry)
+          retry=self._storage_client_retry,
+          composite_upload_threshold=composite_upload_threshold,
+          composite_upload_part_size=composite_upload_part_size,
+          composite_upload_max_concurrency=composite_upload_max_concurrency)
     else:
       raise ValueError('Invalid file open mode: %s.' % mode)
 
@@ -585,12 +655,17 @@ class GcsIO(object):
 
     return file_info
 
-  def list_files(self, path, with_metadata=False):
+  def list_files(
+      self, path, with_metadata=False, start_path=None, end_path=None):
     """Lists files matching the prefix.
 
     Args:
       path: GCS file path pattern in the form gs://<bucket>/[name].
       with_metadata: Experimental. Specify whether returns file metadata.
+      start_path: If set, only files whose paths are equal to or after this
+        GCS path are listed.
+      end_path: If set, only files whose paths are before this GCS path are
+        listed.
 
     Returns:
       If ``with_metadata`` is False: generator of tuple(file name, size); if
@@ -607,7 +682,15 @@ class GcsIO(object):
       _LOGGER.debug("Starting the size estimation of the input")
     bucket = self.client.bucket(bucket_name)
     response = self.client.list_blobs(
-        bucket, prefix=prefix, retry=self._storage_client_retry)
+        bucket,
+        prefix=prefix,
+        start_offset=(
+            parse_gcs_path(start_path, object_optional=True)[1]
+            if start_path else None),
+        end_offset=(
+            parse_gcs_path(end_path, object_optional=True)[1]
+            if end_path else None),
+        retry=self._storage_client_retry)
     for item in response:
       file_name = 'gs://%s/%s' % (item.bucket.name, item.name)
       if file_name not in file_info:
@@ -655,13 +738,32 @@ class GcsIO(object):
 
 
 class BeamBlobReader(BlobReader):
+  """A reader for GCS blobs.
+
+  By default the blob is downloaded sequentially, one chunk of ``chunk_size``
+  bytes at a time. If ``read_ahead_depth`` is positive, the reader instead
+  keeps up to ``read_ahead_depth`` ranged requests of ``read_ahead_chunk_size``
+  bytes in flight ahead of the read cursor and reassembles their responses in
+  order, which lets a single large file be read at close to the available
+  network bandwidth. Seeking outside the prefetched window discards the
+  outstanding requests and restarts read-ahead from the new position.
+  """
   def __init__(
       self,
       blob,
       chunk_size=DEFAULT_READ_BUFFER_SIZE,
       enable_read_bucket_metric=False,
       retry=DEFAULT_RETRY,
-      raw_download=True):
+      raw_download=True,
+      read_ahead_depth=0,
+      read_ahead_chunk_size=DEFAULT_READ_AHEAD_CHUNK_SIZE):
+    if read_ahead_depth < 0:
+      raise ValueError(
+          'read_ahead_depth must be non-negative, got %s' % read_ahead_depth)
+    if read_ahead_depth and read_ahead_chunk_size <= 0:
+      raise ValueError(
+          'read_ahead_chunk_size must be positive, got %s' %
+          read_ahead_chunk_size)
     # By default, we always request to retrieve raw data from GCS even if the
     # object meets the criteria of decompressive transcoding
     # (https://cloud.google.com/storage/docs/transcoding).
@@ -686,8 +788,23 @@ class BeamBlobReader(BlobReader):
     self.enable_read_bucket_metric = enable_read_bucket_metric
     self.mode = "r"
 
+    self._read_ahead_depth = read_ahead_depth
+    self._read_ahead_chunk_size = read_ahead_chunk_size
+    # Read-ahead state: the absolute read position, the chunk currently being
+    # consumed, the offset of the next chunk to request and the in-flight
+    # (start, future) requests, in file order.
+    self._read_ahead_pos = 0
+    self._read_ahead_chunk = b''
+    self._read_ahead_chunk_start = 0
+    self._read_ahead_next_fetch = 0
+    self._read_ahead_pending = collections.deque()
+    self._read_ahead_executor = None
+
   def read(self, size=-1):
-    bytesRead = super().read(size)
+    if self._read_ahead_depth:
+      bytesRead = self._read_ahead(size)
+    else:
+      bytesRead = super().read(size)
     if self.enable_read_bucket_metric:
       Metrics.counter(
           self.__class__,
@@ -695,8 +812,120 @@ class BeamBlobReader(BlobReader):
               len(bytesRead))
     return bytesRead
 
+  def seek(self, pos, whence=0):
+    if not self._read_ahead_depth:
+      return super().seek(pos, whence)
+    self._checkClosed()
+    if whence == 0:
+      target_pos = pos
+    elif whence == 1:
+      target_pos = self._read_ahead_pos + pos
+    elif whence == 2:
+      target_pos = self._blob_size() + pos
+    else:
+      raise ValueError("invalid whence value")
+    # Outstanding requests are kept; _read_ahead_chunk_at() discards them if
+    # the new position falls outside of the prefetched window.
+    self._read_ahead_pos = max(0, min(target_pos, self._blob_size()))
+    return self._read_ahead_pos
+
+  def close(self):
+    self._cancel_read_ahead()
+    if self._read_ahead_executor is not None:
+      self._read_ahead_executor.shutdown(wait=False)
+      self._read_ahead_executor = None
+    super().close()
+
+  def _blob_size(self):
+    if self._blob.size is None:
+      self._blob.reload(**self._download_kwargs)
+    return self._blob.size
+
+  def _read_ahead(self, size):
+    self._checkClosed()  # Raises ValueError if closed.
+    blob_size = self._blob_size()
+    if size is None or size < 0:
+      end = blob_size
+    else:
+      end = min(blob_size, self._read_ahead_pos + size)
+    parts = []
+    while self._read_ahead_pos < end:
+      chunk_start, chunk = self._read_ahead_chunk_at(self._read_ahead_pos)
+      offset = self._read_ahead_pos - chunk_start
+      part = chunk[offset:offset + end - self._read_ahead_pos]
+      if not part:
+        # The blob is shorter than its metadata claims.
+        break
+      parts.append(part)
+      self._read_ahead_pos += len(part)
+    return b''.join(parts)
+
+  def _read_ahead_chunk_at(self, pos):
+    """Returns the (start, data) chunk containing pos, waiting if needed."""
+    chunk_start = self._read_ahead_chunk_start
+    if chunk_start <= pos < chunk_start + len(self._read_ahead_chunk):
+      return chunk_start, self._read_ahead_chunk
+    pending = self._read_ahead_pending
+    # Drop requests for ranges that have been skipped over.
+    while pending and pending[0][0] + self._read_ahead_chunk_size <= pos:
+      pending.popleft()[1].cancel()
+    if not pending or pending[0][0] > pos:
+      self._cancel_read_ahead()
+      self._read_ahead_next_fetch = pos
+      self._fill_read_ahead()
+    chunk_start, future = pending.popleft()
+    # Keep the pipeline full while this chunk is being consumed.
+    self._fill_read_ahead()
+    self._read_ahead_chunk = future.result()
+    self._read_ahead_chunk_start = chunk_start
+    return chunk_start, self._read_ahead_chunk
+
+  def _fill_read_ahead(self):
+    if self._read_ahead_executor is None:
+      self._read_ahead_executor = ThreadPoolExecutor(self._read_ahead_depth)
+    blob_size = self._blob_size()
+    while (len(self._read_ahead_pending) < self._read_ahead_depth and
+           self._read_ahead_next_fetch < blob_size):
+      start = self._read_ahead_next_fetch
+      end = min(start + self._read_ahead_chunk_size, blob_size)
+      self._read_ahead_pending.append(
+          (start, self._read_ahead_executor.submit(self._download, start, end)))
+      self._read_ahead_next_fetch = end
+
+  def _cancel_read_ahead(self):
+    while self._read_ahead_pending:
+      self._read_ahead_pending.popleft()[1].cancel()
+    self._read_ahead_chunk = b''
+    self._read_ahead_chunk_start = 0
+
+  def _download(self, start, end):
+    # Checksumming must be disabled as we are downloading ranges, and the
+    # server only knows the checksum of the entire blob. The end of the range
+    # is inclusive.
+    try:
+      return self._blob.download_as_bytes(
+          start=start,
+          end=end - 1,
+          checksum=None,
+          retry=self._retry,
+          **self._download_kwargs)
+    except RequestRangeNotSatisfiable:
+      return b''
+
 
 class BeamBlobWriter(BlobWriter):
+  """A writer for GCS blobs.
+
+  By default the blob is uploaded as a single resumable upload. If
+  ``composite_upload_threshold`` is set and more than that many bytes are
+  written, the data is instead uploaded as temporary part objects of
+  ``composite_upload_part_size`` bytes, with up to
+  ``composite_upload_max_concurrency`` part uploads in flight, which are
+  composed into the blob and deleted at close. Smaller blobs are still written
+  with a single resumable upload.
+
+  Note that composite objects have a CRC32C but no MD5 checksum.
+  """
   def __init__(
       self,
       blob,
@@ -704,7 +933,24 @@ class BeamBlobWriter(BlobWriter):
       chunk_size=16 * 1024 * 1024,
       ignore_flush=True,
       enable_write_bucket_metric=False,
-      retry=DEFAULT_RETRY):
+      retry=DEFAULT_RETRY,
+      composite_upload_threshold=None,
+      composite_upload_part_size=DEFAULT_COMPOSITE_UPLOAD_PART_SIZE,
+      composite_upload_max_concurrency=DEFAULT_COMPOSITE_UPLOAD_MAX_CONCURRENCY
+  ):
+    if composite_upload_threshold is not None:
+      if composite_upload_threshold < 0:
+        raise ValueError(
+            'composite_upload_threshold must be non-negative, got %s' %
+            composite_upload_threshold)
+      if composite_upload_part_size <= 0:
+        raise ValueError(
+            'composite_upload_part_size must be positive, got %s' %
+            composite_upload_part_size)
+      if composite_upload_max_concurrency < 1:
+        raise ValueError(
+            'composite_upload_max_concurrency must be at least 1, got %s' %
+            composite_upload_max_concurrency)
     super().__init__(
         blob,
         content_type=content_type,
@@ -714,10 +960,132 @@ class BeamBlobWriter(BlobWriter):
     self.mode = "w"
     self.enable_write_bucket_metric = enable_write_bucket_metric
 
+    self._content_type = content_type
+    self._composite_upload_threshold = composite_upload_threshold
+    self._composite_upload_part_size = composite_upload_part_size
+    self._composite_upload_max_concurrency = composite_upload_max_concurrency
+    # Data not handed to an upload yet. It is only buffered here, rather than
+    # in the resumable upload buffer, while composite uploads are possible.
+    self._composite_buffer = bytearray()
+    self._composite_bytes_written = 0
+    # Temporary objects to compose and delete, and the part uploads.
+    self._composite_parts = []
+    self._composite_temp_blobs = []
+    self._composite_uploads = []
+    self._composite_executor = None
+    self._composite_prefix = '%s.composite-%s' % (blob.name, uuid.uuid4().hex)
+
   def write(self, b):
-    bytesWritten = super().write(b)
+    if self._composite_upload_threshold is None:
+      bytesWritten = super().write(b)
+    else:
+      bytesWritten = self._write_composite(b)
     if self.enable_write_bucket_metric:
       Metrics.counter(
           self.__class__, "GCS_write_bytes_counter_" +
           self._blob.bucket.name).inc(bytesWritten)
     return bytesWritten
+
+  def tell(self):
+    if self._composite_upload_threshold is None:
+      return super().tell()
+    return self._composite_bytes_written
+
+  def close(self):
+    if self._composite_upload_threshold is None or self.closed:
+      super().close()
+    elif not self._composite_parts:
+      # Below the threshold: upload the data as a single object.
+      super().write(bytes(self._composite_buffer))
+      self._composite_buffer = bytearray()
+      super().close()
+    else:
+      try:
+        if self._composite_buffer:
+          self._upload_part(bytes(self._composite_buffer))
+          self._composite_buffer = bytearray()
+        for upload in self._composite_uploads:
+          upload.result()
+        self._compose(self._composite_parts)
+      finally:
+        self._buffer.close()
+        # Let failed closes finish their uploads before deleting the parts.
+        futures.wait(self._composite_uploads)
+        self._delete_temp_blobs()
+        self._composite_executor.shutdown(wait=False)
+
+  def _write_composite(self, b):
+    self._checkClosed()  # Raises ValueError if closed.
+    self._composite_buffer += b
+    self._composite_bytes_written += len(b)
+    if (self._composite_parts or
+        len(self._composite_buffer) > self._composite_upload_threshold):
+      part_size = self._composite_upload_part_size
+      while len(self._composite_buffer) >= part_size:
+        self._upload_part(bytes(self._composite_buffer[:part_size]))
+        del self._composite_buffer[:part_size]
+    return len(b)
+
+  def _upload_part(self, data):
+    if self._composite_executor is None:
+      self._composite_executor = ThreadPoolExecutor(
+          self._composite_upload_max_concurrency)
+    # Bound the memory held by in-flight parts, surfacing upload errors early.
+    max_concurrency = self._composite_upload_max_concurrency
+    if len(self._composite_uploads) >= max_concurrency:
+      self._composite_uploads[-max_concurrency].result()
+    part = self._temp_blob('part-%05d' % len(self._composite_parts))
+    self._composite_parts.append(part)
+    self._composite_uploads.append(
+        self._composite_executor.submit(self._upload_part_data, part, data))
+
+  def _upload_part_data(self, part, data):
+    # Parts have unique names, so retrying a part upload conditional on the
+    # part not existing yet is safe.
+    part.upload_from_string(
+        data,
+        content_type=self._content_type,
+        if_generation_match=0,
+        retry=self._retry)
+
+  def _temp_blob(self, suffix):
+    blob = self._blob.bucket.blob('%s-%s' % (self._composite_prefix, suffix))
+    self._composite_temp_blobs.append(blob)
+    return blob
+
+  def _compose(self, sources):
+    """Composes sources into the blob, in rounds of MAX_COMPOSE_SOURCES."""
+    level = 0
+    while len(sources) > MAX_COMPOSE_SOURCES:
+      groups = [
+          sources[i:i + MAX_COMPOSE_SOURCES]
+          for i in range(0, len(sources), MAX_COMPOSE_SOURCES)
+      ]
+      targets = [
+          self._temp_blob('compose-%d-%05d' % (level, i))
+          for i in range(len(groups))
+      ]
+      list(self._composite_executor.map(self._compose_into, targets, groups))
+      sources = targets
+      level += 1
+    self._compose_into(self._blob, sources)
+
+  def _compose_into(self, target, sources):
+    target.content_type = self._content_type
+    target.compose(sources, retry=self._retry)
+
+  def _delete_temp_blobs(self):
+    def delete(blob):
+      try:
+        blob.delete(retry=self._retry)
+      except NotFound:
+        pass
+      except Exception as e:  # pylint: disable=broad-except
+        _LOGGER.warning(
+            'Unable to delete temporary object gs://%s/%s: %s',
+            blob.bucket.name,
+            blob.name,
+            e)
+
+    list(self._composite_executor.map(delete, self._composite_temp_blobs))
+    self._composite_temp_blobs = []
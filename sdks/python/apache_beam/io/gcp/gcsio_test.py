@@ -118,16 +118,21 @@ class FakeGcsClient(object):
     holder = folder.get_blob(blob.name)
     return holder
 
-  def list_blobs(self, bucket_or_path, prefix=None, **unused_kwargs):
+  def list_blobs(
+      self,
+      bucket_or_path,
+      prefix=None,
+      start_offset=None,
+      end_offset=None,
+      **unused_kwargs):
     bucket = self.get_bucket(bucket_or_path.name)
-    if not prefix:
-      return list(bucket.blobs.values())
-    else:
-      output = []
-      for name in list(bucket.blobs):
-        if name[0:len(prefix)] == prefix:
-          output.append(bucket.blobs[name])
-      return output
+    output = []
+    for name in sorted(bucket.blobs):
+      if ((not prefix or name[0:len(prefix)] == prefix) and
+          (start_offset is None or name >= start_offset) and
+          (end_offset is None or name < end_offset)):
+        output.append(bucket.blobs[name])
+    return output
 
 
 class FakeBucket(object):
@@ -218,16 +223,34 @@ class FakeBlob(object):
     self.content_type = None
 
   def reload(self):
-    pass
+    blob = self.bucket.get_blob(self.name)
+    if blob is not None:
+      self.size = blob.size
 
-  def delete(self):
+  def delete(self, **kwargs):
     self.bucket.delete_blob(self.name)
 
-  def download_as_bytes(self, **kwargs):
+  def upload_from_string(self, data, content_type=None, **kwargs):
+    self.contents = bytes(data)
+    self.size = len(self.contents)
+    self.content_type = content_type
+    self.bucket.add_blob(self)
+
+  def compose(self, sources, **kwargs):
+    contents = []
+    for source in sources:
+      blob = self.bucket.get_blob(source.name)
+      if blob is None:
+        raise NotFound("source blob not found")
+      contents.append(blob.contents)
+    self.upload_from_string(b''.join(contents), self.content_type)
+
+  def download_as_bytes(self, start=None, end=None, **kwargs):
     blob = self.bucket.get_blob(self.name)
     if blob is None:
       raise NotFound("blob not found")
-    return blob.contents
+    # As in GCS, the end of the range is inclusive.
+    return blob.contents[start:None if end is None else end + 1]
 
   def __eq__(self, other):
     return self.bucket.get_blob(self.name) is other.bucket.get_blob(other.name)
@@ -673,7 +696,87 @@ class TestGCSIO(unittest.TestCase):
           blob,
           chunk_size=read_buffer_size,
           enable_read_bucket_metric=False,
-          retry=DEFAULT_RETRY_WITH_THROTTLING_COUNTER)
+          retry=DEFAULT_RETRY_WITH_THROTTLING_COUNTER,
+          read_ahead_depth=0,
+          read_ahead_chunk_size=gcsio.DEFAULT_READ_AHEAD_CHUNK_SIZE)
+
+  def test_read_ahead(self):
+    file_name = 'gs://gcsio-test/read_ahead_file'
+    contents = self._insert_random_file(self.client, file_name, 10240).contents
+
+    with self.gcs.open(file_name,
+                       read_ahead_depth=3,
+                       read_ahead_chunk_size=1000) as f:
+      parts = []
+      part = f.read(700)
+      while part:
+        parts.append(part)
+        part = f.read(700)
+      self.assertEqual(b''.join(parts), contents)
+      self.assertEqual(f.tell(), 10240)
+
+    with self.gcs.open(file_name,
+                       read_ahead_depth=3,
+                       read_ahead_chunk_size=1000) as f:
+      self.assertEqual(f.read(), contents)
+
+  def test_read_ahead_issues_concurrent_ranged_requests(self):
+    file_name = 'gs://gcsio-test/read_ahead_file'
+    contents = self._insert_random_file(self.client, file_name, 10240).contents
+
+    with self.gcs.open(file_name,
+                       read_ahead_depth=3,
+                       read_ahead_chunk_size=1000) as f:
+      f.read(10)
+      # Three requests are in flight ahead of the chunk being read.
+      pending = list(f._read_ahead_pending)
+      self.assertEqual([start for start, _ in pending], [1000, 2000, 3000])
+      for start, future in pending:
+        self.assertEqual(future.result(), contents[start:start + 1000])
+
+  def test_read_ahead_seek(self):
+    file_name = 'gs://gcsio-test/read_ahead_file'
+    contents = self._insert_random_file(self.client, file_name, 10240).contents
+
+    with self.gcs.open(file_name,
+                       read_ahead_depth=2,
+                       read_ahead_chunk_size=1000) as f:
+      self.assertEqual(f.read(10), contents[:10])
+      # Within the prefetched window.
+      self.assertEqual(f.seek(1500), 1500)
+      self.assertEqual(f.read(1000), contents[1500:2500])
+      # Past the prefetched window.
+      f.seek(-100, os.SEEK_END)
+      self.assertEqual(f.read(), contents[-100:])
+      self.assertEqual(f.read(), b'')
+      # Backwards.
+      f.seek(20)
+      f.seek(5, os.SEEK_CUR)
+      self.assertEqual(f.tell(), 25)
+      self.assertEqual(f.read(50), contents[25:75])
+      f.seek(20000)
+      self.assertEqual(f.read(), b'')
+
+  def test_read_ahead_pipeline_options(self):
+    file_name = 'gs://gcsio-test/read_ahead_file'
+    contents = self._insert_random_file(self.client, file_name, 10240).contents
+    gcs = gcsio.GcsIO(
+        self.client, {
+            'gcs_read_ahead_depth': 2, 'gcs_read_ahead_chunk_size': 512
+        })
+
+    with gcs.open(file_name) as f:
+      self.assertEqual(f._read_ahead_depth, 2)
+      self.assertEqual(f._read_ahead_chunk_size, 512)
+      self.assertEqual(f.read(), contents)
+
+  def test_read_ahead_invalid_arguments(self):
+    file_name = 'gs://gcsio-test/read_ahead_file'
+    self._insert_random_file(self.client, file_name, 10)
+    with self.assertRaises(ValueError):
+      self.gcs.open(file_name, read_ahead_depth=-1)
+    with self.assertRaises(ValueError):
+      self.gcs.open(file_name, read_ahead_depth=1, read_ahead_chunk_size=0)
 
   def test_file_write_call(self):
     file_name = 'gs://gcsio-test/write_file'
@@ -681,6 +784,91 @@ class TestGCSIO(unittest.TestCase):
       self.gcs.open(file_name, 'w')
       writer.assert_called()
 
+  def test_composite_upload(self):
+    file_name = 'gs://gcsio-test/composite_file'
+    contents = os.urandom(3550)
+
+    with self.gcs.open(file_name,
+                       'w',
+                       composite_upload_threshold=100,
+                       composite_upload_part_size=100,
+                       composite_upload_max_concurrency=3) as f:
+      for i in range(0, len(contents), 333):
+        f.write(contents[i:i + 333])
+      self.assertEqual(f.tell(), 3550)
+
+    bucket = self.client.get_bucket('gcsio-test')
+    # 36 parts take two rounds of compose requests.
+    self.assertEqual(list(bucket.blobs), ['composite_file'])
+    self.assertEqual(bucket.get_blob('composite_file').contents, contents)
+    self.assertEqual(
+        bucket.get_blob('composite_file').content_type,
+        'application/octet-stream')
+
+  def test_composite_upload_below_threshold(self):
+    file_name = 'gs://gcsio-test/composite_file'
+
+    with mock.patch.object(gcsio.BlobWriter, 'write') as write, \
+        mock.patch.object(gcsio.BlobWriter, 'close') as close:
+      with self.gcs.open(file_name, 'w', composite_upload_threshold=100) as f:
+        f.write(b'a' * 60)
+        f.write(b'b' * 40)
+      write.assert_called_once_with(b'a' * 60 + b'b' * 40)
+      close.assert_called_once()
+    self.assertEqual(list(self.client.get_bucket('gcsio-test').blobs), [])
+
+  def test_composite_upload_failure_deletes_parts(self):
+    file_name = 'gs://gcsio-test/composite_file'
+    upload_from_string = FakeBlob.upload_from_string
+
+    def fail_third_part(blob, data, **kwargs):
+      if blob.name.endswith('part-00002'):
+        raise BadRequest('upload failed')
+      upload_from_string(blob, data, **kwargs)
+
+    with mock.patch.object(FakeBlob,
+                           'upload_from_string',
+                           autospec=True,
+                           side_effect=fail_third_part):
+      with self.assertRaises(BadRequest):
+        with self.gcs.open(file_name,
+                           'w',
+                           composite_upload_threshold=10,
+                           composite_upload_part_size=10,
+                           composite_upload_max_concurrency=2) as f:
+          f.write(os.urandom(55))
+    self.assertEqual(list(self.client.get_bucket('gcsio-test').blobs), [])
+
+  def test_composite_upload_pipeline_options(self):
+    gcs = gcsio.GcsIO(
+        self.client,
+        {
+            'gcs_composite_upload_threshold': 1000,
+            'gcs_composite_upload_part_size': 512,
+            'gcs_composite_upload_max_concurrency': 4
+        })
+    writer = gcs.open('gs://gcsio-test/composite_file', 'w')
+    self.assertEqual(writer._composite_upload_threshold, 1000)
+    self.assertEqual(writer._composite_upload_part_size, 512)
+    self.assertEqual(writer._composite_upload_max_concurrency, 4)
+
+  def test_composite_upload_invalid_arguments(self):
+    file_name = 'gs://gcsio-test/composite_file'
+    with self.assertRaises(ValueError):
+      self.gcs.open(file_name, 'w', composite_upload_threshold=-1)
+    with self.assertRaises(ValueError):
+      self.gcs.open(
+          file_name,
+          'w',
+          composite_upload_threshold=0,
+          composite_upload_part_size=0)
+    with self.assertRaises(ValueError):
+      self.gcs.open(
+          file_name,
+          'w',
+          composite_upload_threshold=0,
+          composite_upload_max_concurrency=0)
+
   def test_list_prefix(self):
     bucket_name = 'gcsio-test'
     objects = [
@@ -717,6 +905,17 @@ class TestGCSIO(unittest.TestCase):
           set(self.gcs.list_prefix(file_pattern).items()),
           set(expected_file_names))
 
+  def test_list_files_range(self):
+    bucket_name = 'gcsio-test'
+    for object_name in ['dir/a', 'dir/b', 'dir/c', 'dir/d', 'other']:
+      self._insert_random_file(
+          self.client, 'gs://%s/%s' % (bucket_name, object_name), 1)
+    self.assertEqual([
+        path for path, _ in self.gcs.list_files(
+            'gs://gcsio-test/dir/', start_path='gs://gcsio-test/dir/b',
+            end_path='gs://gcsio-test/dir/d')
+    ], ['gs://gcsio-test/dir/b', 'gs://gcsio-test/dir/c'])
+
   def test_downloader_fail_non_existent_object(self):
     file_name = 'gs://gcsio-metrics-test/dummy_mode_file'
     with self.assertRaises(NotFound):
@@ -323,32 +323,43 @@ class HadoopFileSystem(FileSystem):
               self._join('', path, file),
               self._join('', destination, rel_path, file))
 
-    exceptions = {}
-    for source, destination in zip(source_file_names, destination_file_names):
-      try:
-        _, rel_source = self._parse_url(source)
-        _, rel_destination = self._parse_url(destination)
-        _copy_path(rel_source, rel_destination)
-      except Exception as e:  # pylint: disable=broad-except
-        exceptions[(source, destination)] = e
-
+    def _copy_paths(pairs):
+      exceptions = []
+      for source, destination in pairs:
+        try:
+          _, rel_source = self._parse_url(source)
+          _, rel_destination = self._parse_url(destination)
+          _copy_path(rel_source, rel_destination)
+        except Exception as e:  # pylint: disable=broad-except
+          exceptions.append(((source, destination), e))
+      return exceptions
+
+    exceptions = dict(
+        self._run_in_chunks(
+            _copy_paths, list(zip(source_file_names, destination_file_names))))
     if exceptions:
       raise BeamIOError('Copy operation failed', exceptions)
 
   def rename(self, source_file_names, destination_file_names):
-    exceptions = {}
-    for source, destination in zip(source_file_names, destination_file_names):
-      try:
-        _, rel_source = self._parse_url(source)
-        _, rel_destination = self._parse_url(destination)
+    def _rename_files(pairs):
+      exceptions = []
+      for source, destination in pairs:
         try:
-          self._hdfs_client.rename(rel_source, rel_destination)
-        except hdfs.HdfsError as e:
-          raise BeamIOError(
-              'libhdfs error in renaming %s to %s' % (source, destination), e)
-      except Exception as e:  # pylint: disable=broad-except
-        exceptions[(source, destination)] = e
-
+          _, rel_source = self._parse_url(source)
+          _, rel_destination = self._parse_url(destination)
+          try:
+            self._hdfs_client.rename(rel_source, rel_destination)
+          except hdfs.HdfsError as e:
+            raise BeamIOError(
+                'libhdfs error in renaming %s to %s' % (source, destination), e)
+        except Exception as e:  # pylint: disable=broad-except
+          exceptions.append(((source, destination), e))
+      return exceptions
+
+    exceptions = dict(
+        self._run_in_chunks(
+            _rename_files, list(zip(source_file_names,
+                                    destination_file_names))))
     if exceptions:
       raise BeamIOError('Rename operation failed', exceptions)
 
@@ -433,13 +444,16 @@ class HadoopFileSystem(FileSystem):
         url, status[_FILE_STATUS_LENGTH], status[_FILE_STATUS_UPDATED] / 1000.0)
 
   def delete(self, urls):
-    exceptions = {}
-    for url in urls:
-      try:
-        _, path = self._parse_url(url)
-        self._hdfs_client.delete(path, recursive=True)
-      except Exception as e:  # pylint: disable=broad-except
-        exceptions[url] = e
+    def _delete_urls(urls_to_delete):
+      exceptions = []
+      for url in urls_to_delete:
+        try:
+          _, path = self._parse_url(url)
+          self._hdfs_client.delete(path, recursive=True)
+        except Exception as e:  # pylint: disable=broad-except
+          exceptions.append((url, e))
+      return exceptions
 
+    exceptions = dict(self._run_in_chunks(_delete_urls, list(urls)))
     if exceptions:
       raise BeamIOError("Delete operation failed", exceptions)
@@ -209,13 +209,18 @@ class LocalFileSystem(FileSystem):
       except OSError as err:
         raise IOError(err)
 
-    exceptions = {}
-    for source, destination in zip(source_file_names, destination_file_names):
-      try:
-        _copy_path(source, destination)
-      except Exception as e:  # pylint: disable=broad-except
-        exceptions[(source, destination)] = e
-
+    def _copy_paths(pairs):
+      exceptions = []
+      for source, destination in pairs:
+        try:
+          _copy_path(source, destination)
+        except Exception as e:  # pylint: disable=broad-except
+          exceptions.append(((source, destination), e))
+      return exceptions
+
+    exceptions = dict(
+        self._run_in_chunks(
+            _copy_paths, list(zip(source_file_names, destination_file_names))))
     if exceptions:
       raise BeamIOError("Copy operation failed", exceptions)
 
@@ -242,13 +247,19 @@ class LocalFileSystem(FileSystem):
       except OSError as err:
         raise IOError(err)
 
-    exceptions = {}
-    for source, destination in zip(source_file_names, destination_file_names):
-      try:
-        _rename_file(source, destination)
-      except Exception as e:  # pylint: disable=broad-except
-        exceptions[(source, destination)] = e
-
+    def _rename_files(pairs):
+      exceptions = []
+      for source, destination in pairs:
+        try:
+          _rename_file(source, destination)
+        except Exception as e:  # pylint: disable=broad-except
+          exceptions.append(((source, destination), e))
+      return exceptions
+
+    exceptions = dict(
+        self._run_in_chunks(
+            _rename_files, list(zip(source_file_names,
+                                    destination_file_names))))
     if exceptions:
       raise BeamIOError("Rename operation failed", exceptions)
 
@@ -348,12 +359,16 @@ class LocalFileSystem(FileSystem):
 
     exceptions = {}
 
-    def try_delete(path):
-      try:
-        _delete_path(path)
-      except Exception as e:  # pylint: disable=broad-except
-        exceptions[path] = e
+    def _delete_paths(paths_to_delete):
+      exceptions = []
+      for path in paths_to_delete:
+        try:
+          _delete_path(path)
+        except Exception as e:  # pylint: disable=broad-except
+          exceptions.append((path, e))
+      return exceptions
 
+    paths_to_delete = []
     for match_result in self.match(paths):
       metadata_list = match_result.metadata_list
 
@@ -362,8 +377,9 @@ class LocalFileSystem(FileSystem):
           IOError('No files found to delete under: %s' % match_result.pattern)
 
       for metadata in match_result.metadata_list:
-        try_delete(metadata.path)
+        paths_to_delete.append(metadata.path)
 
+    exceptions.update(self._run_in_chunks(_delete_paths, paths_to_delete))
     if exceptions:
       raise BeamIOError("Delete operation failed", exceptions)
 
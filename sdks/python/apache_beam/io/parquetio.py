@@ -22,7 +22,9 @@ Provides two read ``PTransform``\\s, ``ReadFromParquet`` and
 Each record of this ``PCollection`` will contain a single record read from
 a Parquet file. Records that are of simple types will be mapped into
 corresponding Python types. The actual parquet file operations are done by
-pyarrow. Source splitting is supported at row group granularity.
+pyarrow. Source splitting is supported at row group granularity: files are split
+between the row groups listed in their footers, and row groups that cannot match
+a filter expression are skipped using their statistics.
 
 Additionally, this module provides a write ``PTransform`` ``WriteToParquet``
 that can be used to write a given ``PCollection`` of Python objects to a
@@ -30,11 +32,13 @@ Parquet file.
 """
 # pytype: skip-file
 
+from bisect import bisect_left
 from functools import partial
 from typing import Iterator
 
 from packaging import version
 
+from apache_beam.internal import util
 from apache_beam.io import filebasedsink
 from apache_beam.io import filebasedsource
 from apache_beam.io.filesystem import CompressionTypes
@@ -47,15 +51,18 @@ from apache_beam.transforms import DoFn
 from apache_beam.transforms import ParDo
 from apache_beam.transforms import PTransform
 from apache_beam.transforms import window
+from apache_beam.transforms.display import DisplayDataItem
 from apache_beam.typehints import schemas
 
 try:
   import pyarrow as pa
+  import pyarrow.dataset as ds
   import pyarrow.parquet as pq
   # pylint: disable=ungrouped-imports
   from apache_beam.typehints import arrow_type_compatibility
 except ImportError:
   pa = None
+  ds = None
   pq = None
   ARROW_MAJOR_VERSION = None
   arrow_type_compatibility = None
@@ -165,6 +172,18 @@ class _ArrowTableToBeamRows(DoFn):
     return self._beam_type
 
 
+class _ArrowTableToBeamRowBatches(DoFn):
+  def __init__(self, beam_type):
+    self._beam_type = beam_type
+
+  @DoFn.yields_batches
+  def process(self, element) -> Iterator[pa.RecordBatch]:
+    yield from element.to_batches()
+
+  def infer_output_type(self, input_type):
+    return self._beam_type
+
+
 class _BeamRowsToArrowTable(DoFn):
   @DoFn.yields_elements
   def process_batch(self, element: pa.Table) -> Iterator[pa.Table]:
@@ -176,7 +195,12 @@ class ReadFromParquetBatched(PTransform):
      Parquet files as a `PCollection` of `pyarrow.Table`. This `PTransform` is
      currently experimental. No backward-compatibility guarantees."""
   def __init__(
-      self, file_pattern=None, min_bundle_size=0, validate=True, columns=None):
+      self,
+      file_pattern=None,
+      min_bundle_size=0,
+      validate=True,
+      columns=None,
+      filters=None):
     """ Initializes :class:`~ReadFromParquetBatched`
 
     An alternative to :class:`~ReadFromParquet` that yields each row group from
@@ -213,6 +237,10 @@ class ReadFromParquetBatched(PTransform):
       columns (List[str]): list of columns that will be read from files.
         A column name may be a prefix of a nested field, e.g. 'a' will select
         'a.b', 'a.c', and 'a.d.e'
+      filters (pyarrow.compute.Expression): a filter expression, e.g.
+        ``pyarrow.compute.field('a') > 5``. Row groups whose statistics show
+        that none of their rows match are not read, and only matching rows are
+        returned.
     """
 
     super().__init__()
@@ -221,6 +249,7 @@ class ReadFromParquetBatched(PTransform):
         min_bundle_size,
         validate=validate,
         columns=columns,
+        filters=filters,
     )
 
   def expand(self, pvalue):
@@ -238,7 +267,9 @@ class ReadFromParquet(PTransform):
       min_bundle_size=0,
       validate=True,
       columns=None,
-      as_rows=False):
+      as_rows=False,
+      filters=None,
+      as_batches=False):
     """Initializes :class:`ReadFromParquet`.
 
     Uses source ``_ParquetSource`` to read a set of Parquet files defined by
@@ -285,6 +316,14 @@ class ReadFromParquet(PTransform):
         'a.b', 'a.c', and 'a.d.e'
       as_rows (bool): whether to output a schema'd PCollection of Beam rows
         rather than Python dictionaries.
+      filters (pyarrow.compute.Expression): a filter expression, e.g.
+        ``pyarrow.compute.field('a') > 5``. Row groups whose statistics show
+        that none of their rows match are not read, and only matching rows are
+        returned.
+      as_batches (bool): like ``as_rows``, but the rows are passed on as
+        ``pyarrow.RecordBatch`` batches, so that batched DoFns whose
+        ``process_batch`` accepts a ``pyarrow.RecordBatch`` receive the data
+        read from each row group without converting it to Python objects.
     """
     super().__init__()
     self._source = _ParquetSource(
@@ -292,8 +331,10 @@ class ReadFromParquet(PTransform):
         min_bundle_size,
         validate=validate,
         columns=columns,
+        filters=filters,
     )
-    if as_rows:
+    self._as_batches = as_batches
+    if as_rows or as_batches:
       if columns is None:
         filter_schema = lambda schema: schema
       else:
@@ -312,9 +353,11 @@ class ReadFromParquet(PTransform):
     arrow_batches = pvalue | Read(self._source)
     if self._schema is None:
       return arrow_batches | ParDo(_ArrowTableToRowDictionaries())
+    beam_type = schemas.named_tuple_from_schema(self._schema)
+    if self._as_batches:
+      return arrow_batches | ParDo(_ArrowTableToBeamRowBatches(beam_type))
     else:
-      return arrow_batches | ParDo(
-          _ArrowTableToBeamRows(schemas.named_tuple_from_schema(self._schema)))
+      return arrow_batches | ParDo(_ArrowTableToBeamRows(beam_type))
 
   def display_data(self):
     return {'source_dd': self._source}
@@ -337,7 +380,8 @@ class ReadAllFromParquetBatched(PTransform):
       desired_bundle_size=DEFAULT_DESIRED_BUNDLE_SIZE,
       columns=None,
       with_filename=False,
-      label='ReadAllFiles'):
+      label='ReadAllFiles',
+      filters=None):
     """Initializes ``ReadAllFromParquet``.
 
     Args:
@@ -351,10 +395,16 @@ class ReadAllFromParquetBatched(PTransform):
       with_filename: If True, returns a Key Value with the key being the file
         name and the value being the actual data. If False, it only returns
         the data.
+      filters: a ``pyarrow.compute.Expression`` selecting the rows to read.
+                       Row groups whose statistics show that none of their
+                       rows match are not read.
     """
     super().__init__()
     source_from_file = partial(
-        _ParquetSource, min_bundle_size=min_bundle_size, columns=columns)
+        _ParquetSource,
+        min_bundle_size=min_bundle_size,
+        columns=columns,
+        filters=filters)
     self._read_all_files = filebasedsource.ReadAllFiles(
         True,
         CompressionTypes.UNCOMPRESSED,
@@ -380,6 +430,18 @@ class ReadAllFromParquet(PTransform):
         _ArrowTableToRowDictionaries(), with_filename=self._with_filename)
 
 
+_ROW_INDEX_COLUMN = '__beam_row_index'
+
+# Number of seconds for which the copies of a _ParquetSource in a process reuse
+# the footers they read, both to split the files and to read them.
+FOOTER_CACHE_TTL_SECS = 300
+
+_footer_cache = filebasedsource._ExpiringCache()
+
+# Maximum number of footers read concurrently when splitting a source.
+_MAX_FOOTER_READ_THREADS = 32
+
+
 class _ParquetUtils(object):
   @staticmethod
   def find_first_row_group_index(pf, start_offset):
@@ -391,8 +453,11 @@ class _ParquetUtils(object):
 
   @staticmethod
   def get_offset(pf, row_group_index):
-    first_column_metadata =\
-      pf.metadata.row_group(row_group_index).column(0)
+    return _ParquetUtils.get_row_group_offset(pf.metadata, row_group_index)
+
+  @staticmethod
+  def get_row_group_offset(metadata, row_group_index):
+    first_column_metadata = metadata.row_group(row_group_index).column(0)
     if first_column_metadata.has_dictionary_page:
       return first_column_metadata.dictionary_page_offset
     else:
@@ -402,20 +467,92 @@ class _ParquetUtils(object):
   def get_number_of_row_groups(pf):
     return pf.metadata.num_row_groups
 
+  @staticmethod
+  def get_matching_row_groups(f, filters):
+    # Row group statistics are used to drop the row groups for which the
+    # filter can never be true.
+    fragment = ds.ParquetFileFormat().make_fragment(f)
+    return set(
+        row_group.id
+        for row_group_fragment in fragment.split_by_row_group(filters)
+        for row_group in row_group_fragment.row_groups)
+
+  @staticmethod
+  def read_row_group(pf, row_group_index, columns, filters):
+    table = pf.read_row_group(row_group_index, columns)
+    if filters is None:
+      return table
+    try:
+      return ds.dataset(table).to_table(filter=filters)
+    except pa.ArrowInvalid:
+      # The filter refers to columns that were not selected, so evaluate it
+      # against the whole row group and take the matching rows.
+      row_group = pf.read_row_group(row_group_index)
+      row_group = row_group.append_column(
+          _ROW_INDEX_COLUMN, pa.array(range(row_group.num_rows), pa.int64()))
+      matches = ds.dataset(row_group).to_table(
+          columns=[_ROW_INDEX_COLUMN], filter=filters)
+      return table.take(matches.column(_ROW_INDEX_COLUMN))
+
 
 class _ParquetSource(filebasedsource.FileBasedSource):
   """A source for reading Parquet files.
   """
   def __init__(
-      self, file_pattern, min_bundle_size=0, validate=False, columns=None):
+      self,
+      file_pattern,
+      min_bundle_size=0,
+      validate=False,
+      columns=None,
+      filters=None):
     super().__init__(
         file_pattern=file_pattern,
         min_bundle_size=min_bundle_size,
         validate=validate)
     self._columns = columns
+    self._filters = filters
+
+  def display_data(self):
+    res = super().display_data()
+    if self._filters is not None:
+      res['filters'] = DisplayDataItem(str(self._filters), label='Filters')
+    return res
+
+  def _read_footer(self, file_name, f):
+    key = (self._cache_id, file_name)
+    metadata = _footer_cache.get(key)
+    if metadata is None:
+      metadata = pq.read_metadata(f)
+      _footer_cache.put(key, metadata, FOOTER_CACHE_TTL_SECS)
+    return metadata
+
+  def split(
+      self, desired_bundle_size=None, start_position=None, stop_position=None):
+    # Every file is split at its row groups, which are listed in its footer.
+    # Read the footers concurrently up front rather than one at a time as
+    # each file is split; the file sources then find them in the cache.
+    file_names = [
+        source._file_name for source in self._get_concat_source().sources
+    ]
+    if len(file_names) > 1:
+      util.run_using_threadpool(
+          self._block_offsets, file_names, _MAX_FOOTER_READ_THREADS)
+    return super().split(
+        desired_bundle_size=desired_bundle_size,
+        start_position=start_position,
+        stop_position=stop_position)
+
+  def _block_offsets(self, file_name):
+    with self.open_file(file_name) as f:
+      metadata = self._read_footer(file_name, f)
+    return [
+        _ParquetUtils.get_row_group_offset(metadata, i)
+        for i in range(metadata.num_row_groups)
+    ]
 
   def read_records(self, file_name, range_tracker):
     next_block_start = -1
+    row_group_offsets = None
 
     def split_points_unclaimed(stop_position):
       if next_block_start >= stop_position:
@@ -423,7 +560,12 @@ class _ParquetSource(filebasedsource.FileBasedSource):
         # there will not be split points to be claimed for the range ending at
         # suggested stop position.
         return 0
-      return RangeTracker.SPLIT_POINTS_UNKNOWN
+      if row_group_offsets is None:
+        return RangeTracker.SPLIT_POINTS_UNKNOWN
+      # Every row group left before the stop position is a split point.
+      return (
+          bisect_left(row_group_offsets, stop_position) -
+          bisect_left(row_group_offsets, next_block_start))
 
     range_tracker.set_split_points_unclaimed_callback(split_points_unclaimed)
 
@@ -432,7 +574,7 @@ class _ParquetSource(filebasedsource.FileBasedSource):
       start_offset = 0
 
     with self.open_file(file_name) as f:
-      pf = pq.ParquetFile(f)
+      pf = pq.ParquetFile(f, metadata=self._read_footer(file_name, f))
 
       # find the first dictionary page (or data page if there's no dictionary
       # page available) offset after the given start_offset. This offset is also
@@ -445,9 +587,17 @@ class _ParquetSource(filebasedsource.FileBasedSource):
       else:
         next_block_start = range_tracker.stop_position()
       number_of_row_groups = _ParquetUtils.get_number_of_row_groups(pf)
+      row_group_offsets = [
+          _ParquetUtils.get_offset(pf, i) for i in range(number_of_row_groups)
+      ]
+      if self._filters is not None:
+        matching_row_groups = _ParquetUtils.get_matching_row_groups(
+            f, self._filters)
+      else:
+        matching_row_groups = None
 
       while range_tracker.try_claim(next_block_start):
-        table = pf.read_row_group(index, self._columns)
+        row_group_index = index
 
         if index + 1 < number_of_row_groups:
           index = index + 1
@@ -455,7 +605,13 @@ class _ParquetSource(filebasedsource.FileBasedSource):
         else:
           next_block_start = range_tracker.stop_position()
 
-        yield table
+        if matching_row_groups is None:
+          yield pf.read_row_group(row_group_index, self._columns)
+        elif row_group_index in matching_row_groups:
+          table = _ParquetUtils.read_row_group(
+              pf, row_group_index, self._columns, self._filters)
+          if table.num_rows:
+            yield table
 
 
 _create_parquet_source = _ParquetSource
@@ -21,10 +21,13 @@ import logging
 import os
 import shutil
 import tempfile
+import threading
 import unittest
 from tempfile import TemporaryDirectory
+from typing import Iterator
 
 import hamcrest as hc
+import mock
 import pandas
 import pytest
 from parameterized import param
@@ -44,6 +47,7 @@ from apache_beam.io.parquetio import WriteToParquet
 from apache_beam.io.parquetio import WriteToParquetBatched
 from apache_beam.io.parquetio import _create_parquet_sink
 from apache_beam.io.parquetio import _create_parquet_source
+from apache_beam.io.parquetio import _ParquetUtils
 from apache_beam.testing.test_pipeline import TestPipeline
 from apache_beam.testing.util import assert_that
 from apache_beam.testing.util import equal_to
@@ -52,9 +56,11 @@ from apache_beam.transforms.display_test import DisplayDataItemMatcher
 
 try:
   import pyarrow as pa
+  import pyarrow.compute as pc
   import pyarrow.parquet as pq
 except ImportError:
   pa = None
+  pc = None
   pl = None
   pq = None
 
@@ -237,7 +243,8 @@ class TestParquet(unittest.TestCase):
     self._run_parquet_test(file_name, None, None, False, expected_result)
 
   def test_read_with_splitting(self):
-    file_name = self._write_data()
+    # Files are only split between row groups.
+    file_name = self._write_data(row_group_size=2)
     expected_result = [self._records_as_arrow()]
     self._run_parquet_test(file_name, None, 100, True, expected_result)
 
@@ -256,6 +263,16 @@ class TestParquet(unittest.TestCase):
     ]
     hc.assert_that(dd.items, hc.contains_inanyorder(*expected_items))
 
+  def test_source_display_data_with_filters(self):
+    source = _create_parquet_source(
+        'some_parquet_source',
+        validate=False,
+        filters=pc.field('favorite_number') > 2)
+    dd = DisplayData.create_from(source)
+    hc.assert_that(
+        dd.items,
+        hc.has_item(DisplayDataItemMatcher('filters', '(favorite_number > 2)')))
+
   def test_read_display_data(self):
     file_name = 'some_parquet_source'
     read = \
@@ -498,6 +515,63 @@ class TestParquet(unittest.TestCase):
     source_test_utils.assert_split_at_fraction_exhaustive(
         splits[0].source, splits[0].start_position, splits[0].stop_position)
 
+  def test_split_at_row_groups(self):
+    file_name = self._write_data(count=12000, row_group_size=1000)
+    pf = pq.ParquetFile(file_name)
+    offsets = [
+        _ParquetUtils.get_offset(pf, i) for i in range(pf.num_row_groups)
+    ]
+    source = _create_parquet_source(file_name)
+
+    splits = list(source.split(desired_bundle_size=1))
+    self.assertEqual([0] + offsets[1:],
+                     [split.start_position for split in splits])
+    self.assertEqual(
+        offsets[1:] + [os.path.getsize(file_name)],
+        [split.stop_position for split in splits])
+    for split in splits:
+      self.assertEqual(
+          [1000],
+          [
+              table.num_rows
+              for table in source_test_utils.read_from_source(split.source)
+          ])
+
+    splits = list(source.split(desired_bundle_size=offsets[3] - offsets[0] - 1))
+    self.assertEqual([0] + offsets[3::3],
+                     [split.start_position for split in splits])
+
+  def test_footer_read_once(self):
+    file_name = self._write_data(count=1200, row_group_size=100)
+    source = _create_parquet_source(file_name)
+    with mock.patch.object(pq, 'read_metadata',
+                           wraps=pq.read_metadata) as read_metadata:
+      tables = []
+      for split in source.split(desired_bundle_size=1):
+        tables.extend(source_test_utils.read_from_source(split.source))
+      self.assertEqual(1, read_metadata.call_count)
+    self.assertEqual(12, len(tables))
+
+  def test_footers_read_concurrently(self):
+    pattern = self._write_pattern(4)
+    source = _create_parquet_source(pattern)
+    threads = set()
+    original_read_metadata = pq.read_metadata
+
+    def read_metadata(f):
+      threads.add(threading.current_thread())
+      return original_read_metadata(f)
+
+    with mock.patch.object(pq, 'read_metadata',
+                           side_effect=read_metadata) as mock_read_metadata:
+      tables = []
+      for split in source.split(desired_bundle_size=1):
+        tables.extend(source_test_utils.read_from_source(split.source))
+      self.assertEqual(4, mock_read_metadata.call_count)
+    self.assertNotIn(threading.current_thread(), threads)
+    self.assertEqual(
+        4 * len(self.RECORDS), sum(table.num_rows for table in tables))
+
   def test_min_bundle_size(self):
     file_name = self._write_data(count=120, row_group_size=20)
 
@@ -542,17 +616,13 @@ class TestParquet(unittest.TestCase):
       split_points_report.append(range_tracker.split_points())
 
     # There are a total of four row groups. Each row group has 3000 records.
-
-    # When reading records of the first group, range_tracker.split_points()
-    # should return (0, iobase.RangeTracker.SPLIT_POINTS_UNKNOWN)
-    self.assertEqual(
-        split_points_report,
-        [
-            (0, RangeTracker.SPLIT_POINTS_UNKNOWN),
-            (1, RangeTracker.SPLIT_POINTS_UNKNOWN),
-            (2, RangeTracker.SPLIT_POINTS_UNKNOWN),
-            (3, 1),
-        ])
+    # The number of remaining split points is known from the footer.
+    self.assertEqual(split_points_report, [
+        (0, 4),
+        (1, 3),
+        (2, 2),
+        (3, 1),
+    ])
 
   def test_selective_columns(self):
     file_name = self._write_data()
@@ -566,6 +636,67 @@ class TestParquet(unittest.TestCase):
     ]
     self._run_parquet_test(file_name, ['name'], None, False, expected_result)
 
+  def _write_numbered_rows(self, num_rows, row_group_size):
+    path = os.path.join(self.temp_dir, 'numbered.parquet')
+    table = pa.table({
+        'x': pa.array(range(num_rows), pa.int64()),
+        'y': pa.array([str(i) for i in range(num_rows)]),
+    })
+    pq.write_table(table, path, row_group_size=row_group_size)
+    return path
+
+  def test_read_with_filters(self):
+    path = self._write_numbered_rows(100, row_group_size=10)
+    source = _create_parquet_source(
+        path, filters=(pc.field('x') >= 35) & (pc.field('x') < 52))
+    with mock.patch.object(_ParquetUtils,
+                           'read_row_group',
+                           wraps=_ParquetUtils.read_row_group) as read:
+      tables = source_test_utils.read_from_source(source, None, None)
+      # Only the row groups whose statistics may match are read.
+      self.assertEqual([3, 4, 5], [c.args[1] for c in read.call_args_list])
+    self.assertEqual(
+        list(range(35, 52)), pa.concat_tables(tables).column('x').to_pylist())
+
+  def test_read_with_filters_on_unselected_column(self):
+    path = self._write_numbered_rows(100, row_group_size=10)
+    source = _create_parquet_source(
+        path, columns=['y'], filters=pc.field('x').isin(range(0, 100, 7)))
+    tables = source_test_utils.read_from_source(source, None, None)
+    self.assertEqual(['y'], tables[0].column_names)
+    self.assertEqual([str(i) for i in range(0, 100, 7)],
+                     pa.concat_tables(tables).column('y').to_pylist())
+
+  def test_read_with_filters_and_splitting(self):
+    path = self._write_numbered_rows(1000, row_group_size=50)
+    source = _create_parquet_source(
+        path, filters=pc.field('x').isin(range(1, 1000, 3)))
+    sources_info = [(split.source, split.start_position, split.stop_position)
+                    for split in source.split(desired_bundle_size=2000)]
+    self.assertGreater(len(sources_info), 1)
+    source_test_utils.assert_sources_equal_reference_source(
+        (source, None, None), sources_info)
+
+  def test_read_as_batches(self):
+    path = self._write_numbered_rows(100, row_group_size=10)
+
+    class BatchTypeFn(beam.DoFn):
+      @beam.DoFn.yields_elements
+      def process_batch(self, batch: pa.RecordBatch) -> Iterator[str]:
+        yield type(batch).__name__
+
+    with TestPipeline() as p:
+      rows = p | ReadFromParquet(
+          path, as_batches=True, filters=pc.field('x') < 25)
+      assert_that(
+          rows | Map(lambda row: (row.x, row.y)),
+          equal_to([(i, str(i)) for i in range(25)]),
+          label='CheckRows')
+      assert_that(
+          rows | beam.ParDo(BatchTypeFn()),
+          equal_to(['RecordBatch'] * 3),
+          label='CheckBatches')
+
   def test_sink_transform_multiple_row_group(self):
     with TemporaryDirectory() as tmp_dirname:
       path = os.path.join(tmp_dirname + "tmp_filename")
@@ -23,7 +23,10 @@ import enum
 import json
 import logging
 import sys
+import threading
 import time
+import uuid
+from collections import OrderedDict
 from datetime import timedelta
 from typing import Any
 from typing import Dict
@@ -44,7 +47,9 @@ from apache_beam.coders import coders
 from apache_beam.io.components.adaptive_throttler import AdaptiveThrottler
 from apache_beam.metrics import Metrics
 from apache_beam.transforms.util import BatchElements
+from apache_beam.utils import multi_process_shared
 from apache_beam.utils import retry
+from apache_beam.utils import shared
 
 RequestT = TypeVar('RequestT')
 ResponseT = TypeVar('ResponseT')
@@ -57,6 +62,14 @@ DEFAULT_TIMEOUT_SECS = 30
 # for cache record.
 DEFAULT_CACHE_ENTRY_TTL_SEC = 24 * 60 * 60
 
+# DEFAULT_REDIS_MAX_BATCH_SIZE represents the maximum number of records read
+# from or written to Redis in one round trip.
+DEFAULT_REDIS_MAX_BATCH_SIZE = 100
+
+# DEFAULT_IN_MEMORY_CACHE_MAX_ENTRIES represents the maximum number of
+# records held by an in-memory cache on each worker process.
+DEFAULT_IN_MEMORY_CACHE_MAX_ENTRIES = 10000
+
 MSEC_TO_SEC = 1000
 
 _LOGGER = logging.getLogger(__name__)
@@ -65,8 +78,10 @@ __all__ = [
     'RequestResponseIO',
     'ExponentialBackOffRepeater',
     'DefaultThrottler',
+    'TokenBucketThrottler',
     'NoOpsRepeater',
     'RedisCache',
+    'InMemoryCache',
 ]
 
 
@@ -112,6 +127,8 @@ class _MetricsCollector:
     self.sleeper_counter = Metrics.counter(namespace, 'sleeper_counter')
     self.should_backoff_counter = Metrics.counter(
         namespace, 'should_backoff_counter')
+    self.coalesced_requests = Metrics.counter(namespace, 'coalesced_requests')
+    self.rate_limited_msecs = Metrics.counter(namespace, 'rate_limited_msecs')
 
 
 class Caller(contextlib.AbstractContextManager,
@@ -189,6 +206,9 @@ def _execute_request(
     request: RequestT,
     timeout: float,
     metrics_collector: Optional[_MetricsCollector] = None) -> ResponseT:
+  if isinstance(caller, _TokenBucketCaller):
+    # Time spent waiting for a token doesn't count towards the timeout.
+    caller.wait_for_token()
   with concurrent.futures.ThreadPoolExecutor() as executor:
     future = executor.submit(caller, request)
     try:
@@ -285,6 +305,110 @@ class DefaultThrottler(PreCallThrottler):
     self.delay_secs = delay_secs
 
 
+class _AIMDTokenBucket:
+  """A token bucket whose rate is adjusted by additive increase and
+  multiplicative decrease (AIMD) based on the outcome of requests."""
+  def __init__(
+      self,
+      qps: float,
+      burst: float,
+      min_qps: float,
+      additive_increase_qps: float,
+      multiplicative_decrease: float,
+      clock=time.monotonic):
+    self._max_qps = qps
+    self._min_qps = min_qps
+    self._burst = burst
+    self._additive_increase_qps = additive_increase_qps
+    self._multiplicative_decrease = multiplicative_decrease
+    self._clock = clock
+    self._lock = threading.Lock()
+    self._qps = qps
+    self._tokens = burst
+    self._last_refill = clock()
+
+  def _refill(self):
+    now = self._clock()
+    self._tokens = min(
+        self._burst, self._tokens + (now - self._last_refill) * self._qps)
+    self._last_refill = now
+
+  def try_acquire(self) -> float:
+    """Takes a token if one is available and returns 0. Otherwise, returns the
+    number of seconds until the next token is available."""
+    with self._lock:
+      self._refill()
+      if self._tokens >= 1:
+        self._tokens -= 1
+        return 0
+      return (1 - self._tokens) / self._qps
+
+  def on_success(self):
+    # Increase the rate by additive_increase_qps per second of requests.
+    with self._lock:
+      self._refill()
+      self._qps = min(
+          self._max_qps, self._qps + self._additive_increase_qps / self._qps)
+
+  def on_quota_exceeded(self):
+    with self._lock:
+      self._refill()
+      self._qps = max(self._min_qps, self._qps * self._multiplicative_decrease)
+      self._tokens = min(self._tokens, 0)
+
+  def qps(self) -> float:
+    return self._qps
+
+
+class TokenBucketThrottler(PreCallThrottler):
+  """Throttler that limits the rate of requests sent by all threads and
+  processes of a worker with a token bucket, so that requests are spread out
+  before the API rejects them.
+
+  The rate is reduced multiplicatively every time the API signals that its
+  quota is exceeded, with a `UserCodeQuotaException` or `TooManyRequests`,
+  and is increased additively again as requests succeed, up to `qps`.
+
+  Args:
+    qps (float): the maximum number of requests per second per worker.
+    burst (int): (Optional) the maximum number of requests that can be sent at
+      once after a period of inactivity. Defaults to one second of requests.
+    min_qps (float): (Optional) the lowest rate that quota errors can reduce
+      the rate to. Defaults to 1% of `qps`.
+    additive_increase_qps (float): the rate is increased by this many requests
+      per second for every second of successful requests.
+    multiplicative_decrease (float): the factor the rate is multiplied with
+      when the quota is exceeded.
+  """
+  def __init__(
+      self,
+      qps: float,
+      burst: Optional[int] = None,
+      min_qps: Optional[float] = None,
+      additive_increase_qps: float = 1,
+      multiplicative_decrease: float = 0.5):
+    if qps <= 0:
+      raise ValueError(f'qps must be positive, got {qps}')
+    if not 0 < multiplicative_decrease < 1:
+      raise ValueError(
+          'multiplicative_decrease must be between 0 and 1, got '
+          f'{multiplicative_decrease}')
+    self.qps = qps
+    self.burst = burst if burst else max(1, qps)
+    self.min_qps = min_qps if min_qps else qps / 100
+    self.additive_increase_qps = additive_increase_qps
+    self.multiplicative_decrease = multiplicative_decrease
+    self._tag = f'TokenBucketThrottler_{uuid.uuid4().hex}'
+
+  def _acquire_token_bucket(self) -> _AIMDTokenBucket:
+    return multi_process_shared.MultiProcessShared(
+        lambda: _AIMDTokenBucket(
+            self.qps, self.burst, self.min_qps, self.additive_increase_qps, self
+            .multiplicative_decrease),
+        tag=self._tag,
+        always_proxy=True).acquire()
+
+
 class _FilterCacheReadFn(beam.DoFn):
   """A `DoFn` that partitions cache reads.
 
@@ -313,6 +437,8 @@ class _Call(beam.PTransform[beam.PCollection[RequestT],
       should_backoff: (Optional) provides methods for backoff.
       repeater: (Optional) provides methods to repeat requests to API.
       throttler: (Optional) provides methods to pre-throttle a request.
+      in_memory_cache: (Optional) an `InMemoryCache` whose worker-wide state
+        is used to coalesce concurrent calls for the same request.
   """
   def __init__(
       self,
@@ -321,18 +447,25 @@ class _Call(beam.PTransform[beam.PCollection[RequestT],
       should_backoff: Optional[ShouldBackOff] = None,
       repeater: Repeater = None,
       throttler: PreCallThrottler = None,
+      in_memory_cache: Optional['InMemoryCache'] = None,
   ):
     self._caller = caller
     self._timeout = timeout
     self._should_backoff = should_backoff
     self._repeater = repeater
     self._throttler = throttler
+    self._in_memory_cache = in_memory_cache
 
   def expand(
       self,
       requests: beam.PCollection[RequestT]) -> beam.PCollection[ResponseT]:
     return requests | beam.ParDo(
-        _CallDoFn(self._caller, self._timeout, self._repeater, self._throttler))
+        _CallDoFn(
+            self._caller,
+            self._timeout,
+            self._repeater,
+            self._throttler,
+            self._in_memory_cache))
 
 
 class _CallDoFn(beam.DoFn):
@@ -340,22 +473,50 @@ class _CallDoFn(beam.DoFn):
     self._caller.__enter__()
     self._metrics_collector = _MetricsCollector(self._caller.__str__())
     self._metrics_collector.setup_counter.inc(1)
+    if self._in_memory_cache:
+      self._store = self._in_memory_cache._acquire_store()
+    if isinstance(self._throttler, TokenBucketThrottler):
+      self._token_bucket = self._throttler._acquire_token_bucket()
 
   def __init__(
       self,
       caller: Caller[RequestT, ResponseT],
       timeout: float,
       repeater: Repeater,
-      throttler: PreCallThrottler):
+      throttler: PreCallThrottler,
+      in_memory_cache: Optional['InMemoryCache'] = None):
     self._metrics_collector = None
     self._caller = caller
     self._timeout = timeout
     self._repeater = repeater
     self._throttler = throttler
+    self._in_memory_cache = in_memory_cache
+    self._store = None
+    self._token_bucket = None
 
   def process(self, request: RequestT, *args, **kwargs):
     self._metrics_collector.requests.inc(1)
 
+    if self._store is None:
+      yield self._call(request)
+      return
+
+    # Concurrent calls for the same request wait for a single call to the
+    # API. The caller returns (request, response) tuples to use the cache, so
+    # pair the shared response with this request.
+    response, coalesced = self._store.coalesce(
+        self._in_memory_cache._cache_key(request),
+        lambda: self._call(request))
+    if coalesced:
+      self._metrics_collector.coalesced_requests.inc(1)
+      yield request, response[1]
+    else:
+      yield response
+
+  def _call(self, request: RequestT):
+    if self._token_bucket is not None:
+      return self._call_with_token_bucket(request)
+
     is_throttled_request = False
     if self._throttler:
       while self._throttler.throttler.throttle_request(time.time() *
@@ -369,21 +530,77 @@ class _CallDoFn(beam.DoFn):
     if is_throttled_request:
       self._metrics_collector.throttled_requests.inc(1)
 
+    req_time = time.time()
+    response = self._repeater.repeat(
+        self._caller, request, self._timeout, self._metrics_collector)
+    self._metrics_collector.responses.inc(1)
+    if self._throttler:
+      self._throttler.throttler.successful_request(req_time * MSEC_TO_SEC)
+    return response
+
+  def _call_with_token_bucket(self, request: RequestT):
+    caller = _TokenBucketCaller(self._caller, self._token_bucket)
     try:
-      req_time = time.time()
       response = self._repeater.repeat(
-          self._caller, request, self._timeout, self._metrics_collector)
-      self._metrics_collector.responses.inc(1)
-      self._throttler.throttler.successful_request(req_time * MSEC_TO_SEC)
-      yield response
-    except Exception as e:
-      raise e
+          caller, request, self._timeout, self._metrics_collector)
+    finally:
+      # The attempts may run on other threads, so the time each of them waited
+      # for a token is reported to the metrics from this one.
+      throttled_attempt_secs = [secs for secs in caller.throttled_secs if secs]
+      if throttled_attempt_secs:
+        self._metrics_collector.throttled_requests.inc(
+            len(throttled_attempt_secs))
+        self._metrics_collector.rate_limited_msecs.inc(
+            int(sum(throttled_attempt_secs) * MSEC_TO_SEC))
+    self._metrics_collector.responses.inc(1)
+    return response
 
   def teardown(self):
     self._metrics_collector.teardown_counter.inc(1)
     self._caller.__exit__(*sys.exc_info())
 
 
+class _TokenBucketCaller(Caller[RequestT, ResponseT]):
+  """Takes a token from a token bucket for every attempt to call caller, and
+  adjusts the rate of the bucket to the outcome of the attempt."""
+  def __init__(
+      self, caller: Caller[RequestT, ResponseT],
+      token_bucket: _AIMDTokenBucket):
+    self._caller = caller
+    self._token_bucket = token_bucket
+    self._has_token = False
+    # The seconds each attempt waited for its token.
+    self.throttled_secs: List[float] = []
+
+  def wait_for_token(self):
+    """Takes a token for the next attempt.
+
+    This is called by _execute_request before it starts timing the attempt.
+    """
+    throttled_secs = 0.0
+    while True:
+      wait_secs = self._token_bucket.try_acquire()
+      if wait_secs <= 0:
+        break
+      time.sleep(wait_secs)
+      throttled_secs += wait_secs
+    self.throttled_secs.append(throttled_secs)
+    self._has_token = True
+
+  def __call__(self, request: RequestT, *args, **kwargs) -> ResponseT:
+    if not self._has_token:
+      # The attempt wasn't made through _execute_request.
+      self.wait_for_token()
+    self._has_token = False
+    try:
+      response = self._caller(request, *args, **kwargs)
+    except (UserCodeQuotaException, TooManyRequests):
+      self._token_bucket.on_quota_exceeded()
+      raise
+    self._token_bucket.on_success()
+    return response
+
+
 class Cache(abc.ABC):
   """Base Cache class for
   :class:`apache_beam.io.requestresponse.RequestResponseIO`.
@@ -454,6 +671,7 @@ class _RedisCaller(Caller):
       kwargs: Optional[Dict[str, Any]] = None,
       source_caller: Optional[Caller] = None,
       mode: _RedisMode,
+      max_batch_size: Optional[int] = None,
   ):
     """
     Args:
@@ -472,6 +690,9 @@ class _RedisCaller(Caller):
         cache in case of fetching the cache request to store in Redis.
       mode: `_RedisMode` An enum type specifying the operational mode of
         the `_RedisCaller`.
+      max_batch_size: (Optional[int]) the maximum number of records to read
+        with a single `MGET` or write with a single pipeline. Records are
+        read and written one at a time if not set.
     """
     self.host, self.port = host, port
     self.time_to_live = time_to_live
@@ -480,20 +701,38 @@ class _RedisCaller(Caller):
     self.kwargs = kwargs
     self.source_caller = source_caller
     self.mode = mode
+    self.max_batch_size = max_batch_size
 
   def __enter__(self):
     self.client = redis.Redis(self.host, self.port, **self.kwargs)
 
-  def _read_cache(self, element):
-    cache_request = self.source_caller.get_cache_key(element)
+  def batch_elements_kwargs(self) -> Mapping[str, Any]:
+    if self.max_batch_size and self.max_batch_size > 1:
+      return {'max_batch_size': self.max_batch_size}
+    return {}
+
+  def _encode_request(self, request):
+    cache_request = self.source_caller.get_cache_key(request)
     # check if the caller is a enrichment handler. EnrichmentHandler
     # provides the request format for cache.
     if cache_request:
-      encoded_request = self.request_coder.encode(cache_request)
-    else:
-      encoded_request = self.request_coder.encode(element)
+      return self.request_coder.encode(cache_request)
+    return self.request_coder.encode(request)
 
-    encoded_response = self.client.get(encoded_request)
+  def _read_cache(self, element):
+    encoded_response = self.client.get(self._encode_request(element))
+    return self._decode_response(element, encoded_response)
+
+  def _read_cache_batch(self, elements):
+    # Read all records in a single round trip.
+    encoded_responses = self.client.mget(
+        [self._encode_request(element) for element in elements])
+    return [
+        self._decode_response(element, encoded_response)
+        for element, encoded_response in zip(elements, encoded_responses)
+    ]
+
+  def _decode_response(self, element, encoded_response):
     if not encoded_response:
       # no cache entry present for this request.
       return element, None
@@ -510,39 +749,47 @@ class _RedisCaller(Caller):
       response = self.response_coder.decode(encoded_response)
     return element, response
 
-  def _write_cache(self, element):
-    cache_request = self.source_caller.get_cache_key(element[0])
-    if cache_request:
-      encoded_request = self.request_coder.encode(cache_request)
-    else:
-      encoded_request = self.request_coder.encode(element[0])
+  def _encode_response(self, element):
     if self.response_coder is None:
       try:
-        encoded_response = json.dumps(element[1]._asdict()).encode('utf-8')
+        return json.dumps(element[1]._asdict()).encode('utf-8')
       except Exception:
         _LOGGER.warning(
             'cannot encode response %s for %s to store in '
             'redis cache.' % (element[1], element[0]))
-        return element
-    else:
-      encoded_response = self.response_coder.encode(element[1])
+        return None
+    return self.response_coder.encode(element[1])
+
+  def _write_cache(self, element, client=None):
+    encoded_response = self._encode_response(element)
+    if encoded_response is None:
+      return element
     # Write to cache with TTL. Set nx to True to prevent overwriting for the
     # same key.
-    self.client.set(
-        encoded_request, encoded_response, self.time_to_live, nx=True)
+    (client or self.client).set(
+        self._encode_request(element[0]),
+        encoded_response,
+        self.time_to_live,
+        nx=True)
     return element
 
+  def _write_cache_batch(self, elements):
+    # Queue the writes in a pipeline to send them in a single round trip.
+    pipeline = self.client.pipeline(transaction=False)
+    for element in elements:
+      self._write_cache(element, pipeline)
+    pipeline.execute()
+    return elements
+
   def __call__(self, element, *args, **kwargs):
     if self.mode == _RedisMode.READ:
       if isinstance(element, List):
-        responses = [self._read_cache(e) for e in element]
-        return responses
+        return self._read_cache_batch(element)
       else:
         return self._read_cache(element)
     else:
       if isinstance(element, List):
-        responses = [self._write_cache(e) for e in element]
-        return responses
+        return self._write_cache_batch(element)
       else:
         return self._write_cache(element)
 
@@ -563,6 +810,7 @@ class _ReadFromRedis(beam.PTransform[beam.PCollection[RequestT],
       request_coder: Optional[coders.Coder],
       response_coder: Optional[coders.Coder],
       source_caller: Optional[Caller[RequestT, ResponseT]] = None,
+      max_batch_size: Optional[int] = None,
   ):
     """
     Args:
@@ -579,6 +827,8 @@ class _ReadFromRedis(beam.PTransform[beam.PCollection[RequestT],
         received from Redis.
       source_caller: (Optional[`Caller`]): The source caller using this Redis
         cache in case of fetching the cache request to store in Redis.
+      max_batch_size: (Optional[int]) the maximum number of records to read
+        from Redis in a single round trip.
     """
     self.request_coder = request_coder
     self.response_coder = response_coder
@@ -590,7 +840,8 @@ class _ReadFromRedis(beam.PTransform[beam.PCollection[RequestT],
         response_coder=self.response_coder,
         kwargs=kwargs,
         source_caller=source_caller,
-        mode=_RedisMode.READ)
+        mode=_RedisMode.READ,
+        max_batch_size=max_batch_size)
 
   def expand(
       self,
@@ -612,6 +863,7 @@ class _WriteToRedis(beam.PTransform[beam.PCollection[Tuple[RequestT,
       request_coder: Optional[coders.Coder],
       response_coder: Optional[coders.Coder],
       source_caller: Optional[Caller[RequestT, ResponseT]] = None,
+      max_batch_size: Optional[int] = None,
   ):
     """
     Args:
@@ -628,6 +880,8 @@ class _WriteToRedis(beam.PTransform[beam.PCollection[Tuple[RequestT,
         received from Redis.
       source_caller: (Optional[`Caller`]): The source caller using this Redis
         cache in case of fetching the cache request to store in Redis.
+      max_batch_size: (Optional[int]) the maximum number of records to write
+        to Redis in a single round trip.
       """
     self.request_coder = request_coder
     self.response_coder = response_coder
@@ -639,7 +893,8 @@ class _WriteToRedis(beam.PTransform[beam.PCollection[Tuple[RequestT,
         response_coder=self.response_coder,
         kwargs=kwargs,
         source_caller=source_caller,
-        mode=_RedisMode.WRITE)
+        mode=_RedisMode.WRITE,
+        max_batch_size=max_batch_size)
 
   def expand(
       self, elements: beam.PCollection[Tuple[RequestT, ResponseT]]
@@ -666,6 +921,7 @@ class RedisCache(Cache):
       *,
       request_coder: Optional[coders.Coder] = None,
       response_coder: Optional[coders.Coder] = None,
+      max_batch_size: Optional[int] = DEFAULT_REDIS_MAX_BATCH_SIZE,
       **kwargs,
   ):
     """
@@ -678,6 +934,10 @@ class RedisCache(Cache):
       request_coder: (Optional[`coders.Coder`]) coder for encoding requests.
       response_coder: (Optional[`coders.Coder`]) coder for decoding responses
         received from Redis.
+      max_batch_size: (Optional[int]) the maximum number of records read with
+        a single `MGET` or written with a single pipeline of `SET` commands.
+        Requests are batched with `BatchElements`. Set to None to read and
+        write records one at a time.
       kwargs: Optional additional keyword arguments that
         are required to connect to your redis server. Same as `redis.Redis()`.
     """
@@ -686,6 +946,7 @@ class RedisCache(Cache):
     self._time_to_live = time_to_live
     self._request_coder = request_coder
     self._response_coder = response_coder
+    self._max_batch_size = max_batch_size
     self._kwargs = kwargs if kwargs else {}
     self._source_caller = None
 
@@ -699,7 +960,8 @@ class RedisCache(Cache):
         kwargs=self._kwargs,
         request_coder=self._request_coder,
         response_coder=self._response_coder,
-        source_caller=self._source_caller)
+        source_caller=self._source_caller,
+        max_batch_size=self._max_batch_size)
 
   def get_write(self):
     """returns a PTransform for writing to the cache."""
@@ -711,7 +973,235 @@ class RedisCache(Cache):
         kwargs=self._kwargs,
         request_coder=self._request_coder,
         response_coder=self._response_coder,
-        source_caller=self._source_caller)
+        source_caller=self._source_caller,
+        max_batch_size=self._max_batch_size)
+
+  @property
+  def source_caller(self):
+    return self._source_caller
+
+  @source_caller.setter
+  def source_caller(self, source_caller: Caller):
+    self._source_caller = source_caller
+
+  @property
+  def request_coder(self):
+    return self._request_coder
+
+  @request_coder.setter
+  def request_coder(self, request_coder: coders.Coder):
+    self._request_coder = request_coder
+
+
+class _InMemoryStore:
+  """A thread-safe LRU cache whose entries expire after a time-to-live.
+
+  It also tracks the calls in flight for each key so that concurrent calls
+  for the same key can share a single call."""
+  def __init__(self, max_entries: int, time_to_live_secs: float):
+    self._max_entries = max_entries
+    self._time_to_live_secs = time_to_live_secs
+    self._lock = threading.Lock()
+    # Maps keys to (expiry time, response), in least recently used order.
+    self._entries: OrderedDict[bytes, Tuple[float, Any]] = OrderedDict()
+    self._in_flight: Dict[bytes, concurrent.futures.Future] = {}
+
+  def get(self, key: bytes) -> Optional[Any]:
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is None:
+        return None
+      if entry[0] <= time.monotonic():
+        del self._entries[key]
+        return None
+      self._entries.move_to_end(key)
+      return entry[1]
+
+  def put(self, key: bytes, response: Any):
+    with self._lock:
+      self._entries[key] = (
+          time.monotonic() + self._time_to_live_secs, response)
+      self._entries.move_to_end(key)
+      while len(self._entries) > self._max_entries:
+        self._entries.popitem(last=False)
+
+  def coalesce(self, key: bytes, call) -> Tuple[Any, bool]:
+    """Returns the result of call(), unless a call for the same key is already
+    in flight, in which case its result is returned instead. Also returns
+    whether the result came from another call."""
+    with self._lock:
+      future = self._in_flight.get(key)
+      if future is not None:
+        coalesced = True
+      else:
+        coalesced = False
+        future = concurrent.futures.Future()
+        self._in_flight[key] = future
+    if coalesced:
+      return future.result(), True
+
+    try:
+      response = call()
+      future.set_result(response)
+      return response, False
+    except BaseException as e:
+      future.set_exception(e)
+      raise
+    finally:
+      with self._lock:
+        del self._in_flight[key]
+
+
+class _ReadFromInMemoryCacheFn(beam.DoFn):
+  """A `DoFn` that looks up requests in an in-memory cache and emits
+  (request, response) tuples, with None responses for cache misses."""
+  def __init__(self, cache: 'InMemoryCache'):
+    self._cache = cache
+
+  def setup(self):
+    self._store = self._cache._acquire_store()
+    self._hits = Metrics.counter(InMemoryCache.__name__, 'cache_hits')
+    self._misses = Metrics.counter(InMemoryCache.__name__, 'cache_misses')
+
+  def process(self, request: RequestT, *args, **kwargs):
+    response = self._store.get(self._cache._cache_key(request))
+    if response is None:
+      self._misses.inc(1)
+    else:
+      self._hits.inc(1)
+    yield request, response
+
+
+class _WriteToInMemoryCacheFn(beam.DoFn):
+  """A `DoFn` that stores (request, response) tuples in an in-memory cache."""
+  def __init__(self, cache: 'InMemoryCache'):
+    self._cache = cache
+
+  def setup(self):
+    self._store = self._cache._acquire_store()
+
+  def process(self, element: Tuple[RequestT, ResponseT], *args, **kwargs):
+    if element[1]:
+      self._store.put(self._cache._cache_key(element[0]), element[1])
+    yield element
+
+
+class _ReadFromInMemoryCache(beam.PTransform[beam.PCollection[RequestT],
+                                             beam.PCollection[ResponseT]]):
+  """A `PTransform` that reads from an in-memory cache, falling back to the
+  next cache for cache misses."""
+  def __init__(self, cache: 'InMemoryCache', next_cache: Optional[Cache]):
+    self._cache = cache
+    self._next_cache = next_cache
+
+  def expand(self, requests):
+    responses = requests | 'ReadInMemoryCache' >> beam.ParDo(
+        _ReadFromInMemoryCacheFn(self._cache))
+    if not self._next_cache:
+      return responses
+    hits, misses = (responses
+                    | 'FilterInMemoryCacheRead' >> beam.ParDo(
+                        _FilterCacheReadFn()).with_outputs(
+                        'cache_misses', main='hits'))
+    next_responses = (
+        misses
+        | 'ReadNextCache' >> self._next_cache.get_read()
+        # Keep responses found in the next cache in memory.
+        | 'WriteInMemoryCache' >> beam.ParDo(
+            _WriteToInMemoryCacheFn(self._cache)))
+    return (hits, next_responses) | beam.Flatten()
+
+
+class _WriteToInMemoryCache(beam.PTransform[beam.PCollection[Tuple[RequestT,
+                                                                   ResponseT]],
+                                            beam.PCollection[ResponseT]]):
+  """A `PTransform` that writes to an in-memory cache and the next cache."""
+  def __init__(self, cache: 'InMemoryCache', next_cache: Optional[Cache]):
+    self._cache = cache
+    self._next_cache = next_cache
+
+  def expand(self, elements):
+    elements = elements | 'WriteInMemoryCache' >> beam.ParDo(
+        _WriteToInMemoryCacheFn(self._cache))
+    if self._next_cache:
+      elements = elements | 'WriteNextCache' >> self._next_cache.get_write()
+    return elements
+
+
+class InMemoryCache(Cache):
+  """Configure an in-memory cache for
+  :class:`apache_beam.io.requestresponse.RequestResponseIO`.
+
+  The cache is shared by all threads of each worker process and holds up to
+  `max_entries` responses, evicting the least recently used ones first. It can
+  be stacked in front of another cache such as
+  :class:`apache_beam.io.requestresponse.RedisCache`, which is then only used
+  for requests that are not in memory. Concurrent calls to the API for the
+  same request are also coalesced into a single call, unless requests are
+  batched. Cache hits and misses are reported as the `cache_hits` and
+  `cache_misses` counters.
+  """
+  def __init__(
+      self,
+      max_entries: int = DEFAULT_IN_MEMORY_CACHE_MAX_ENTRIES,
+      time_to_live: Union[int, timedelta] = DEFAULT_CACHE_ENTRY_TTL_SEC,
+      *,
+      request_coder: Optional[coders.Coder] = None,
+      next_cache: Optional[Cache] = None,
+  ):
+    """
+    Args:
+      max_entries (int): The maximum number of responses held in memory by
+        each worker process.
+      time_to_live: `(Union[int, timedelta])` The time-to-live (TTL) for
+        records held in memory. Provide an integer (in seconds) or a
+        `datetime.timedelta` object.
+      request_coder: (Optional[`coders.Coder`]) coder for encoding requests.
+      next_cache: (Optional[`Cache`]) a cache to use for requests that are not
+        in memory, e.g. a `RedisCache`.
+    """
+    if max_entries < 1:
+      raise ValueError(f'max_entries must be positive, got {max_entries}')
+    self._max_entries = max_entries
+    if isinstance(time_to_live, timedelta):
+      time_to_live = time_to_live.total_seconds()
+    self._time_to_live_secs = time_to_live
+    self._next_cache = next_cache
+    self._request_coder = None
+    self._source_caller = None
+    self.request_coder = request_coder
+    self._shared_handle = shared.Shared()
+
+  def _acquire_store(self) -> _InMemoryStore:
+    return self._shared_handle.acquire(
+        lambda: _InMemoryStore(self._max_entries, self._time_to_live_secs))
+
+  def _cache_key(self, request: RequestT) -> bytes:
+    cache_request = self._source_caller.get_cache_key(request)
+    return self._request_coder.encode(
+        cache_request if cache_request else request)
+
+  def get_read(self):
+    """get_read returns a PTransform for reading from the cache."""
+    ensure_coders_exist(self._request_coder)
+    return _ReadFromInMemoryCache(self, self._next_cache)
+
+  def get_write(self):
+    """returns a PTransform for writing to the cache."""
+    ensure_coders_exist(self._request_coder)
+    return _WriteToInMemoryCache(self, self._next_cache)
+
+  @property
+  def next_cache(self):
+    return self._next_cache
+
+  @next_cache.setter
+  def next_cache(self, next_cache: Optional[Cache]):
+    self._next_cache = next_cache
+    if next_cache:
+      next_cache.source_caller = self._source_caller
+      if self._request_coder:
+        next_cache.request_coder = self._request_coder
 
   @property
   def source_caller(self):
@@ -720,6 +1210,8 @@ class RedisCache(Cache):
   @source_caller.setter
   def source_caller(self, source_caller: Caller):
     self._source_caller = source_caller
+    if self._next_cache:
+      self._next_cache.source_caller = source_caller
 
   @property
   def request_coder(self):
@@ -728,6 +1220,8 @@ class RedisCache(Cache):
   @request_coder.setter
   def request_coder(self, request_coder: coders.Coder):
     self._request_coder = request_coder
+    if self._next_cache and request_coder:
+      self._next_cache.request_coder = request_coder
 
 
 class FlattenBatch(beam.DoFn):
@@ -772,6 +1266,8 @@ class RequestResponseIO(beam.PTransform[beam.PCollection[RequestT],
         :class:`apache_beam.io.requestresponse.DefaultThrottler` for
         client-side adaptive throttling using
         :class:`apache_beam.io.components.adaptive_throttler.AdaptiveThrottler`
+        Use :class:`apache_beam.io.requestresponse.TokenBucketThrottler` to
+        limit the rate of requests instead.
     """
     self._caller = caller
     self._timeout = timeout
@@ -808,9 +1304,15 @@ class RequestResponseIO(beam.PTransform[beam.PCollection[RequestT],
     if self._batching_kwargs:
       inputs = inputs | BatchElements(**self._batching_kwargs)
 
-    if isinstance(self._throttler, DefaultThrottler):
-      # DefaultThrottler applies throttling in the DoFn of
-      # Call PTransform.
+    # Coalesce concurrent calls for the same request using the state of an
+    # in-memory cache. This needs a single request per call.
+    in_memory_cache = None
+    if isinstance(self._cache, InMemoryCache) and not self._batching_kwargs:
+      in_memory_cache = self._cache
+
+    if isinstance(self._throttler, (DefaultThrottler, TokenBucketThrottler)):
+      # DefaultThrottler and TokenBucketThrottler apply throttling in the DoFn
+      # of Call PTransform.
       responses = (
           inputs
           | _Call(
@@ -818,7 +1320,8 @@ class RequestResponseIO(beam.PTransform[beam.PCollection[RequestT],
               timeout=self._timeout,
               should_backoff=self._should_backoff,
               repeater=self._repeater,
-              throttler=self._throttler))
+              throttler=self._throttler,
+              in_memory_cache=in_memory_cache))
     else:
       # No throttling mechanism. The requests are made to the external source
       # as they come.
@@ -828,7 +1331,8 @@ class RequestResponseIO(beam.PTransform[beam.PCollection[RequestT],
               caller=self._caller,
               timeout=self._timeout,
               should_backoff=self._should_backoff,
-              repeater=self._repeater))
+              repeater=self._repeater,
+              in_memory_cache=in_memory_cache))
 
     # if batching is enabled then handle accordingly.
     if self._batching_kwargs:
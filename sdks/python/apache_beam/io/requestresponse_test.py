@@ -15,22 +15,39 @@
 # limitations under the License.
 #
 import logging
+import threading
 import time
 import unittest
 
+import mock
 from tenacity import retry
 from tenacity import retry_if_exception_type
 from tenacity import stop_after_attempt
 
 import apache_beam as beam
+from apache_beam.coders import coders
 from apache_beam.testing.test_pipeline import TestPipeline
+from apache_beam.testing.util import assert_that
+from apache_beam.testing.util import equal_to
 
 # pylint: disable=ungrouped-imports
 try:
   from google.api_core.exceptions import TooManyRequests
   from apache_beam.io.requestresponse import Caller
+  from apache_beam.io.requestresponse import Cache
   from apache_beam.io.requestresponse import DefaultThrottler
+  from apache_beam.io.requestresponse import InMemoryCache
+  from apache_beam.io.requestresponse import NoOpsRepeater
+  from apache_beam.io.requestresponse import RedisCache
+  from apache_beam.io.requestresponse import Repeater
   from apache_beam.io.requestresponse import RequestResponseIO
+  from apache_beam.io.requestresponse import TokenBucketThrottler
+  from apache_beam.io.requestresponse import _AIMDTokenBucket
+  from apache_beam.io.requestresponse import _CallDoFn
+  from apache_beam.io.requestresponse import _InMemoryStore
+  from apache_beam.io.requestresponse import _MetricsCollector
+  from apache_beam.io.requestresponse import _RedisCaller
+  from apache_beam.io.requestresponse import _RedisMode
   from apache_beam.io.requestresponse import retry_on_exception
 except ImportError:
   raise unittest.SkipTest('RequestResponseIO dependencies are not installed.')
@@ -83,6 +100,62 @@ class CallerThatRetries(AckCaller):
       raise TooManyRequests('retries = %d' % self.count)
 
 
+class CallerThatFailsOnce(AckCaller):
+  def __init__(self):
+    self.count = 0
+
+  def __call__(self, request: str, *args, **kwargs):
+    self.count += 1
+    if self.count == 1:
+      raise TooManyRequests('quota exceeded')
+    return f"ACK: {request}"
+
+
+class ImmediateRetryRepeater(Repeater):
+  """Retries a request that exceeded the quota once, without backing off."""
+  def repeat(self, caller, request, timeout, metrics_collector=None):
+    try:
+      return caller(request)
+    except TooManyRequests:
+      return caller(request)
+
+
+class PairCaller(AckCaller):
+  """PairCaller returns (request, response) tuples, as needed for caching."""
+  def __call__(self, request: str, *args, **kwargs):
+    return request, f"ACK: {request}"
+
+
+class FakeNextCache(Cache):
+  """FakeNextCache has a response for the request 'b' and drops writes."""
+  def __init__(self):
+    self._request_coder = None
+    self._source_caller = None
+
+  def get_read(self):
+    return beam.Map(
+        lambda request: (request, 'cached: b' if request == 'b' else None))
+
+  def get_write(self):
+    return beam.Map(lambda element: element)
+
+  @property
+  def request_coder(self):
+    return self._request_coder
+
+  @request_coder.setter
+  def request_coder(self, request_coder):
+    self._request_coder = request_coder
+
+  @property
+  def source_caller(self):
+    return self._source_caller
+
+  @source_caller.setter
+  def source_caller(self, caller):
+    self._source_caller = caller
+
+
 class TestCaller(unittest.TestCase):
   def test_valid_call(self):
     caller = AckCaller()
@@ -136,6 +209,98 @@ class TestCaller(unittest.TestCase):
             | RequestResponseIO(caller=caller, repeater=None))
     self.assertRegex(str(cm.exception), 'retries = 0')
 
+  def test_token_bucket_throttler(self):
+    # TODO(https://github.com/apache/beam/issues/34549): This test relies on
+    # metrics filtering which doesn't work on Prism yet.
+    test_pipeline = TestPipeline('FnApiRunner')
+    output = (
+        test_pipeline
+        | beam.Create(['a', 'b', 'c', 'd'])
+        | RequestResponseIO(
+            caller=AckCaller(), throttler=TokenBucketThrottler(qps=5, burst=1)))
+    assert_that(output, equal_to(['ACK: a', 'ACK: b', 'ACK: c', 'ACK: d']))
+    result = test_pipeline.run()
+    result.wait_until_finish()
+    # Only the first request fits in the initial burst.
+    metrics = result.metrics().query(
+        beam.metrics.MetricsFilter().with_name('throttled_requests'))
+    self.assertEqual(metrics['counters'][0].committed, 3)
+
+  def test_token_bucket_throttler_limits_retries(self):
+    call_fn = _CallDoFn(
+        CallerThatFailsOnce(),
+        timeout=30,
+        repeater=ImmediateRetryRepeater(),
+        throttler=TokenBucketThrottler(qps=1))
+    call_fn._metrics_collector = _MetricsCollector('test')
+    now = [0.0]
+    call_fn._token_bucket = mock.Mock(
+        wraps=_AIMDTokenBucket(
+            qps=1,
+            burst=1,
+            min_qps=1,
+            additive_increase_qps=1,
+            multiplicative_decrease=0.5,
+            clock=lambda: now[0]))
+
+    def sleep(secs):
+      now[0] += secs
+
+    with mock.patch.object(time, 'sleep', side_effect=sleep) as mock_sleep:
+      self.assertEqual(['ACK: a'], list(call_fn.process('a')))
+    # The first attempt took the only token, so the retry had to wait for one.
+    mock_sleep.assert_called_once_with(1.0)
+    self.assertEqual(3, call_fn._token_bucket.try_acquire.call_count)
+
+  def test_token_bucket_wait_does_not_count_towards_timeout(self):
+    call_fn = _CallDoFn(
+        AckCaller(),
+        timeout=0.1,
+        repeater=NoOpsRepeater(),
+        throttler=TokenBucketThrottler(qps=1))
+    call_fn._metrics_collector = _MetricsCollector('test')
+    call_fn._token_bucket = mock.Mock()
+    # The token is only available after a wait longer than the timeout.
+    call_fn._token_bucket.try_acquire.side_effect = [0.5, 0]
+    self.assertEqual(['ACK: a'], list(call_fn.process('a')))
+    call_fn._token_bucket.on_success.assert_called_once_with()
+
+  def test_token_bucket_throttler_validation(self):
+    with self.assertRaises(ValueError):
+      TokenBucketThrottler(qps=0)
+    with self.assertRaises(ValueError):
+      TokenBucketThrottler(qps=1, multiplicative_decrease=1)
+
+  def test_in_memory_cache(self):
+    with TestPipeline() as test_pipeline:
+      output = (
+          test_pipeline
+          | beam.Create(['a', 'b', 'a'])
+          | RequestResponseIO(
+              caller=PairCaller(),
+              cache=InMemoryCache(request_coder=coders.StrUtf8Coder())))
+      assert_that(
+          output, equal_to([('a', 'ACK: a'), ('b', 'ACK: b'), ('a', 'ACK: a')]))
+
+  def test_in_memory_cache_in_front_of_next_cache(self):
+    cache = InMemoryCache(next_cache=FakeNextCache())
+    cache.request_coder = coders.StrUtf8Coder()
+    self.assertIsInstance(cache.next_cache.request_coder, coders.StrUtf8Coder)
+    with TestPipeline() as test_pipeline:
+      output = (
+          test_pipeline
+          | beam.Create(['a', 'b'])
+          | RequestResponseIO(caller=PairCaller(), cache=cache))
+      assert_that(output, equal_to([('a', 'ACK: a'), ('b', 'cached: b')]))
+
+  def test_in_memory_cache_requires_coder(self):
+    with self.assertRaisesRegex(ValueError, 'need request coder'):
+      with TestPipeline() as test_pipeline:
+        _ = (
+            test_pipeline
+            | beam.Create(['a'])
+            | RequestResponseIO(caller=PairCaller(), cache=InMemoryCache()))
+
   @retry(
       retry=retry_if_exception_type(IndexError),
       reraise=True,
@@ -168,5 +333,195 @@ class TestCaller(unittest.TestCase):
     self.assertEqual(metrics['counters'][0].committed, 1)
 
 
+class FakeRedis:
+  """An in-process stand-in for a Redis client that counts round trips."""
+  def __init__(self):
+    self.data = {}
+    self.round_trips = 0
+
+  def get(self, key):
+    self.round_trips += 1
+    return self.data.get(key)
+
+  def mget(self, keys):
+    self.round_trips += 1
+    return [self.data.get(key) for key in keys]
+
+  def set(self, key, value, ex=None, nx=False):
+    self.round_trips += 1
+    return self._set(key, value, nx)
+
+  def _set(self, key, value, nx):
+    if nx and key in self.data:
+      return None
+    self.data[key] = value
+    return True
+
+  def pipeline(self, transaction=True):
+    return FakeRedisPipeline(self)
+
+
+class FakeRedisPipeline:
+  def __init__(self, client):
+    self._client = client
+    self._commands = []
+
+  def set(self, key, value, ex=None, nx=False):
+    self._commands.append((key, value, nx))
+
+  def execute(self):
+    self._client.round_trips += 1
+    return [self._client._set(*command) for command in self._commands]
+
+
+class RedisCallerTest(unittest.TestCase):
+  def create_caller(self, mode, client, max_batch_size=None):
+    caller = _RedisCaller(
+        'localhost',
+        6379,
+        60,
+        request_coder=coders.StrUtf8Coder(),
+        response_coder=coders.StrUtf8Coder(),
+        source_caller=PairCaller(),
+        mode=mode,
+        max_batch_size=max_batch_size)
+    caller.client = client
+    return caller
+
+  def test_batched_reads_and_writes(self):
+    client = FakeRedis()
+    write = self.create_caller(_RedisMode.WRITE, client, max_batch_size=10)
+    self.assertEqual({'max_batch_size': 10}, write.batch_elements_kwargs())
+    elements = [('a', 'ACK: a'), ('b', 'ACK: b'), ('c', 'ACK: c')]
+    self.assertEqual(elements, write(elements))
+    self.assertEqual(1, client.round_trips)
+    # Existing records are not overwritten.
+    write([('a', 'other')])
+    self.assertEqual(b'ACK: a', client.data[b'a'])
+
+    client.round_trips = 0
+    read = self.create_caller(_RedisMode.READ, client, max_batch_size=10)
+    self.assertEqual([('a', 'ACK: a'), ('d', None), ('c', 'ACK: c')],
+                     read(['a', 'd', 'c']))
+    self.assertEqual(1, client.round_trips)
+
+  def test_unbatched_reads_and_writes(self):
+    client = FakeRedis()
+    write = self.create_caller(_RedisMode.WRITE, client)
+    self.assertEqual({}, write.batch_elements_kwargs())
+    self.assertEqual(('a', 'ACK: a'), write(('a', 'ACK: a')))
+    read = self.create_caller(_RedisMode.READ, client)
+    self.assertEqual(('a', 'ACK: a'), read('a'))
+    self.assertEqual(('b', None), read('b'))
+    self.assertEqual(3, client.round_trips)
+
+  def test_redis_cache_batches_by_default(self):
+    cache = RedisCache('localhost', 6379, request_coder=coders.StrUtf8Coder())
+    cache.source_caller = PairCaller()
+    self.assertEqual({'max_batch_size': 100},
+                     cache.get_read().redis_caller.batch_elements_kwargs())
+    self.assertEqual({'max_batch_size': 100},
+                     cache.get_write().redis_caller.batch_elements_kwargs())
+
+
+class AIMDTokenBucketTest(unittest.TestCase):
+  def create_bucket(self, **kwargs):
+    self.now = 0.0
+    bucket_kwargs = dict(
+        qps=10,
+        burst=2,
+        min_qps=1,
+        additive_increase_qps=1,
+        multiplicative_decrease=0.5)
+    bucket_kwargs.update(kwargs)
+    return _AIMDTokenBucket(clock=lambda: self.now, **bucket_kwargs)
+
+  def test_limits_rate(self):
+    bucket = self.create_bucket()
+    self.assertEqual(0, bucket.try_acquire())
+    self.assertEqual(0, bucket.try_acquire())
+    self.assertAlmostEqual(0.1, bucket.try_acquire())
+    self.now = 0.05
+    self.assertAlmostEqual(0.05, bucket.try_acquire())
+    self.now = 0.1
+    self.assertEqual(0, bucket.try_acquire())
+    # Tokens don't accumulate beyond the burst size.
+    self.now = 10
+    self.assertEqual(0, bucket.try_acquire())
+    self.assertEqual(0, bucket.try_acquire())
+    self.assertGreater(bucket.try_acquire(), 0)
+
+  def test_adjusts_rate(self):
+    bucket = self.create_bucket()
+    bucket.on_quota_exceeded()
+    self.assertEqual(5, bucket.qps())
+    # No tokens are left after exceeding the quota.
+    self.assertAlmostEqual(0.2, bucket.try_acquire())
+    for _ in range(5):
+      bucket.on_quota_exceeded()
+    self.assertEqual(1, bucket.qps())
+    bucket.on_success()
+    self.assertEqual(2, bucket.qps())
+    for _ in range(100):
+      bucket.on_success()
+    self.assertEqual(10, bucket.qps())
+
+
+class InMemoryStoreTest(unittest.TestCase):
+  def test_evicts_least_recently_used(self):
+    store = _InMemoryStore(max_entries=2, time_to_live_secs=60)
+    store.put(b'a', 1)
+    store.put(b'b', 2)
+    self.assertEqual(1, store.get(b'a'))
+    store.put(b'c', 3)
+    self.assertIsNone(store.get(b'b'))
+    self.assertEqual(1, store.get(b'a'))
+    self.assertEqual(3, store.get(b'c'))
+
+  def test_expires_entries(self):
+    store = _InMemoryStore(max_entries=2, time_to_live_secs=0)
+    store.put(b'a', 1)
+    self.assertIsNone(store.get(b'a'))
+
+  def test_coalesces_concurrent_calls(self):
+    store = _InMemoryStore(max_entries=2, time_to_live_secs=60)
+    call_started = threading.Event()
+    finish_call = threading.Event()
+    calls = []
+
+    def call():
+      calls.append(1)
+      call_started.set()
+      finish_call.wait(timeout=60)
+      return 'response'
+
+    results = []
+    first = threading.Thread(
+        target=lambda: results.append(store.coalesce(b'a', call)))
+    first.start()
+    call_started.wait(timeout=60)
+    second = threading.Thread(
+        target=lambda: results.append(store.coalesce(b'a', call)))
+    second.start()
+    # Wait for the second call to be waiting on the first.
+    time.sleep(0.1)
+    finish_call.set()
+    first.join(timeout=60)
+    second.join(timeout=60)
+    self.assertEqual(1, len(calls))
+    self.assertCountEqual([('response', False), ('response', True)], results)
+    # Calls that are no longer in flight are not coalesced.
+    self.assertEqual(('other', False), store.coalesce(b'a', lambda: 'other'))
+
+  def test_coalesced_calls_raise_errors(self):
+    store = _InMemoryStore(max_entries=2, time_to_live_secs=60)
+
+    def call():
+      raise RuntimeError('call failed')
+
+    with self.assertRaisesRegex(RuntimeError, 'call failed'):
+      store.coalesce(b'a', call)
+
+
 if __name__ == '__main__':
   unittest.main()
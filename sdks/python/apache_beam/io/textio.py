@@ -25,6 +25,7 @@ from functools import partial
 from typing import TYPE_CHECKING
 from typing import Any
 from typing import Dict
+from typing import List
 from typing import Optional
 from typing import Union
 
@@ -46,6 +47,7 @@ if TYPE_CHECKING:
 __all__ = [
     'ReadFromText',
     'ReadFromTextWithFilename',
+    'ReadFromTextBatched',
     'ReadAllFromText',
     'ReadAllFromTextContinuously',
     'WriteToText',
@@ -71,6 +73,13 @@ class _TextSource(filebasedsource.FileBasedSource):
 
   DEFAULT_READ_BUFFER_SIZE = 8192
 
+  # Size of the blocks read and split at once when the default delimiters are
+  # used.
+  DEFAULT_READ_BLOCK_SIZE = 4 * 1024 * 1024
+
+  # Whether read_records yields lists of records rather than single records.
+  _output_batches = False
+
   class ReadBuffer(object):
     # A buffer that gives the buffered data and next position in the
     # buffer that should be read.
@@ -117,7 +126,8 @@ class _TextSource(filebasedsource.FileBasedSource):
       skip_header_lines=0,
       header_processor_fns=(None, None),
       delimiter=None,
-      escapechar=None):
+      escapechar=None,
+      use_compression_indexes=False):
     """Initialize a _TextSource
 
     Args:
@@ -145,7 +155,8 @@ class _TextSource(filebasedsource.FileBasedSource):
         file_pattern,
         min_bundle_size,
         compression_type=compression_type,
-        validate=validate)
+        validate=validate,
+        use_compression_indexes=use_compression_indexes)
 
     self._strip_trailing_newlines = strip_trailing_newlines
     self._compression_type = compression_type
@@ -233,6 +244,32 @@ class _TextSource(filebasedsource.FileBasedSource):
       else:
         next_record_start_position = position_after_processing_header_lines
 
+      if self._delimiter is None and self._escapechar is None:
+        # Fast path for the default delimiters: split whole blocks at once.
+        for sizes, records in self._read_line_blocks(file_to_read, read_buffer):
+          if not self._output_batches:
+            # Claim each record just before emitting it so that dynamic
+            # splits see the same progress as on the per-record path.
+            for size, record in zip(sizes, records):
+              if not range_tracker.try_claim(next_record_start_position):
+                return
+              next_record_start_position += size
+              yield record
+            continue
+          num_claimed = 0
+          for size in sizes:
+            if not range_tracker.try_claim(next_record_start_position):
+              break
+            next_record_start_position += size
+            num_claimed += 1
+          if num_claimed:
+            yield records[:num_claimed]
+          if num_claimed < len(sizes):
+            return
+        return
+
+      batch = []
+      batch_bytes = 0
       while range_tracker.try_claim(next_record_start_position):
         record, num_bytes_to_next_record = self._read_record(file_to_read,
                                                              read_buffer)
@@ -250,9 +287,72 @@ class _TextSource(filebasedsource.FileBasedSource):
         if num_bytes_to_next_record > 0:
           next_record_start_position += num_bytes_to_next_record
 
-        yield self._coder.decode(record)
+        if self._output_batches:
+          batch.append(self._coder.decode(record))
+          batch_bytes += len(record)
+          if batch_bytes >= self.DEFAULT_READ_BLOCK_SIZE:
+            yield batch
+            batch = []
+            batch_bytes = 0
+        else:
+          yield self._coder.decode(record)
         if num_bytes_to_next_record < 0:
           break
+      if batch:
+        yield batch
+
+  def _read_line_blocks(self, file_to_read, read_buffer):
+    # Reads the rest of the file from 'read_buffer.position' in large blocks
+    # and splits each block into records at the default delimiters, with the
+    # splitting and decoding done by bytes and str methods rather than record
+    # by record. Yields, for each block, a tuple of a list with the size in
+    # bytes of each record, including its delimiter, and a list of the decoded
+    # records. A record at the end of the file without a delimiter is yielded
+    # last.
+    remainder = read_buffer.data[read_buffer.position:]
+    read_buffer.reset()
+    block_size = max(self._buffer_size, self.DEFAULT_READ_BLOCK_SIZE)
+
+    while True:
+      block = file_to_read.read(block_size)
+      data = remainder + block if remainder else block
+      end = data.rfind(b'\n')
+      if end >= 0:
+        remainder = data[end + 1:]
+        yield self._split_lines(data[:end])
+      else:
+        remainder = data
+      if not block:
+        if remainder:
+          yield [len(remainder)], [self._coder.decode(remainder)]
+        return
+
+  def _split_lines(self, data):
+    # Splits 'data' at '\n' delimiters, treating a preceding '\r' as part of
+    # the delimiter, and returns the sizes and decoded records as for
+    # '_read_line_blocks'.
+    lines = data.split(b'\n')
+    sizes = [len(line) + 1 for line in lines]
+    # Newline bytes only occur as newlines in UTF-8, so UTF-8 data can be
+    # decoded at once and split into the same records as its bytes.
+    decode_at_once = type(self._coder) is coders.StrUtf8Coder
+    if decode_at_once:
+      data = data.decode('utf-8')
+      lines = data.split('\n')
+      carriage_return, newline = '\r', '\n'
+    else:
+      carriage_return, newline = b'\r', b'\n'
+    if self._strip_trailing_newlines:
+      if carriage_return in data:
+        lines = [
+            line[:-1] if line.endswith(carriage_return) else line
+            for line in lines
+        ]
+    else:
+      lines = [line + newline for line in lines]
+    if not decode_at_once:
+      lines = [self._coder.decode(line) for line in lines]
+    return sizes, lines
 
   def _process_header(self, file_to_read, read_buffer):
     # Returns a tuple containing the position in file after processing header
@@ -425,6 +525,13 @@ class _TextSource(filebasedsource.FileBasedSource):
       return Any
 
 
+class _TextSourceBatched(_TextSource):
+  _output_batches = True
+
+  def output_type_hint(self):
+    return List[super().output_type_hint()]
+
+
 class _TextSourceWithFilename(_TextSource):
   def read_records(self, file_name, range_tracker):
     records = super().read_records(file_name, range_tracker)
@@ -452,7 +559,8 @@ class _TextSink(filebasedsink.FileBasedSink):
       max_records_per_shard=None,
       max_bytes_per_shard=None,
       skip_if_empty=False,
-      triggering_frequency=None):
+      triggering_frequency=None,
+      compressed_member_size=None):
     """Initialize a _TextSink.
 
     Args:
@@ -508,6 +616,10 @@ class _TextSink(filebasedsink.FileBasedSink):
       triggering_frequency: (int) Every triggering_frequency duration, a window
         will be triggered and all bundles in the window will be written.
         If set it overrides user windowing. Mandatory for GlobalWindow.
+      compressed_member_size: If set, compressed files are written as a series
+        of independently compressed members of about this many uncompressed
+        bytes, with an index of the members next to each file, so that the
+        files can be split when they are read.
 
 
     Returns:
@@ -524,7 +636,8 @@ class _TextSink(filebasedsink.FileBasedSink):
         max_records_per_shard=max_records_per_shard,
         max_bytes_per_shard=max_bytes_per_shard,
         skip_if_empty=skip_if_empty,
-        triggering_frequency=triggering_frequency)
+        triggering_frequency=triggering_frequency,
+        compressed_member_size=compressed_member_size)
     self._append_trailing_newlines = append_trailing_newlines
     self._header = header
     self._footer = footer
@@ -566,7 +679,8 @@ def _create_text_source(
     validate=False,
     skip_header_lines=None,
     delimiter=None,
-    escapechar=None):
+    escapechar=None,
+    use_compression_indexes=False):
   return _TextSource(
       file_pattern=file_pattern,
       min_bundle_size=min_bundle_size,
@@ -576,7 +690,8 @@ def _create_text_source(
       validate=validate,
       skip_header_lines=skip_header_lines,
       delimiter=delimiter,
-      escapechar=escapechar)
+      escapechar=escapechar,
+      use_compression_indexes=use_compression_indexes)
 
 
 class ReadAllFromText(PTransform):
@@ -616,6 +731,7 @@ class ReadAllFromText(PTransform):
       with_filename=False,
       delimiter=None,
       escapechar=None,
+      use_compression_indexes=False,
       **kwargs):
     """Initialize the ``ReadAllFromText`` transform.
 
@@ -645,6 +761,9 @@ class ReadAllFromText(PTransform):
         ambiguous parsing.
       escapechar (bytes) Optional: a single byte to escape the records
         delimiter, can also escape itself.
+      use_compression_indexes: If True, compressed files that were written
+        with an index, e.g. by ``WriteToText`` with ``compressed_member_size``,
+        are split into several data ranges.
     """
     super().__init__(**kwargs)
     self._source_from_file = partial(
@@ -656,7 +775,8 @@ class ReadAllFromText(PTransform):
         coder=coder,
         skip_header_lines=skip_header_lines,
         delimiter=delimiter,
-        escapechar=escapechar)
+        escapechar=escapechar,
+        use_compression_indexes=use_compression_indexes)
     self._desired_bundle_size = desired_bundle_size
     self._min_bundle_size = min_bundle_size
     self._compression_type = compression_type
@@ -667,7 +787,8 @@ class ReadAllFromText(PTransform):
         self._desired_bundle_size,
         self._min_bundle_size,
         self._source_from_file,
-        self._with_filename)
+        self._with_filename,
+        use_compression_indexes=use_compression_indexes)
 
   def expand(self, pvalue):
     return pvalue | 'ReadAllFiles' >> self._read_all_files
@@ -702,7 +823,8 @@ class ReadAllFromTextContinuously(ReadAllFromText):
       'skip_header_lines',
       'with_filename',
       'delimiter',
-      'escapechar')
+      'escapechar',
+      'use_compression_indexes')
 
   def __init__(self, file_pattern, **kwargs):
     """Initialize the ``ReadAllFromTextContinuously`` transform.
@@ -767,6 +889,7 @@ class ReadFromText(PTransform):
       skip_header_lines=0,
       delimiter=None,
       escapechar=None,
+      use_compression_indexes=False,
       **kwargs):
     """Initialize the :class:`ReadFromText` transform.
 
@@ -795,6 +918,10 @@ class ReadFromText(PTransform):
         ambiguous parsing.
       escapechar (bytes) Optional: a single byte to escape the records
         delimiter, can also escape itself.
+      use_compression_indexes (bool): If :data:`True`, compressed files that
+        were written with an index, e.g. by :class:`WriteToText` with
+        ``compressed_member_size``, are split into several bundles. This looks
+        up the index of every compressed file that is read.
     """
 
     super().__init__(**kwargs)
@@ -814,7 +941,8 @@ class ReadFromText(PTransform):
         validate=validate,
         skip_header_lines=skip_header_lines,
         delimiter=delimiter,
-        escapechar=escapechar)
+        escapechar=escapechar,
+        use_compression_indexes=use_compression_indexes)
 
   def expand(self, pvalue):
     return pvalue.pipeline | Read(self._source).with_output_types(
@@ -832,6 +960,22 @@ class ReadFromTextWithFilename(ReadFromText):
   _source_class = _TextSourceWithFilename
 
 
+class ReadFromTextBatched(ReadFromText):
+  r"""A :class:`~apache_beam.io.textio.ReadFromText` for reading text
+  files as lists of lines.
+
+  Each element of the output is a list of consecutive lines of a file rather
+  than a single line, which avoids per-line overhead for DoFns that process
+  many lines at once. With the default delimiters, each list holds the lines
+  of a block of about ``_TextSource.DEFAULT_READ_BLOCK_SIZE`` bytes.
+
+  This class extend ReadFromText class just setting a different
+  _source_class attribute.
+  """
+
+  _source_class = _TextSourceBatched
+
+
 class WriteToText(PTransform):
   """A :class:`~apache_beam.transforms.ptransform.PTransform` for writing to
   text files."""
@@ -850,7 +994,8 @@ class WriteToText(PTransform):
       max_records_per_shard=None,
       max_bytes_per_shard=None,
       skip_if_empty=False,
-      triggering_frequency=None):
+      triggering_frequency=None,
+      compressed_member_size=None):
     r"""Initialize a :class:`WriteToText` transform.
 
     Args:
@@ -910,6 +1055,11 @@ class WriteToText(PTransform):
         files having same file path and not create new ones.
       triggering_frequency: (int) Every triggering_frequency duration, a window
         will be triggered and all bundles in the window will be written.
+      compressed_member_size (int): If set, compressed files are written as a
+        series of independently compressed members of about this many
+        uncompressed bytes, with an index of the members next to each file, so
+        that :class:`ReadFromText` can split the files into several bundles
+        when reading with ``use_compression_indexes``.
     """
 
     self._sink = _TextSink(
@@ -925,7 +1075,8 @@ class WriteToText(PTransform):
         max_records_per_shard=max_records_per_shard,
         max_bytes_per_shard=max_bytes_per_shard,
         skip_if_empty=skip_if_empty,
-        triggering_frequency=triggering_frequency)
+        triggering_frequency=triggering_frequency,
+        compressed_member_size=compressed_member_size)
 
   def expand(self, pcoll):
     if (not pcoll.is_bounded and self._sink.shard_name_template
@@ -30,6 +30,7 @@ import tempfile
 import unittest
 import zlib
 from datetime import datetime
+from unittest import mock
 
 import pytz
 
@@ -37,6 +38,7 @@ import apache_beam as beam
 from apache_beam import coders
 from apache_beam.io import iobase
 from apache_beam.io import source_test_utils
+from apache_beam.io.filesystem import CompressedFileIndex
 from apache_beam.io.filesystem import CompressionTypes
 from apache_beam.io.filesystems import FileSystems
 from apache_beam.io.textio import _TextSink as TextSink
@@ -45,6 +47,7 @@ from apache_beam.io.textio import _TextSource as TextSource
 from apache_beam.io.textio import ReadAllFromText
 from apache_beam.io.textio import ReadAllFromTextContinuously
 from apache_beam.io.textio import ReadFromText
+from apache_beam.io.textio import ReadFromTextBatched
 from apache_beam.io.textio import ReadFromTextWithFilename
 from apache_beam.io.textio import WriteToText
 from apache_beam.options.pipeline_options import PipelineOptions
@@ -1378,6 +1381,41 @@ class TextSourceTest(unittest.TestCase):
     self._run_read_test(
         file_name, expected_data, delimiter=b'\r\n', escapechar=b'\\')
 
+  def test_read_blocks_match_per_record_read(self):
+    with TempDir() as tempdir:
+      file_name = tempdir.create_temp_file()
+      with open(file_name, 'wb') as f:
+        f.write(b'a\r\nbb\n\nccc\r\n\r\ndd\re\nlast')
+      stripped = [b'a', b'bb', b'', b'ccc', b'', b'dd\re', b'last']
+      unstripped = [
+          b'a\r\n', b'bb\n', b'\n', b'ccc\r\n', b'\r\n', b'dd\re\n', b'last'
+      ]
+      for strip, coder, lines in [
+          (True, coders.StrUtf8Coder(), stripped),
+          (False, coders.StrUtf8Coder(), unstripped),
+          (True, coders.BytesCoder(), stripped),
+          (False, DummyCoder(), unstripped)]:
+        expected = [coder.decode(line) for line in lines]
+        source = TextSource(
+            file_name, 0, CompressionTypes.UNCOMPRESSED, strip, coder, 4)
+        # Use blocks smaller than the records to cover records spanning
+        # several blocks.
+        with mock.patch.object(TextSource, 'DEFAULT_READ_BLOCK_SIZE', 3):
+          self.assertEqual(
+              list(source.read(source.get_range_tracker(None, None))), expected)
+        self.assertEqual(
+            list(source.read(source.get_range_tracker(None, None))), expected)
+
+  def test_read_from_text_batched(self):
+    file_name, expected_data = write_data(
+        self.DEFAULT_NUM_RECORDS, eol=EOL.CRLF)
+    with TestPipeline() as pipeline:
+      batches = pipeline | 'Read' >> ReadFromTextBatched(
+          file_name, skip_header_lines=1)
+      assert_that(
+          batches | beam.FlatMap(lambda batch: batch),
+          equal_to(expected_data[1:]))
+
   def test_read_escaped_custom_delimiter(self):
     file_name, expected_data = write_data(
       TextSource.DEFAULT_READ_BUFFER_SIZE,
@@ -1642,6 +1680,38 @@ class TextSinkTest(unittest.TestCase):
 
     self.assertEqual(sorted(read_result), sorted(self.lines))
 
+  def test_write_pipeline_compressed_members(self):
+    with TestPipeline() as pipeline:
+      pcoll = pipeline | beam.core.Create(self.lines)
+      pcoll | 'Write' >> WriteToText(  # pylint: disable=expression-not-assigned
+          self.path,
+          file_name_suffix='.gz',
+          num_shards=1,
+          compressed_member_size=20)
+
+    [file_name] = glob.glob(self.path + '*.gz')
+    with open(CompressedFileIndex.index_path(file_name), 'rb') as f:
+      index = CompressedFileIndex.decode(f.read())
+    self.assertGreater(len(index.members), 1)
+    self.assertEqual(index.compressed_size, os.path.getsize(file_name))
+    with gzip.GzipFile(file_name, 'rb') as f:
+      self.assertEqual(sorted(f.read().splitlines()), sorted(self.lines))
+
+    source = ReadFromText(self.path + '*', use_compression_indexes=True)._source
+    self.assertEqual(
+        len(list(source.split(desired_bundle_size=1))), len(index.members))
+    with TestPipeline() as pipeline:
+      pcoll = pipeline | 'Read' >> ReadFromText(
+          self.path + '*', use_compression_indexes=True)
+      read_all = (
+          pipeline
+          | 'Pattern' >> beam.Create([self.path + '*'])
+          | 'ReadAll' >> ReadAllFromText(
+              desired_bundle_size=20, use_compression_indexes=True))
+      expected = [line.decode('utf-8') for line in self.lines]
+      assert_that(pcoll, equal_to(expected), label='CheckRead')
+      assert_that(read_all, equal_to(expected), label='CheckReadAll')
+
   def test_write_pipeline_auto_compression_unsharded(self):
     with TestPipeline() as pipeline:
       pcoll = pipeline | 'Create' >> beam.core.Create(self.lines)
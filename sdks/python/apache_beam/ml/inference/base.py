@@ -27,6 +27,7 @@ The transform handles standard inference functionality, like metric
 collection, sharing model between threads, and batching elements.
 """
 
+import concurrent.futures
 import functools
 import logging
 import os
@@ -43,6 +44,7 @@ from collections.abc import Callable
 from collections.abc import Iterable
 from collections.abc import Mapping
 from collections.abc import Sequence
+from copy import copy
 from copy import deepcopy
 from dataclasses import dataclass
 from datetime import datetime
@@ -71,6 +73,10 @@ _NANOSECOND_TO_MILLISECOND = 1_000_000
 _NANOSECOND_TO_MICROSECOND = 1_000
 _MILLISECOND_TO_SECOND = 1_000
 
+# Guards the AdaptiveThrottlers of RemoteModelHandlers, which are shared by the
+# concurrent requests of a batch.
+_THROTTLER_LOCK = threading.Lock()
+
 ModelT = TypeVar('ModelT')
 ExampleT = TypeVar('ExampleT')
 PreProcessT = TypeVar('PreProcessT')
@@ -118,6 +124,10 @@ class _ModelLoadStats(NamedTuple):
   model_tag: str
   load_latency: Optional[int]
   byte_size: Optional[int]
+  # Keys whose models were evicted to make room for this model.
+  evicted_keys: tuple[str, ...] = ()
+  # The total estimated size of all models held after loading this model.
+  resident_bytes: Optional[int] = None
 
 
 ModelMetadata.model_id.__doc__ = """Unique identifier for the model. This can be
@@ -353,7 +363,8 @@ class RemoteModelHandler(ABC, ModelHandler[ExampleT, PredictionT, ModelT]):
       *,
       window_ms: int = 1 * _MILLISECOND_TO_SECOND,
       bucket_ms: int = 1 * _MILLISECOND_TO_SECOND,
-      overload_ratio: float = 2):
+      overload_ratio: float = 2,
+      max_concurrent_requests: int = 1):
     """Initializes metrics tracking + an AdaptiveThrottler class for enabling
     client-side throttling for remote calls to an inference service.
     See https://s.apache.org/beam-client-side-throttling for more details
@@ -374,7 +385,16 @@ class RemoteModelHandler(ABC, ModelHandler[ExampleT, PredictionT, ModelT]):
       overload_ratio: the target ratio between requests sent and successful
         requests. This is "K" in the formula in 
         https://landing.google.com/sre/book/chapters/handling-overload.html.
+      max_concurrent_requests: the maximum number of requests to have in flight
+        at once for a batch. Each batch is split into up to this many requests
+        of consecutive examples, which are sent concurrently and retried and
+        throttled independently. Predictions are returned in the order of the
+        batch.
     """
+    if max_concurrent_requests < 1:
+      raise ValueError(
+          'max_concurrent_requests must be at least 1, got '
+          f'{max_concurrent_requests}')
     # Configure AdaptiveThrottler and throttling metrics for client-side
     # throttling behavior.
     self.throttled_secs = Metrics.counter(
@@ -386,6 +406,21 @@ class RemoteModelHandler(ABC, ModelHandler[ExampleT, PredictionT, ModelT]):
     self.num_retries = num_retries
     self.throttle_delay_secs = throttle_delay_secs
     self.retry_filter = retry_filter
+    self.max_concurrent_requests = max_concurrent_requests
+    # Created on first use since it cannot be pickled.
+    self._request_executor = None
+
+  def __getstate__(self):
+    # Copies don't share the executor, so that collecting a copy doesn't shut
+    # down the executor of the original.
+    state = self.__dict__.copy()
+    state['_request_executor'] = None
+    return state
+
+  def __del__(self):
+    executor = getattr(self, '_request_executor', None)
+    if executor is not None:
+      executor.shutdown(wait=False)
 
   def __init_subclass__(cls):
     if cls.load_model is not RemoteModelHandler.load_model:
@@ -416,14 +451,14 @@ class RemoteModelHandler(ABC, ModelHandler[ExampleT, PredictionT, ModelT]):
 
     return wrapper
 
-  @retry_on_exception
   def run_inference(
       self,
       batch: Sequence[ExampleT],
       model: ModelT,
       inference_args: Optional[dict[str, Any]] = None) -> Iterable[PredictionT]:
     """Runs inferences on a batch of examples. Calls a remote model for
-    predictions and will retry if a retryable exception is raised.
+    predictions and will retry if a retryable exception is raised. The batch
+    is split into up to max_concurrent_requests concurrent requests.
 
     Args:
       batch: A sequence of examples or features.
@@ -434,17 +469,58 @@ class RemoteModelHandler(ABC, ModelHandler[ExampleT, PredictionT, ModelT]):
     Returns:
       An Iterable of Predictions.
     """
-    while self.throttler.throttle_request(time.time() * _MILLISECOND_TO_SECOND):
+    # Metrics can only be updated from the bundle's thread, so throttling
+    # delays of concurrent requests are collected and reported here.
+    throttled_secs: list[int] = []
+    try:
+      if self.max_concurrent_requests == 1 or len(batch) <= 1:
+        return self._request_with_retries(
+            batch, model, inference_args, throttled_secs)
+      if self._request_executor is None:
+        self._request_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_concurrent_requests,
+            thread_name_prefix='RemoteModelHandler')
+      request_size = -(-len(batch) // self.max_concurrent_requests)
+      futures = [
+          self._request_executor.submit(
+              self._request_with_retries,
+              batch[start:start + request_size],
+              model,
+              inference_args,
+              throttled_secs) for start in range(0, len(batch), request_size)
+      ]
+      predictions = []
+      for future in futures:
+        predictions.extend(future.result())
+      return predictions
+    finally:
+      if throttled_secs:
+        self.throttled_secs.inc(sum(throttled_secs))
+
+  @retry_on_exception
+  def _request_with_retries(
+      self,
+      batch: Sequence[ExampleT],
+      model: ModelT,
+      inference_args: Optional[dict[str, Any]],
+      throttled_secs: list[int]) -> Iterable[PredictionT]:
+    while True:
+      with _THROTTLER_LOCK:
+        should_throttle = self.throttler.throttle_request(
+            time.time() * _MILLISECOND_TO_SECOND)
+      if not should_throttle:
+        break
       self.logger.info(
           "Delaying request for %d seconds due to previous failures",
           self.throttle_delay_secs)
       time.sleep(self.throttle_delay_secs)
-      self.throttled_secs.inc(self.throttle_delay_secs)
+      throttled_secs.append(self.throttle_delay_secs)
 
     try:
       req_time = time.time()
       predictions = self.request(batch, model, inference_args)
-      self.throttler.successful_request(req_time * _MILLISECOND_TO_SECOND)
+      with _THROTTLER_LOCK:
+        self.throttler.successful_request(req_time * _MILLISECOND_TO_SECOND)
       return predictions
     except Exception as e:
       self.logger.error("exception raised as part of request, got %s", e)
@@ -480,6 +556,12 @@ class _ModelManager:
   A class for efficiently managing copies of multiple models. Will load a
   single copy of each model into a multi_process_shared object and then
   return a lookup key for that object.
+
+  The number of models held can be limited by count and by their total size
+  in bytes. Without a byte limit, the least recently used model is evicted
+  first. With one, models are evicted according to GreedyDual-Size-Frequency,
+  which prefers to keep models that are used often, are expensive to load and
+  are small.
   """
   def __init__(self, mh_map: dict[str, ModelHandler]):
     """
@@ -488,6 +570,7 @@ class _ModelManager:
         model.
     """
     self._max_models = None
+    self._max_model_bytes = None
     # Map keys to model handlers
     self._mh_map: dict[str, ModelHandler] = mh_map
     # Map keys to the last updated model path for that key
@@ -499,6 +582,16 @@ class _ModelManager:
     # Map a tag to a multiprocessshared model object for that tag. Each entry
     # of this map should last as long as the corresponding entry in _tag_map.
     self._proxy_map: dict[str, multi_process_shared.MultiProcessShared] = {}
+    # Map keys to the estimated size in bytes and the load latency in
+    # milliseconds of their models, as measured the last time they were loaded.
+    self._key_to_model_bytes: dict[str, int] = {}
+    self._key_to_load_latency: dict[str, int] = {}
+    # The GreedyDual-Size-Frequency state of the loaded models: the number of
+    # uses since loading, the resulting eviction priority of each model, and
+    # the priority of the last evicted model, which ages the remaining ones.
+    self._key_to_uses: dict[str, int] = {}
+    self._key_to_priority: dict[str, float] = {}
+    self._priority_floor = 0.0
 
   def load(self, key: str) -> _ModelLoadStats:
     """
@@ -506,8 +599,9 @@ class _ModelManager:
     Args:
       key: the key associated with the model we'd like to load.
     Returns:
-      _ModelLoadStats with tag, byte size, and latency to load the model. If
-        the model was already loaded, byte size/latency will be None.
+      _ModelLoadStats with tag, byte size, and latency to load the model, as
+        well as the keys of any models evicted to make room for it. If the
+        model was already loaded, byte size/latency will be None.
     """
     # Map the key for a model to a unique tag that will persist until the model
     # is released. This needs to be unique between releasing/reacquiring th
@@ -515,6 +609,7 @@ class _ModelManager:
     # has been released and deleted.
     if key in self._tag_map:
       self._tag_map.move_to_end(key)
+      self._record_use(key)
       return _ModelLoadStats(self._tag_map[key], None, None)
     else:
       self._tag_map[key] = uuid.uuid4().hex
@@ -522,12 +617,13 @@ class _ModelManager:
     tag = self._tag_map[key]
     mh = self._mh_map[key]
 
+    evicted_keys = []
     if self._max_models is not None and self._max_models < len(self._tag_map):
-      # If we're about to exceed our LRU size, release the last used model.
-      tag_to_remove = self._tag_map.popitem(last=False)[1]
-      shared_handle, model_to_remove = self._proxy_map[tag_to_remove]
-      shared_handle.release(model_to_remove)
-      del self._proxy_map[tag_to_remove]
+      # If we're about to exceed our size, release the least valuable model.
+      evicted_keys.append(self._evict(self._next_to_evict(key)))
+    # If we know the size of this model from a previous load, make room for it
+    # before loading it.
+    evicted_keys.extend(self._evict_to_fit_budget(key))
 
     # Load the new model
     memory_before = _get_current_process_memory_in_bytes()
@@ -539,8 +635,74 @@ class _ModelManager:
     memory_after = _get_current_process_memory_in_bytes()
     end_time = _to_milliseconds(time.time_ns())
 
+    byte_size = memory_after - memory_before
+    self._key_to_model_bytes[key] = self._estimate_model_bytes(key, byte_size)
+    self._key_to_load_latency[key] = end_time - start_time
+    self._key_to_uses[key] = 0
+    self._record_use(key)
+    evicted_keys.extend(self._evict_to_fit_budget(key))
+
     return _ModelLoadStats(
-        tag, end_time - start_time, memory_after - memory_before)
+        tag,
+        end_time - start_time,
+        byte_size,
+        tuple(evicted_keys),
+        self.resident_bytes())
+
+  def _estimate_model_bytes(self, key: str, measured_bytes: int) -> int:
+    # Memory is measured as the peak resident set size, which only grows if
+    # loading this model exceeded the previous peak. Otherwise, fall back to
+    # an earlier measurement of this model, or the average model size.
+    if measured_bytes > 0:
+      return measured_bytes
+    elif self._key_to_model_bytes.get(key):
+      return self._key_to_model_bytes[key]
+    known_sizes = [size for size in self._key_to_model_bytes.values() if size]
+    if known_sizes:
+      return sum(known_sizes) // len(known_sizes)
+    return 0
+
+  def _record_use(self, key: str):
+    self._key_to_uses[key] = self._key_to_uses.get(key, 0) + 1
+    cost = max(self._key_to_load_latency.get(key, 0), 1)
+    size = max(self._key_to_model_bytes.get(key, 0), 1)
+    self._key_to_priority[key] = (
+        self._priority_floor + self._key_to_uses[key] * cost / size)
+
+  def _next_to_evict(self, key_to_keep: str) -> Optional[str]:
+    candidates = [key for key in self._tag_map if key != key_to_keep]
+    if not candidates:
+      return None
+    if self._max_model_bytes is None:
+      # _tag_map is in least recently used order.
+      return candidates[0]
+    return min(
+        candidates,
+        key=lambda key: self._key_to_priority.get(key, self._priority_floor))
+
+  def _evict(self, key: str) -> str:
+    tag_to_remove = self._tag_map.pop(key)
+    shared_handle, model_to_remove = self._proxy_map.pop(tag_to_remove)
+    shared_handle.release(model_to_remove)
+    self._key_to_uses.pop(key, None)
+    self._priority_floor = max(
+        self._priority_floor, self._key_to_priority.pop(key, 0.0))
+    return key
+
+  def _evict_to_fit_budget(self, key_to_keep: str) -> list[str]:
+    evicted_keys = []
+    if self._max_model_bytes is None:
+      return evicted_keys
+    while self.resident_bytes() > self._max_model_bytes:
+      key = self._next_to_evict(key_to_keep)
+      if key is None:
+        break
+      evicted_keys.append(self._evict(key))
+    return evicted_keys
+
+  def resident_bytes(self) -> int:
+    """Returns the estimated total size of the models currently held."""
+    return sum(self._key_to_model_bytes.get(key, 0) for key in self._tag_map)
 
   def increment_max_models(self, increment: int):
     """
@@ -553,6 +715,17 @@ class _ModelManager:
       self._max_models = 0
     self._max_models += increment
 
+  def increment_max_model_bytes(self, increment: int):
+    """
+    Increments the total size, in bytes, of the models that this instance of a
+    _ModelManager is able to hold. If it is never called, no limit is imposed.
+    Args:
+      increment: the amount by which we are incrementing the number of bytes.
+    """
+    if self._max_model_bytes is None:
+      self._max_model_bytes = 0
+    self._max_model_bytes += increment
+
   def update_model_handler(self, key: str, model_path: str, previous_key: str):
     """
     Updates the model path of this model handler and removes it from memory so
@@ -573,11 +746,7 @@ class _ModelManager:
       self._mh_map[key] = deepcopy(self._mh_map[previous_key])
     self._mh_map[key].update_model_path(model_path)
     if key in self._tag_map:
-      tag_to_remove = self._tag_map[key]
-      shared_handle, model_to_remove = self._proxy_map[tag_to_remove]
-      shared_handle.release(model_to_remove)
-      del self._tag_map[key]
-      del self._proxy_map[tag_to_remove]
+      self._evict(key)
 
 
 # Use a dataclass instead of named tuple because NamedTuples and generics don't
@@ -604,7 +773,8 @@ class KeyedModelHandler(Generic[KeyT, ExampleT, PredictionT, ModelT],
       unkeyed: Union[ModelHandler[ExampleT, PredictionT, ModelT],
                      list[KeyModelMapping[KeyT, ExampleT, PredictionT,
                                           ModelT]]],
-      max_models_per_worker_hint: Optional[int] = None):
+      max_models_per_worker_hint: Optional[int] = None,
+      max_model_bytes_per_worker_hint: Optional[int] = None):
     """A ModelHandler that takes keyed examples and returns keyed predictions.
 
     For example, if the original model is used with RunInference to take a
@@ -660,7 +830,9 @@ class KeyedModelHandler(Generic[KeyT, ExampleT, PredictionT, ModelT],
     Loading multiple models at the same time can increase the risk of an out of
     memory (OOM) exception. To avoid this issue, use the parameter
     `max_models_per_worker_hint` to limit the number of models that are loaded
-    at the same time. For more information about memory management, see
+    at the same time, or `max_model_bytes_per_worker_hint` to limit their total
+    size when models differ a lot in size. For more information about memory
+    management, see
     `Use a keyed `ModelHandler <https://beam.apache.org/documentation/ml/about-ml/#use-a-keyed-modelhandler-object>_`.  # pylint: disable=line-too-long
 
 
@@ -674,6 +846,11 @@ class KeyedModelHandler(Generic[KeyT, ExampleT, PredictionT, ModelT],
         take up 1 GB each, you should set this to 7 to allow all models to sit
         in memory with some buffer. For more information about memory management,
         see `Use a keyed `ModelHandler <https://beam.apache.org/documentation/ml/about-ml/#use-a-keyed-modelhandler-object>_`.  # pylint: disable=line-too-long
+      max_model_bytes_per_worker_hint: A hint to the runner indicating how many
+        bytes of models can be held in memory at one time per worker process.
+        The size of each model is measured as the growth in memory usage while
+        loading it. When this is exceeded, the models that are least often
+        used and cheapest to reload per byte are evicted first.
     """
     self._metrics_collectors: dict[str, _MetricsCollector] = {}
     self._default_metrics_collector: _MetricsCollector = None
@@ -692,6 +869,7 @@ class KeyedModelHandler(Generic[KeyT, ExampleT, PredictionT, ModelT],
       return
 
     self._max_models_per_worker_hint = max_models_per_worker_hint
+    self._max_model_bytes_per_worker_hint = max_model_bytes_per_worker_hint
     # To maintain an efficient representation, we will map all keys in a given
     # KeyModelMapping to a single id (the first key in the KeyModelMapping
     # list). We will then map that key to a ModelHandler. This will allow us to
@@ -775,6 +953,9 @@ class KeyedModelHandler(Generic[KeyT, ExampleT, PredictionT, ModelT],
       if lock.acquire(blocking=False):
         model.increment_max_models(self._max_models_per_worker_hint)
       self._max_models_per_worker_hint = None
+    if self._max_model_bytes_per_worker_hint is not None:
+      model.increment_max_model_bytes(self._max_model_bytes_per_worker_hint)
+      self._max_model_bytes_per_worker_hint = None
 
     batch_by_key = defaultdict(list)
     key_by_id = defaultdict(set)
@@ -792,6 +973,15 @@ class KeyedModelHandler(Generic[KeyT, ExampleT, PredictionT, ModelT],
             loaded_model.load_latency, loaded_model.byte_size)
         self._default_metrics_collector.update_load_model_metrics(
             loaded_model.load_latency, loaded_model.byte_size)
+        self._metrics_collectors[id].model_loads_counter.inc()
+        self._default_metrics_collector.model_loads_counter.inc()
+        for evicted_id in loaded_model.evicted_keys:
+          if evicted_id in self._metrics_collectors:
+            self._metrics_collectors[evicted_id].model_evictions_counter.inc()
+          self._default_metrics_collector.model_evictions_counter.inc()
+        if loaded_model.resident_bytes is not None:
+          self._default_metrics_collector.resident_model_bytes.set(
+              loaded_model.resident_bytes)
       keyed_model_shared_handle = multi_process_shared.MultiProcessShared(
           mh.load_model, tag=keyed_model_tag)
       keyed_model = keyed_model_shared_handle.acquire()
@@ -1280,6 +1470,10 @@ class RunInference(beam.PTransform[beam.PCollection[Union[ExampleT,
       model_metadata_pcoll: beam.PCollection[ModelMetadata] = None,
       watch_model_pattern: Optional[str] = None,
       model_identifier: Optional[str] = None,
+      async_model_updates: bool = False,
+      model_update_memory_headroom_bytes: Optional[int] = None,
+      max_cross_bundle_batch_size: Optional[int] = None,
+      max_cross_bundle_batch_wait_secs: float = 0.01,
       **kwargs):
     """
     A transform that takes a PCollection of examples (or features) for use
@@ -1310,6 +1504,23 @@ class RunInference(beam.PTransform[beam.PCollection[Union[ExampleT,
           the same tag for different models will lead to non-deterministic
           results, so exercise caution when using this parameter. This only
           impacts models which are already being shared across processes.
+        async_model_updates: If True, models updated through
+          model_metadata_pcoll or watch_model_pattern are loaded in the
+          background while the current model keeps serving inferences, and are
+          swapped in once loaded. This briefly holds both models in memory.
+        model_update_memory_headroom_bytes: Only used with async_model_updates.
+          If less than this much memory is available on the worker when an
+          update arrives, the current model is released and the new one is
+          loaded synchronously instead.
+        max_cross_bundle_batch_size: If set, batches from bundles that are
+          processed concurrently on the same worker process are combined into
+          batches of up to this many examples before running inference, which
+          helps when bundles are small, e.g. in streaming pipelines. Each
+          bundle still receives the predictions for its own examples. This is
+          not applied to models updated through side inputs.
+        max_cross_bundle_batch_wait_secs: The longest a batch waits for batches
+          from other bundles before running inference, when
+          max_cross_bundle_batch_size is set.
     """
     self._model_handler = model_handler
     self._inference_args = inference_args
@@ -1320,6 +1531,11 @@ class RunInference(beam.PTransform[beam.PCollection[Union[ExampleT,
     self._exception_handling_timeout = None
     self._timeout = None
     self._watch_model_pattern = watch_model_pattern
+    self._async_model_updates = async_model_updates
+    self._model_update_memory_headroom_bytes = (
+        model_update_memory_headroom_bytes)
+    self._max_cross_bundle_batch_size = max_cross_bundle_batch_size
+    self._max_cross_bundle_batch_wait_secs = max_cross_bundle_batch_wait_secs
     self._kwargs = kwargs
     # Generate a random tag to use for shared.py and multi_process_shared.py to
     # allow us to effectively disambiguate in multi-model settings. Only use
@@ -1432,7 +1648,13 @@ class RunInference(beam.PTransform[beam.PCollection[Union[ExampleT,
             self._clock,
             self._metrics_namespace,
             load_model_at_runtime,
-            self._model_tag),
+            self._model_tag,
+            async_model_updates=self._async_model_updates,
+            model_update_memory_headroom_bytes=(
+                self._model_update_memory_headroom_bytes),
+            max_cross_bundle_batch_size=self._max_cross_bundle_batch_size,
+            max_cross_bundle_batch_wait_secs=(
+                self._max_cross_bundle_batch_wait_secs)),
         self._inference_args,
         beam.pvalue.AsSingleton(
             self._model_metadata_pcoll,
@@ -1594,6 +1816,18 @@ class _MetricsCollector:
     # Model load latency in milliseconds.
     self._load_model_latency_milli_secs = beam.metrics.Metrics.distribution(
         namespace, prefix + 'load_model_latency_milli_secs')
+    # Loads and evictions of models held by a KeyedModelHandler, and the total
+    # size of the models it holds.
+    self.model_loads_counter = beam.metrics.Metrics.counter(
+        namespace, prefix + 'model_loads')
+    self.model_evictions_counter = beam.metrics.Metrics.counter(
+        namespace, prefix + 'model_evictions')
+    self.resident_model_bytes = beam.metrics.Metrics.gauge(
+        namespace, prefix + 'resident_model_bytes')
+    # Time from receiving a model update to swapping the model in, in
+    # milliseconds.
+    self._model_swap_latency_milli_secs = beam.metrics.Metrics.distribution(
+        namespace, prefix + 'model_swap_latency_milli_secs')
 
     # Metrics cache
     self._load_model_latency_milli_secs_cache = None
@@ -1616,6 +1850,9 @@ class _MetricsCollector:
     self._load_model_latency_milli_secs.update(load_model_latency_ms)
     self._model_byte_size.update(model_byte_size)
 
+  def update_model_swap_metrics(self, model_swap_latency_ms):
+    self._model_swap_latency_milli_secs.update(model_swap_latency_ms)
+
   def update(
       self,
       examples_count: int,
@@ -1771,6 +2008,106 @@ class _SharedModelWrapper():
     return self.models
 
 
+class _CrossBundleBatchRequest():
+  def __init__(self, batch: Sequence[Any], deadline: float):
+    self.batch = batch
+    self.deadline = deadline
+    self.predictions: Optional[list[Any]] = None
+    self.error: Optional[BaseException] = None
+
+  def done(self) -> bool:
+    return self.predictions is not None or self.error is not None
+
+
+class _CrossBundleBatcher():
+  """Combines batches submitted by concurrent bundles into larger batches.
+
+    A single instance is shared by all threads of a worker process. Batches
+    are queued and the thread that submitted the oldest queued batch runs
+    inference on behalf of the others once enough examples are queued or its
+    deadline passes. Each thread then receives the predictions for its own
+    batch.
+  """
+  def __init__(self, max_batch_size: int, max_wait_secs: float):
+    self._max_batch_size = max_batch_size
+    self._max_wait_secs = max_wait_secs
+    self._condition = threading.Condition()
+    self._queue: list[_CrossBundleBatchRequest] = []
+    self._queued_examples = 0
+
+  def _take_requests(self) -> list[_CrossBundleBatchRequest]:
+    # Always take the first request, even if it is larger than a batch.
+    num_requests = 1
+    num_examples = len(self._queue[0].batch)
+    while (num_requests < len(self._queue) and
+           num_examples + len(self._queue[num_requests].batch)
+           <= self._max_batch_size):
+      num_examples += len(self._queue[num_requests].batch)
+      num_requests += 1
+    requests = self._queue[:num_requests]
+    del self._queue[:num_requests]
+    self._queued_examples -= num_examples
+    return requests
+
+  def run_inference(
+      self,
+      batch: Sequence[Any],
+      inference_fn: Callable[[Sequence[Any]], Sequence[Any]]) -> list[Any]:
+    """Runs inference for the batch, possibly together with others.
+
+    Args:
+      batch: the examples to run inference on.
+      inference_fn: returns one prediction per example of a batch. This may
+        be called on behalf of other threads if this thread runs inference.
+
+    Returns:
+      the predictions for the examples in batch.
+    """
+    request = _CrossBundleBatchRequest(
+        batch, time.monotonic() + self._max_wait_secs)
+    requests = None
+    with self._condition:
+      self._queue.append(request)
+      self._queued_examples += len(batch)
+      self._condition.notify_all()
+      while not request.done():
+        if self._queue and self._queue[0] is request:
+          time_left = request.deadline - time.monotonic()
+          if (self._queued_examples < self._max_batch_size and time_left > 0):
+            self._condition.wait(time_left)
+            continue
+          requests = self._take_requests()
+          # Let the next queued request start waiting for its own batch.
+          self._condition.notify_all()
+          break
+        self._condition.wait()
+
+    if requests is not None:
+      try:
+        predictions = list(
+            inference_fn(
+                [example for queued in requests for example in queued.batch]))
+        num_examples = sum(len(queued.batch) for queued in requests)
+        if len(predictions) != num_examples:
+          raise ValueError(
+              'Cannot combine batches across bundles: expected one prediction '
+              f'per example, but got {len(predictions)} predictions for '
+              f'{num_examples} examples.')
+        start = 0
+        for queued in requests:
+          queued.predictions = predictions[start:start + len(queued.batch)]
+          start += len(queued.batch)
+      except BaseException as e:
+        for queued in requests:
+          queued.error = e
+      with self._condition:
+        self._condition.notify_all()
+
+    if request.error is not None:
+      raise request.error
+    return request.predictions
+
+
 class _RunInferenceDoFn(beam.DoFn, Generic[ExampleT, PredictionT]):
   def __init__(
       self,
@@ -1778,7 +2115,11 @@ class _RunInferenceDoFn(beam.DoFn, Generic[ExampleT, PredictionT]):
       clock,
       metrics_namespace,
       load_model_at_runtime: bool = False,
-      model_tag: str = "RunInference"):
+      model_tag: str = "RunInference",
+      async_model_updates: bool = False,
+      model_update_memory_headroom_bytes: Optional[int] = None,
+      max_cross_bundle_batch_size: Optional[int] = None,
+      max_cross_bundle_batch_wait_secs: float = 0.01):
     """A DoFn implementation generic to frameworks.
 
       Args:
@@ -1790,6 +2131,15 @@ class _RunInferenceDoFn(beam.DoFn, Generic[ExampleT, PredictionT]):
             inputs to get the model path or we want to enforce a timeout on
             model loading.
         model_tag: Tag to use to disambiguate models in multi-model settings.
+        async_model_updates: Bool to indicate if models updated by side input
+            should be loaded in the background while the current model keeps
+            serving.
+        model_update_memory_headroom_bytes: The memory that must be available
+            to load an updated model in the background.
+        max_cross_bundle_batch_size: If set, the maximum number of examples to
+            combine from batches of concurrent bundles.
+        max_cross_bundle_batch_wait_secs: The longest a batch waits to be
+            combined with batches of other bundles.
     """
     self._model_handler = model_handler
     self._shared_model_handle = shared.Shared()
@@ -1802,30 +2152,64 @@ class _RunInferenceDoFn(beam.DoFn, Generic[ExampleT, PredictionT]):
     # _cur_tag is the tag of the actually loaded model
     self._model_tag = model_tag
     self._cur_tag = model_tag
+    self._async_model_updates = async_model_updates
+    self._model_update_memory_headroom_bytes = (
+        model_update_memory_headroom_bytes)
+    self._model_loader = None
+    # The future of a model being loaded in the background, together with the
+    # metrics collector to use for it and the time the update was received.
+    self._pending_model = None
+    self._max_cross_bundle_batch_size = max_cross_bundle_batch_size
+    self._max_cross_bundle_batch_wait_secs = max_cross_bundle_batch_wait_secs
+    self._batcher = None
 
   def _load_model(
       self,
       side_input_model_path: Optional[Union[str,
-                                            list[KeyModelPathMapping]]] = None
+                                            list[KeyModelPathMapping]]] = None,
+      metrics_collector: Optional[_MetricsCollector] = None
   ) -> _SharedModelWrapper:
+    self._cur_tag, model_wrapper = self._acquire_model(
+        self._model_handler, side_input_model_path, metrics_collector)
+    # since shared_model_handle is shared across threads, the model path
+    # might not get updated in the model handler
+    # because we directly get cached weak ref model from shared cache, instead
+    # of calling load(). For sanity check, call update_model_path again.
+    if isinstance(side_input_model_path, str):
+      self._model_handler.update_model_path(side_input_model_path)
+    else:
+      if self._model is not None:
+        models = self._model.all_models()
+        for m in models:
+          self._model_handler.update_model_paths(m, side_input_model_path)
+    return model_wrapper
+
+  def _acquire_model(
+      self,
+      model_handler: ModelHandler,
+      side_input_model_path: Optional[Union[str, list[KeyModelPathMapping]]],
+      metrics_collector: Optional[_MetricsCollector]
+  ) -> tuple[str, _SharedModelWrapper]:
+    """Returns the tag of the model at side_input_model_path and the model,
+    loading it with model_handler unless it is already shared."""
     def load():
       """Function for constructing shared LoadedModel."""
       memory_before = _get_current_process_memory_in_bytes()
       start_time = _to_milliseconds(self._clock.time_ns())
       if isinstance(side_input_model_path, str):
-        self._model_handler.update_model_path(side_input_model_path)
+        model_handler.update_model_path(side_input_model_path)
       else:
         if self._model is not None:
           models = self._model.all_models()
           for m in models:
-            self._model_handler.update_model_paths(m, side_input_model_path)
-      model = self._model_handler.load_model()
+            model_handler.update_model_paths(m, side_input_model_path)
+      model = model_handler.load_model()
       end_time = _to_milliseconds(self._clock.time_ns())
       memory_after = _get_current_process_memory_in_bytes()
       load_model_latency_ms = end_time - start_time
       model_byte_size = memory_after - memory_before
-      if self._metrics_collector:
-        self._metrics_collector.cache_load_model_metrics(
+      if metrics_collector:
+        metrics_collector.cache_load_model_metrics(
             load_model_latency_ms, model_byte_size)
       return model
 
@@ -1835,30 +2219,18 @@ class _RunInferenceDoFn(beam.DoFn, Generic[ExampleT, PredictionT]):
     if isinstance(side_input_model_path, str) and side_input_model_path != '':
       model_tag = side_input_model_path
     # Ensure the tag we're loading is valid, if not replace it with a valid tag
-    self._cur_tag = self._model_metadata.get_valid_tag(model_tag)
-    if self._model_handler.share_model_across_processes():
+    tag = self._model_metadata.get_valid_tag(model_tag)
+    if model_handler.share_model_across_processes():
       models = []
-      for copy_tag in _get_tags_for_copies(self._cur_tag,
-                                           self._model_handler.model_copies()):
+      for copy_tag in _get_tags_for_copies(tag, model_handler.model_copies()):
         models.append(
             multi_process_shared.MultiProcessShared(
                 load, tag=copy_tag, always_proxy=True).acquire())
-      model_wrapper = _SharedModelWrapper(models, self._cur_tag)
+      model_wrapper = _SharedModelWrapper(models, tag)
     else:
-      model = self._shared_model_handle.acquire(load, tag=self._cur_tag)
-      model_wrapper = _SharedModelWrapper([model], self._cur_tag)
-    # since shared_model_handle is shared across threads, the model path
-    # might not get updated in the model handler
-    # because we directly get cached weak ref model from shared cache, instead
-    # of calling load(). For sanity check, call update_model_path again.
-    if isinstance(side_input_model_path, str):
-      self._model_handler.update_model_path(side_input_model_path)
-    else:
-      if self._model is not None:
-        models = self._model.all_models()
-        for m in models:
-          self._model_handler.update_model_paths(m, side_input_model_path)
-    return model_wrapper
+      model = self._shared_model_handle.acquire(load, tag=tag)
+      model_wrapper = _SharedModelWrapper([model], tag)
+    return tag, model_wrapper
 
   def get_metrics_collector(self, prefix: str = ''):
     """
@@ -1879,13 +2251,85 @@ class _RunInferenceDoFn(beam.DoFn, Generic[ExampleT, PredictionT]):
     self._model_metadata = load_model_status(
         self._model_tag, self._model_handler.share_model_across_processes())
     if not self._load_model_at_runtime:
-      self._model = self._load_model()
+      self._model = self._load_model(metrics_collector=self._metrics_collector)
+    if self._max_cross_bundle_batch_size is not None:
+      # The batcher is shared through the model's handle under its own tag.
+      self._batcher = self._shared_model_handle.acquire(
+          lambda: _CrossBundleBatcher(
+              self._max_cross_bundle_batch_size, self.
+              _max_cross_bundle_batch_wait_secs),
+          tag=f'{self._model_tag}_batcher')
 
   def update_model(
       self,
       side_input_model_path: Optional[Union[str,
                                             list[KeyModelPathMapping]]] = None):
-    self._model = self._load_model(side_input_model_path=side_input_model_path)
+    # A model still loading in the background must not replace this one.
+    self._discard_pending_model()
+    self._model = self._load_model(
+        side_input_model_path=side_input_model_path,
+        metrics_collector=self._metrics_collector)
+
+  def _discard_pending_model(self):
+    if self._pending_model is not None:
+      self._pending_model[0].cancel()
+      self._pending_model = None
+
+  def _can_update_model_async(self) -> bool:
+    if not self._async_model_updates or self._model is None:
+      return False
+    if self._model_update_memory_headroom_bytes is None:
+      return True
+    available_memory = _get_available_memory_in_bytes()
+    return (
+        available_memory is None or
+        available_memory >= self._model_update_memory_headroom_bytes)
+
+  def _update_model_async(self, model_metadata: ModelMetadata):
+    """Starts loading the model in the background if no other model is being
+    loaded. The current model keeps serving until _maybe_swap_model swaps the
+    new model in."""
+    if self._pending_model is not None:
+      return
+    metrics_collector = self.get_metrics_collector(
+        prefix=model_metadata.model_name)
+    if self._model_loader is None:
+      self._model_loader = concurrent.futures.ThreadPoolExecutor(
+          max_workers=1, thread_name_prefix='RunInferenceModelLoader')
+    # The loader only computes the tag and the model, using its own copy of
+    # the model handler, so that the model handler serving the current model
+    # and the state of this DoFn are only changed on the bundle thread.
+    self._pending_model = (
+        self._model_loader.submit(
+            self._acquire_model,
+            _copy_model_handler(self._model_handler),
+            model_metadata.model_id,
+            metrics_collector),
+        model_metadata.model_id,
+        metrics_collector,
+        _to_milliseconds(self._clock.time_ns()))
+
+  def _maybe_swap_model(self):
+    if self._pending_model is None or not self._pending_model[0].done():
+      return
+    model_future, model_path, metrics_collector, update_time = (
+        self._pending_model)
+    self._pending_model = None
+    try:
+      tag, model = model_future.result()
+    except Exception:  # pylint: disable=broad-except
+      # Keep serving the current model. As the side input path is unchanged,
+      # the update is retried with the next batch.
+      logging.exception('Failed to load model %s', model_path)
+      return
+    self._model_handler.update_model_path(model_path)
+    self._cur_tag = tag
+    self._side_input_path = model_path
+    self._model = model
+    self._metrics_collector = metrics_collector
+    if self._metrics_collector:
+      self._metrics_collector.update_model_swap_metrics(
+          _to_milliseconds(self._clock.time_ns()) - update_time)
 
   def _run_inference(self, batch, inference_args):
     start_time = _to_microseconds(self._clock.time_ns())
@@ -1931,10 +2375,14 @@ class _RunInferenceDoFn(beam.DoFn, Generic[ExampleT, PredictionT]):
       side input is empty or the model has not been updated, the method
       simply runs inference on the batch of data.
     """
+    self._maybe_swap_model()
     if not si_model_metadata:
       if (not self._model_metadata.is_valid_tag(self._cur_tag) or
           self._model is None):
         self.update_model(side_input_model_path=None)
+      if self._batcher is not None:
+        return self._batcher.run_inference(
+            batch, lambda b: self._run_inference(b, inference_args))
       return self._run_inference(batch, inference_args)
 
     if isinstance(si_model_metadata, beam.pvalue.EmptySideInput):
@@ -1944,9 +2392,21 @@ class _RunInferenceDoFn(beam.DoFn, Generic[ExampleT, PredictionT]):
       # TODO(https://github.com/apache/beam/issues/27628): Update metrics here
       self.update_model(si_model_metadata)
     elif self._side_input_path != si_model_metadata.model_id:
+      if self._pending_model is not None:
+        # Keep serving the current model until the model being loaded is
+        # swapped in. The load uses up the memory headroom, so it must not
+        # be checked again meanwhile.
+        return self._run_inference(batch, inference_args)
+      if self._can_update_model_async():
+        self._update_model_async(si_model_metadata)
+        return self._run_inference(batch, inference_args)
       self._side_input_path = si_model_metadata.model_id
       self._metrics_collector = self.get_metrics_collector(
           prefix=si_model_metadata.model_name)
+      if self._async_model_updates:
+        # There isn't enough memory to hold both models, so release the
+        # current model before loading the new one.
+        self._model = None
       lock = threading.Lock()
       with lock:
         self.update_model(si_model_metadata.model_id)
@@ -1970,6 +2430,21 @@ class _RunInferenceDoFn(beam.DoFn, Generic[ExampleT, PredictionT]):
                                                   tag).unsafe_hard_delete()
       self._model_metadata.mark_tags_deleted(tags_to_gc)
 
+  def teardown(self):
+    if self._model_loader is not None:
+      self._model_loader.shutdown(wait=False)
+      self._model_loader = None
+
+
+def _copy_model_handler(model_handler: ModelHandler) -> ModelHandler:
+  """Returns a shallow copy of model_handler, and of the model handlers it
+  wraps, whose model path can be updated without affecting model_handler."""
+  handler_copy = copy(model_handler)
+  for name, value in list(vars(handler_copy).items()):
+    if isinstance(value, ModelHandler):
+      setattr(handler_copy, name, _copy_model_handler(value))
+  return handler_copy
+
 
 def _is_darwin() -> bool:
   return sys.platform == 'darwin'
@@ -1993,6 +2468,22 @@ def _get_current_process_memory_in_bytes():
   return 0
 
 
+def _get_available_memory_in_bytes() -> Optional[int]:
+  """
+  Returns:
+    memory available for starting new processes or allocations in bytes, or
+    None if it cannot be determined on this platform.
+  """
+  try:
+    with open('/proc/meminfo') as f:
+      for line in f:
+        if line.startswith('MemAvailable:'):
+          return int(line.split()[1]) * 1024
+  except (OSError, ValueError):
+    pass
+  return None
+
+
 def _get_tags_for_copies(base_tag, num_copies):
   tags = []
   for i in range(num_copies):
@@ -16,19 +16,23 @@
 #
 
 """Tests for apache_beam.ml.base."""
+import copy
 import math
 import os
 import pickle
 import sys
 import tempfile
+import threading
 import time
 import unittest
+import uuid
 from collections.abc import Iterable
 from collections.abc import Mapping
 from collections.abc import Sequence
 from typing import Any
 from typing import Optional
 from typing import Union
+from unittest import mock
 
 import pytest
 
@@ -231,6 +235,32 @@ class FakeModelHandlerReturnsPredictionResult(
     return self._multi_process_shared
 
 
+class FakeBlockingLoadModelHandler(base.ModelHandler[int,
+                                                     int,
+                                                     FakeStatefulModel]):
+  """Loads models predicting their (integer) path, blocking on loading the
+  model at blocked_path until unblock_load is set."""
+  def __init__(self, blocked_path):
+    self._model_path = '1'
+    self._blocked_path = blocked_path
+    self.unblock_load = threading.Event()
+    self.load_failures = []
+
+  def load_model(self):
+    if self.load_failures:
+      raise self.load_failures.pop()
+    model_path = self._model_path
+    if model_path == self._blocked_path:
+      self.unblock_load.wait()
+    return FakeStatefulModel(int(model_path))
+
+  def run_inference(self, batch, model, inference_args=None):
+    return [model.predict(example) for example in batch]
+
+  def update_model_path(self, model_path: Optional[str] = None):
+    self._model_path = model_path or self._model_path
+
+
 class FakeModelHandlerNoEnvVars(base.ModelHandler[int, int, FakeModel]):
   def __init__(
       self, clock=None, min_batch_size=1, max_batch_size=9999, **kwargs):
@@ -496,6 +526,32 @@ class RunInferenceBaseTest(unittest.TestCase):
     self.assertGreater(load_latency_dist_aggregate.committed.count, 2)
     self.assertLess(load_latency_dist_aggregate.committed.count, 12)
 
+  def test_run_inference_impl_with_keyed_examples_many_mhs_max_bytes_hint(self):
+    pipeline = TestPipeline()
+    examples = [1, 5, 3, 10, 2, 4, 6, 8, 9, 7]
+    metrics_namespace = 'test_namespace'
+    keyed_examples = [(i, example) for i, example in enumerate(examples)]
+    pcoll = pipeline | 'start' >> beam.Create(keyed_examples)
+    mhs = [
+        base.KeyModelMapping([0, 2, 4, 6, 8],
+                             FakeModelHandler(
+                                 state=200, multi_process_shared=True)),
+        base.KeyModelMapping([1, 3, 5, 7, 9],
+                             FakeModelHandler(multi_process_shared=True))
+    ]
+    actual = pcoll | base.RunInference(
+        base.KeyedModelHandler(mhs, max_model_bytes_per_worker_hint=1 << 30),
+        metrics_namespace=metrics_namespace)
+    expected = [(i, 200 if i % 2 == 0 else example + 1)
+                for i, example in keyed_examples]
+    assert_that(actual, equal_to(expected))
+    result = pipeline.run()
+    result.wait_until_finish()
+
+    metrics_filter = MetricsFilter().with_name('model_loads')
+    metrics = result.metrics().query(metrics_filter)
+    self.assertEqual(metrics['counters'][0].committed, 2)
+
   def test_keyed_many_model_handlers_validation(self):
     def mult_two(example: str) -> int:
       return int(example) * 2
@@ -1558,6 +1614,174 @@ class RunInferenceBaseTest(unittest.TestCase):
 
       assert_that(result_pcoll, equal_to(expected_result))
 
+  def test_run_inference_dofn_swaps_model_async(self):
+    model_handler = FakeBlockingLoadModelHandler(blocked_path='2')
+    dofn = base._RunInferenceDoFn(
+        model_handler,
+        time,
+        'test_namespace',
+        load_model_at_runtime=True,
+        model_tag=uuid.uuid4().hex,
+        async_model_updates=True)
+    dofn.setup()
+    self.assertEqual([1, 1],
+                     dofn.process([5, 6], None, base.ModelMetadata('1', 'a')))
+    # The old model keeps serving while the new one is loaded.
+    self.assertEqual([1], dofn.process([5], None, base.ModelMetadata('2', 'b')))
+    self.assertEqual([1], dofn.process([5], None, base.ModelMetadata('2', 'b')))
+    model_handler.unblock_load.set()
+    dofn._pending_model[0].result(timeout=60)
+    self.assertEqual([2], dofn.process([5], None, base.ModelMetadata('2', 'b')))
+    dofn.teardown()
+
+  def test_run_inference_dofn_retries_failed_async_model_load(self):
+    model_handler = FakeBlockingLoadModelHandler(blocked_path=None)
+    dofn = base._RunInferenceDoFn(
+        model_handler,
+        time,
+        'test_namespace',
+        load_model_at_runtime=True,
+        model_tag=uuid.uuid4().hex,
+        async_model_updates=True)
+    dofn.setup()
+    self.assertEqual([1], dofn.process([5], None, base.ModelMetadata('1', 'a')))
+    model_handler.load_failures.append(ValueError('Load failed'))
+    self.assertEqual([1], dofn.process([5], None, base.ModelMetadata('2', 'b')))
+    with self.assertRaisesRegex(ValueError, 'Load failed'):
+      dofn._pending_model[0].result(timeout=60)
+    # The old model keeps serving, and the model handler it uses is unchanged.
+    self.assertEqual([1], dofn.process([5], None, base.ModelMetadata('2', 'b')))
+    self.assertEqual('1', model_handler._model_path)
+    # The update is retried.
+    dofn._pending_model[0].result(timeout=60)
+    self.assertEqual([2], dofn.process([5], None, base.ModelMetadata('2', 'b')))
+    self.assertEqual('2', model_handler._model_path)
+    dofn.teardown()
+
+  def test_run_inference_dofn_swaps_model_sync_without_memory_headroom(self):
+    model_handler = FakeBlockingLoadModelHandler(blocked_path=None)
+    dofn = base._RunInferenceDoFn(
+        model_handler,
+        time,
+        'test_namespace',
+        load_model_at_runtime=True,
+        model_tag=uuid.uuid4().hex,
+        async_model_updates=True,
+        model_update_memory_headroom_bytes=1 << 62)
+    dofn.setup()
+    self.assertEqual([1], dofn.process([5], None, base.ModelMetadata('1', 'a')))
+    self.assertEqual([2], dofn.process([5], None, base.ModelMetadata('2', 'b')))
+    self.assertIsNone(dofn._pending_model)
+    dofn.teardown()
+
+  def test_run_inference_dofn_keeps_serving_while_loading_without_headroom(
+      self):
+    model_handler = FakeBlockingLoadModelHandler(blocked_path='2')
+    dofn = base._RunInferenceDoFn(
+        model_handler,
+        time,
+        'test_namespace',
+        load_model_at_runtime=True,
+        model_tag=uuid.uuid4().hex,
+        async_model_updates=True,
+        model_update_memory_headroom_bytes=1)
+    dofn.setup()
+    with mock.patch.object(base,
+                           '_get_available_memory_in_bytes',
+                           return_value=1):
+      self.assertEqual([1],
+                       dofn.process([5], None, base.ModelMetadata('1', 'a')))
+      self.assertEqual([1],
+                       dofn.process([5], None, base.ModelMetadata('2', 'b')))
+    # The model being loaded uses up the headroom, which must not make the
+    # next batch load the model again on the bundle thread.
+    with mock.patch.object(base,
+                           '_get_available_memory_in_bytes',
+                           return_value=0):
+      self.assertEqual([1],
+                       dofn.process([5], None, base.ModelMetadata('2', 'b')))
+      self.assertIsNotNone(dofn._model)
+      model_handler.unblock_load.set()
+      dofn._pending_model[0].result(timeout=60)
+      self.assertEqual([2],
+                       dofn.process([5], None, base.ModelMetadata('2', 'b')))
+    dofn.teardown()
+
+  def test_run_inference_dofn_sync_update_discards_pending_model(self):
+    model_handler = FakeBlockingLoadModelHandler(blocked_path='2')
+    dofn = base._RunInferenceDoFn(
+        model_handler,
+        time,
+        'test_namespace',
+        load_model_at_runtime=True,
+        model_tag=uuid.uuid4().hex,
+        async_model_updates=True)
+    dofn.setup()
+    self.assertEqual([1], dofn.process([5], None, base.ModelMetadata('1', 'a')))
+    self.assertEqual([1], dofn.process([5], None, base.ModelMetadata('2', 'b')))
+    model_handler.unblock_load.set()
+    dofn._pending_model[0].result(timeout=60)
+    dofn.update_model('3')
+    self.assertIsNone(dofn._pending_model)
+    # The older model loaded in the background is not swapped in.
+    self.assertEqual([3], dofn.process([5], None, base.ModelMetadata('3', 'c')))
+    dofn.teardown()
+
+  def test_cross_bundle_batcher_combines_concurrent_batches(self):
+    batcher = base._CrossBundleBatcher(max_batch_size=6, max_wait_secs=60)
+    inference_batches = []
+
+    def inference_fn(batch):
+      inference_batches.append(list(batch))
+      return [example * 10 for example in batch]
+
+    results = {}
+
+    def run(batch):
+      results[batch[0]] = batcher.run_inference(batch, inference_fn)
+
+    threads = [
+        threading.Thread(target=run, args=(batch, ))
+        for batch in ([1, 2], [3, 4], [5, 6])
+    ]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join(timeout=60)
+    # The batch is full once all three bundles have submitted their batches.
+    self.assertEqual(1, len(inference_batches))
+    self.assertCountEqual([1, 2, 3, 4, 5, 6], inference_batches[0])
+    self.assertEqual({1: [10, 20], 3: [30, 40], 5: [50, 60]}, results)
+
+  def test_cross_bundle_batcher_runs_partial_batch_after_deadline(self):
+    batcher = base._CrossBundleBatcher(max_batch_size=100, max_wait_secs=0.01)
+    self.assertEqual([2, 4],
+                     batcher.run_inference([1, 2],
+                                           lambda b: [e * 2 for e in b]))
+    self.assertEqual([6],
+                     batcher.run_inference([3], lambda b: [e * 2 for e in b]))
+
+  def test_cross_bundle_batcher_raises_inference_errors(self):
+    batcher = base._CrossBundleBatcher(max_batch_size=1, max_wait_secs=60)
+
+    def inference_fn(batch):
+      raise ValueError('Inference failed')
+
+    with self.assertRaisesRegex(ValueError, 'Inference failed'):
+      batcher.run_inference([1], inference_fn)
+    with self.assertRaisesRegex(ValueError, 'one prediction per example'):
+      batcher.run_inference([1], lambda batch: [])
+
+  def test_run_inference_cross_bundle_batching(self):
+    with TestPipeline() as pipeline:
+      examples = list(range(20))
+      pcoll = pipeline | 'start' >> beam.Create(examples)
+      actual = pcoll | base.RunInference(
+          FakeModelHandler(),
+          max_cross_bundle_batch_size=8,
+          max_cross_bundle_batch_wait_secs=0.001)
+      assert_that(actual, equal_to([example + 1 for example in examples]))
+
   @unittest.skipIf(
       not TestPipeline().get_pipeline_options().view_as(
           StandardOptions).streaming,
@@ -1734,6 +1958,58 @@ class RunInferenceBaseTest(unittest.TestCase):
         mh3.load_model, tag=tag3).acquire()
     self.assertEqual(8, model3.predict(10))
 
+  def _load_with_size(self, mm, key, byte_size, load_latency=10):
+    with mock.patch.object(base,
+                           '_get_current_process_memory_in_bytes',
+                           side_effect=[0, byte_size]):
+      with mock.patch.object(base,
+                             '_to_milliseconds',
+                             side_effect=[0, load_latency]):
+        return mm.load(key)
+
+  def test_model_manager_evicts_models_over_byte_budget(self):
+    mhs = {
+        'key1': FakeModelHandler(state=1),
+        'key2': FakeModelHandler(state=2),
+        'key3': FakeModelHandler(state=3)
+    }
+    mm = base._ModelManager(mh_map=mhs)
+    mm.increment_max_model_bytes(200)
+    mm.increment_max_model_bytes(100)
+    stats = self._load_with_size(mm, 'key1', 100)
+    self.assertEqual((), stats.evicted_keys)
+    self.assertEqual(100, stats.resident_bytes)
+    stats = self._load_with_size(mm, 'key2', 200)
+    self.assertEqual((), stats.evicted_keys)
+    self.assertEqual(300, stats.resident_bytes)
+    # Already loaded models aren't reloaded, but are now used more often.
+    self.assertIsNone(mm.load('key1').byte_size)
+    self.assertIsNone(mm.load('key1').byte_size)
+
+    # key2 is the most recently used model, but it is used the least per byte.
+    stats = self._load_with_size(mm, 'key3', 100)
+    self.assertEqual(('key2', ), stats.evicted_keys)
+    self.assertEqual(200, stats.resident_bytes)
+
+    stats = self._load_with_size(mm, 'key2', 200)
+    self.assertEqual(('key3', ), stats.evicted_keys)
+    self.assertEqual(300, stats.resident_bytes)
+    self.assertIsNone(mm.load('key1').byte_size)
+
+  def test_model_manager_estimates_unmeasured_model_bytes(self):
+    mhs = {
+        'key1': FakeModelHandler(state=1),
+        'key2': FakeModelHandler(state=2),
+        'key3': FakeModelHandler(state=3)
+    }
+    mm = base._ModelManager(mh_map=mhs)
+    self.assertEqual(100, self._load_with_size(mm, 'key1', 100).resident_bytes)
+    self.assertEqual(300, self._load_with_size(mm, 'key2', 200).resident_bytes)
+    # Peak memory didn't grow, so the average size of known models is used.
+    stats = self._load_with_size(mm, 'key3', 0)
+    self.assertEqual(0, stats.byte_size)
+    self.assertEqual(450, stats.resident_bytes)
+
   def test_run_inference_loads_different_models(self):
     mh1 = FakeModelHandler(incrementing=True, min_batch_size=3)
     with TestPipeline() as pipeline:
@@ -1894,6 +2170,7 @@ class FakeRemoteModelHandler(base.RemoteModelHandler[int, int, FakeModel]):
       min_batch_size=1,
       max_batch_size=9999,
       retry_filter=_always_retry,
+      max_concurrent_requests=1,
       **kwargs):
     self._fake_clock = clock
     self._min_batch_size = min_batch_size
@@ -1901,7 +2178,9 @@ class FakeRemoteModelHandler(base.RemoteModelHandler[int, int, FakeModel]):
     self._env_vars = kwargs.get('env_vars', {})
     self._multi_process_shared = multi_process_shared
     super().__init__(
-        namespace='FakeRemoteModelHandler', retry_filter=retry_filter)
+        namespace='FakeRemoteModelHandler',
+        retry_filter=retry_filter,
+        max_concurrent_requests=max_concurrent_requests)
 
   def create_client(self):
     return FakeModel()
@@ -2020,6 +2299,46 @@ class RunInferenceRemoteTest(unittest.TestCase):
       actual = pcoll | base.RunInference(FakeFailsOnceRemoteModelHandler())
       assert_that(actual, equal_to(expected), label='assert:inferences')
 
+  def test_concurrent_requests(self):
+    class RecordingRemoteModelHandler(FakeRemoteModelHandler):
+      def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = []
+        self.all_requests_sent = threading.Barrier(3)
+
+      def request(self, batch, model, inference_args=None):
+        self.requests.append(list(batch))
+        # Only returns once all three requests are in flight.
+        self.all_requests_sent.wait(timeout=60)
+        return super().request(batch, model, inference_args)
+
+    handler = RecordingRemoteModelHandler(max_concurrent_requests=3)
+    predictions = handler.run_inference(list(range(8)), FakeModel())
+    self.assertEqual([example + 1 for example in range(8)], predictions)
+    self.assertCountEqual([[0, 1, 2], [3, 4, 5], [6, 7]], handler.requests)
+
+  def test_concurrent_requests_in_pipeline(self):
+    with TestPipeline() as pipeline:
+      examples = list(range(20))
+      expected = [example + 1 for example in examples]
+      pcoll = pipeline | 'start' >> beam.Create(examples)
+      actual = pcoll | base.RunInference(
+          FakeRemoteModelHandler(min_batch_size=10, max_concurrent_requests=4))
+      assert_that(actual, equal_to(expected), label='assert:inferences')
+
+  def test_request_executor_is_not_copied_and_shut_down(self):
+    handler = FakeRemoteModelHandler(max_concurrent_requests=2)
+    handler.run_inference([1, 2], FakeModel())
+    executor = handler._request_executor
+    self.assertIsNone(copy.copy(handler)._request_executor)
+    handler.__del__()
+    with self.assertRaises(RuntimeError):
+      executor.submit(lambda: None)
+
+  def test_invalid_max_concurrent_requests(self):
+    with self.assertRaises(ValueError):
+      FakeRemoteModelHandler(max_concurrent_requests=0)
+
   def test_exception_on_load_model_override(self):
     with self.assertRaises(Exception):
 
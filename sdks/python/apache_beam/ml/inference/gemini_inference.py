@@ -74,6 +74,7 @@ class GeminiModelHandler(RemoteModelHandler[Any, PredictionResult,
       min_batch_size: Optional[int] = None,
       max_batch_size: Optional[int] = None,
       max_batch_duration_secs: Optional[int] = None,
+      max_concurrent_requests: int = 1,
       **kwargs):
     """Implementation of the ModelHandler interface for Google Gemini.
     **NOTE:** This API and its implementation are under development and
@@ -105,6 +106,8 @@ class GeminiModelHandler(RemoteModelHandler[Any, PredictionResult,
         inputs.
       max_batch_duration_secs: optional. the maximum amount of time to buffer 
         a batch before emitting; used in streaming contexts.
+      max_concurrent_requests: optional. the maximum number of requests to
+        send to Gemini concurrently for a batch.
     """
     self._batching_kwargs = {}
     self._env_vars = kwargs.get('env_vars', {})
@@ -134,6 +137,7 @@ class GeminiModelHandler(RemoteModelHandler[Any, PredictionResult,
     super().__init__(
         namespace='GeminiModelHandler',
         retry_filter=_retry_on_appropriate_service_error,
+        max_concurrent_requests=max_concurrent_requests,
         **kwargs)
 
   def create_client(self) -> genai.Client:
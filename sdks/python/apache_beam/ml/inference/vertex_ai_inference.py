@@ -67,6 +67,7 @@ class VertexAIModelHandlerJSON(RemoteModelHandler[Any,
       min_batch_size: Optional[int] = None,
       max_batch_size: Optional[int] = None,
       max_batch_duration_secs: Optional[int] = None,
+      max_concurrent_requests: int = 1,
       **kwargs):
     """Implementation of the ModelHandler interface for Vertex AI.
     **NOTE:** This API and its implementation are under development and
@@ -101,6 +102,8 @@ class VertexAIModelHandlerJSON(RemoteModelHandler[Any,
         inputs.
       max_batch_duration_secs: optional. the maximum amount of time to buffer 
         a batch before emitting; used in streaming contexts.
+      max_concurrent_requests: optional. the maximum number of requests to
+        send to the endpoint concurrently for a batch.
     """
     self._batching_kwargs = {}
     self._env_vars = kwargs.get('env_vars', {})
@@ -135,6 +138,7 @@ class VertexAIModelHandlerJSON(RemoteModelHandler[Any,
     super().__init__(
         namespace='VertexAIModelHandlerJSON',
         retry_filter=_retry_on_appropriate_gcp_error,
+        max_concurrent_requests=max_concurrent_requests,
         **kwargs)
 
   def _retrieve_endpoint(
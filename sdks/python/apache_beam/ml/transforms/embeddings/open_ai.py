@@ -70,12 +70,14 @@ class _OpenAITextEmbeddingHandler(RemoteModelHandler):
       dimensions: Optional[int] = None,
       user: Optional[str] = None,
       max_batch_size: Optional[int] = None,
+      max_concurrent_requests: int = 1,
   ):
     super().__init__(
         namespace="OpenAITextEmbeddings",
         num_retries=5,
         throttle_delay_secs=5,
-        retry_filter=_retry_on_appropriate_openai_error)
+        retry_filter=_retry_on_appropriate_openai_error,
+        max_concurrent_requests=max_concurrent_requests)
     self.model_name = model_name
     self.api_key = api_key
     self.organization = organization
@@ -135,6 +137,7 @@ class OpenAITextEmbeddings(EmbeddingsManager):
       dimensions: Optional[int] = None,
       user: Optional[str] = None,
       max_batch_size: Optional[int] = None,
+      max_concurrent_requests: int = 1,
       **kwargs):
     """
     Embedding Config for OpenAI Text Embedding models.
@@ -148,6 +151,8 @@ class OpenAITextEmbeddings(EmbeddingsManager):
       dimensions: Specific embedding dimensions to use (if model supports it)
       user: End-user identifier for tracking and rate limit calculations
       max_batch_size: Maximum batch size for requests to OpenAI API
+      max_concurrent_requests: Maximum number of requests to send to the
+        OpenAI API concurrently for a batch
     """
     self.model_name = model_name
     self.api_key = api_key
@@ -155,6 +160,7 @@ class OpenAITextEmbeddings(EmbeddingsManager):
     self.dimensions = dimensions
     self.user = user
     self.max_batch_size = max_batch_size
+    self.max_concurrent_requests = max_concurrent_requests
     super().__init__(columns=columns, **kwargs)
 
   def get_model_handler(self) -> RemoteModelHandler:
@@ -165,6 +171,7 @@ class OpenAITextEmbeddings(EmbeddingsManager):
         dimensions=self.dimensions,
         user=self.user,
         max_batch_size=self.max_batch_size,
+        max_concurrent_requests=self.max_concurrent_requests,
     )
 
   def get_ptransform_for_processing(self, **kwargs) -> beam.PTransform:
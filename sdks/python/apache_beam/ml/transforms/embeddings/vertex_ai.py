@@ -88,6 +88,7 @@ class _VertexAITextEmbeddingHandler(RemoteModelHandler):
       project: Optional[str] = None,
       location: Optional[str] = None,
       credentials: Optional[Credentials] = None,
+      max_concurrent_requests: int = 1,
       **kwargs):
     vertexai.init(project=project, location=location, credentials=credentials)
     self.model_name = model_name
@@ -100,6 +101,7 @@ class _VertexAITextEmbeddingHandler(RemoteModelHandler):
     super().__init__(
         namespace='VertexAITextEmbeddingHandler',
         retry_filter=_retry_on_appropriate_gcp_error,
+        max_concurrent_requests=max_concurrent_requests,
         **kwargs)
 
   def request(
@@ -141,6 +143,7 @@ class VertexAITextEmbeddings(EmbeddingsManager):
       project: Optional[str] = None,
       location: Optional[str] = None,
       credentials: Optional[Credentials] = None,
+      max_concurrent_requests: int = 1,
       **kwargs):
     """
     Embedding Config for Vertex AI Text Embedding models following
@@ -162,11 +165,14 @@ class VertexAITextEmbeddings(EmbeddingsManager):
       location: The default location for API calls.
       credentials: Custom credentials for API calls.
         Defaults to environment credentials.
+      max_concurrent_requests: The maximum number of requests to send to
+        Vertex AI concurrently for a batch.
     """
     self.model_name = model_name
     self.project = project
     self.location = location
     self.credentials = credentials
+    self.max_concurrent_requests = max_concurrent_requests
     self.title = title
     self.task_type = task_type
     self.kwargs = kwargs
@@ -180,6 +186,7 @@ class VertexAITextEmbeddings(EmbeddingsManager):
         credentials=self.credentials,
         title=self.title,
         task_type=self.task_type,
+        max_concurrent_requests=self.max_concurrent_requests,
         **self.kwargs)
 
   def get_ptransform_for_processing(self, **kwargs) -> beam.PTransform:
@@ -196,6 +203,7 @@ class _VertexAIImageEmbeddingHandler(RemoteModelHandler):
       project: Optional[str] = None,
       location: Optional[str] = None,
       credentials: Optional[Credentials] = None,
+      max_concurrent_requests: int = 1,
       **kwargs):
     vertexai.init(project=project, location=location, credentials=credentials)
     self.model_name = model_name
@@ -204,6 +212,7 @@ class _VertexAIImageEmbeddingHandler(RemoteModelHandler):
     super().__init__(
         namespace='VertexAIImageEmbeddingHandler',
         retry_filter=_retry_on_appropriate_gcp_error,
+        max_concurrent_requests=max_concurrent_requests,
         **kwargs)
 
   def request(
@@ -238,6 +247,7 @@ class VertexAIImageEmbeddings(EmbeddingsManager):
       project: Optional[str] = None,
       location: Optional[str] = None,
       credentials: Optional[Credentials] = None,
+      max_concurrent_requests: int = 1,
       **kwargs):
     """
     Embedding Config for Vertex AI Image Embedding models following
@@ -256,11 +266,14 @@ class VertexAIImageEmbeddings(EmbeddingsManager):
       location: The default location for API calls.
       credentials: Custom credentials for API calls.
         Defaults to environment credentials.
+      max_concurrent_requests: The maximum number of requests to send to
+        Vertex AI concurrently for a batch.
     """
     self.model_name = model_name
     self.project = project
     self.location = location
     self.credentials = credentials
+    self.max_concurrent_requests = max_concurrent_requests
     self.kwargs = kwargs
     if dimension is not None and dimension not in (128, 256, 512, 1408):
       raise ValueError(
@@ -275,6 +288,7 @@ class VertexAIImageEmbeddings(EmbeddingsManager):
         project=self.project,
         location=self.location,
         credentials=self.credentials,
+        max_concurrent_requests=self.max_concurrent_requests,
         **self.kwargs)
 
   def get_ptransform_for_processing(self, **kwargs) -> beam.PTransform:
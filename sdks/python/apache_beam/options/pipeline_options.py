@@ -911,6 +911,27 @@ class DirectOptions(PipelineOptions):
         dest='direct_embed_docker_python',
         help='DirectRunner uses the embedded Python environment when '
         'the default Python docker environment is specified.')
+    parser.add_argument(
+        '--direct_concurrent_stages',
+        default=False,
+        action='store_true',
+        dest='direct_concurrent_stages',
+        help='The FnApiRunner executes bundles of independent stages '
+        'concurrently, up to direct_num_workers at once, rather than one '
+        'bundle at a time. Has no effect unless direct_num_workers is not 1.')
+    parser.add_argument(
+        '--direct_grouping_buffer_max_bytes',
+        type=int,
+        default=None,
+        help='The approximate number of encoded bytes that the FnApiRunner '
+        'buffers in memory for each GroupByKey before spilling sorted runs '
+        'to local disk. The runs are merged when the grouped output is read. '
+        'If unset, grouping is done entirely in memory.')
+    parser.add_argument(
+        '--direct_grouping_buffer_spill_dir',
+        default=None,
+        help='The directory in which the FnApiRunner writes spilled '
+        'GroupByKey runs. Defaults to the system temporary directory.')
     parser.add_argument(
         '--direct_test_splits',
         default={},
@@ -1107,6 +1128,40 @@ class GoogleCloudOptions(PipelineOptions):
         action='store_true',
         help='Use blob generation when mutating blobs in GCSIO to '
         'mitigate race conditions at the cost of more HTTP requests.')
+    parser.add_argument(
+        '--gcs_read_ahead_depth',
+        default=0,
+        type=int,
+        help='Number of ranged requests GcsIO keeps in flight ahead of the '
+        'read cursor when reading a GCS object. Read-ahead can increase the '
+        'throughput of reading large files. 0 (default) reads sequentially.')
+    parser.add_argument(
+        '--gcs_read_ahead_chunk_size',
+        default=None,
+        type=int,
+        help='Size in bytes of each ranged request issued when '
+        '--gcs_read_ahead_depth is set. Defaults to 8 MiB.')
+    parser.add_argument(
+        '--gcs_composite_upload_threshold',
+        default=None,
+        type=int,
+        help='Size in bytes above which GcsIO uploads an object as parts in '
+        'parallel and composes them when the object is closed. Composite '
+        'uploads can increase the throughput of writing large files, but '
+        'composite objects have no MD5 checksum. Unset (default) uploads '
+        'objects as a single stream.')
+    parser.add_argument(
+        '--gcs_composite_upload_part_size',
+        default=None,
+        type=int,
+        help='Size in bytes of each part of a composite upload. Defaults to '
+        '32 MiB.')
+    parser.add_argument(
+        '--gcs_composite_upload_max_concurrency',
+        default=None,
+        type=int,
+        help='Maximum number of parts of a composite upload that are '
+        'uploaded at once. Defaults to 8.')
     parser.add_argument(
         '--gcs_custom_audit_entry',
         '--gcs_custom_audit_entries',
@@ -1455,6 +1510,18 @@ class WorkerOptions(PipelineOptions):
             'responsible for executing the user code and communicating with '
             'the runner. Depending on the runner, there may be more than one '
             'SDK Harness process running on the same worker node.'))
+    parser.add_argument(
+        '--max_cache_memory_usage_shards',
+        dest='max_cache_memory_usage_shards',
+        type=int,
+        default=1,
+        help=(
+            'Number of independently locked shards to split the SDK Harness '
+            'cache into. Each shard holds an equal part of '
+            '--max_cache_memory_usage_mb and evicts its least recently used '
+            'elements independently. Increasing the number of shards reduces '
+            'lock contention when many bundles are processed concurrently '
+            'by the same SDK Harness.'))
 
   def validate(self, validator):
     errors = []
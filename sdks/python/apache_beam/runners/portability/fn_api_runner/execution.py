@@ -21,9 +21,12 @@
 
 import collections
 import copy
+import heapq
 import itertools
 import logging
 import struct
+import tempfile
+import threading
 import typing
 import uuid
 import weakref
@@ -108,7 +111,7 @@ class PartitionableBuffer(Buffer, Protocol):
   def copy(self) -> 'PartitionableBuffer':
     pass
 
-  def partition(self, n: int) -> List[List[bytes]]:
+  def partition(self, n: int) -> Sequence[Iterable[bytes]]:
     pass
 
   @property
@@ -188,19 +191,65 @@ class ListBuffer:
     self.cleared = False
 
 
+class _SpilledOutput(object):
+  """Encoded elements written to a temporary file in element-aligned chunks.
+
+  Iterating yields the chunks in the order they were written; it may be done
+  more than once.
+  """
+
+  _CHUNK_HEADER = struct.Struct('>I')
+
+  def __init__(self, spill_dir: Optional[str]) -> None:
+    self._file = tempfile.TemporaryFile(dir=spill_dir)
+
+  def write(self, chunk: bytes) -> None:
+    self._file.write(self._CHUNK_HEADER.pack(len(chunk)))
+    self._file.write(chunk)
+
+  def __iter__(self) -> Iterator[bytes]:
+    header = self._CHUNK_HEADER
+    self._file.seek(0)
+    while True:
+      chunk_header = self._file.read(header.size)
+      if not chunk_header:
+        return
+      yield self._file.read(header.unpack(chunk_header)[0])
+
+
 class GroupingBuffer(object):
-  """Used to accumulate groupded (shuffled) results."""
+  """Used to accumulate groupded (shuffled) results.
+
+  If ``max_bytes`` is set, the buffer keeps at most (approximately) that many
+  encoded bytes of input in memory. Once the budget is exceeded, the buffered
+  values are sorted by encoded key and written to a temporary run file in
+  ``spill_dir``. The runs are merged by encoded key when the buffer is read, so
+  only the values of a single key need to be held in memory at a time while
+  grouping. The grouped output is then written to disk as well, in chunks of
+  at most ``max_bytes`` per partition, rather than being held in memory.
+  """
+
+  # Used to frame key and value records in spilled run files.
+  _RECORD_HEADER = struct.Struct('>II')
+
   def __init__(
       self,
       pre_grouped_coder: coders.Coder,
       post_grouped_coder: coders.Coder,
-      windowing: core.Windowing) -> None:
+      windowing: core.Windowing,
+      max_bytes: Optional[int] = None,
+      spill_dir: Optional[str] = None) -> None:
     self._key_coder = pre_grouped_coder.key_coder()
     self._pre_grouped_coder = pre_grouped_coder
     self._post_grouped_coder = post_grouped_coder
     self._table: DefaultDict[bytes, List[Any]] = collections.defaultdict(list)
     self._windowing = windowing
-    self._grouped_output: Optional[List[List[bytes]]] = None
+    self._grouped_output: Optional[List[Iterable[bytes]]] = None
+    self._max_bytes = max_bytes
+    self._spill_dir = spill_dir
+    self._table_bytes = 0
+    self._runs: List[typing.BinaryIO] = []
+    self._spill_coder_impl: Optional[CoderImpl] = None
 
   def copy(self) -> 'GroupingBuffer':
     # This is a silly temporary optimization. This class must be removed once
@@ -218,11 +267,16 @@ class GroupingBuffer(object):
     # window-dropping coder for the data plane.
     is_trivial_windowing = self._windowing.is_default()
     while input_stream.size() > 0:
+      remaining = input_stream.size()
       windowed_key_value = coder_impl.decode_from_stream(input_stream, True)
       key, value = windowed_key_value.value
       self._table[key_coder_impl.encode(key)].append(
           value if is_trivial_windowing else windowed_key_value.
           with_value(value))
+      if self._max_bytes is not None:
+        self._table_bytes += remaining - input_stream.size()
+        if self._table_bytes > self._max_bytes:
+          self._spill()
 
   def extend(self, input_buffer: Buffer) -> None:
     if isinstance(input_buffer, ListBuffer):
@@ -231,10 +285,83 @@ class GroupingBuffer(object):
       return
     assert isinstance(input_buffer, GroupingBuffer), \
       'Input was not GroupingBuffer: %s' % input_buffer
+    if input_buffer is self:
+      return
     for key, values in input_buffer._table.items():
       self._table[key].extend(values)
-
-  def partition(self, n: int) -> List[List[bytes]]:
+    # Spilled runs are moved rather than copied, as they are closed once read.
+    self._runs.extend(input_buffer._runs)
+    input_buffer._runs = []
+    if self._max_bytes is not None:
+      self._table_bytes += input_buffer._table_bytes
+      if self._table_bytes > self._max_bytes:
+        self._spill()
+
+  def _get_spill_coder_impl(self) -> CoderImpl:
+    """Returns the coder used to write buffered values to run files."""
+    if self._spill_coder_impl is None:
+      if self._windowing.is_default():
+        self._spill_coder_impl = (
+            self._pre_grouped_coder.value_coder().get_impl())
+      else:
+        assert isinstance(self._pre_grouped_coder, WindowedValueCoder)
+        self._spill_coder_impl = WindowedValueCoder(
+            self._pre_grouped_coder.value_coder(),
+            self._pre_grouped_coder.window_coder).get_impl()
+    return self._spill_coder_impl
+
+  def _spill(self) -> None:
+    """Writes the in-memory table to disk as a run sorted by encoded key."""
+    if not self._table:
+      return
+    value_coder_impl = self._get_spill_coder_impl()
+    run = tempfile.TemporaryFile(dir=self._spill_dir)
+    header = self._RECORD_HEADER
+    for encoded_key in sorted(self._table):
+      for value in self._table[encoded_key]:
+        encoded_value = value_coder_impl.encode(value)
+        run.write(header.pack(len(encoded_key), len(encoded_value)))
+        run.write(encoded_key)
+        run.write(encoded_value)
+    _LOGGER.debug(
+        'Spilled %d bytes of grouping buffer to run %d.',
+        self._table_bytes,
+        len(self._runs))
+    self._runs.append(run)
+    self._table.clear()
+    self._table_bytes = 0
+
+  def _read_run(self, run: typing.BinaryIO) -> Iterator[Tuple[bytes, Any]]:
+    value_coder_impl = self._get_spill_coder_impl()
+    header = self._RECORD_HEADER
+    run.seek(0)
+    while True:
+      record_header = run.read(header.size)
+      if not record_header:
+        return
+      key_length, value_length = header.unpack(record_header)
+      encoded_key = run.read(key_length)
+      yield encoded_key, value_coder_impl.decode(run.read(value_length))
+
+  def _grouped_items(self) -> Iterator[Tuple[bytes, List[Any]]]:
+    """Yields (encoded key, values) pairs for all buffered data."""
+    if not self._runs:
+      yield from self._table.items()
+      return
+    # Merge the spilled runs by encoded key. heapq.merge is stable, so values
+    # for a key are returned in the order their runs were written.
+    self._spill()
+    merged = heapq.merge(
+        *[self._read_run(run) for run in self._runs],
+        key=lambda record: record[0])
+    for encoded_key, records in itertools.groupby(merged,
+                                                  key=lambda record: record[0]):
+      yield encoded_key, [value for _, value in records]
+    for run in self._runs:
+      run.close()
+    self._runs = []
+
+  def partition(self, n: int) -> List[Iterable[bytes]]:
     """ It is used to partition _GroupingBuffer to N parts. Once it is
     partitioned, it would not be re-partitioned with diff N. Re-partition
     is not supported now.
@@ -262,15 +389,34 @@ class GroupingBuffer(object):
         windowed_key_values = trigger_driver.process_entire_key
       coder_impl = self._post_grouped_coder.get_impl()
       key_coder_impl = self._key_coder.get_impl()
-      self._grouped_output = [[] for _ in range(n)]
       output_stream_list = [create_OutputStream() for _ in range(n)]
-      for idx, (encoded_key, windowed_values) in enumerate(self._table.items()):
+      # If the input did not fit in memory, neither will the output, so it is
+      # flushed to disk whenever a partition's stream exceeds the budget.
+      spill_threshold = self._max_bytes if self._runs else None
+      spilled_outputs = [] if spill_threshold is None else [
+          _SpilledOutput(self._spill_dir) for _ in range(n)
+      ]
+      for idx, (encoded_key,
+                windowed_values) in enumerate(self._grouped_items()):
         key = key_coder_impl.decode(encoded_key)
+        output_stream = output_stream_list[idx % n]
         for wkvs in windowed_key_values(key, windowed_values):
-          coder_impl.encode_to_stream(wkvs, output_stream_list[idx % n], True)
-      for ix, output_stream in enumerate(output_stream_list):
-        self._grouped_output[ix] = [output_stream.get()]
+          coder_impl.encode_to_stream(wkvs, output_stream, True)
+        if (spill_threshold is not None and
+            output_stream.size() > spill_threshold):
+          spilled_outputs[idx % n].write(output_stream.get())
+          output_stream_list[idx % n] = create_OutputStream()
+      if spilled_outputs:
+        for spilled_output, output_stream in zip(spilled_outputs,
+                                                 output_stream_list):
+          if output_stream.size():
+            spilled_output.write(output_stream.get())
+        self._grouped_output = list(spilled_outputs)
+      else:
+        self._grouped_output = [[output_stream.get()]
+                                for output_stream in output_stream_list]
       self._table.clear()
+      self._table_bytes = 0
     return self._grouped_output
 
   def __iter__(self) -> Iterator[bytes]:
@@ -672,8 +818,9 @@ class FnApiRunnerExecutionContext(object):
       num_workers: int,
       uses_teststream: bool = False,
       split_managers: Sequence[Tuple[str, Callable[[int],
-                                                   Iterable[float]]]] = ()
-  ) -> None:
+                                                   Iterable[float]]]] = (),
+      grouping_buffer_max_bytes: Optional[int] = None,
+      grouping_buffer_spill_dir: Optional[str] = None) -> None:
     """
     :param worker_handler_manager: This class manages the set of worker
         handlers, and the communication with state / control APIs.
@@ -681,18 +828,28 @@ class FnApiRunnerExecutionContext(object):
     :param safe_coders: A map from Coder ID to Safe Coder ID.
     :param data_channel_coders: A map from PCollection ID to the ID of the Coder
         for that PCollection.
+    :param grouping_buffer_max_bytes: The number of encoded bytes a
+        ``GroupingBuffer`` may hold in memory before spilling to disk, or None
+        to never spill.
+    :param grouping_buffer_spill_dir: The directory for spilled grouping
+        buffer runs, or None to use the default temporary directory.
     """
     self.stages = {s.name: s for s in stages}
     self.side_input_descriptors_by_stage = (
         self._build_data_side_inputs_map(stages))
     self.pcoll_buffers: MutableMapping[bytes, PartitionableBuffer] = {}
     self.timer_buffers: MutableMapping[bytes, ListBuffer] = {}
+    # Guards the buffers above and the coders of the pipeline context, which
+    # bundles running concurrently on other threads may add to.
+    self.lock = threading.RLock()
     self.worker_handler_manager = worker_handler_manager
     self.pipeline_components = pipeline_components
     self.safe_coders = safe_coders
     self.data_channel_coders = data_channel_coders
     self.num_workers = num_workers
     self.split_managers = split_managers
+    self.grouping_buffer_max_bytes = grouping_buffer_max_bytes
+    self.grouping_buffer_spill_dir = grouping_buffer_spill_dir
     # TODO(pabloem): Move Clock classes out of DirectRunner and into FnApiRnr
     self.clock: Union[TestClock, RealClock] = (
         TestClock() if uses_teststream else RealClock())
@@ -1102,11 +1259,13 @@ class BundleContextManager(object):
     return timer_coder_ids
 
   def get_coder_impl(self, coder_id: str) -> CoderImpl:
-    if coder_id in self.execution_context.safe_coders:
-      return self.execution_context.pipeline_context.coders[
-          self.execution_context.safe_coders[coder_id]].get_impl()
-    else:
-      return self.execution_context.pipeline_context.coders[coder_id].get_impl()
+    with self.execution_context.lock:
+      if coder_id in self.execution_context.safe_coders:
+        return self.execution_context.pipeline_context.coders[
+            self.execution_context.safe_coders[coder_id]].get_impl()
+      else:
+        return self.execution_context.pipeline_context.coders[
+            coder_id].get_impl()
 
   def get_timer_coder_impl(
       self, transform_id: str, timer_family_id: str) -> CoderImpl:
@@ -1120,6 +1279,11 @@ class BundleContextManager(object):
     For grouping-typed operations, we produce a ``GroupingBuffer``. For
     others, we produce a ``ListBuffer``.
     """
+    with self.execution_context.lock:
+      return self._get_buffer(buffer_id, transform_id)
+
+  def _get_buffer(
+      self, buffer_id: bytes, transform_id: str) -> PartitionableBuffer:
     kind, name = split_buffer_id(buffer_id)
     if kind == 'materialize':
       if buffer_id not in self.execution_context.pcoll_buffers:
@@ -1153,7 +1317,11 @@ class BundleContextManager(object):
                     self.execution_context.pipeline_components.
                     pcollections[input_pcoll].windowing_strategy_id]])
         self.execution_context.pcoll_buffers[buffer_id] = GroupingBuffer(
-            pre_gbk_coder, post_gbk_coder, windowing_strategy)
+            pre_gbk_coder,
+            post_gbk_coder,
+            windowing_strategy,
+            max_bytes=self.execution_context.grouping_buffer_max_bytes,
+            spill_dir=self.execution_context.grouping_buffer_spill_dir)
     else:
       # These should be the only two identifiers we produce for now,
       # but special side input writes may go here.
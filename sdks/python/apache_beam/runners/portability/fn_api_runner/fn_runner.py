@@ -20,6 +20,7 @@
 # pytype: skip-file
 # mypy: check-untyped-defs
 
+import concurrent.futures
 import contextlib
 import copy
 import itertools
@@ -77,6 +78,7 @@ from apache_beam.runners.portability.fn_api_runner.translations import OutputTim
 from apache_beam.runners.portability.fn_api_runner.translations import OutputTimers
 from apache_beam.runners.portability.fn_api_runner.translations import create_buffer_id
 from apache_beam.runners.portability.fn_api_runner.translations import only_element
+from apache_beam.runners.portability.fn_api_runner.worker_handlers import EmbeddedWorkerHandler
 from apache_beam.runners.portability.fn_api_runner.worker_handlers import WorkerHandler
 from apache_beam.runners.portability.fn_api_runner.worker_handlers import WorkerHandlerManager
 from apache_beam.runners.worker import bundle_processor
@@ -124,10 +126,13 @@ class FnApiRunner(runner.PipelineRunner):
         default_environment or environments.EmbeddedPythonEnvironment.default())
     self._bundle_repeat = bundle_repeat
     self._num_workers = 1
+    self._concurrent_stages = False
     self._progress_frequency = progress_request_frequency
     self._profiler_factory: Optional[Callable[..., Profile]] = None
     self._use_state_iterables = use_state_iterables
     self._is_drain = is_drain
+    self._grouping_buffer_max_bytes: Optional[int] = None
+    self._grouping_buffer_spill_dir: Optional[str] = None
     self._provision_info = provision_info or ExtendedProvisionInfo(
         beam_provision_api_pb2.ProvisionInfo(
             retrieval_token='unused-retrieval-token'))
@@ -167,6 +172,8 @@ class FnApiRunner(runner.PipelineRunner):
       self._num_workers = multiprocessing.cpu_count()
     else:
       self._num_workers = pipeline_direct_num_workers or self._num_workers
+    self._concurrent_stages = options.view_as(
+        pipeline_options.DirectOptions).direct_concurrent_stages
 
     # set direct workers running mode if it is defined with pipeline options.
     running_mode = \
@@ -214,6 +221,10 @@ class FnApiRunner(runner.PipelineRunner):
         (stage, create_test_split_manager(**data))
         for (stage, data) in test_splits.items()
     ]
+    self._grouping_buffer_max_bytes = (
+        direct_options.direct_grouping_buffer_max_bytes)
+    self._grouping_buffer_spill_dir = (
+        direct_options.direct_grouping_buffer_spill_dir)
     if direct_options.direct_embed_docker_python:
       pipeline_proto = self.embed_default_docker_image(pipeline_proto)
     pipeline_proto = merge_common_environments(
@@ -428,6 +439,32 @@ class FnApiRunner(runner.PipelineRunner):
     monitoring_infos_by_stage: MutableMapping[
         str, Iterable['metrics_pb2.MonitoringInfo']] = {}
 
+    def record_bundle_results(
+        consuming_stage_name: str,
+        bundle_results: beam_fn_api_pb2.InstructionResponse) -> None:
+      if consuming_stage_name in monitoring_infos_by_stage:
+        monitoring_infos_by_stage[
+            consuming_stage_name] = consolidate_monitoring_infos(
+                itertools.chain(
+                    bundle_results.process_bundle.monitoring_infos,
+                    monitoring_infos_by_stage[consuming_stage_name]))
+      else:
+        assert isinstance(
+            bundle_results.process_bundle.monitoring_infos, Iterable)
+        monitoring_infos_by_stage[consuming_stage_name] = \
+          bundle_results.process_bundle.monitoring_infos
+
+      # Within monitoring_infos_by_stage we also keep monitoring information
+      # for the whole pipeline, which we key under ''.
+      if '' not in monitoring_infos_by_stage:
+        monitoring_infos_by_stage[''] = list(
+            pipeline_metrics.to_runner_api_monitoring_infos('').values())
+      else:
+        monitoring_infos_by_stage[''] = consolidate_monitoring_infos(
+            itertools.chain(
+                pipeline_metrics.to_runner_api_monitoring_infos('').values(),
+                monitoring_infos_by_stage['']))
+
     runner_execution_context = execution.FnApiRunnerExecutionContext(
         stages,
         worker_handler_manager,
@@ -435,7 +472,9 @@ class FnApiRunner(runner.PipelineRunner):
         stage_context.safe_coders,
         stage_context.data_channel_coders,
         self._num_workers,
-        split_managers=self._split_managers)
+        split_managers=self._split_managers,
+        grouping_buffer_max_bytes=self._grouping_buffer_max_bytes,
+        grouping_buffer_spill_dir=self._grouping_buffer_spill_dir)
 
     try:
       with self.maybe_profile():
@@ -444,61 +483,13 @@ class FnApiRunner(runner.PipelineRunner):
         # - Replace Data API endpoints in protobufs.
         runner_execution_context.setup()
 
-        bundle_counter = 0
         # Start executing all ready bundles.
-        while len(runner_execution_context.queues.ready_inputs) > 0:
-          _LOGGER.debug(
-              "Remaining ready bundles: %s\n"
-              "\tWatermark pending bundles: %s\n"
-              "\tTime pending bundles: %s",
-              len(runner_execution_context.queues.ready_inputs),
-              len(runner_execution_context.queues.watermark_pending_inputs),
-              len(runner_execution_context.queues.time_pending_inputs))
-          consuming_stage_name, bundle_input = (
-              runner_execution_context.queues.ready_inputs.deque())
-          stage = runner_execution_context.stages[consuming_stage_name]
-          bundle_context_manager = runner_execution_context.bundle_manager_for(
-              stage)
-          _BUNDLE_LOGGER.debug(
-              'Running bundle for stage %s\n\tExpected outputs: %s timers: %s',
-              bundle_context_manager.stage.name,
-              bundle_context_manager.stage_data_outputs,
-              bundle_context_manager.stage_timer_outputs)
-          assert consuming_stage_name == bundle_context_manager.stage.name
-
-          bundle_counter += 1
-          bundle_results = self._execute_bundle(
-              runner_execution_context, bundle_context_manager, bundle_input)
-
-          if consuming_stage_name in monitoring_infos_by_stage:
-            monitoring_infos_by_stage[
-                consuming_stage_name] = consolidate_monitoring_infos(
-                    itertools.chain(
-                        bundle_results.process_bundle.monitoring_infos,
-                        monitoring_infos_by_stage[consuming_stage_name]))
-          else:
-            assert isinstance(
-                bundle_results.process_bundle.monitoring_infos, Iterable)
-            monitoring_infos_by_stage[consuming_stage_name] = \
-              bundle_results.process_bundle.monitoring_infos
-
-          # Within monitoring_infos_by_stage we also keep monitoring information
-          # for the whole pipeline, which we key under ''.
-          if '' not in monitoring_infos_by_stage:
-            monitoring_infos_by_stage[''] = list(
-                pipeline_metrics.to_runner_api_monitoring_infos('').values())
-          else:
-            monitoring_infos_by_stage[''] = consolidate_monitoring_infos(
-                itertools.chain(
-                    pipeline_metrics.to_runner_api_monitoring_infos(
-                        '').values(),
-                    monitoring_infos_by_stage['']))
-
-          # We only compute new ready bundles whenever we run out of current
-          # ready bundles, but we could do it after every new bundle and
-          # it should work either way.
-          if len(runner_execution_context.queues.ready_inputs) == 0:
-            self._schedule_ready_bundles(runner_execution_context)
+        if self._max_concurrent_stages() > 1:
+          self._run_ready_bundles_concurrently(
+              runner_execution_context, record_bundle_results)
+        else:
+          self._run_ready_bundles(
+              runner_execution_context, record_bundle_results)
 
       assert len(runner_execution_context.queues.ready_inputs) == 0, (
               'A total of %d ready bundles did not execute.'
@@ -514,6 +505,159 @@ class FnApiRunner(runner.PipelineRunner):
       worker_handler_manager.close_all()
     return RunnerResult(runner.PipelineState.DONE, monitoring_infos_by_stage)
 
+  def _max_concurrent_stages(self) -> int:
+    """Returns how many bundles of distinct stages may execute at once."""
+    if not self._concurrent_stages:
+      return 1
+    if self._bundle_repeat > 0:
+      # Replaying bundles checkpoints and restores the shared state servicer.
+      return 1
+    return self._num_workers
+
+  def _next_ready_bundle(
+      self, runner_execution_context: execution.FnApiRunnerExecutionContext
+  ) -> Tuple[execution.BundleContextManager, DataInput]:
+    _LOGGER.debug(
+        "Remaining ready bundles: %s\n"
+        "\tWatermark pending bundles: %s\n"
+        "\tTime pending bundles: %s",
+        len(runner_execution_context.queues.ready_inputs),
+        len(runner_execution_context.queues.watermark_pending_inputs),
+        len(runner_execution_context.queues.time_pending_inputs))
+    consuming_stage_name, bundle_input = (
+        runner_execution_context.queues.ready_inputs.deque())
+    stage = runner_execution_context.stages[consuming_stage_name]
+    bundle_context_manager = runner_execution_context.bundle_manager_for(stage)
+    assert consuming_stage_name == bundle_context_manager.stage.name
+    return bundle_context_manager, bundle_input
+
+  def _run_ready_bundles(
+      self,
+      runner_execution_context: execution.FnApiRunnerExecutionContext,
+      record_bundle_results: Callable[
+          [str, beam_fn_api_pb2.InstructionResponse], None]
+  ) -> None:
+    """Executes ready bundles one at a time until none are left."""
+    while len(runner_execution_context.queues.ready_inputs) > 0:
+      bundle_context_manager, bundle_input = self._next_ready_bundle(
+          runner_execution_context)
+      _BUNDLE_LOGGER.debug(
+          'Running bundle for stage %s\n\tExpected outputs: %s timers: %s',
+          bundle_context_manager.stage.name,
+          bundle_context_manager.stage_data_outputs,
+          bundle_context_manager.stage_timer_outputs)
+      bundle_results = self._execute_bundle(
+          runner_execution_context, bundle_context_manager, bundle_input)
+      record_bundle_results(bundle_context_manager.stage.name, bundle_results)
+
+      # We only compute new ready bundles whenever we run out of current
+      # ready bundles, but we could do it after every new bundle and
+      # it should work either way.
+      if len(runner_execution_context.queues.ready_inputs) == 0:
+        self._schedule_ready_bundles(runner_execution_context)
+
+  def _run_ready_bundles_concurrently(
+      self,
+      runner_execution_context: execution.FnApiRunnerExecutionContext,
+      record_bundle_results: Callable[
+          [str, beam_fn_api_pb2.InstructionResponse], None]
+  ) -> None:
+    """Executes ready bundles of independent stages concurrently.
+
+    This is enabled by the ``direct_concurrent_stages`` option. Bundles are
+    taken off the ready queue in order and run on a thread each, so that
+    stages of independent branches of the pipeline execute on the workers at
+    the same time. A bundle is held back while another bundle of the same
+    stage, or of a stage writing to any of the same buffers, runs. Bundles of
+    stages executing on in-memory workers always run alone. The results of a
+    bundle are committed on this thread once it completes, which may make
+    further bundles ready.
+
+    Stages do not get a pool of workers each. All stages of an environment
+    share its ``direct_num_workers`` worker handlers (e.g. the
+    ``SubprocessSdkWorkerHandler`` processes of a subprocess environment),
+    each of which processes bundles of several stages at once.
+    """
+    max_concurrent_stages = self._max_concurrent_stages()
+    # Futures of the running bundles, to their stage and input.
+    running: Dict[concurrent.futures.Future,
+                  Tuple[execution.BundleContextManager, DataInput]] = {}
+
+    def output_buffers(
+        bundle_context_manager: execution.BundleContextManager) -> Set[bytes]:
+      return set(bundle_context_manager.stage_data_outputs.values())
+
+    def is_exclusive(
+        bundle_context_manager: execution.BundleContextManager) -> bool:
+      # In-memory workers process a single bundle at a time.
+      return any(
+          isinstance(worker_handler, EmbeddedWorkerHandler)
+          for worker_handler in bundle_context_manager.worker_handlers)
+
+    def conflicts_with_running(
+        bundle_context_manager: execution.BundleContextManager) -> bool:
+      if running and is_exclusive(bundle_context_manager):
+        return True
+      outputs = output_buffers(bundle_context_manager)
+      for other, _ in running.values():
+        if (other is bundle_context_manager or is_exclusive(other) or
+            not outputs.isdisjoint(output_buffers(other))):
+          return True
+      return False
+
+    with thread_pool_executor.shared_unbounded_instance() as executor:
+      try:
+        while (running or
+               len(runner_execution_context.queues.ready_inputs) > 0):
+          held_back = []
+          while (len(running) < max_concurrent_stages and
+                 len(runner_execution_context.queues.ready_inputs) > 0):
+            bundle_context_manager, bundle_input = self._next_ready_bundle(
+                runner_execution_context)
+            if conflicts_with_running(bundle_context_manager):
+              held_back.append(
+                  (bundle_context_manager.stage.name, bundle_input))
+              continue
+            _BUNDLE_LOGGER.debug(
+                'Running bundle for stage %s\n'
+                '\tExpected outputs: %s timers: %s',
+                bundle_context_manager.stage.name,
+                bundle_context_manager.stage_data_outputs,
+                bundle_context_manager.stage_timer_outputs)
+            bundle_manager = self._prepare_bundle(
+                runner_execution_context, bundle_context_manager)
+            future = executor.submit(
+                self._run_bundle,
+                runner_execution_context,
+                bundle_context_manager,
+                bundle_input,
+                bundle_context_manager.stage_data_outputs,
+                bundle_context_manager.stage_timer_outputs,
+                bundle_manager)
+            running[future] = bundle_context_manager, bundle_input
+          for held_back_input in held_back:
+            runner_execution_context.queues.ready_inputs.enque(held_back_input)
+
+          if not running:
+            break
+          done, _ = concurrent.futures.wait(
+              running, return_when=concurrent.futures.FIRST_COMPLETED)
+          for future in done:
+            bundle_context_manager, bundle_input = running.pop(future)
+            bundle_results = self._commit_bundle(
+                runner_execution_context,
+                bundle_context_manager,
+                bundle_input,
+                *future.result())
+            record_bundle_results(
+                bundle_context_manager.stage.name, bundle_results)
+
+          if len(runner_execution_context.queues.ready_inputs) == 0:
+            self._schedule_ready_bundles(runner_execution_context)
+      finally:
+        # Do not leave bundles running against workers that are shut down.
+        concurrent.futures.wait(running)
+
   def _schedule_ready_bundles(
       self, runner_execution_context: execution.FnApiRunnerExecutionContext):
     to_add_watermarks = []
@@ -781,15 +925,8 @@ class FnApiRunner(runner.PipelineRunner):
         the stage to execute, and its context.
       bundle_input: The set of buffers to input into this bundle
     """
-    worker_handler_manager = runner_execution_context.worker_handler_manager
-
-    # TODO(pabloem): Should move this to be done once per stage
-    worker_handler_manager.register_process_bundle_descriptor(
-        bundle_context_manager.process_bundle_descriptor)
-
-    # We create the bundle manager here, as it can be reused for bundles of
-    # the same stage, but it may have to be created by-bundle later on.
-    bundle_manager = self._get_bundle_manager(bundle_context_manager)
+    bundle_manager = self._prepare_bundle(
+        runner_execution_context, bundle_context_manager)
 
     last_result, deferred_inputs, newly_set_timers, watermark_updates = (
         self._run_bundle(
@@ -800,6 +937,49 @@ class FnApiRunner(runner.PipelineRunner):
             bundle_context_manager.stage_timer_outputs,
             bundle_manager))
 
+    return self._commit_bundle(
+        runner_execution_context,
+        bundle_context_manager,
+        bundle_input,
+        last_result,
+        deferred_inputs,
+        newly_set_timers,
+        watermark_updates)
+
+  def _prepare_bundle(
+      self,
+      runner_execution_context: execution.FnApiRunnerExecutionContext,
+      bundle_context_manager: execution.BundleContextManager
+  ) -> 'BundleManager':
+    """Registers the stage with its workers, and returns its bundle manager."""
+    worker_handler_manager = runner_execution_context.worker_handler_manager
+
+    # TODO(pabloem): Should move this to be done once per stage
+    worker_handler_manager.register_process_bundle_descriptor(
+        bundle_context_manager.process_bundle_descriptor)
+    # Start the workers of the stage, if they are not running yet.
+    bundle_context_manager.worker_handlers  # pylint: disable=pointless-statement
+
+    # We create the bundle manager here, as it can be reused for bundles of
+    # the same stage, but it may have to be created by-bundle later on.
+    return self._get_bundle_manager(bundle_context_manager)
+
+  def _commit_bundle(
+      self,
+      runner_execution_context: execution.FnApiRunnerExecutionContext,
+      bundle_context_manager: execution.BundleContextManager,
+      bundle_input: DataInput,
+      last_result: beam_fn_api_pb2.InstructionResponse,
+      deferred_inputs: Dict[str, execution.PartitionableBuffer],
+      newly_set_timers: OutputTimerData,
+      watermark_updates: Dict[Union[str, translations.TimerFamilyId],
+                              timestamp.Timestamp]
+  ) -> beam_fn_api_pb2.InstructionResponse:
+    """Applies the results of an executed bundle to the pipeline's state.
+
+    Updates watermarks, and enqueues deferred inputs, timers and the stage's
+    outputs for the bundles that consume them.
+    """
     for pc_name, watermark in watermark_updates.items():
       _BUNDLE_LOGGER.debug('Update: %s %s', pc_name, watermark)
       runner_execution_context.watermark_manager.set_pcoll_watermark(
@@ -828,57 +1008,59 @@ class FnApiRunner(runner.PipelineRunner):
         runner_execution_context.watermark_manager.get_pcoll_node(
             update_output_pc).set_produced_watermark(timestamp.MAX_TIMESTAMP)
 
-    # Store the required downstream side inputs into state so it is accessible
-    # for the worker when it runs bundles that consume this stage's output.
-    data_side_input = (
-        runner_execution_context.side_input_descriptors_by_stage.get(
-            bundle_context_manager.stage.name, {}))
-    runner_execution_context.commit_side_inputs_to_state(data_side_input)
-
-    buffers_to_clean = set()
-    known_consumers = set()
-    for transform_id, buffer_id in (
-      bundle_context_manager.stage_data_outputs.items()):
-      for (consuming_stage_name, consuming_transform) in \
-          runner_execution_context.buffer_id_to_consumer_pairs.get(buffer_id,
-                                                                   []):
-        buffer = runner_execution_context.pcoll_buffers.get(buffer_id, None)
-
-        if (buffer_id in runner_execution_context.pcoll_buffers and
-            buffer_id not in buffers_to_clean):
-          buffers_to_clean.add(buffer_id)
-        elif buffer and buffer_id in buffers_to_clean:
-          # If the buffer_id has already been added to buffers_to_clean, this
-          # means that the buffer is being consumed by two separate stages,
-          # so we create a copy of the buffer for every new stage.
-          runner_execution_context.pcoll_buffers[buffer_id] = buffer.copy()
-          buffer = runner_execution_context.pcoll_buffers[buffer_id]
-
-        # empty buffer. Add it to the pcoll_buffer to avoid element
-        # duplication.
-        if buffer_id not in runner_execution_context.pcoll_buffers:
-          buffer = bundle_context_manager.get_buffer(buffer_id, transform_id)
-          runner_execution_context.pcoll_buffers[buffer_id] = buffer
-          buffers_to_clean.add(buffer_id)
-
-        # If the buffer has already been added to be consumed by
-        # (stage, transform), then we don't need to add it again. This case
-        # can happen whenever we flatten the same PCollection with itself.
-        if (consuming_stage_name, consuming_transform,
-            buffer_id) in known_consumers:
-          continue
-        else:
-          known_consumers.add(
-              (consuming_stage_name, consuming_transform, buffer_id))
-        # We enqueue all of the pending output buffers to be scheduled at the
-        # MAX_TIMESTAMP for the downstream stage.
-        runner_execution_context.queues.watermark_pending_inputs.enque(
-            ((consuming_stage_name, timestamp.MAX_TIMESTAMP),
-             DataInput({consuming_transform: buffer}, {})))  # type: ignore
-
-    for bid in buffers_to_clean:
-      if bid in runner_execution_context.pcoll_buffers:
-        del runner_execution_context.pcoll_buffers[bid]
+    # Bundles of other stages may be creating buffers concurrently.
+    with runner_execution_context.lock:
+      # Store the required downstream side inputs into state so it is accessible
+      # for the worker when it runs bundles that consume this stage's output.
+      data_side_input = (
+          runner_execution_context.side_input_descriptors_by_stage.get(
+              bundle_context_manager.stage.name, {}))
+      runner_execution_context.commit_side_inputs_to_state(data_side_input)
+
+      buffers_to_clean = set()
+      known_consumers = set()
+      for transform_id, buffer_id in (
+        bundle_context_manager.stage_data_outputs.items()):
+        for (consuming_stage_name, consuming_transform) in \
+            runner_execution_context.buffer_id_to_consumer_pairs.get(buffer_id,
+                                                                     []):
+          buffer = runner_execution_context.pcoll_buffers.get(buffer_id, None)
+
+          if (buffer_id in runner_execution_context.pcoll_buffers and
+              buffer_id not in buffers_to_clean):
+            buffers_to_clean.add(buffer_id)
+          elif buffer and buffer_id in buffers_to_clean:
+            # If the buffer_id has already been added to buffers_to_clean, this
+            # means that the buffer is being consumed by two separate stages,
+            # so we create a copy of the buffer for every new stage.
+            runner_execution_context.pcoll_buffers[buffer_id] = buffer.copy()
+            buffer = runner_execution_context.pcoll_buffers[buffer_id]
+
+          # empty buffer. Add it to the pcoll_buffer to avoid element
+          # duplication.
+          if buffer_id not in runner_execution_context.pcoll_buffers:
+            buffer = bundle_context_manager.get_buffer(buffer_id, transform_id)
+            runner_execution_context.pcoll_buffers[buffer_id] = buffer
+            buffers_to_clean.add(buffer_id)
+
+          # If the buffer has already been added to be consumed by
+          # (stage, transform), then we don't need to add it again. This case
+          # can happen whenever we flatten the same PCollection with itself.
+          if (consuming_stage_name, consuming_transform,
+              buffer_id) in known_consumers:
+            continue
+          else:
+            known_consumers.add(
+                (consuming_stage_name, consuming_transform, buffer_id))
+          # We enqueue all of the pending output buffers to be scheduled at the
+          # MAX_TIMESTAMP for the downstream stage.
+          runner_execution_context.queues.watermark_pending_inputs.enque(
+              ((consuming_stage_name, timestamp.MAX_TIMESTAMP),
+               DataInput({consuming_transform: buffer}, {})))  # type: ignore
+
+      for bid in buffers_to_clean:
+        if bid in runner_execution_context.pcoll_buffers:
+          del runner_execution_context.pcoll_buffers[bid]
 
     return last_result
 
@@ -1433,9 +1615,9 @@ class ParallelBundleManager(BundleManager):
       expected_output_timers: OutputTimers,
       dry_run: bool = False,
   ) -> BundleProcessResult:
-    part_inputs: List[Dict[str,
-                           List[bytes]]] = [{}
-                                            for _ in range(self._num_workers)]
+    part_inputs: List[Dict[str, Iterable[bytes]]] = [
+        {} for _ in range(self._num_workers)
+    ]
     # Timers are only executed on the first worker
     # TODO(BEAM-9741): Split timers to multiple workers
     timer_inputs = [
@@ -60,6 +60,7 @@ from apache_beam.options.pipeline_options import StandardOptions
 from apache_beam.options.value_provider import RuntimeValueProvider
 from apache_beam.portability import python_urns
 from apache_beam.runners.portability import fn_api_runner
+from apache_beam.runners.portability.fn_api_runner import execution
 from apache_beam.runners.portability.fn_api_runner import fn_runner
 from apache_beam.runners.sdf_utils import RestrictionTrackerView
 from apache_beam.runners.worker import data_plane
@@ -70,6 +71,7 @@ from apache_beam.testing.test_stream import TestStream
 from apache_beam.testing.util import assert_that
 from apache_beam.testing.util import equal_to
 from apache_beam.tools import utils
+from apache_beam.transforms import core
 from apache_beam.transforms import environments
 from apache_beam.transforms import userstate
 from apache_beam.transforms import window
@@ -834,6 +836,7 @@ class FnApiRunnerTest(unittest.TestCase):
                                'FnApiRunnerTestWithMultiWorkers',
                                'FnApiRunnerTestWithBundleRepeat',
                                'FnApiRunnerTestWithBundleRepeatAndMultiWorkers',
+                               'FnApiRunnerTestWithGroupingBufferSpill',
                                'SamzaRunnerTest',
                                'SparkRunnerTest'}:
       raise unittest.SkipTest("https://github.com/apache/beam/issues/35168")
@@ -851,6 +854,7 @@ class FnApiRunnerTest(unittest.TestCase):
                                'FnApiRunnerTestWithMultiWorkers',
                                'FnApiRunnerTestWithBundleRepeat',
                                'FnApiRunnerTestWithBundleRepeatAndMultiWorkers',
+                               'FnApiRunnerTestWithGroupingBufferSpill',
                                'SamzaRunnerTest',
                                'SparkRunnerTest'}:
       raise unittest.SkipTest("https://github.com/apache/beam/issues/35168")
@@ -867,6 +871,7 @@ class FnApiRunnerTest(unittest.TestCase):
                                'FnApiRunnerTestWithMultiWorkers',
                                'FnApiRunnerTestWithBundleRepeat',
                                'FnApiRunnerTestWithBundleRepeatAndMultiWorkers',
+                               'FnApiRunnerTestWithGroupingBufferSpill',
                                'SamzaRunnerTest',
                                'SparkRunnerTest'}:
       raise unittest.SkipTest("https://github.com/apache/beam/issues/35168")
@@ -2036,10 +2041,21 @@ class FnApiRunnerTestWithMultiWorkers(FnApiRunnerTest):
     raise unittest.SkipTest("This test is for a single worker only.")
 
 
+# Shared by the workers of in-process environments.
+_BRANCH_BARRIER = threading.Barrier(2, timeout=60)
+
+
+def _wait_for_other_branch(x):
+  _BRANCH_BARRIER.wait()
+  return x
+
+
 class FnApiRunnerTestWithGrpcAndMultiWorkers(FnApiRunnerTest):
   def create_pipeline(self, is_drain=False):
     pipeline_options = PipelineOptions(
-        direct_num_workers=2, direct_running_mode='multi_threading')
+        direct_num_workers=2,
+        direct_running_mode='multi_threading',
+        direct_concurrent_stages=True)
     p = beam.Pipeline(
         runner=fn_api_runner.FnApiRunner(is_drain=is_drain),
         options=pipeline_options)
@@ -2068,6 +2084,75 @@ class FnApiRunnerTestWithGrpcAndMultiWorkers(FnApiRunnerTest):
   def test_sliding_windows(self):
     raise unittest.SkipTest("This test is for a single worker only.")
 
+  def test_independent_stages_run_concurrently(self):
+    # Each branch blocks until the other one is running as well.
+    _BRANCH_BARRIER.reset()
+    with self.create_pipeline() as p:
+      a = p | 'CreateA' >> beam.Create(
+          ['a']) | 'WaitA' >> beam.Map(_wait_for_other_branch)
+      b = p | 'CreateB' >> beam.Create(
+          ['b']) | 'WaitB' >> beam.Map(_wait_for_other_branch)
+      assert_that(a, equal_to(['a']), label='CheckA')
+      assert_that(b, equal_to(['b']), label='CheckB')
+
+
+class FnApiRunnerTestWithGroupingBufferSpill(FnApiRunnerTest):
+  def create_pipeline(self, is_drain=False):
+    # Spill every element to exercise merging of many sorted runs.
+    pipeline_options = PipelineOptions(direct_grouping_buffer_max_bytes=1)
+    return beam.Pipeline(
+        runner=fn_api_runner.FnApiRunner(is_drain=is_drain),
+        options=pipeline_options)
+
+  def test_group_by_key_spills_to_disk(self):
+    with self.create_pipeline() as p:
+      res = (
+          p
+          | beam.Create([(k % 7, k) for k in range(1000)])
+          | beam.GroupByKey()
+          | beam.MapTuple(lambda k, vs: (k, sorted(vs))))
+      assert_that(
+          res, equal_to([(k, list(range(k, 1000, 7))) for k in range(7)]))
+
+  def test_windowed_group_by_key_spills_to_disk(self):
+    with self.create_pipeline() as p:
+      res = (
+          p
+          | beam.Create([('k', t) for t in range(20)])
+          | beam.Map(lambda kv: window.TimestampedValue(kv, kv[1]))
+          | beam.WindowInto(window.FixedWindows(10))
+          | beam.GroupByKey()
+          | beam.MapTuple(lambda k, vs: (k, sorted(vs))))
+      assert_that(
+          res, equal_to([('k', list(range(10))), ('k', list(range(10, 20)))]))
+
+  def test_spilled_grouping_buffer_output_is_chunked(self):
+    pre_grouped_coder = coders.WindowedValueCoder(
+        coders.TupleCoder([coders.VarIntCoder(), coders.VarIntCoder()]))
+    post_grouped_coder = coders.WindowedValueCoder(
+        coders.TupleCoder(
+            [coders.VarIntCoder(), coders.IterableCoder(coders.VarIntCoder())]))
+    buffer = execution.GroupingBuffer(
+        pre_grouped_coder,
+        post_grouped_coder,
+        core.Windowing(window.GlobalWindows()),
+        max_bytes=16)
+    for k in range(100):
+      buffer.append(
+          pre_grouped_coder.encode(
+              window.GlobalWindows.windowed_value((k % 10, k))))
+    parts = buffer.partition(2)
+    # Each partition holds five keys, written out in one chunk per key.
+    self.assertEqual([5, 5], [len(list(part)) for part in parts])
+    # The spilled output can be read more than once.
+    for _ in range(2):
+      grouped = [
+          wv.value for part in parts for chunk in part
+          for wv in post_grouped_coder.get_impl().decode_all(chunk)
+      ]
+      self.assertEqual([(k, list(range(k, 100, 10))) for k in range(10)],
+                       sorted((k, list(vs)) for k, vs in grouped))
+
 
 class FnApiRunnerTestWithBundleRepeat(FnApiRunnerTest):
   def create_pipeline(self, is_drain=False):
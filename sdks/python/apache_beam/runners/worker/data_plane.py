@@ -64,6 +64,10 @@ _LOGGER = logging.getLogger(__name__)
 _DEFAULT_SIZE_FLUSH_THRESHOLD = 10 << 20  # 10MB
 _DEFAULT_TIME_FLUSH_THRESHOLD_MS = 0  # disable time-based flush by default
 _FLUSH_MAX_SIZE = (2 << 30) - 100  # 2GB less some overhead, protobuf/grpc limit
+# Bounds and step sizes for adaptive flush sizing. See AdaptiveFlushController.
+_ADAPTIVE_FLUSH_MIN_THRESHOLD = 64 << 10  # 64KB
+_ADAPTIVE_FLUSH_MAX_THRESHOLD = 64 << 20  # 64MB
+_ADAPTIVE_FLUSH_BACKLOG_DEPTH = 8
 # Keep a set of completed instructions to discard late received data. The set
 # can have up to _MAX_CLEANED_INSTRUCTIONS items. See _GrpcDataChannel.
 _MAX_CLEANED_INSTRUCTIONS = 10000
@@ -108,21 +112,99 @@ class ClosableOutputStream(OutputStream):
     # type: () -> None
     pass
 
+  def adaptive_size_flush_threshold(self):
+    # type: () -> Optional[int]
+
+    """Returns the current flush threshold if it is being tuned adaptively."""
+    return None
+
   @staticmethod
   def create(
       close_callback,  # type: Optional[Callable[[bytes], None]]
       flush_callback,  # type: Optional[Callable[[bytes], None]]
-      data_buffer_time_limit_ms  # type: int
+      data_buffer_time_limit_ms,  # type: int
+      flush_controller=None  # type: Optional[AdaptiveFlushController]
   ):
     # type: (...) -> ClosableOutputStream
     if data_buffer_time_limit_ms > 0:
       return TimeBasedBufferingClosableOutputStream(
           close_callback,
           flush_callback=flush_callback,
-          time_flush_threshold_ms=data_buffer_time_limit_ms)
+          time_flush_threshold_ms=data_buffer_time_limit_ms,
+          flush_controller=flush_controller)
     else:
       return SizeBasedBufferingClosableOutputStream(
-          close_callback, flush_callback=flush_callback)
+          close_callback,
+          flush_callback=flush_callback,
+          flush_controller=flush_controller)
+
+
+class AdaptiveFlushController(object):
+  """Tunes the size flush threshold of the output streams of a data channel.
+
+  The controller is fed, for every message handed to gRPC, the time gRPC took
+  to accept it and the number of messages still waiting in the channel's send
+  queue. Their product estimates how long freshly flushed data waits before it
+  is on the wire.
+
+  With a positive target_latency_ms the threshold is adjusted AIMD-style to
+  keep that estimate under the target: it is halved whenever the target is
+  exceeded and grows additively while the estimate is below half the target.
+  Otherwise the controller optimizes for throughput: the threshold doubles
+  while the send queue is backed up, so that fewer and larger messages are
+  sent, and decays back towards its initial value once the backlog clears.
+  """
+  def __init__(
+      self,
+      target_latency_ms=0,  # type: int
+      initial_threshold=None,  # type: Optional[int]
+      min_threshold=_ADAPTIVE_FLUSH_MIN_THRESHOLD,  # type: int
+      max_threshold=_ADAPTIVE_FLUSH_MAX_THRESHOLD,  # type: int
+      backlog_depth=_ADAPTIVE_FLUSH_BACKLOG_DEPTH  # type: int
+  ):
+    # type: (...) -> None
+    if not 0 < min_threshold <= max_threshold <= _FLUSH_MAX_SIZE:
+      raise ValueError(
+          'Invalid flush threshold bounds [%s, %s]' %
+          (min_threshold, max_threshold))
+    if initial_threshold is None:
+      initial_threshold = min(_DEFAULT_SIZE_FLUSH_THRESHOLD, max_threshold)
+    self._target_latency_secs = target_latency_ms / 1000.0
+    self._min_threshold = min_threshold
+    self._max_threshold = max_threshold
+    self._initial_threshold = max(
+        min_threshold, min(initial_threshold, max_threshold))
+    self._step = min_threshold
+    self._backlog_depth = backlog_depth
+    self._threshold = self._initial_threshold
+
+  @property
+  def size_flush_threshold(self):
+    # type: () -> int
+    return self._threshold
+
+  def observe(self, send_latency_secs, queue_depth):
+    # type: (float, int) -> None
+
+    """Records one send and adjusts the flush threshold accordingly.
+
+    Args:
+      send_latency_secs: the time gRPC took to accept the last message.
+      queue_depth: the number of messages waiting to be sent.
+    """
+    threshold = self._threshold
+    if self._target_latency_secs > 0:
+      estimated_latency_secs = send_latency_secs * (queue_depth + 1)
+      if estimated_latency_secs > self._target_latency_secs:
+        threshold //= 2
+      elif estimated_latency_secs < self._target_latency_secs / 2:
+        threshold += self._step
+    elif queue_depth >= self._backlog_depth:
+      threshold *= 2
+    elif queue_depth == 0 and threshold > self._initial_threshold:
+      threshold = max(self._initial_threshold, threshold - self._step)
+    self._threshold = max(
+        self._min_threshold, min(threshold, self._max_threshold))
 
 
 class SizeBasedBufferingClosableOutputStream(ClosableOutputStream):
@@ -135,19 +217,31 @@ class SizeBasedBufferingClosableOutputStream(ClosableOutputStream):
       close_callback=None,  # type: Optional[Callable[[bytes], None]]
       flush_callback=None,  # type: Optional[Callable[[bytes], None]]
       size_flush_threshold=_DEFAULT_SIZE_FLUSH_THRESHOLD,  # type: int
-      large_buffer_warn_threshold_bytes=512 << 20  # type: int
+      large_buffer_warn_threshold_bytes=512 << 20,  # type: int
+      flush_controller=None  # type: Optional[AdaptiveFlushController]
   ):
     super().__init__(close_callback)
     self._flush_callback = flush_callback
     self._size_flush_threshold = size_flush_threshold
     self._large_buffer_warn_threshold_bytes = large_buffer_warn_threshold_bytes
+    self._flush_controller = flush_controller
 
   # This must be called explicitly to avoid flushing partial elements.
   def maybe_flush(self):
     # type: () -> None
-    if self.size() > self._size_flush_threshold:
+    if self._flush_controller is not None:
+      size_flush_threshold = self._flush_controller.size_flush_threshold
+    else:
+      size_flush_threshold = self._size_flush_threshold
+    if self.size() > size_flush_threshold:
       self.flush()
 
+  def adaptive_size_flush_threshold(self):
+    # type: () -> Optional[int]
+    if self._flush_controller is not None:
+      return self._flush_controller.size_flush_threshold
+    return None
+
   def flush(self):
     # type: () -> None
     if self._flush_callback:
@@ -192,10 +286,15 @@ class TimeBasedBufferingClosableOutputStream(
       close_callback=None,  # type: Optional[Callable[[bytes], None]]
       flush_callback=None,  # type: Optional[Callable[[bytes], None]]
       size_flush_threshold=_DEFAULT_SIZE_FLUSH_THRESHOLD,  # type: int
-      time_flush_threshold_ms=_DEFAULT_TIME_FLUSH_THRESHOLD_MS  # type: int
+      time_flush_threshold_ms=_DEFAULT_TIME_FLUSH_THRESHOLD_MS,  # type: int
+      flush_controller=None  # type: Optional[AdaptiveFlushController]
   ):
     # type: (...) -> None
-    super().__init__(close_callback, flush_callback, size_flush_threshold)
+    super().__init__(
+        close_callback,
+        flush_callback,
+        size_flush_threshold,
+        flush_controller=flush_controller)
     assert time_flush_threshold_ms > 0
     self._time_flush_threshold_ms = time_flush_threshold_ms
     self._flush_lock = threading.Lock()
@@ -453,9 +552,18 @@ class _GrpcDataChannel(DataChannel):
 
   _WRITES_FINISHED = beam_fn_api_pb2.Elements.Data()
 
-  def __init__(self, data_buffer_time_limit_ms=0):
-    # type: (int) -> None
+  def __init__(
+      self,
+      data_buffer_time_limit_ms=0,  # type: int
+      adaptive_flush_target_latency_ms=None  # type: Optional[int]
+  ):
+    # type: (...) -> None
     self._data_buffer_time_limit_ms = data_buffer_time_limit_ms
+    if adaptive_flush_target_latency_ms is None:
+      self._flush_controller = None  # type: Optional[AdaptiveFlushController]
+    else:
+      self._flush_controller = AdaptiveFlushController(
+          adaptive_flush_target_latency_ms)
     self._to_send = queue.Queue()  # type: queue.Queue[DataOrTimers]
     self._received = collections.defaultdict(
         lambda: queue.Queue(maxsize=5)
@@ -598,7 +706,10 @@ class _GrpcDataChannel(DataChannel):
               is_last=True))
 
     return ClosableOutputStream.create(
-        close_callback, add_to_send_queue, self._data_buffer_time_limit_ms)
+        close_callback,
+        add_to_send_queue,
+        self._data_buffer_time_limit_ms,
+        self._flush_controller)
 
   def output_timer_stream(
       self,
@@ -629,7 +740,10 @@ class _GrpcDataChannel(DataChannel):
               is_last=True))
 
     return ClosableOutputStream.create(
-        close_callback, add_to_send_queue, self._data_buffer_time_limit_ms)
+        close_callback,
+        add_to_send_queue,
+        self._data_buffer_time_limit_ms,
+        self._flush_controller)
 
   def _write_outputs(self):
     # type: () -> Iterator[beam_fn_api_pb2.Elements]
@@ -659,7 +773,12 @@ class _GrpcDataChannel(DataChannel):
             data_stream.append(stream)
           else:
             raise ValueError('Unexpected output element type %s' % type(stream))
+        send_start = time.time()
         yield beam_fn_api_pb2.Elements(data=data_stream, timers=timer_stream)
+        # gRPC resumes this generator once it has accepted the message above.
+        if self._flush_controller is not None:
+          self._flush_controller.observe(
+              time.time() - send_start, self._to_send.qsize())
 
   def _read_inputs(self, elements_iterator):
     # type: (Iterable[beam_fn_api_pb2.Elements]) -> None
@@ -728,10 +847,12 @@ class GrpcClientDataChannel(_GrpcDataChannel):
   def __init__(
       self,
       data_stub,  # type: beam_fn_api_pb2_grpc.BeamFnDataStub
-      data_buffer_time_limit_ms=0  # type: int
+      data_buffer_time_limit_ms=0,  # type: int
+      adaptive_flush_target_latency_ms=None  # type: Optional[int]
   ):
     # type: (...) -> None
-    super().__init__(data_buffer_time_limit_ms)
+    super().__init__(
+        data_buffer_time_limit_ms, adaptive_flush_target_latency_ms)
     self.set_inputs(data_stub.Data(self._write_outputs()))
 
 
@@ -797,7 +918,8 @@ class GrpcClientDataChannelFactory(DataChannelFactory):
       self,
       credentials=None,  # type: Any
       worker_id=None,  # type: Optional[str]
-      data_buffer_time_limit_ms=0  # type: int
+      data_buffer_time_limit_ms=0,  # type: int
+      adaptive_flush_target_latency_ms=None  # type: Optional[int]
   ):
     # type: (...) -> None
     self._data_channel_cache = {}  # type: Dict[str, GrpcClientDataChannel]
@@ -805,6 +927,7 @@ class GrpcClientDataChannelFactory(DataChannelFactory):
     self._credentials = None
     self._worker_id = worker_id
     self._data_buffer_time_limit_ms = data_buffer_time_limit_ms
+    self._adaptive_flush_target_latency_ms = adaptive_flush_target_latency_ms
     if credentials is not None:
       _LOGGER.info('Using secure channel creds.')
       self._credentials = credentials
@@ -835,7 +958,8 @@ class GrpcClientDataChannelFactory(DataChannelFactory):
               grpc_channel, WorkerIdInterceptor(self._worker_id))
           self._data_channel_cache[url] = GrpcClientDataChannel(
               beam_fn_api_pb2_grpc.BeamFnDataStub(grpc_channel),
-              self._data_buffer_time_limit_ms)
+              self._data_buffer_time_limit_ms,
+              self._adaptive_flush_target_latency_ms)
 
     return self._data_channel_cache[url]
 
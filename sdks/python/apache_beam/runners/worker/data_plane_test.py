@@ -40,7 +40,11 @@ class DataChannelTest(unittest.TestCase):
   def test_time_based_flush_grpc_data_channel(self):
     self._grpc_data_channel_test(True)
 
-  def _grpc_data_channel_test(self, time_based_flush=False):
+  def test_adaptive_flush_grpc_data_channel(self):
+    self._grpc_data_channel_test(adaptive_flush_target_latency_ms=100)
+
+  def _grpc_data_channel_test(
+      self, time_based_flush=False, adaptive_flush_target_latency_ms=None):
     if time_based_flush:
       data_servicer = data_plane.BeamFnDataServicer(
           data_buffer_time_limit_ms=100)
@@ -64,7 +68,9 @@ class DataChannelTest(unittest.TestCase):
       data_channel_client = data_plane.GrpcClientDataChannel(
           data_channel_stub, data_buffer_time_limit_ms=100)
     else:
-      data_channel_client = data_plane.GrpcClientDataChannel(data_channel_stub)
+      data_channel_client = data_plane.GrpcClientDataChannel(
+          data_channel_stub,
+          adaptive_flush_target_latency_ms=adaptive_flush_target_latency_ms)
 
     try:
       self._data_channel_test(
@@ -139,6 +145,78 @@ class DataChannelTest(unittest.TestCase):
         ])
 
 
+class AdaptiveFlushControllerTest(unittest.TestCase):
+  def test_latency_target(self):
+    controller = data_plane.AdaptiveFlushController(
+        target_latency_ms=100,
+        initial_threshold=1 << 20,
+        min_threshold=1 << 10,
+        max_threshold=4 << 20)
+    self.assertEqual(controller.size_flush_threshold, 1 << 20)
+    # Over the target, either because of slow sends or a deep queue.
+    controller.observe(0.2, 0)
+    self.assertEqual(controller.size_flush_threshold, 1 << 19)
+    controller.observe(0.03, 5)
+    self.assertEqual(controller.size_flush_threshold, 1 << 18)
+    # Well within the target.
+    controller.observe(0.01, 1)
+    self.assertEqual(controller.size_flush_threshold, (1 << 18) + (1 << 10))
+    # Close to the target.
+    controller.observe(0.07, 0)
+    self.assertEqual(controller.size_flush_threshold, (1 << 18) + (1 << 10))
+    for _ in range(100):
+      controller.observe(1, 10)
+    self.assertEqual(controller.size_flush_threshold, 1 << 10)
+    for _ in range(10000):
+      controller.observe(0, 0)
+    self.assertEqual(controller.size_flush_threshold, 4 << 20)
+
+  def test_throughput(self):
+    controller = data_plane.AdaptiveFlushController(
+        initial_threshold=1 << 20,
+        min_threshold=1 << 10,
+        max_threshold=4 << 20,
+        backlog_depth=4)
+    # Send latency alone does not matter without a latency target.
+    controller.observe(10, 0)
+    self.assertEqual(controller.size_flush_threshold, 1 << 20)
+    controller.observe(0.01, 4)
+    self.assertEqual(controller.size_flush_threshold, 2 << 20)
+    controller.observe(0.01, 8)
+    controller.observe(0.01, 8)
+    self.assertEqual(controller.size_flush_threshold, 4 << 20)
+    # A partially drained queue keeps the threshold.
+    controller.observe(0.01, 2)
+    self.assertEqual(controller.size_flush_threshold, 4 << 20)
+    controller.observe(0.01, 0)
+    self.assertEqual(controller.size_flush_threshold, (4 << 20) - (1 << 10))
+    for _ in range(10000):
+      controller.observe(0.01, 0)
+    self.assertEqual(controller.size_flush_threshold, 1 << 20)
+
+  def test_invalid_bounds(self):
+    with self.assertRaises(ValueError):
+      data_plane.AdaptiveFlushController(min_threshold=2, max_threshold=1)
+
+  def test_output_stream(self):
+    flushed = []
+    controller = data_plane.AdaptiveFlushController(
+        target_latency_ms=100, initial_threshold=2 << 10, min_threshold=1 << 10)
+    stream = data_plane.SizeBasedBufferingClosableOutputStream(
+        flush_callback=flushed.append, flush_controller=controller)
+    self.assertEqual(stream.adaptive_size_flush_threshold(), 2 << 10)
+    stream.write(b'a' * 1500)
+    stream.maybe_flush()
+    self.assertEqual(flushed, [])
+    controller.observe(1, 0)
+    self.assertEqual(stream.adaptive_size_flush_threshold(), 1 << 10)
+    stream.maybe_flush()
+    self.assertEqual(flushed, [b'a' * 1500])
+    self.assertIsNone(
+        data_plane.SizeBasedBufferingClosableOutputStream().
+        adaptive_size_flush_threshold())
+
+
 if __name__ == '__main__':
   logging.getLogger().setLevel(logging.INFO)
   unittest.main()
@@ -63,7 +63,9 @@ from apache_beam.runners.worker import statesampler
 from apache_beam.runners.worker.channel_factory import GRPCChannelFactory
 from apache_beam.runners.worker.data_plane import PeriodicThread
 from apache_beam.runners.worker.statecache import CacheAware
+from apache_beam.runners.worker.statecache import ShardedStateCache
 from apache_beam.runners.worker.statecache import StateCache
+from apache_beam.runners.worker.statecache import estimate_weight
 from apache_beam.runners.worker.worker_id_interceptor import WorkerIdInterceptor
 from apache_beam.runners.worker.worker_status import FnApiWorkerStatusHandler
 from apache_beam.utils import thread_pool_executor
@@ -165,8 +167,11 @@ class SdkHarness(object):
       worker_id=None,  # type: Optional[str]
       # Caching is disabled by default
       state_cache_size=0,  # type: int
+      state_cache_shards=1,  # type: int
       # time-based data buffering is disabled by default
       data_buffer_time_limit_ms=0,  # type: int
+      # adaptive flush sizing is disabled by default
+      data_buffer_adaptive_flush_target_latency_ms=None,  # type: Optional[int]
       profiler_factory=None,  # type: Optional[Callable[..., Profile]]
       status_address=None,  # type: Optional[str]
       # Heap dump through status api is disabled by default
@@ -181,7 +186,11 @@ class SdkHarness(object):
     self._alive = True
     self._worker_index = 0
     self._worker_id = worker_id
-    self._state_cache = StateCache(state_cache_size)
+    if state_cache_shards > 1:
+      self._state_cache = ShardedStateCache(
+          state_cache_size, state_cache_shards)  # type: StateCache
+    else:
+      self._state_cache = StateCache(state_cache_size)
     self._deferred_exception = deferred_exception
     options = [('grpc.max_receive_message_length', -1),
                ('grpc.max_send_message_length', -1)]
@@ -199,7 +208,10 @@ class SdkHarness(object):
     self._control_channel = grpc.intercept_channel(
         self._control_channel, WorkerIdInterceptor(self._worker_id))
     self._data_channel_factory = data_plane.GrpcClientDataChannelFactory(
-        credentials, self._worker_id, data_buffer_time_limit_ms)
+        credentials,
+        self._worker_id,
+        data_buffer_time_limit_ms,
+        data_buffer_adaptive_flush_target_latency_ms)
     self._state_handler_factory = GrpcStateHandlerFactory(
         state_cache=self._state_cache,
         credentials=credentials,
@@ -1390,6 +1402,10 @@ class GlobalCachingStateHandler(CachingStateHandler):
       # we don't want to include in the cache measurement.
       return [self.head]
 
+    def get_cache_weight(self):
+      # type: () -> Optional[int]
+      return estimate_weight(self.head)
+
   @staticmethod
   def _convert_to_cache_key(state_key):
     # type: (beam_fn_api_pb2.StateKey) -> bytes
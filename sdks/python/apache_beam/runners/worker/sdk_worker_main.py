@@ -36,6 +36,7 @@ from apache_beam.options.pipeline_options import GoogleCloudOptions
 from apache_beam.options.pipeline_options import PipelineOptions
 from apache_beam.options.pipeline_options import ProfilingOptions
 from apache_beam.options.pipeline_options import SetupOptions
+from apache_beam.options.pipeline_options import StandardOptions
 from apache_beam.options.pipeline_options import WorkerOptions
 from apache_beam.options.value_provider import RuntimeValueProvider
 from apache_beam.portability.api import endpoints_pb2
@@ -161,7 +162,12 @@ def create_harness(environment, dry_run=False):
       worker_id=_worker_id,
       state_cache_size=_get_state_cache_size_bytes(
           options=sdk_pipeline_options),
+      state_cache_shards=sdk_pipeline_options.view_as(
+          WorkerOptions).max_cache_memory_usage_shards,
       data_buffer_time_limit_ms=_get_data_buffer_time_limit_ms(experiments),
+      data_buffer_adaptive_flush_target_latency_ms=(
+          _get_data_buffer_adaptive_flush_target_latency_ms(
+              sdk_pipeline_options)),
       profiler_factory=profiler.Profile.factory_from_options(
           sdk_pipeline_options.view_as(ProfilingOptions)),
       enable_heap_dump=enable_heap_dump,
@@ -285,6 +291,36 @@ def _get_data_buffer_time_limit_ms(experiments):
   return 0
 
 
+def _get_data_buffer_adaptive_flush_target_latency_ms(options):
+  """Defines whether and how the outbound data buffer size is tuned.
+
+  Adaptive flush sizing is enabled by the data_buffer_adaptive_flush
+  experiment. Streaming pipelines then keep the estimated send latency under
+  a target, 100ms by default, which can be overridden with
+  data_buffer_adaptive_flush_latency_ms=<ms>. Batch pipelines, and a target
+  of 0, optimize for throughput instead.
+
+  Note: these are experimental flags and might not be available in future
+  releases.
+
+  Returns:
+    None if adaptive flush sizing is disabled, otherwise an int indicating the
+      target send latency in milliseconds, with 0 maximizing throughput.
+  """
+  experiments = options.view_as(DebugOptions).experiments or []
+  target_latency_ms = None
+  for experiment in experiments:
+    match = re.match(
+        r'data_buffer_adaptive_flush_latency_ms=(?P<latency_ms>.*)', experiment)
+    if match:
+      target_latency_ms = int(match.group('latency_ms'))
+  if 'data_buffer_adaptive_flush' not in experiments:
+    return None
+  if target_latency_ms is not None:
+    return target_latency_ms
+  return 100 if options.view_as(StandardOptions).streaming else 0
+
+
 def _get_log_level_from_options_dict(options_dict: dict) -> int:
   """Get log level from options dict's entry `default_sdk_harness_log_level`.
   If not specified, default log level is logging.INFO.
@@ -245,6 +245,28 @@ class SdkWorkerMainTest(unittest.TestCase):
     cache_size = sdk_worker_main._get_state_cache_size_bytes(options)
     self.assertEqual(cache_size, 50 << 20)
 
+  def test_data_buffer_adaptive_flush_target_latency_ms(self):
+    def target_latency_ms(flags):
+      return sdk_worker_main._get_data_buffer_adaptive_flush_target_latency_ms(
+          PipelineOptions(flags=flags))
+
+    self.assertIsNone(target_latency_ms([]))
+    self.assertIsNone(
+        target_latency_ms(
+            ['--experiments=data_buffer_adaptive_flush_latency_ms=50']))
+    self.assertEqual(
+        target_latency_ms(['--experiments=data_buffer_adaptive_flush']), 0)
+    self.assertEqual(
+        target_latency_ms(
+            ['--experiments=data_buffer_adaptive_flush', '--streaming']),
+        100)
+    self.assertEqual(
+        target_latency_ms([
+            '--experiments=data_buffer_adaptive_flush',
+            '--experiments=data_buffer_adaptive_flush_latency_ms=50'
+        ]),
+        50)
+
 
 if __name__ == '__main__':
   logging.getLogger().setLevel(logging.INFO)
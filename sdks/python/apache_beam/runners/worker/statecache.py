@@ -22,6 +22,7 @@
 import collections
 import gc
 import logging
+import random
 import sys
 import threading
 import time
@@ -30,6 +31,7 @@ import weakref
 from typing import Any
 from typing import Callable
 from typing import List
+from typing import Optional
 from typing import Tuple
 from typing import Union
 
@@ -37,6 +39,9 @@ import objsize
 
 _LOGGER = logging.getLogger(__name__)
 _DEFAULT_WEIGHT = 8
+# Lists with more elements than this are sized by sampling their elements.
+_SAMPLED_LIST_THRESHOLD = 1000
+_SAMPLED_LIST_SAMPLE_SIZE = 100
 _TYPES_TO_NOT_MEASURE = (
     # Do not measure shared types
     type,
@@ -81,6 +86,16 @@ class CacheAware(object):
     """Returns the list of objects accounted during cache measurement."""
     raise NotImplementedError()
 
+  def get_cache_weight(self) -> Optional[int]:
+    """Returns the weight of this object in bytes.
+
+    Returning None, the default, measures the deep size of the objects
+    returned by get_referents_for_cache() instead. Types that can cheaply
+    compute their own size should override this to avoid walking the object
+    graph when the object is stored in the cache.
+    """
+    return None
+
 
 def _safe_isinstance(obj: Any, type: Union[type, Tuple[type, ...]]) -> bool:
   """
@@ -166,6 +181,27 @@ def get_deep_size(*objs: Any) -> int:
       filter_func=_filter_func)
 
 
+def estimate_weight(obj: Any) -> int:
+  """Estimates the weight of an object stored in the cache in bytes.
+
+  Avoids walking the full object graph with get_deep_size where possible:
+    * bytes, bytearray and str objects are sized exactly.
+    * CacheAware objects may report their own weight via get_cache_weight.
+    * Large lists are sized by measuring a random sample of their elements
+      and extrapolating to the length of the list.
+  """
+  if _safe_isinstance(obj, (bytes, bytearray, str)):
+    return _size_func(obj)
+  if _safe_isinstance(obj, CacheAware):
+    weight = obj.get_cache_weight()
+    if weight is not None:
+      return weight
+  elif (_safe_isinstance(obj, list) and len(obj) > _SAMPLED_LIST_THRESHOLD):
+    sample = random.sample(obj, _SAMPLED_LIST_SAMPLE_SIZE)
+    return _size_func(obj) + get_deep_size(*sample) * len(obj) // len(sample)
+  return get_deep_size(obj)
+
+
 class _LoadingValue(WeightedValue):
   """Allows concurrent users of the cache to wait for a value to be loaded."""
   def __init__(self) -> None:
@@ -188,6 +224,36 @@ class _LoadingValue(WeightedValue):
     return self._value
 
 
+def _format_stats(
+    current_weight: int,
+    max_weight: int,
+    hit_count: int,
+    miss_count: int,
+    load_time_ns: int,
+    load_count: int,
+    evict_count: int,
+    size_time_ns: int,
+    size_count: int) -> str:
+  request_count = hit_count + miss_count
+  if request_count > 0:
+    hit_ratio = 100.0 * hit_count / request_count
+  else:
+    hit_ratio = 100.0
+  return (
+      'used/max %d/%d MB, hit %.2f%%, lookups %d, '
+      'avg load time %.0f ns, loads %d, evictions %d, '
+      'avg size time %.0f ns, sizes %d') % (
+          current_weight >> 20,
+          max_weight >> 20,
+          hit_ratio,
+          request_count,
+          load_time_ns / load_count if load_count > 0 else 0,
+          load_count,
+          evict_count,
+          size_time_ns / size_count if size_count > 0 else 0,
+          size_count)
+
+
 class StateCache(object):
   """LRU cache for Beam state access, scoped by state key and cache_token.
      Assumes a bag state implementation.
@@ -209,10 +275,16 @@ class StateCache(object):
   The operations on the cache are thread-safe for use by multiple workers.
 
   :arg max_weight The maximum weight of entries to store in the cache in bytes.
+  :arg weight_fn The function used to compute the weight in bytes of values
+  that are not WeightedValues.
   """
-  def __init__(self, max_weight: int) -> None:
+  def __init__(
+      self,
+      max_weight: int,
+      weight_fn: Callable[[Any], int] = estimate_weight) -> None:
     _LOGGER.info('Creating state cache with size %s', max_weight)
     self._max_weight = max_weight
+    self._weight_fn = weight_fn
     self._current_weight = 0
     self._cache: collections.OrderedDict[
         Any, WeightedValue] = collections.OrderedDict()
@@ -221,8 +293,24 @@ class StateCache(object):
     self._evict_count = 0
     self._load_time_ns = 0
     self._load_count = 0
+    self._size_time_ns = 0
+    self._size_count = 0
     self._lock = threading.RLock()
 
+  def _to_weighted_value(self, value: Any) -> Tuple[WeightedValue, int]:
+    """Sizes the value, returning the WeightedValue and the time spent sizing
+    it in nanoseconds."""
+    start_time_ns = time.time_ns()
+    weight = self._weight_fn(value)
+    elapsed_time_ns = time.time_ns() - start_time_ns
+    if weight <= 0:
+      _LOGGER.warning(
+          'Expected object size to be >= 0 for %s but received %d.',
+          value,
+          weight)
+      weight = _DEFAULT_WEIGHT
+    return WeightedValue(value, weight), elapsed_time_ns
+
   def peek(self, key: Any) -> Any:
     assert self.is_cache_enabled()
     with self._lock:
@@ -282,17 +370,12 @@ class StateCache(object):
 
     # Replace the value in the cache with a weighted value now that the
     # loading has completed successfully.
-    weight = get_deep_size(value)
-    if weight <= 0:
-      _LOGGER.warning(
-          'Expected object size to be >= 0 for %s but received %d.',
-          value,
-          weight)
-      weight = 8
-    value = WeightedValue(value, weight)
+    value, size_time_ns = self._to_weighted_value(value)
     with self._lock:
       self._load_count += 1
       self._load_time_ns += elapsed_time_ns
+      self._size_count += 1
+      self._size_time_ns += size_time_ns
       # Don't replace values that have already been replaced with a different
       # value by a put/invalidate that occurred concurrently with the load.
       # The put/invalidate will have been responsible for updating the
@@ -313,16 +396,13 @@ class StateCache(object):
 
   def put(self, key: Any, value: Any) -> None:
     assert self.is_cache_enabled()
+    size_time_ns: Optional[int] = None
     if not _safe_isinstance(value, WeightedValue):
-      weight = get_deep_size(value)
-      if weight <= 0:
-        _LOGGER.warning(
-            'Expected object size to be >= 0 for %s but received %d.',
-            value,
-            weight)
-        weight = _DEFAULT_WEIGHT
-      value = WeightedValue(value, weight)
+      value, size_time_ns = self._to_weighted_value(value)
     with self._lock:
+      if size_time_ns is not None:
+        self._size_count += 1
+        self._size_time_ns += size_time_ns
       old_value = self._cache.pop(key, None)
       if old_value is not None:
         self._current_weight -= old_value.weight()
@@ -347,22 +427,16 @@ class StateCache(object):
 
   def describe_stats(self) -> str:
     with self._lock:
-      request_count = self._hit_count + self._miss_count
-      if request_count > 0:
-        hit_ratio = 100.0 * self._hit_count / request_count
-      else:
-        hit_ratio = 100.0
-      return (
-          'used/max %d/%d MB, hit %.2f%%, lookups %d, '
-          'avg load time %.0f ns, loads %d, evictions %d') % (
-              self._current_weight >> 20,
-              self._max_weight >> 20,
-              hit_ratio,
-              request_count,
-              self._load_time_ns /
-              self._load_count if self._load_count > 0 else 0,
-              self._load_count,
-              self._evict_count)
+      return _format_stats(
+          self._current_weight,
+          self._max_weight,
+          self._hit_count,
+          self._miss_count,
+          self._load_time_ns,
+          self._load_count,
+          self._evict_count,
+          self._size_time_ns,
+          self._size_count)
 
   def is_cache_enabled(self) -> bool:
     return self._max_weight > 0
@@ -370,3 +444,87 @@ class StateCache(object):
   def size(self) -> int:
     with self._lock:
       return len(self._cache)
+
+
+class ShardedStateCache(StateCache):
+  """A StateCache that partitions keys across independently locked shards.
+
+  Each key is assigned to one of ``num_shards`` LRU caches by its hash, and
+  each shard holds up to ``max_weight / num_shards`` bytes. Lookups for keys
+  in different shards do not contend on the same lock, which reduces
+  contention when many bundle processing threads access state concurrently.
+  Eviction is LRU within a shard rather than across the whole cache.
+
+  :arg max_weight The maximum weight of entries to store in the cache in bytes.
+  :arg num_shards The number of independently locked shards.
+  :arg weight_fn The function used to compute the weight in bytes of values
+  that are not WeightedValues.
+  """
+  def __init__(
+      self,
+      max_weight: int,
+      num_shards: int,
+      weight_fn: Callable[[Any], int] = estimate_weight) -> None:
+    if num_shards <= 0:
+      raise ValueError('Expected num_shards to be > 0 but was %d' % num_shards)
+    _LOGGER.info(
+        'Creating state cache with size %s and %d shards',
+        max_weight,
+        num_shards)
+    self._max_weight = max_weight
+    self._shards = [
+        StateCache(max_weight // num_shards, weight_fn)
+        for _ in range(num_shards)
+    ]
+
+  def _shard_for(self, key: Any) -> StateCache:
+    return self._shards[hash(key) % len(self._shards)]
+
+  def peek(self, key: Any) -> Any:
+    return self._shard_for(key).peek(key)
+
+  def get(self, key: Any, loading_fn: Callable[[Any], Any]) -> Any:
+    return self._shard_for(key).get(key, loading_fn)
+
+  def put(self, key: Any, value: Any) -> None:
+    self._shard_for(key).put(key, value)
+
+  def invalidate(self, key: Any) -> None:
+    self._shard_for(key).invalidate(key)
+
+  def invalidate_all(self) -> None:
+    for shard in self._shards:
+      shard.invalidate_all()
+
+  def describe_stats(self) -> str:
+    current_weight = 0
+    hit_count = 0
+    miss_count = 0
+    evict_count = 0
+    load_time_ns = 0
+    load_count = 0
+    size_time_ns = 0
+    size_count = 0
+    for shard in self._shards:
+      with shard._lock:
+        current_weight += shard._current_weight
+        hit_count += shard._hit_count
+        miss_count += shard._miss_count
+        evict_count += shard._evict_count
+        load_time_ns += shard._load_time_ns
+        load_count += shard._load_count
+        size_time_ns += shard._size_time_ns
+        size_count += shard._size_count
+    return _format_stats(
+        current_weight,
+        self._max_weight,
+        hit_count,
+        miss_count,
+        load_time_ns,
+        load_count,
+        evict_count,
+        size_time_ns,
+        size_count) + ', shards %d' % len(self._shards)
+
+  def size(self) -> int:
+    return sum(shard.size() for shard in self._shards)
@@ -31,9 +31,11 @@ from hamcrest import assert_that
 from hamcrest import contains_string
 
 from apache_beam.runners.worker.statecache import CacheAware
+from apache_beam.runners.worker.statecache import ShardedStateCache
 from apache_beam.runners.worker.statecache import StateCache
 from apache_beam.runners.worker.statecache import WeightedValue
 from apache_beam.runners.worker.statecache import _LoadingValue
+from apache_beam.runners.worker.statecache import estimate_weight
 from apache_beam.runners.worker.statecache import get_deep_size
 
 
@@ -51,10 +53,10 @@ class StateCacheTest(unittest.TestCase):
     cache.put('deep ref', o)
     # Ensure that the contents of the internal weak ref isn't sized
     self.assertIsNotNone(cache.peek('deep ref'))
-    self.assertEqual(
+    self.assertRegex(
         cache.describe_stats(),
-        'used/max 0/5 MB, hit 100.00%, lookups 1, avg load time 0 ns, loads 0, '
-        'evictions 0')
+        r'used/max 0/5 MB, hit 100.00%, lookups 1, avg load time 0 ns, '
+        r'loads 0, evictions 0, avg size time \d+ ns, sizes 1')
     cache.invalidate_all()
 
     # Ensure that putting in a weakref doesn't fail regardless of whether
@@ -78,10 +80,10 @@ class StateCacheTest(unittest.TestCase):
     cache.put('deep ref', o)
     # Ensure that the contents of the internal weak ref isn't sized
     self.assertIsNotNone(cache.peek('deep ref'))
-    self.assertEqual(
+    self.assertRegex(
         cache.describe_stats(),
-        'used/max 0/5 MB, hit 100.00%, lookups 1, avg load time 0 ns, loads 0, '
-        'evictions 0')
+        r'used/max 0/5 MB, hit 100.00%, lookups 1, avg load time 0 ns, '
+        r'loads 0, evictions 0, avg size time \d+ ns, sizes 1')
     cache.invalidate_all()
 
     # Ensure that putting in a weakref doesn't fail regardless of whether
@@ -114,7 +116,8 @@ class StateCacheTest(unittest.TestCase):
         cache.describe_stats(),
         (
             'used/max 0/5 MB, hit 0.00%, lookups 1, '
-            'avg load time 0 ns, loads 0, evictions 0'))
+            'avg load time 0 ns, loads 0, evictions 0, '
+            'avg size time 0 ns, sizes 0'))
 
   def test_put_peek(self):
     cache = StateCache(5 << 20)
@@ -126,7 +129,8 @@ class StateCacheTest(unittest.TestCase):
         cache.describe_stats(),
         (
             'used/max 1/5 MB, hit 50.00%, lookups 2, '
-            'avg load time 0 ns, loads 0, evictions 0'))
+            'avg load time 0 ns, loads 0, evictions 0, '
+            'avg size time 0 ns, sizes 0'))
 
   def test_default_sized_put(self):
     cache = StateCache(5 << 20)
@@ -139,11 +143,12 @@ class StateCacheTest(unittest.TestCase):
     # note that each byte array instance takes slightly over 1 MB which is why
     # these 5 byte arrays can't all be stored in the cache causing a single
     # eviction
-    self.assertEqual(
+    self.assertRegex(
         cache.describe_stats(),
         (
-            'used/max 4/5 MB, hit 100.00%, lookups 1, '
-            'avg load time 0 ns, loads 0, evictions 1'))
+            r'used/max 4/5 MB, hit 100.00%, lookups 1, '
+            r'avg load time 0 ns, loads 0, evictions 1, '
+            r'avg size time \d+ ns, sizes 5'))
 
   def test_max_size(self):
     cache = StateCache(2 << 20)
@@ -156,7 +161,8 @@ class StateCacheTest(unittest.TestCase):
         cache.describe_stats(),
         (
             'used/max 2/2 MB, hit 100.00%, lookups 0, '
-            'avg load time 0 ns, loads 0, evictions 1'))
+            'avg load time 0 ns, loads 0, evictions 1, '
+            'avg size time 0 ns, sizes 0'))
 
   def test_invalidate_all(self):
     cache = StateCache(5 << 20)
@@ -171,7 +177,8 @@ class StateCacheTest(unittest.TestCase):
         cache.describe_stats(),
         (
             'used/max 0/5 MB, hit 0.00%, lookups 2, '
-            'avg load time 0 ns, loads 0, evictions 0'))
+            'avg load time 0 ns, loads 0, evictions 0, '
+            'avg size time 0 ns, sizes 0'))
 
   def test_lru(self):
     cache = StateCache(5 << 20)
@@ -216,7 +223,8 @@ class StateCacheTest(unittest.TestCase):
         cache.describe_stats(),
         (
             'used/max 5/5 MB, hit 60.00%, lookups 10, '
-            'avg load time 0 ns, loads 0, evictions 5'))
+            'avg load time 0 ns, loads 0, evictions 5, '
+            'avg size time 0 ns, sizes 0'))
 
   def test_get(self):
     def check_key(key):
@@ -246,7 +254,7 @@ class StateCacheTest(unittest.TestCase):
 
     assert_that(cache.describe_stats(), contains_string(", loads 3,"))
     load_time_ns = re.search(
-        ", avg load time (.+) ns,", cache.describe_stats()).group(1)
+        r", avg load time (\d+) ns,", cache.describe_stats()).group(1)
     # Load time should be larger then the sleep time and less than 2x sleep time
     self.assertGreater(int(load_time_ns), 0.5 * 1_000_000_000)
     self.assertLess(int(load_time_ns), 1_000_000_000)
@@ -336,14 +344,16 @@ class StateCacheTest(unittest.TestCase):
         cache.describe_stats(),
         (
             'used/max 0/1 MB, hit 100.00%, lookups 0, '
-            'avg load time 0 ns, loads 0, evictions 0'))
+            'avg load time 0 ns, loads 0, evictions 0, '
+            'avg size time 0 ns, sizes 0'))
     cache = StateCache(0)
     self.assertEqual(cache.is_cache_enabled(), False)
     self.assertEqual(
         cache.describe_stats(),
         (
             'used/max 0/0 MB, hit 100.00%, lookups 0, '
-            'avg load time 0 ns, loads 0, evictions 0'))
+            'avg load time 0 ns, loads 0, evictions 0, '
+            'avg size time 0 ns, sizes 0'))
 
   def test_get_referents_for_cache(self):
     class GetReferentsForCache(CacheAware):
@@ -356,11 +366,12 @@ class StateCacheTest(unittest.TestCase):
 
     cache = StateCache(5 << 20)
     cache.put("key", GetReferentsForCache())
-    self.assertEqual(
+    self.assertRegex(
         cache.describe_stats(),
         (
-            'used/max 1/5 MB, hit 100.00%, lookups 0, '
-            'avg load time 0 ns, loads 0, evictions 0'))
+            r'used/max 1/5 MB, hit 100.00%, lookups 0, '
+            r'avg load time 0 ns, loads 0, evictions 0, '
+            r'avg size time \d+ ns, sizes 1'))
 
   def test_get_deep_size_builtin_objects(self):
     """
@@ -402,6 +413,47 @@ class StateCacheTest(unittest.TestCase):
           objsize.get_deep_size(obj),
           f'different size for obj: `{obj}`, type: {type(obj)}')
 
+  def test_get_cache_weight(self):
+    class GetCacheWeight(CacheAware):
+      def __init__(self):
+        self.ignore_me = bytearray(2 << 20)
+
+      def get_referents_for_cache(self):
+        raise AssertionError('Should not be called.')
+
+      def get_cache_weight(self):
+        return 1 << 20
+
+    cache = StateCache(5 << 20)
+    cache.put("key", GetCacheWeight())
+    self.assertRegex(
+        cache.describe_stats(),
+        (
+            r'used/max 1/5 MB, hit 100.00%, lookups 0, '
+            r'avg load time 0 ns, loads 0, evictions 0, '
+            r'avg size time \d+ ns, sizes 1'))
+
+  def test_estimate_weight(self):
+    self.assertEqual(estimate_weight(b'abc'), sys.getsizeof(b'abc'))
+    self.assertEqual(estimate_weight('abc'), sys.getsizeof('abc'))
+    small_list = ['a%d' % i for i in range(10)]
+    self.assertEqual(estimate_weight(small_list), get_deep_size(small_list))
+    # Large lists are sized by extrapolating from a sample of their elements.
+    large_list = [i.to_bytes(100, 'big') for i in range(10000)]
+    self.assertEqual(
+        estimate_weight(large_list),
+        sys.getsizeof(large_list) + 10000 * sys.getsizeof(bytes(100)))
+    mixed_list = ['a' * (i % 100) for i in range(5000)]
+    ratio = estimate_weight(mixed_list) / get_deep_size(mixed_list)
+    self.assertAlmostEqual(ratio, 1.0, delta=0.15)
+
+  def test_custom_weight_fn(self):
+    cache = StateCache(5 << 20, weight_fn=lambda value: 1 << 20)
+    cache.put("key", "value")
+    cache.put("key2", ["value2"])
+    self.assertEqual(cache.size(), 2)
+    self.assertRegex(cache.describe_stats(), r'used/max 2/5 MB, .*, sizes 2$')
+
   def test_current_weight_between_get_and_put(self):
     value = 1234567
     get_cache = StateCache(100)
@@ -413,6 +465,67 @@ class StateCacheTest(unittest.TestCase):
     self.assertEqual(get_cache._current_weight, put_cache._current_weight)
 
 
+class ShardedStateCacheTest(unittest.TestCase):
+  def test_put_peek_get(self):
+    cache = ShardedStateCache(8 << 20, 4)
+    cache.put("key", WeightedValue("value", 1 << 20))
+    self.assertEqual(cache.size(), 1)
+    self.assertEqual(cache.peek("key"), "value")
+    self.assertEqual(cache.peek("key2"), None)
+    self.assertEqual(cache.get("key2", lambda k: "value2"), "value2")
+    self.assertEqual(cache.peek("key2"), "value2")
+    cache.invalidate("key")
+    self.assertEqual(cache.peek("key"), None)
+    self.assertEqual(cache.size(), 1)
+
+  def test_describe_stats_aggregates_shards(self):
+    cache = ShardedStateCache(8 << 20, 4)
+    for i in range(8):
+      cache.put(i, WeightedValue(i, 1 << 20))
+    for i in range(8):
+      cache.peek(i)
+    cache.peek("missing")
+    self.assertEqual(
+        cache.describe_stats(),
+        (
+            'used/max 8/8 MB, hit 88.89%, lookups 9, '
+            'avg load time 0 ns, loads 0, evictions 0, '
+            'avg size time 0 ns, sizes 0, shards 4'))
+
+  def test_evicts_within_shard(self):
+    # Integers hash to themselves, so keys 0, 2, 4 land in the same shard.
+    cache = ShardedStateCache(4 << 20, 2)
+    cache.put(0, WeightedValue("value0", 1 << 20))
+    cache.put(1, WeightedValue("value1", 1 << 20))
+    cache.put(2, WeightedValue("value2", 1 << 20))
+    cache.put(4, WeightedValue("value4", 1 << 20))
+    self.assertEqual(cache.peek(0), None)
+    self.assertEqual(cache.peek(1), "value1")
+    self.assertEqual(cache.peek(2), "value2")
+    self.assertEqual(cache.peek(4), "value4")
+    cache.invalidate_all()
+    self.assertEqual(cache.size(), 0)
+
+  def test_concurrent_access(self):
+    cache = ShardedStateCache(100 << 20, 8)
+
+    def worker(thread_id):
+      for i in range(1000):
+        key = (thread_id + i) % 100
+        self.assertEqual(cache.get(key, lambda k: k), key)
+
+    threads = [threading.Thread(target=worker, args=(i, )) for i in range(8)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    self.assertEqual(cache.size(), 100)
+
+  def test_invalid_num_shards(self):
+    with self.assertRaises(ValueError):
+      ShardedStateCache(1 << 20, 0)
+
+
 if __name__ == '__main__':
   logging.getLogger().setLevel(logging.INFO)
   unittest.main()
@@ -73,6 +73,35 @@ def coder_benchmark_factory(coder, generate_fn):
   return CoderBenchmark
 
 
+def data_plane_decode_benchmark_factory(coder, generate_fn):
+  """Creates a benchmark that decodes elements from a data plane buffer.
+
+  The elements are encoded once into a single buffer, which is decoded through
+  a memoryview in the same way the SDK harness decodes received data.
+
+  Args:
+    coder: a LengthPrefixCoder to use to encode an element.
+    generate_fn: a callable that generates an element.
+  """
+  class DecodeBenchmark(object):
+    def __init__(self, num_elements_per_benchmark):
+      self._coder_impl = coder.get_impl()
+      output_stream = coder_impl.create_OutputStream()
+      for _ in range(num_elements_per_benchmark):
+        self._coder_impl.encode_to_stream(generate_fn(), output_stream, True)
+      self._data = output_stream.get()
+
+    def __call__(self):
+      input_stream = coder_impl.create_InputStream(memoryview(self._data))
+      while input_stream.size() > 0:
+        self._coder_impl.decode_from_stream(input_stream, True)
+
+  DecodeBenchmark.__name__ = "%s, %s, data plane decode" % (
+      generate_fn.__name__, str(coder))
+
+  return DecodeBenchmark
+
+
 def batch_row_coder_benchmark_factory(generate_fn, use_batch):
   """Creates a benchmark that encodes and decodes a list of elements.
 
@@ -139,6 +168,10 @@ def large_string():
   return random_string(100)
 
 
+def large_bytes():
+  return random_string(1000).encode('utf-8')
+
+
 def list_int(size):
   return [small_int() for _ in range(size)]
 
@@ -298,6 +331,14 @@ def run_coder_benchmarks(
           globally_windowed_value),
       coder_benchmark_factory(
           coders.LengthPrefixCoder(coders.FastPrimitivesCoder()), small_int),
+      data_plane_decode_benchmark_factory(
+          coders.LengthPrefixCoder(coders.BytesCoder()), large_bytes),
+      data_plane_decode_benchmark_factory(
+          coders.LengthPrefixCoder(coders.FastPrimitivesCoder()), large_bytes),
+      data_plane_decode_benchmark_factory(
+          coders.LengthPrefixCoder(coders.FastPrimitivesCoder()), large_string),
+      data_plane_decode_benchmark_factory(
+          coders.LengthPrefixCoder(coders.FastPrimitivesCoder()), large_list),
       row_coder_benchmark_factory(tiny_row),
       row_coder_benchmark_factory(large_row),
       row_coder_benchmark_factory(nullable_row),
@@ -24,6 +24,9 @@ from importlib.metadata import PackageNotFoundError
 from importlib.metadata import distribution
 
 from apache_beam.tools import coders_microbenchmark
+from apache_beam.tools import row_coder_microbenchmark
+from apache_beam.tools import statecache_microbenchmark
+from apache_beam.tools import textio_microbenchmark
 from apache_beam.tools import utils
 
 
@@ -34,6 +37,17 @@ class MicrobenchmarksTest(unittest.TestCase):
     coders_microbenchmark.run_coder_benchmarks(
         num_runs=1, input_size=10, seed=1, verbose=False)
 
+  def test_row_coder_microbenchmark(self):
+    row_coder_microbenchmark.run_benchmark(
+        num_runs=1, num_rows=10, verbose=False)
+
+  def test_textio_microbenchmark(self):
+    textio_microbenchmark.run_benchmark(size_mb=1, verbose=False)
+
+  def test_statecache_microbenchmark(self):
+    statecache_microbenchmark.run_benchmark(
+        num_runs=1, ops_per_thread=10, thread_counts=(1, 2), verbose=False)
+
   def is_cython_installed(self):
     try:
       distribution('cython')
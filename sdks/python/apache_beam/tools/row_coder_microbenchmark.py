@@ -0,0 +1,112 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""A microbenchmark comparing per-row and columnar RowCoder throughput.
+
+Encodes and decodes the same rows one row at a time, as a batch of numpy
+columns and as a pyarrow RecordBatch, and reports rows/sec for each.
+
+Run as
+  python -m apache_beam.tools.row_coder_microbenchmark
+"""
+
+# pytype: skip-file
+
+import logging
+import random
+import time
+import typing
+
+import numpy as np
+
+from apache_beam.coders import RowCoder
+from apache_beam.typehints.schemas import typing_to_runner_api
+
+try:
+  import pyarrow as pa
+except ImportError:
+  pa = None
+
+
+class Trade(typing.NamedTuple):
+  symbol: str
+  price: np.float64
+  quantity: np.int64
+  fee: typing.Optional[np.float64]
+  buy: bool
+
+
+def _generate_columns(num_rows, seed):
+  rand = random.Random(seed)
+  return {
+      'symbol': np.array(
+          ['SYM%d' % rand.randrange(100) for _ in range(num_rows)],
+          dtype=object),
+      'price': np.array([rand.random() * 100 for _ in range(num_rows)]),
+      'quantity': np.array([rand.randrange(1000) for _ in range(num_rows)]),
+      'fee': np.ma.MaskedArray([rand.random() for _ in range(num_rows)],
+                               mask=[i % 4 == 0 for i in range(num_rows)]),
+      'buy': np.array([rand.random() < 0.5 for _ in range(num_rows)]),
+  }
+
+
+def _time(fn, num_runs):
+  times = []
+  for _ in range(num_runs):
+    start = time.time()
+    fn()
+    times.append(time.time() - start)
+  return sum(times) / len(times)
+
+
+def run_benchmark(num_runs=5, num_rows=100000, seed=0, verbose=True):
+  coder = RowCoder(typing_to_runner_api(Trade).row_type.schema)
+  columns = _generate_columns(num_rows, seed)
+  rows = [
+      Trade(*values) for values in zip(
+          columns['symbol'], columns['price'], columns['quantity'],
+          columns['fee'].tolist(), columns['buy'])
+  ]
+  impl = coder.get_impl()
+  encoded_rows = [impl.encode(row) for row in rows]
+  encoded = b''.join(encoded_rows)
+
+  benchmarks = [
+      ('per-row encode', lambda: [impl.encode(row) for row in rows]),
+      ('per-row decode', lambda: [impl.decode(row) for row in encoded_rows]),
+      ('numpy batch encode', lambda: coder.encode_batch(columns)),
+      ('numpy batch decode', lambda: coder.decode_batch(encoded)),
+  ]
+  if pa is not None:
+    record_batch = coder.decode_record_batch(encoded)
+    benchmarks.extend([
+        ('arrow batch encode', lambda: coder.encode_batch(record_batch)),
+        ('arrow batch decode', lambda: coder.decode_record_batch(encoded)),
+    ])
+
+  results = {}
+  for name, fn in benchmarks:
+    rows_per_sec = num_rows / _time(fn, num_runs)
+    results[name] = rows_per_sec
+    if verbose:
+      print("%-20s rows/sec: %.0f" % (name, rows_per_sec))
+  return results
+
+
+if __name__ == '__main__':
+  logging.basicConfig()
+  run_benchmark()
@@ -0,0 +1,107 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""A microbenchmark for measuring StateCache throughput under contention.
+
+Runs a mix of get/put/peek operations against a StateCache and a
+ShardedStateCache from a varying number of threads, and reports the total
+number of cache operations per second.
+
+Run as
+  python -m apache_beam.tools.statecache_microbenchmark
+"""
+
+# pytype: skip-file
+
+import logging
+import random
+import threading
+import time
+
+from apache_beam.runners.worker.statecache import ShardedStateCache
+from apache_beam.runners.worker.statecache import StateCache
+from apache_beam.runners.worker.statecache import WeightedValue
+
+_NUM_KEYS = 10000
+_MAX_WEIGHT = 100 << 20
+
+
+def _run_threads(cache, num_threads, ops_per_thread, seed):
+  keys = [('token', 'key-%d' % i) for i in range(_NUM_KEYS)]
+  value = WeightedValue('value', 1000)
+  for key in keys:
+    cache.put(key, value)
+  start_event = threading.Event()
+
+  def worker(thread_id):
+    rand = random.Random(seed + thread_id)
+    indices = [rand.randrange(_NUM_KEYS) for _ in range(ops_per_thread)]
+    start_event.wait()
+    for i, index in enumerate(indices):
+      key = keys[index]
+      op = i % 10
+      if op < 7:
+        cache.get(key, lambda _: value)
+      elif op < 9:
+        cache.peek(key)
+      else:
+        cache.put(key, value)
+
+  threads = [
+      threading.Thread(target=worker, args=(i, )) for i in range(num_threads)
+  ]
+  for thread in threads:
+    thread.start()
+  start = time.time()
+  start_event.set()
+  for thread in threads:
+    thread.join()
+  return time.time() - start
+
+
+def run_benchmark(
+    num_runs=3,
+    ops_per_thread=20000,
+    thread_counts=(1, 2, 4, 8, 16, 32),
+    num_shards=16,
+    seed=0,
+    verbose=True):
+  cache_factories = [
+      ('StateCache', lambda: StateCache(_MAX_WEIGHT)),
+      (
+          'ShardedStateCache(%d)' % num_shards,
+          lambda: ShardedStateCache(_MAX_WEIGHT, num_shards)),
+  ]
+  results = {}
+  for num_threads in thread_counts:
+    for name, cache_factory in cache_factories:
+      times = [
+          _run_threads(cache_factory(), num_threads, ops_per_thread, seed)
+          for _ in range(num_runs)
+      ]
+      ops_per_sec = num_threads * ops_per_thread / (sum(times) / len(times))
+      results[name, num_threads] = ops_per_sec
+      if verbose:
+        print(
+            "%-24s threads: %2d, ops/sec: %.0f" %
+            (name, num_threads, ops_per_sec))
+  return results
+
+
+if __name__ == '__main__':
+  logging.basicConfig()
+  run_benchmark()
@@ -0,0 +1,111 @@
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""A microbenchmark measuring the read throughput of the text source.
+
+Writes a local text file of the requested size and reads it with the
+block-splitting fast path, with the batched output mode and with the
+per-record reader used for custom delimiters, reporting MB/sec and
+lines/sec for each.
+
+Run as
+  python -m apache_beam.tools.textio_microbenchmark --size_mb=2048
+"""
+
+# pytype: skip-file
+
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+
+from apache_beam import coders
+from apache_beam.io.filesystem import CompressionTypes
+from apache_beam.io.textio import _TextSource
+from apache_beam.io.textio import _TextSourceBatched
+
+
+def _write_file(file_name, size_bytes, seed):
+  rand = random.Random(seed)
+  lines = [
+      b'x' * rand.randrange(20, 200) + (b'\r\n' if i % 8 == 0 else b'\n')
+      for i in range(1000)
+  ]
+  chunk = b''.join(lines)
+  num_lines = 0
+  with open(file_name, 'wb') as f:
+    for _ in range(max(1, size_bytes // len(chunk))):
+      f.write(chunk)
+      num_lines += len(lines)
+  return num_lines
+
+
+def _read(source_class, file_name, **kwargs):
+  source = source_class(
+      file_name,
+      0,
+      CompressionTypes.UNCOMPRESSED,
+      True,
+      coders.StrUtf8Coder(),
+      validate=False,
+      **kwargs)
+  count = 0
+  for _ in source.read(source.get_range_tracker(None, None)):
+    count += 1
+  return count
+
+
+def run_benchmark(size_mb=1024, seed=0, verbose=True):
+  fd, file_name = tempfile.mkstemp(suffix='.txt')
+  os.close(fd)
+  try:
+    num_lines = _write_file(file_name, size_mb * 1024 * 1024, seed)
+    size_bytes = os.path.getsize(file_name)
+    benchmarks = [
+        ('block split', lambda: _read(_TextSource, file_name)),
+        ('block split batched', lambda: _read(_TextSourceBatched, file_name)),
+        ('per-record', lambda: _read(_TextSource, file_name, delimiter=b'\n')),
+    ]
+
+    results = {}
+    for name, fn in benchmarks:
+      start = time.time()
+      fn()
+      elapsed = time.time() - start
+      results[name] = size_bytes / elapsed
+      if verbose:
+        print(
+            "%-20s MB/sec: %8.1f lines/sec: %.0f" %
+            (name, size_bytes / elapsed / 1e6, num_lines / elapsed))
+    return results
+  finally:
+    os.remove(file_name)
+
+
+if __name__ == '__main__':
+  logging.basicConfig()
+  parser = argparse.ArgumentParser()
+  parser.add_argument(
+      '--size_mb',
+      type=int,
+      default=1024,
+      help='Size of the generated text file in MiB.')
+  parser.add_argument('--seed', type=int, default=0)
+  args = parser.parse_args()
+  run_benchmark(args.size_mb, args.seed)
@@ -25,10 +25,12 @@ from typing import Union
 import apache_beam as beam
 from apache_beam.coders import coders
 from apache_beam.io.requestresponse import DEFAULT_CACHE_ENTRY_TTL_SEC
+from apache_beam.io.requestresponse import DEFAULT_IN_MEMORY_CACHE_MAX_ENTRIES
 from apache_beam.io.requestresponse import DEFAULT_TIMEOUT_SECS
 from apache_beam.io.requestresponse import Caller
 from apache_beam.io.requestresponse import DefaultThrottler
 from apache_beam.io.requestresponse import ExponentialBackOffRepeater
+from apache_beam.io.requestresponse import InMemoryCache
 from apache_beam.io.requestresponse import PreCallThrottler
 from apache_beam.io.requestresponse import RedisCache
 from apache_beam.io.requestresponse import Repeater
@@ -200,11 +202,42 @@ class Enrichment(beam.PTransform[beam.PCollection[InputT],
         are required to connect to your redis server. Same as `redis.Redis()`.
     """
     if has_valid_redis_address(host, port):
-      self._cache = RedisCache(  # type: ignore[assignment]
+      redis_cache = RedisCache(
           host=host,
           port=port,
           time_to_live=time_to_live,
           request_coder=request_coder,
           response_coder=response_coder,
           **kwargs)
+      if isinstance(self._cache, InMemoryCache):
+        self._cache.next_cache = redis_cache
+      else:
+        self._cache = redis_cache  # type: ignore[assignment]
+    return self
+
+  def with_in_memory_cache(
+      self,
+      max_entries: int = DEFAULT_IN_MEMORY_CACHE_MAX_ENTRIES,
+      time_to_live: Union[int, timedelta] = DEFAULT_CACHE_ENTRY_TTL_SEC):
+    """Configure an in-memory cache, shared by all threads of each worker
+    process, to use with enrichment transform. Concurrent lookups for the same
+    cache key are also coalesced into a single request to the source.
+
+    If a Redis cache is configured as well, the in-memory cache is checked
+    first.
+
+    Args:
+      max_entries (int): The maximum number of responses held in memory by
+        each worker process.
+      time_to_live: `(Union[int, timedelta])` The time-to-live (TTL) for
+        records held in memory. Provide an integer (in seconds) or a
+        `datetime.timedelta` object.
+    """
+    next_cache = self._cache
+    if isinstance(next_cache, InMemoryCache):
+      next_cache = next_cache.next_cache
+    self._cache = InMemoryCache(  # type: ignore[assignment]
+        max_entries=max_entries,
+        time_to_live=time_to_live,
+        next_cache=next_cache)
     return self
@@ -320,6 +320,12 @@ class _BatchSizeEstimator(object):
 
   _MAX_DATA_POINTS = 100
   _MAX_GROWTH_FACTOR = 2
+  _BYTES_PER_ELEMENT_SMOOTHING = 0.25
+
+  # Defaults for estimators that were pickled into state by older versions.
+  _max_batch_bytes = None
+  _bytes_per_element = None
+  _bytes_distribution = None
 
   def __init__(
       self,
@@ -331,7 +337,8 @@ class _BatchSizeEstimator(object):
       variance=0.25,
       clock=time.time,
       ignore_first_n_seen_per_batch_size=0,
-      record_metrics=True):
+      record_metrics=True,
+      max_batch_bytes=None):
     if min_batch_size > max_batch_size:
       raise ValueError(
           "Minimum (%s) must not be greater than maximum (%s)" %
@@ -360,6 +367,9 @@ class _BatchSizeEstimator(object):
       raise ValueError(
           'ignore_first_n_seen_per_batch_size (%s) must be non '
           'negative' % (ignore_first_n_seen_per_batch_size))
+    if max_batch_bytes is not None and max_batch_bytes <= 0:
+      raise ValueError(
+          "max_batch_bytes (%s) must be positive" % (max_batch_bytes))
     self._min_batch_size = min_batch_size
     self._max_batch_size = max_batch_size
     self._target_batch_overhead = target_batch_overhead
@@ -377,14 +387,21 @@ class _BatchSizeEstimator(object):
     self._record_metrics = record_metrics
     self._element_count = 0
     self._batch_count = 0
+    self._max_batch_bytes = max_batch_bytes
+    # A moving average of the bytes per unit of batch size, as reported to
+    # record_time.
+    self._bytes_per_element = None
 
     if record_metrics:
       self._size_distribution = Metrics.distribution(
           'BatchElements', 'batch_size')
       self._time_distribution = Metrics.distribution(
           'BatchElements', 'msec_per_batch')
+      self._bytes_distribution = Metrics.distribution(
+          'BatchElements', 'bytes_per_batch')
     else:
       self._size_distribution = self._time_distribution = None
+      self._bytes_distribution = None
     # Beam distributions only accept integer values, so we use this to
     # accumulate under-reported values until they add up to whole milliseconds.
     # (Milliseconds are chosen because that's conventionally used elsewhere in
@@ -400,7 +417,7 @@ class _BatchSizeEstimator(object):
     self._ignore_next_timing = True
 
   @contextlib.contextmanager
-  def record_time(self, batch_size):
+  def record_time(self, batch_size, batch_bytes=None):
     start = self._clock()
     yield
     elapsed = float(self._clock() - start)
@@ -408,6 +425,15 @@ class _BatchSizeEstimator(object):
     if self._record_metrics:
       self._size_distribution.update(batch_size)
       self._time_distribution.update(int(elapsed_msec))
+      if batch_bytes is not None and self._bytes_distribution is not None:
+        self._bytes_distribution.update(int(batch_bytes))
+    if batch_bytes is not None and batch_size > 0:
+      bytes_per_element = float(batch_bytes) / batch_size
+      if self._bytes_per_element is None:
+        self._bytes_per_element = bytes_per_element
+      else:
+        self._bytes_per_element += self._BYTES_PER_ELEMENT_SMOOTHING * (
+            bytes_per_element - self._bytes_per_element)
     self._element_count += batch_size
     self._batch_count += 1
     self._remainder_msecs = elapsed_msec - int(elapsed_msec)
@@ -490,6 +516,15 @@ class _BatchSizeEstimator(object):
     linear_regression = linear_regression_no_numpy
 
   def _calculate_next_batch_size(self):
+    batch_size = self._calculate_next_batch_size_from_timings()
+    if self._max_batch_bytes and self._bytes_per_element:
+      # Don't target batches that are expected to exceed max_batch_bytes.
+      batch_size = max(
+          self._min_batch_size,
+          min(batch_size, int(self._max_batch_bytes / self._bytes_per_element)))
+    return batch_size
+
+  def _calculate_next_batch_size_from_timings(self):
     if self._min_batch_size == self._max_batch_size:
       return self._min_batch_size
     elif len(self._data) < 1:
@@ -567,42 +602,65 @@ class _BatchSizeEstimator(object):
     return result
 
   def stats(self):
-    return "element_count=%s batch_count=%s next_batch_size=%s timings=%s" % (
-        self._element_count,
-        self._batch_count,
-        self._calculate_next_batch_size(),
-        self._data)
+    return (
+        "element_count=%s batch_count=%s next_batch_size=%s "
+        "bytes_per_element=%s timings=%s" % (
+            self._element_count,
+            self._batch_count,
+            self._calculate_next_batch_size(),
+            self._bytes_per_element,
+            self._data))
 
 
 class _GlobalWindowsBatchingDoFn(DoFn):
-  def __init__(self, batch_size_estimator, element_size_fn):
+  def __init__(
+      self,
+      batch_size_estimator,
+      element_size_fn,
+      element_bytes_fn=None,
+      max_batch_bytes=None):
     self._batch_size_estimator = batch_size_estimator
     self._element_size_fn = element_size_fn
+    self._element_bytes_fn = element_bytes_fn
+    self._max_batch_bytes = max_batch_bytes
 
   def start_bundle(self):
     self._batch = []
     self._running_batch_size = 0
+    self._running_batch_bytes = 0
     self._target_batch_size = self._batch_size_estimator.next_batch_size()
     # The first emit often involves non-trivial setup.
     self._batch_size_estimator.ignore_next_timing()
 
+  def _record_time(self):
+    return self._batch_size_estimator.record_time(
+        self._running_batch_size,
+        self._running_batch_bytes if self._element_bytes_fn else None)
+
   def process(self, element):
     element_size = self._element_size_fn(element)
-    if self._running_batch_size + element_size > self._target_batch_size:
-      with self._batch_size_estimator.record_time(self._running_batch_size):
+    element_bytes = (
+        self._element_bytes_fn(element) if self._element_bytes_fn else 0)
+    if (self._running_batch_size + element_size > self._target_batch_size or
+        (self._max_batch_bytes and self._batch and
+         self._running_batch_bytes + element_bytes > self._max_batch_bytes)):
+      with self._record_time():
         yield window.GlobalWindows.windowed_value_at_end_of_window(self._batch)
       self._batch = []
       self._running_batch_size = 0
+      self._running_batch_bytes = 0
       self._target_batch_size = self._batch_size_estimator.next_batch_size()
     self._batch.append(element)
     self._running_batch_size += element_size
+    self._running_batch_bytes += element_bytes
 
   def finish_bundle(self):
     if self._batch:
-      with self._batch_size_estimator.record_time(self._running_batch_size):
+      with self._record_time():
         yield window.GlobalWindows.windowed_value_at_end_of_window(self._batch)
       self._batch = None
       self._running_batch_size = 0
+      self._running_batch_bytes = 0
     self._target_batch_size = self._batch_size_estimator.next_batch_size()
     logging.info(
         "BatchElements statistics: " + self._batch_size_estimator.stats())
@@ -612,15 +670,23 @@ class _SizedBatch():
   def __init__(self):
     self.elements = []
     self.size = 0
+    self.bytes = 0
 
 
 class _WindowAwareBatchingDoFn(DoFn):
 
   _MAX_LIVE_WINDOWS = 10
 
-  def __init__(self, batch_size_estimator, element_size_fn):
+  def __init__(
+      self,
+      batch_size_estimator,
+      element_size_fn,
+      element_bytes_fn=None,
+      max_batch_bytes=None):
     self._batch_size_estimator = batch_size_estimator
     self._element_size_fn = element_size_fn
+    self._element_bytes_fn = element_bytes_fn
+    self._max_batch_bytes = max_batch_bytes
 
   def start_bundle(self):
     self._batches = collections.defaultdict(_SizedBatch)
@@ -628,11 +694,19 @@ class _WindowAwareBatchingDoFn(DoFn):
     # The first emit often involves non-trivial setup.
     self._batch_size_estimator.ignore_next_timing()
 
+  def _record_time(self, batch):
+    return self._batch_size_estimator.record_time(
+        batch.size, batch.bytes if self._element_bytes_fn else None)
+
   def process(self, element, window=DoFn.WindowParam):
     batch = self._batches[window]
     element_size = self._element_size_fn(element)
-    if batch.size + element_size > self._target_batch_size:
-      with self._batch_size_estimator.record_time(batch.size):
+    element_bytes = (
+        self._element_bytes_fn(element) if self._element_bytes_fn else 0)
+    if (batch.size + element_size > self._target_batch_size or
+        (self._max_batch_bytes and batch.elements and
+         batch.bytes + element_bytes > self._max_batch_bytes)):
+      with self._record_time(batch):
         yield windowed_value.WindowedValue(
             batch.elements, window.max_timestamp(), (window, ))
       del self._batches[window]
@@ -640,12 +714,13 @@ class _WindowAwareBatchingDoFn(DoFn):
 
     self._batches[window].elements.append(element)
     self._batches[window].size += element_size
+    self._batches[window].bytes += element_bytes
 
     if len(self._batches) > self._MAX_LIVE_WINDOWS:
       window, batch = max(
           self._batches.items(),
           key=lambda window_batch: window_batch[1].size)
-      with self._batch_size_estimator.record_time(batch.size):
+      with self._record_time(batch):
         yield windowed_value.WindowedValue(
             batch.elements, window.max_timestamp(), (window, ))
       del self._batches[window]
@@ -654,7 +729,7 @@ class _WindowAwareBatchingDoFn(DoFn):
   def finish_bundle(self):
     for window, batch in self._batches.items():
       if batch:
-        with self._batch_size_estimator.record_time(batch.size):
+        with self._record_time(batch):
           yield windowed_value.WindowedValue(
               batch.elements, window.max_timestamp(), (window, ))
     self._batches = None
@@ -665,7 +740,8 @@ def _pardo_stateful_batch_elements(
     input_coder: coders.Coder,
     batch_size_estimator: _BatchSizeEstimator,
     max_buffering_duration_secs: int,
-    clock=time.time):
+    clock=time.time,
+    element_bytes_fn=None):
   ELEMENT_STATE = BagStateSpec('values', input_coder)
   COUNT_STATE = CombiningValueStateSpec('count', input_coder, CountCombineFn())
   BATCH_SIZE_STATE = ReadModifyWriteStateSpec('batch_size', input_coder)
@@ -753,7 +829,12 @@ def _pardo_stateful_batch_elements(
       element_state.clear()
       count_state.clear()
       batch_estimator = batch_estimator_state.read()
-      with batch_estimator.record_time(len(batch)):
+      # The batch size is bounded in bytes only through the estimator here,
+      # which learns the number of bytes per element from these batches.
+      batch_bytes = (
+          sum(element_bytes_fn(element)
+              for element in batch) if element_bytes_fn else None)
+      with batch_estimator.record_time(len(batch), batch_bytes):
         yield batch
       batch_size_state.write(batch_estimator.next_batch_size())
       batch_estimator_state.write(batch_estimator)
@@ -806,6 +887,10 @@ class BatchElements(PTransform):
   and maximum parameters by profiling the time taken by (fused) downstream
   operations. For a fixed batch size, set the min and max to be equal.
 
+  Batches can additionally be bounded by their total size in bytes, which
+  caps the number of elements per batch when elements are large without
+  limiting the batch size when they are small.
+
   Elements are batched per-window and batches emitted in the window
   corresponding to its contents. Each batch is emitted with a timestamp at
   the end of their window.
@@ -847,6 +932,14 @@ class BatchElements(PTransform):
         donwstream operations (mostly for testing)
     record_metrics: (optional) whether or not to record beam metrics on
         distributions of the batch size. Defaults to True.
+    max_batch_bytes: (optional) the largest total size, in bytes, of a batch,
+        as measured by element_bytes_fn. An element larger than this on its
+        own is emitted in a batch by itself. With max_batch_duration_secs,
+        this only limits the batch size targeted based on the average element
+        size seen so far.
+    element_bytes_fn: (optional) A mapping of an element to its (estimated)
+        size in bytes. Defaults to the size estimate of the input
+        PCollection's coder if max_batch_bytes is set.
   """
   def __init__(
       self,
@@ -860,7 +953,9 @@ class BatchElements(PTransform):
       element_size_fn=lambda x: 1,
       variance=0.25,
       clock=time.time,
-      record_metrics=True):
+      record_metrics=True,
+      max_batch_bytes=None,
+      element_bytes_fn=None):
     self._batch_size_estimator = _BatchSizeEstimator(
         min_batch_size=min_batch_size,
         max_batch_size=max_batch_size,
@@ -870,12 +965,19 @@ class BatchElements(PTransform):
             target_batch_duration_secs_including_fixed_cost),
         variance=variance,
         clock=clock,
-        record_metrics=record_metrics)
+        record_metrics=record_metrics,
+        max_batch_bytes=max_batch_bytes)
     self._element_size_fn = element_size_fn
     self._max_batch_dur = max_batch_duration_secs
     self._clock = clock
+    self._max_batch_bytes = max_batch_bytes
+    self._element_bytes_fn = element_bytes_fn
 
   def expand(self, pcoll):
+    element_bytes_fn = self._element_bytes_fn
+    if element_bytes_fn is None and self._max_batch_bytes is not None:
+      element_bytes_fn = coders.registry.get_coder(
+          pcoll.element_type).estimate_size
     if getattr(pcoll.pipeline.runner, 'is_streaming', False):
       raise NotImplementedError("Requires stateful processing (BEAM-2687)")
     elif self._max_batch_dur is not None:
@@ -885,17 +987,24 @@ class BatchElements(PTransform):
               coder,
               self._batch_size_estimator,
               self._max_batch_dur,
-              self._clock))
+              self._clock,
+              element_bytes_fn))
     elif pcoll.windowing.is_default():
       # This is the same logic as _GlobalWindowsBatchingDoFn, but optimized
       # for that simpler case.
       return pcoll | ParDo(
           _GlobalWindowsBatchingDoFn(
-              self._batch_size_estimator, self._element_size_fn))
+              self._batch_size_estimator,
+              self._element_size_fn,
+              element_bytes_fn,
+              self._max_batch_bytes))
     else:
       return pcoll | ParDo(
           _WindowAwareBatchingDoFn(
-              self._batch_size_estimator, self._element_size_fn))
+              self._batch_size_estimator,
+              self._element_size_fn,
+              element_bytes_fn,
+              self._max_batch_bytes))
 
 
 class _IdentityWindowFn(NonMergingWindowFn):
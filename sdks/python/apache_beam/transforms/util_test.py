@@ -326,6 +326,82 @@ class BatchElementsTest(unittest.TestCase):
           | beam.Map(len))
       assert_that(res, equal_to([2, 10, 10, 10]))
 
+  def test_byte_bounded_batches(self):
+    with TestPipeline() as p:
+      res = (
+          p
+          | beam.Create(
+              [
+                  'a',
+                  'a',
+                  'aaa',  # First batch.
+                  'aaaaaaaaaaaa',  # Second batch, larger than the maximum.
+                  'aaaa',
+                  'aaaa',  # Third batch.
+                  'a',
+                  'a',
+                  'a',
+                  'a',
+                  'a',  # Fourth batch, limited by count.
+                  'a'
+              ],
+              reshuffle=False)
+          | util.BatchElements(
+              min_batch_size=5,
+              max_batch_size=5,
+              max_batch_bytes=8,
+              element_bytes_fn=len)
+          | beam.Map(lambda batch: (len(batch), len(''.join(batch)))))
+      assert_that(res, equal_to([(3, 5), (1, 12), (2, 8), (5, 5), (1, 1)]))
+
+  def test_byte_bounded_batches_default_to_coder_estimate(self):
+    with TestPipeline() as p:
+      res = (
+          p
+          | beam.Create([b'x' * 100] * 10, reshuffle=False)
+          | util.BatchElements(
+              min_batch_size=10, max_batch_size=10, max_batch_bytes=250)
+          | beam.Map(len))
+      # Each element is estimated at a little over 100 bytes.
+      assert_that(res, equal_to([2, 2, 2, 2, 2]))
+
+  def test_byte_bounded_batches_use_element_type_coder(self):
+    with TestPipeline() as p:
+      res = (
+          p
+          | beam.Create(range(10), reshuffle=False).with_output_types(int)
+          | util.BatchElements(
+              min_batch_size=10, max_batch_size=10, max_batch_bytes=2)
+          | beam.Map(len))
+      # VarIntCoder estimates each element at 1 byte, whereas a fallback
+      # FastPrimitivesCoder would add a type byte and allow only one.
+      assert_that(res, equal_to([2, 2, 2, 2, 2]))
+
+  def test_byte_bounded_windowed_batches(self):
+    # Assumes a single bundle, in order so we pin to the FnApiRunner
+    with TestPipeline('FnApiRunner') as p:
+      res = (
+          p
+          | beam.Create(range(1, 8), reshuffle=False)
+          | beam.Map(lambda t: window.TimestampedValue('a' * t, t))
+          | beam.WindowInto(window.FixedWindows(4))
+          | util.BatchElements(
+              min_batch_size=10,
+              max_batch_size=10,
+              max_batch_bytes=6,
+              element_bytes_fn=len)
+          | beam.Map(lambda batch: ''.join(batch))
+          | beam.Map(len))
+      assert_that(
+          res,
+          equal_to([
+              6,  # elements in [0, 4)
+              4,
+              5,
+              6,
+              7,  # elements in [4, 8)
+          ]))
+
   def test_sized_windowed_batches(self):
     # Assumes a single bundle, in order so we pin to the FnApiRunner
     with TestPipeline('FnApiRunner') as p:
@@ -394,6 +470,25 @@ class BatchElementsTest(unittest.TestCase):
         clock.sleep(batch_duration(actual_sizes[-1]))
     self.assertEqual(expected_sizes, actual_sizes)
 
+  def test_max_batch_bytes(self):
+    clock = FakeClock()
+    batch_estimator = util._BatchSizeEstimator(
+        target_batch_overhead=.05,
+        target_batch_duration_secs=None,
+        clock=clock,
+        max_batch_bytes=1000)
+    batch_duration = lambda batch_size: 1 + .7 * batch_size
+    # Without the byte limit, this would grow to 27 items (as above), but at
+    # 100 bytes per element, only 10 fit.
+    expected_sizes = [1, 2, 4, 8, 10, 10, 10]
+    actual_sizes = []
+    for _ in range(len(expected_sizes)):
+      actual_sizes.append(batch_estimator.next_batch_size())
+      with batch_estimator.record_time(actual_sizes[-1],
+                                       100 * actual_sizes[-1]):
+        clock.sleep(batch_duration(actual_sizes[-1]))
+    self.assertEqual(expected_sizes, actual_sizes)
+
   def test_variance(self):
     clock = FakeClock()
     variance = 0.25
@@ -295,8 +295,10 @@ def _arrow_type_from_beam_fieldtype(
 
 
 class PyarrowBatchConverter(BatchConverter):
+  _BATCH_TYPE = pa.Table
+
   def __init__(self, element_type: RowTypeConstraint):
-    super().__init__(pa.Table, element_type)
+    super().__init__(self._BATCH_TYPE, element_type)
     self._beam_schema = typing_to_runner_api(element_type).row_type.schema
     arrow_schema = arrow_schema_from_beam_schema(self._beam_schema)
 
@@ -355,6 +357,45 @@ class PyarrowBatchConverter(BatchConverter):
         self._beam_schema.SerializeToString(), )
 
 
+class PyarrowRecordBatchConverter(PyarrowBatchConverter):
+  _BATCH_TYPE = pa.RecordBatch
+
+  @staticmethod
+  def from_typehints(element_type,
+                     batch_type) -> Optional['PyarrowRecordBatchConverter']:
+    assert batch_type == pa.RecordBatch
+
+    if not isinstance(element_type, RowTypeConstraint):
+      element_type = RowTypeConstraint.from_user_type(element_type)
+      if element_type is None:
+        raise TypeError(
+            f"Element type {element_type} must be compatible with Beam Schemas "
+            "(https://beam.apache.org/documentation/programming-guide/#schemas)"
+            " for batch type pa.RecordBatch.")
+
+    return PyarrowRecordBatchConverter(element_type)
+
+  def _to_record_batch(self, table: pa.Table) -> pa.RecordBatch:
+    batches = table.combine_chunks().to_batches()
+    if not batches:
+      return pa.RecordBatch.from_pylist([], schema=self._arrow_schema)
+    return batches[0]
+
+  def produce_batch(self, elements):
+    return self._to_record_batch(super().produce_batch(elements))
+
+  def combine_batches(self, batches: List[pa.RecordBatch]):
+    return self._to_record_batch(
+        pa.Table.from_batches(batches, schema=self._arrow_schema))
+
+  @staticmethod
+  def _from_serialized_schema(serialized_schema):
+    beam_schema = proto_utils.parse_Bytes(serialized_schema, schema_pb2.Schema)
+    element_type = typing_from_runner_api(
+        schema_pb2.FieldType(row_type=schema_pb2.RowType(schema=beam_schema)))
+    return PyarrowRecordBatchConverter(element_type)
+
+
 class PyarrowArrayBatchConverter(BatchConverter):
   def __init__(self, element_type: type):
     super().__init__(pa.Array, element_type)
@@ -393,8 +434,11 @@ def create_pyarrow_batch_converter(
   if batch_type == pa.Table:
     return PyarrowBatchConverter.from_typehints(
         element_type=element_type, batch_type=batch_type)
+  elif batch_type == pa.RecordBatch:
+    return PyarrowRecordBatchConverter.from_typehints(
+        element_type=element_type, batch_type=batch_type)
   elif batch_type == pa.Array:
     return PyarrowArrayBatchConverter.from_typehints(
         element_type=element_type, batch_type=batch_type)
 
-  raise TypeError("batch type must be pa.Table or pa.Array")
+  raise TypeError("batch type must be pa.Table, pa.RecordBatch or pa.Array")
@@ -81,6 +81,18 @@ class ArrowTypeCompatibilityTest(unittest.TestCase):
             ]),
         }),
     },
+    {
+        'batch_typehint': pa.RecordBatch,
+        'element_typehint': row_type.RowTypeConstraint.from_fields([
+            ('foo', Optional[int]),
+            ('baz', Optional[str]),
+        ]),
+        'batch': pa.RecordBatch.from_pydict({
+            'foo': pa.array(range(100), type=pa.int64()),
+            'baz': pa.array([None if i % 5 else str(i) for i in range(100)],
+                            type=pa.string()),
+        }),
+    },
     {
         'batch_typehint': pa.Array,
         'element_typehint': int,
@@ -195,12 +207,12 @@ class ArrowBatchConverterTest(unittest.TestCase):
 class ArrowBatchConverterErrorsTest(unittest.TestCase):
   @parameterized.expand([
       (
-          pa.RecordBatch,
+          pa.ChunkedArray,
           row_type.RowTypeConstraint.from_fields([
               ("bar", Optional[float]),  # noqa: F821
               ("baz", Optional[str]),  # noqa: F821
           ]),
-          r'batch type must be pa\.Table or pa\.Array',
+          r'batch type must be pa\.Table, pa\.RecordBatch or pa\.Array',
       ),
       (
           pa.Table,